@@ -142,11 +142,31 @@ echo 'config.AlertGenerator.cpuPoller.critical = 99' >> ./config/tier0/config.py
 #
 #echo 'config.Tier0Feeder.dropboxuser = "cmsprod"' >> ./config/tier0/config.py
 #echo 'config.Tier0Feeder.dropboxpass = "*******"' >> ./config/tier0/config.py
+#echo 'config.Tier0Feeder.conditionUploadWorkers = 4' >> ./config/tier0/config.py
+#echo 'config.Tier0Feeder.conditionUploadCompressLevel = 1' >> ./config/tier0/config.py
 
 #
 # needed for passing notifications back to StorageManager
 #
 #echo 'config.Tier0Feeder.transferSystemBaseDir = "/data/tier0/replayinject"' >> ./config/tier0/config.py
+#echo 'config.Tier0Feeder.smNotificationBudget = 10000' >> ./config/tier0/config.py
+
+#
+# drop streamer and lumi records of fully done runs
+#
+#echo 'config.Tier0Feeder.purgeRuns = True' >> ./config/tier0/config.py
+
+#
+# per stage (minimum, maximum) polling interval overrides
+#
+#echo 'config.Tier0Feeder.stageIntervals = { "feedCouchMonitoring" : (600, 3600) }' >> ./config/tier0/config.py
+
+#
+# run several feeders against the same T0AST, run/streams are
+# spread over lease partitions (same number for all feeders)
+#
+#echo 'config.Tier0Feeder.leasePartitions = 16' >> ./config/tier0/config.py
+#echo 'config.Tier0Feeder.leaseTimeout = 600' >> ./config/tier0/config.py
 
 #
 # upload PromptReco performance data
@@ -5,6 +5,10 @@ config = Configuration()
 # General configuration
 config.section_("Settings")
 config.Settings.xmlDir = "/data/tier0/sls"
+# seconds between job state snapshots
+config.Settings.pollInterval = 300
+# seconds between request database checks
+config.Settings.requestDBInterval = 900
 
 # Late workflows alarm
 config.section_("cmst0_late_workflows")
@@ -65,6 +69,8 @@ config.cmst0_long_jobs.Thresholds.Running.Processing = 18
 config.cmst0_long_jobs.Thresholds.Running.LogCollect = 24
 config.cmst0_long_jobs.Thresholds.Running.Cleanup = 24
 config.cmst0_long_jobs.RunBlacklist = ["000000"]
+config.cmst0_long_jobs.reportFile = "/afs/cern.ch/user/c/cmst1/www/LongJobs/LongJobs.html"
+config.cmst0_long_jobs.reportUrl = "http://cmst1.web.cern.ch/CMST1/LongJobs/LongJobs.html"
 config.cmst0_long_jobs.section_("Intervention")
 config.cmst0_long_jobs.Intervention.startTime = "2015-01-31T23:00:00"
 config.cmst0_long_jobs.Intervention.duration = 2
@@ -2,11 +2,17 @@
 config.component_('Tier0Feeder')
 config.Tier0Feeder.namespace = "T0Component.Tier0Feeder.Tier0Feeder"
 config.Tier0Feeder.componentDir = config.General.workDir + "/Tier0Feeder"
-config.Tier0Feeder.pollInterval = 30
+config.Tier0Feeder.pollInterval = 10
 config.Tier0Feeder.tier0ConfigFile = "TIER0_CONFIG_FILE"
 config.Tier0Feeder.specDirectory = "TIER0_SPEC_DIR"
 config.Tier0Feeder.requestDBName = "t0_request_local"
 
+config.component_('Tier0Auditor')
+config.Tier0Auditor.namespace = "T0Component.Tier0Auditor.Tier0Auditor"
+config.Tier0Auditor.componentDir = config.General.workDir + "/Tier0Auditor"
+config.Tier0Auditor.pollInterval = 300
+config.Tier0Auditor.timeBudget = 60
+
 config.JobSubmitter.LsfPluginQueue = "cmsrepack"
 config.JobSubmitter.LsfPluginResourceReq = "select[type==SLC5_64] rusage[pool=10000,mem=1800]"
 config.JobSubmitter.LsfPluginJobGroup = "/groups/tier0/wmagent_testing"
@@ -0,0 +1,222 @@
+"""
+_AuditAPI_
+
+API for the Tier0Auditor consistency checks
+
+Every run/stream with an open fileset is audited. A checkpoint per
+run/stream remembers the newest streamer or lumi record seen when
+it was last verified. Only run/streams that changed since then,
+were never verified or were verified longer than recheckInterval
+ago (for problems that show up without any change, like filesets
+that never close) are verified again.
+
+Verification stops once the time budget of a polling cycle is
+used up, the run/streams verified the longest time ago go first,
+the rest is picked up in later cycles.
+
+"""
+import logging
+import threading
+import time
+
+
+def checkMissingEoLS(daoFactory, candidate, now, settings):
+    """
+    _checkMissingEoLS_
+
+    Stopped run with EoLS records missing for some lumis
+
+    """
+    if candidate['stop_time'] == 0 or candidate['lumicount'] == 0:
+        return None
+    if now - candidate['stop_time'] < settings['eolsTimeout']:
+        return None
+
+    getClosedLumiCountDAO = daoFactory(classname = "Tier0Auditor.GetClosedLumiCount")
+    closedLumis, maxLumi = getClosedLumiCountDAO.execute(candidate['run'], candidate['stream'],
+                                                         transaction = False)
+
+    if closedLumis == candidate['lumicount'] and maxLumi == candidate['lumicount']:
+        return None
+
+    return "%d of %d lumis have EoLS records, highest lumi %d" % (closedLumis, candidate['lumicount'], maxLumi)
+
+def checkStreamerCounts(daoFactory, candidate, now, settings):
+    """
+    _checkStreamerCounts_
+
+    Closed lumis where the number of streamers doesn't match the EoLS record
+
+    """
+    getStreamerCountMismatchesDAO = daoFactory(classname = "Tier0Auditor.GetStreamerCountMismatches")
+    mismatches = getStreamerCountMismatchesDAO.execute(candidate['run'], candidate['stream'],
+                                                       now - settings['streamerTimeout'],
+                                                       transaction = False)
+
+    if len(mismatches) == 0:
+        return None
+
+    detail = ", ".join([ "lumi %d expected %d found %d" % (lumi, mismatches[lumi][0], mismatches[lumi][1])
+                         for lumi in sorted(mismatches.keys()) ])
+
+    return "%d lumis with streamer count mismatch: %s" % (len(mismatches), detail)
+
+def checkSplitLumis(daoFactory, candidate, now, settings):
+    """
+    _checkSplitLumis_
+
+    Closed run with lumis still marked as being split
+
+    """
+    if candidate['close_time'] == 0 or now - candidate['close_time'] < settings['splitTimeout']:
+        return None
+
+    getActiveSplitLumiCountDAO = daoFactory(classname = "Tier0Auditor.GetActiveSplitLumiCount")
+    activeSplitLumis = getActiveSplitLumiCountDAO.execute(candidate['run'], candidate['fileset'],
+                                                          transaction = False)
+
+    if activeSplitLumis == 0:
+        return None
+
+    return "%d lumis still marked as being split" % activeSplitLumis
+
+def checkOpenFileset(daoFactory, candidate, now, settings):
+    """
+    _checkOpenFileset_
+
+    Closed run with a fileset that didn't close
+
+    """
+    if candidate['close_time'] == 0 or now - candidate['close_time'] < settings['filesetTimeout']:
+        return None
+
+    return "fileset %d still open %d hours after run close" % (candidate['fileset'],
+                                                                (now - candidate['close_time']) // 3600)
+
+auditChecks = [ ("MissingEoLS", checkMissingEoLS),
+                ("StreamerCount", checkStreamerCounts),
+                ("SplitLumis", checkSplitLumis),
+                ("OpenFileset", checkOpenFileset) ]
+
+defaultSettings = { 'timeBudget' : 60,
+                    'recheckInterval' : 3600,
+                    'eolsTimeout' : 3600,
+                    'streamerTimeout' : 3600,
+                    'splitTimeout' : 7200,
+                    'filesetTimeout' : 86400 }
+
+
+def selectDue(candidates, now, recheckInterval):
+    """
+    _selectDue_
+
+    Run/streams that need verification, least recently verified first
+
+    """
+    due = []
+    for candidate in candidates:
+        if candidate['checkpoint'] == None or \
+           candidate['last_change'] > candidate['checkpoint'] or \
+           candidate['check_time'] < now - recheckInterval:
+            due.append(candidate)
+
+    due.sort(key = lambda x : (x['check_time'] or 0, x['run'], x['stream']))
+
+    return due
+
+def auditRunStreams(daoFactory, settings = defaultSettings, checks = auditChecks):
+    """
+    _auditRunStreams_
+
+    Called by Tier0Auditor
+
+    Verify changed run/streams within the time budget, record
+    checkpoints and findings. A run/stream where a check failed
+    gets no checkpoint and is verified again in the next cycle.
+    Returns a summary with the number of due, verified and failed
+    run/streams, the findings and the time spent in every check.
+
+    """
+    logging.debug("auditRunStreams()")
+    myThread = threading.currentThread()
+
+    findAuditCandidatesDAO = daoFactory(classname = "Tier0Auditor.FindAuditCandidates")
+    updateAuditCheckpointsDAO = daoFactory(classname = "Tier0Auditor.UpdateAuditCheckpoints")
+    replaceAuditFindingsDAO = daoFactory(classname = "Tier0Auditor.ReplaceAuditFindings")
+
+    startTime = time.time()
+    now = int(startTime)
+
+    candidates = findAuditCandidatesDAO.execute(transaction = False)
+    due = selectDue(candidates, now, settings['recheckInterval'])
+
+    summary = { 'candidates' : len(candidates),
+                'due' : len(due),
+                'verified' : 0,
+                'failed' : 0,
+                'findings' : [],
+                'durations' : dict([ (name, 0.0) for name, function in checks ]) }
+    summary['durations']['FindAuditCandidates'] = time.time() - startTime
+
+    bindsCheckpoint = []
+    bindsFinding = []
+    verified = []
+    for candidate in due:
+
+        if time.time() - startTime > settings['timeBudget']:
+            logging.info("Audit time budget used up, %d run/streams left for later" % (len(due) - len(verified) - summary['failed']))
+            break
+
+        failed = False
+        findings = []
+        for name, function in checks:
+            checkStartTime = time.time()
+            try:
+                detail = function(daoFactory, candidate, now, settings)
+            except Exception:
+                logging.exception("Audit check %s failed for run %d stream %d" % (name, candidate['run'], candidate['stream']))
+                failed = True
+                detail = None
+            summary['durations'][name] += time.time() - checkStartTime
+
+            if detail != None:
+                findings.append( (name, detail) )
+
+        # no checkpoint, the run/stream is verified again next cycle
+        if failed:
+            summary['failed'] += 1
+            continue
+
+        for name, detail in findings:
+            bindsFinding.append( { 'RUN' : candidate['run'],
+                                   'STREAM' : candidate['stream'],
+                                   'CHECK' : name,
+                                   'DETAIL' : detail[:4000],
+                                   'TIME' : now } )
+            summary['findings'].append( (candidate['run'], candidate['stream'], name, detail) )
+
+        verified.append( (candidate['run'], candidate['stream']) )
+        bindsCheckpoint.append( { 'RUN' : candidate['run'],
+                                  'STREAM' : candidate['stream'],
+                                  'LAST_CHANGE' : candidate['last_change'],
+                                  'TIME' : now,
+                                  'FINDINGS' : len(findings) } )
+
+    summary['verified'] = len(verified)
+
+    if len(verified) > 0:
+
+        try:
+            myThread.transaction.begin()
+            replaceAuditFindingsDAO.execute(verified, bindsFinding, conn = myThread.transaction.conn, transaction = True)
+            updateAuditCheckpointsDAO.execute(bindsCheckpoint, conn = myThread.transaction.conn, transaction = True)
+        except Exception as ex:
+            logging.exception(ex)
+            myThread.transaction.rollback()
+            raise RuntimeError("Problem in auditRunStreams() database transaction !")
+        else:
+            myThread.transaction.commit()
+
+    summary['durations']['total'] = time.time() - startTime
+
+    return summary
@@ -8,28 +8,144 @@ import os
 import stat
 import time
 import shutil
-import tarfile
 import logging
+import tempfile
 import threading
 import subprocess
 
 from T0.ConditionUpload import upload
+from T0.WMBS.DAOCache import cachedDAOFactory
 
-from WMCore.DAOFactory import DAOFactory
 
+#
+# failed payloads are retried after retryDelay seconds,
+# doubling with every further failure up to maxRetryDelay
+#
+retryDelay = 300
+maxRetryDelay = 3600
 
-def uploadConditions(username, password, serviceProxy):
+
+class PayloadTransfer(object):
+    """
+    _PayloadTransfer_
+
+    Moves payloads between EOS, the local disk and the Dropbox.
+
+    All EOS copies are made with xrdcp, if a timeout is set they
+    are killed after that many seconds. The same timeout is used
+    for every HTTP request to the Dropbox.
+
+    Dropbox uploads go through one long lived session, keep the
+    PayloadTransfer around to reuse tokens and connections across
+    polling cycles.
+
+    """
+    eosPrefix = "root://eoscms//eos/cms"
+
+    def __init__(self, username, password, serviceProxy, timeout = 0, workDir = None,
+                 compressLevel = upload.defaultCompressLevel):
+        self.username = username
+        self.password = password
+        self.serviceProxy = serviceProxy
+        self.timeout = timeout
+        self.workDir = workDir
+        if self.workDir == None:
+            self.workDir = os.getcwd()
+        self.session = upload.UploadSession(username, password, timeout = timeout,
+                                            compressLevel = compressLevel)
+        return
+
+    def pfn(self, lfn):
+        """
+        _pfn_
+
+        Return the EOS location of a payload file
+
+        """
+        return self.eosPrefix + lfn
+
+    def copy(self, source, destination):
+        """
+        _copy_
+
+        Copy a file from or to EOS, return success and output
+
+        """
+        command = "export X509_USER_PROXY=%s\n" % self.serviceProxy
+        if self.timeout > 0:
+            command += "env KRB5CCNAME=/tmp/bla timeout %d xrdcp -s -f %s %s" % (self.timeout, source, destination)
+        else:
+            command += "env KRB5CCNAME=/tmp/bla xrdcp -s -f %s %s" % (source, destination)
+        p = subprocess.Popen(command, shell = True,
+                             stdin=subprocess.PIPE,
+                             stdout=subprocess.PIPE,
+                             stderr=subprocess.STDOUT)
+        output = p.communicate()[0]
+        return (p.returncode == 0, output)
+
+    def upload(self, filenameDB):
+        """
+        _upload_
+
+        Upload a payload (sqlite and metadata file) to the Dropbox
+
+        """
+        upload.uploadTier0Files([filenameDB], self.username, self.password,
+                                session = self.session)
+        return
+
+    def close(self):
+        """
+        _close_
+
+        Close the Dropbox session
+
+        """
+        self.session.close()
+        return
+
+
+def queueAcquiredConditions():
+    """
+    _queueAcquiredConditions_
+
+    Called by Tier0Feeder on startup
+
+    Queue the run/streams with acquired payload files as
+    pending. Only new payload files queue their run/stream,
+    payload files that were inserted before the pending
+    queue existed are picked up this way.
+
+    """
+    logging.debug("queueAcquiredConditions()")
+    myThread = threading.currentThread()
+
+    daoFactory = cachedDAOFactory(package = "T0.WMBS",
+                                  logger = logging,
+                                  dbinterface = myThread.dbi)
+
+    queueAcquiredConditionsDAO = daoFactory(classname = "ConditionUpload.QueueAcquiredConditions")
+    queueAcquiredConditionsDAO.execute(transaction = False)
+
+    return
+
+def uploadConditions(username, password, serviceProxy,
+                     maxWorkers = 4, payloadTimeout = 0, transfer = None):
     """
     _uploadConditions_
 
     Called by Tier0Feeder in every polling cycle
 
-    Determine PCL status incl. files for upload for all
-    run/stream combos that are not finished yet.
+    Only run/streams queued as pending (new payload files
+    since they were last handled) are looked at for files
+    to upload.
 
-    Loop through the runs, uploading files for all
-    streams. If the run/stream  upload subscription
-    is finished, mark that run/stream PCL as finished.
+    Late payloads for run/streams that already finished
+    the PCL are uploaded right away.
+
+    Loop through the runs that have not finished the PCL,
+    uploading files for all streams. If the run/stream upload
+    subscription is finished, mark that run/stream PCL as finished.
 
     Terminate the loop on the first run that has
     not completely finished streams, but only
@@ -37,98 +153,85 @@ def uploadConditions(username, password, serviceProxy):
     end time (either from the EoR record or based
     on the insertion time of the last streamer file).
 
+    The payloads of a run/stream are uploaded by up
+    to maxWorkers threads in parallel, each one limited
+    to payloadTimeout seconds per copy or request.
+
+    Pass in a PayloadTransfer to keep the Dropbox session
+    open between calls.
+
     """
     logging.debug("uploadConditions()")
     myThread = threading.currentThread()
 
-    daoFactory = DAOFactory(package = "T0.WMBS",
-                            logger = logging,
-                            dbinterface = myThread.dbi)
+    daoFactory = cachedDAOFactory(package = "T0.WMBS",
+                                  logger = logging,
+                                  dbinterface = myThread.dbi)
 
-    getConditionsDAO = daoFactory(classname = "ConditionUpload.GetConditions")
-    completeFilesDAO = daoFactory(classname = "ConditionUpload.CompleteFiles")
+    getPendingConditionsDAO = daoFactory(classname = "ConditionUpload.GetPendingConditions")
+    getUnfinishedRunStreamsDAO = daoFactory(classname = "ConditionUpload.GetUnfinishedRunStreams")
+    getRunConditionInfoDAO = daoFactory(classname = "ConditionUpload.GetRunConditionInfo")
+    clearPendingConditionsDAO = daoFactory(classname = "ConditionUpload.ClearPendingConditions")
 
     finishPCLforEmptyExpressDAO = daoFactory(classname = "ConditionUpload.FinishPCLforEmptyExpress")
 
     isPromptCalibrationFinishedDAO = daoFactory(classname = "ConditionUpload.IsPromptCalibrationFinished")
     markPromptCalibrationFinishedDAO = daoFactory(classname = "ConditionUpload.MarkPromptCalibrationFinished")
 
-    # look at all runs which are finished with conditions uploads
-    # check for late arriving payloads and upload them
-    conditions = getConditionsDAO.execute(finished = True, transaction = False)
-
-    for (index, run) in enumerate(sorted(conditions.keys()), 1):
-
-        dropboxHost = conditions[run]['dropboxHost']
-        validationMode = conditions[run]['validationMode']
+    if transfer == None:
+        transfer = PayloadTransfer(username, password, serviceProxy, timeout = payloadTimeout)
 
-        for streamid, uploadableFiles in conditions[run]['streams'].items():
+    # check for pathological runs with no express data that will never
+    # create conditions for upload and set them to finished
+    finishPCLforEmptyExpressDAO.execute(transaction = False)
 
-            if len(uploadableFiles) > 0:
+    pendingConditions = getPendingConditionsDAO.execute(transaction = False)
+    unfinishedRunStreams = getUnfinishedRunStreamsDAO.execute(transaction = False)
 
-                uploadedFiles = uploadToDropbox(uploadableFiles, dropboxHost, validationMode,
-                                                username, password, serviceProxy)
+    runs = set(unfinishedRunStreams.keys())
+    for (run, streamid) in pendingConditions.keys():
+        runs.add(run)
+    runInfo = getRunConditionInfoDAO.execute(sorted(runs), transaction = False)
 
-                if len(uploadedFiles) > 0:
+    # queued run/streams without anything left to upload
+    emptyBinds = []
+    for (run, streamid), pending in sorted(pendingConditions.items()):
+        if len(pending['files']) == 0:
+            emptyBinds.append( { 'RUN' : run,
+                                 'STREAMID' : streamid } )
+    if len(emptyBinds) > 0:
+        clearPendingConditionsDAO.execute(emptyBinds, transaction = False)
 
-                    bindVarList = []
-                    for uploadedFile in uploadedFiles:
-                        bindVarList.append( { 'FILEID' : uploadedFile['fileid'],
-                                              'SUBSCRIPTION' : uploadedFile['subscription'] } )
-
-                    # need a transaction here so we don't have files in
-                    # state acquired and complete at the same time
-                    try:
-                        myThread.transaction.begin()
-                        completeFilesDAO.execute(bindVarList, conn = myThread.transaction.conn, transaction = True)
-                    except:
-                        myThread.transaction.rollback()
-                        raise
-                    else:
-                        myThread.transaction.commit()
+    # runs which are finished with conditions uploads
+    # upload late arriving payloads
+    for (run, streamid), pending in sorted(pendingConditions.items()):
 
+        if pending['finished'] and len(pending['files']) > 0:
 
-    # check for pathological runs with no express data that will never
-    # create conditions for upload and set them to finished
-    finishPCLforEmptyExpressDAO.execute(transaction = False)
+            uploadRunStream(daoFactory, run, streamid, pending['files'],
+                            runInfo[run]['validationMode'], transfer, maxWorkers)
 
-    # look at all runs not completely finished with condition uploads
-    # return acquired (to be uploaded) files for them 
-    conditions = getConditionsDAO.execute(finished = False, transaction = False)
+    # runs not completely finished with condition uploads
+    # are walked in order
+    unfinishedRuns = sorted(unfinishedRunStreams.keys())
 
-    for (index, run) in enumerate(sorted(conditions.keys()), 1):
+    for (index, run) in enumerate(unfinishedRuns, 1):
 
         advanceToNextRun = True
 
-        timeout = conditions[run]['condUploadTimeout']
-        dropboxHost = conditions[run]['dropboxHost']
-        validationMode = conditions[run]['validationMode']
+        for streamid in sorted(unfinishedRunStreams[run]):
 
-        for streamid, uploadableFiles in conditions[run]['streams'].items():
+            uploadableFiles = []
+            if (run, streamid) in pendingConditions:
+                uploadableFiles = pendingConditions[(run, streamid)]['files']
 
             if len(uploadableFiles) > 0:
 
-                uploadedFiles = uploadToDropbox(uploadableFiles, dropboxHost, validationMode,
-                                                username, password, serviceProxy)
+                uploadedFiles = uploadRunStream(daoFactory, run, streamid, uploadableFiles,
+                                                runInfo[run]['validationMode'], transfer, maxWorkers)
 
                 if len(uploadedFiles) > 0:
 
-                    bindVarList = []
-                    for uploadedFile in uploadedFiles:
-                        bindVarList.append( { 'FILEID' : uploadedFile['fileid'],
-                                              'SUBSCRIPTION' : uploadedFile['subscription'] } )
-
-                    # need a transaction here so we don't have files in
-                    # state acquired and complete at the same time
-                    try:
-                        myThread.transaction.begin()
-                        completeFilesDAO.execute(bindVarList, conn = myThread.transaction.conn, transaction = True)
-                    except:
-                        myThread.transaction.rollback()
-                        raise
-                    else:
-                        myThread.transaction.commit()
-
                     # check if all files for run/stream uploaded (that means only complete
                     # files for same number of subscriptions as number of producers)
                     markPromptCalibrationFinishedDAO.execute(run, streamid, transaction = False)
@@ -148,29 +251,125 @@ def uploadConditions(username, password, serviceProxy):
                 advanceToNextRun = False
 
         # check for timeout, but only if there is a next run
-        if not advanceToNextRun and index < len(conditions.keys()):
+        if not advanceToNextRun and index < len(unfinishedRuns):
 
-            getRunStopTimeDAO = daoFactory(classname = "ConditionUpload.GetRunStopTime")
-            stopTime = getRunStopTimeDAO.execute(run, transaction = False)
-
-            if time.time() < stopTime + timeout:
+            if time.time() < runInfo[run]['stopTime'] + runInfo[run]['condUploadTimeout']:
                 break
 
     return
 
-def uploadToDropbox(condFiles, dropboxHost, validationMode,
-                    username, password, serviceProxy):
+def uploadRunStream(daoFactory, run, streamid, uploadableFiles,
+                    validationMode, transfer, maxWorkers):
+    """
+    _uploadRunStream_
+
+    Upload all payloads for a run/stream, skipping payloads
+    that failed recently.
+
+    Uploaded files are completed, the upload attempts are
+    updated and the run/stream is removed from the pending
+    queue (if nothing is left to upload) in a single
+    transaction for the run/stream.
+
+    Returns the list of completed files.
+
+    """
+    myThread = threading.currentThread()
+
+    getUploadAttemptsDAO = daoFactory(classname = "ConditionUpload.GetUploadAttempts")
+    completeFilesDAO = daoFactory(classname = "ConditionUpload.CompleteFiles")
+    recordUploadFailuresDAO = daoFactory(classname = "ConditionUpload.RecordUploadFailures")
+    clearUploadFailuresDAO = daoFactory(classname = "ConditionUpload.ClearUploadFailures")
+    clearPendingConditionsDAO = daoFactory(classname = "ConditionUpload.ClearPendingConditions")
+    recordConditionsUploadedDAO = daoFactory(classname = "ConditionUpload.RecordConditionsUploaded")
+
+    uploadAttempts = getUploadAttemptsDAO.execute(run, streamid, transaction = False)
+
+    now = int(time.time())
+    deferredPayloads = set()
+    for payload, attempts in uploadAttempts.items():
+        delay = min(retryDelay * 2**(attempts['attempts'] - 1), maxRetryDelay)
+        if now < attempts['last_attempt'] + delay:
+            deferredPayloads.add(payload)
+
+    if len(deferredPayloads) > 0:
+        logging.info("Deferring upload of %d failed payloads for run %d stream %d" % (len(deferredPayloads), run, streamid))
+
+    (uploadedFiles, failedPayloads) = uploadToDropbox(uploadableFiles, validationMode, transfer,
+                                                      maxWorkers = maxWorkers,
+                                                      deferredPayloads = deferredPayloads)
+
+    bindVarList = []
+    clearBinds = []
+    for uploadedFile in uploadedFiles:
+        bindVarList.append( { 'FILEID' : uploadedFile['fileid'],
+                              'SUBSCRIPTION' : uploadedFile['subscription'] } )
+        payload = payloadName(uploadedFile['lfn'])
+        if payload in uploadAttempts:
+            clearBinds.append( { 'RUN' : run,
+                                 'STREAMID' : streamid,
+                                 'PAYLOAD' : payload } )
+            del uploadAttempts[payload]
+
+    failureBinds = []
+    for payload in failedPayloads:
+        failureBinds.append( { 'RUN' : run,
+                               'STREAMID' : streamid,
+                               'PAYLOAD' : payload,
+                               'TIME' : now } )
+
+    if len(bindVarList) > 0 or len(failureBinds) > 0:
+
+        # need a transaction here so we don't have files in
+        # state acquired and complete at the same time
+        try:
+            myThread.transaction.begin()
+            if len(bindVarList) > 0:
+                completeFilesDAO.execute(bindVarList, conn = myThread.transaction.conn, transaction = True)
+                recordConditionsUploadedDAO.execute( { 'RUN' : run, 'STREAMID' : streamid, 'TIME' : int(time.time()) },
+                                                     conn = myThread.transaction.conn, transaction = True)
+            if len(clearBinds) > 0:
+                clearUploadFailuresDAO.execute(clearBinds, conn = myThread.transaction.conn, transaction = True)
+            if len(failureBinds) > 0:
+                recordUploadFailuresDAO.execute(failureBinds, conn = myThread.transaction.conn, transaction = True)
+            clearPendingConditionsDAO.execute( { 'RUN' : run, 'STREAMID' : streamid },
+                                               conn = myThread.transaction.conn, transaction = True)
+        except:
+            myThread.transaction.rollback()
+            raise
+        else:
+            myThread.transaction.commit()
+
+    return uploadedFiles
+
+def payloadName(lfn):
+    """
+    _payloadName_
+
+    Payloads are identified by the filename without extension
+
+    """
+    return os.path.basename(lfn).split('.')[0]
+
+def uploadToDropbox(condFiles, validationMode, transfer,
+                    maxWorkers = 1, deferredPayloads = set()):
     """
     _uploadToDropbox_
 
     Upload a number of files to the Dropbox
 
-    The files are on AFS and are both sqlite and metadata.
+    The files are on EOS and are both sqlite and metadata.
     They also contain both the regular destination and the
     validation destionation, depending on the value of the
     passed in validationMode parameter one needs to be
     filtered out.
 
+    Payloads are uploaded by up to maxWorkers threads,
+    payloads in deferredPayloads are not tried.
+
+    Returns the completed files and the names of the
+    payloads that failed to upload.
+
     """
     # sort files
     completeFiles = []
@@ -180,122 +379,130 @@ def uploadToDropbox(condFiles, dropboxHost, validationMode,
             completeFiles.append(condFile)
         else:
             (filenamePrefix, filenameExt) = os.path.basename(condFile['lfn']).split('.')
+            if filenamePrefix in deferredPayloads:
+                continue
             if filenamePrefix not in filesDict:
                 filesDict[filenamePrefix] = {}
             filesDict[filenamePrefix][filenameExt] = condFile
 
-    for filenamePrefix in filesDict.keys():
-
-        sqliteFile = filesDict[filenamePrefix]['db']
-        metaFile = filesDict[filenamePrefix]['txt']
-
-        completeFiles.extend( uploadPayload(filenamePrefix, sqliteFile, metaFile,
-                                            dropboxHost, validationMode,
-                                            username, password,
-                                            serviceProxy) )
+    payloads = sorted(filesDict.keys())
+    results = {}
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                if len(payloads) == 0:
+                    return
+                filenamePrefix = payloads.pop(0)
+            try:
+                result = uploadPayload(filenamePrefix,
+                                       filesDict[filenamePrefix]['db'],
+                                       filesDict[filenamePrefix]['txt'],
+                                       validationMode, transfer)
+            except:
+                logging.exception("Something went wrong with the upload of payload %s..." % filenamePrefix)
+                result = []
+            with lock:
+                results[filenamePrefix] = result
+
+    workers = []
+    for i in range(min(maxWorkers, len(payloads))):
+        thread = threading.Thread(target = worker)
+        thread.start()
+        workers.append(thread)
+    for thread in workers:
+        thread.join()
+
+    failedPayloads = []
+    for filenamePrefix in sorted(results.keys()):
+        if len(results[filenamePrefix]) > 0:
+            completeFiles.extend(results[filenamePrefix])
+        else:
+            failedPayloads.append(filenamePrefix)
 
-    return completeFiles
+    return (completeFiles, failedPayloads)
 
-def uploadPayload(filenamePrefix, sqliteFile, metaFile, dropboxHost, validationMode, username, password, serviceProxy):
+def uploadPayload(filenamePrefix, sqliteFile, metaFile, validationMode, transfer):
     """
     _uploadPayload_
 
     Upload a single payload consisting of a sqlite
     file and a metadata file to the dropbox.
+
+    The payload is staged in its own directory, so
+    that payloads can be uploaded concurrently.
     
     """
     completeFiles = []
-    files2delete = []
     inputCopied = True
 
-    filenameDB = filenamePrefix + ".db"
-    filenameTXT = filenamePrefix + ".txt"
-    filenameTAR = filenamePrefix + ".tar.bz2"
+    stagingDir = tempfile.mkdtemp(prefix = filenamePrefix + ".", dir = transfer.workDir)
 
-    eosPrefix = "root://eoscms//eos/cms"
-    sqliteFile['pfn'] = eosPrefix + sqliteFile['lfn']
-    metaFile['pfn'] = eosPrefix + metaFile['lfn']
-
-    command = "export X509_USER_PROXY=%s\n" % serviceProxy
-    command += "env KRB5CCNAME=/tmp/bla xrdcp -s -f %s %s" % (sqliteFile['pfn'], filenameDB)
-    p = subprocess.Popen(command, shell = True,
-                         stdout=subprocess.PIPE,
-                         stderr=subprocess.STDOUT)
-    output = p.communicate()[0]
-    if p.returncode > 0:
-        logging.error("Failure during copy from EOS: %s" % output)
-        logging.error("  ==> Upload failed for payload %s" % filenamePrefix)
-        inputCopied = False
-    else:
-        files2delete.append(filenameDB)
-
-    command = "export X509_USER_PROXY=%s\n" % serviceProxy
-    command += "env KRB5CCNAME=/tmp/bla xrdcp -s -f %s %s" % (metaFile['pfn'], filenameTXT)
-    p = subprocess.Popen(command, shell = True,
-                         stdout=subprocess.PIPE,
-                         stderr=subprocess.STDOUT)
-    output = p.communicate()[0]
-    if p.returncode > 0:
-        logging.error("Failure during copy from EOS: %s" % output)
-        logging.error("  ==> Upload failed for payload %s" % filenamePrefix)
-        inputCopied = False
-    else:
-        files2delete.append(filenameTXT)
-
-    # select the right destination db depending
-    # on whether we are in validation mode
-    if inputCopied:
-        fin = open(filenameTXT)
-        lines = fin.readlines()
-        fin.close()
-        fout = open(filenameTXT, 'w')
-        if validationMode:
-            fout.writelines( [ line.replace('prepMetaData ', '', 1) for line in lines if 'prodMetaData ' not in line] )
-        else:
-            fout.writelines( [ line.replace('prodMetaData ', '', 1) for line in lines if 'prepMetaData ' not in line] )
-        fout.close()
-
-        os.chmod(filenameDB, stat.S_IREAD | stat.S_IWRITE | stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IWGRP | stat.S_IROTH | stat.S_IWOTH)
-        os.chmod(filenameTXT, stat.S_IREAD | stat.S_IWRITE | stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IWGRP | stat.S_IROTH | stat.S_IWOTH)
-
-        if username == None or password == None:
-            completeFiles.append(sqliteFile)
-            completeFiles.append(metaFile)
-            logging.info("No username/password provided for DropBox upload...")
-            logging.info("  ==> Upload skipped for payload %s" % filenamePrefix)
-        elif serviceProxy == None:
-            completeFiles.append(sqliteFile)
-            completeFiles.append(metaFile)
-            logging.info("No service proxy provided to access EOS for uploaded record...")
-            logging.info("  ==> Upload skipped for payload %s" % filenamePrefix)
-        else:
-            # needed by the PCL monitoring to know whether we uploaded to prod or validation
-            command = "export X509_USER_PROXY=%s\n" % serviceProxy
-            command += "env KRB5CCNAME=/tmp/bla xrdcp -s -f %s %s" % (filenameTXT, metaFile['pfn'] + ".uploaded")
-            p = subprocess.Popen(command, shell = True,
-                                 stdin=subprocess.PIPE,
-                                 stdout=subprocess.PIPE,
-                                 stderr=subprocess.STDOUT)
-            output = p.communicate()[0]
-            if p.returncode > 0:
-                logging.error("Failure during copy of .uploaded file to EOS: %s" % output)
+    filenameDB = os.path.join(stagingDir, filenamePrefix + ".db")
+    filenameTXT = os.path.join(stagingDir, filenamePrefix + ".txt")
+
+    sqliteFile['pfn'] = transfer.pfn(sqliteFile['lfn'])
+    metaFile['pfn'] = transfer.pfn(metaFile['lfn'])
+
+    try:
+
+        for (condFile, filename) in [ (sqliteFile, filenameDB), (metaFile, filenameTXT) ]:
+            (success, output) = transfer.copy(condFile['pfn'], filename)
+            if not success:
+                logging.error("Failure during copy from EOS: %s" % output)
                 logging.error("  ==> Upload failed for payload %s" % filenamePrefix)
+                inputCopied = False
+                break
+
+        # select the right destination db depending
+        # on whether we are in validation mode
+        if inputCopied:
+            fin = open(filenameTXT)
+            lines = fin.readlines()
+            fin.close()
+            fout = open(filenameTXT, 'w')
+            if validationMode:
+                fout.writelines( [ line.replace('prepMetaData ', '', 1) for line in lines if 'prodMetaData ' not in line] )
             else:
-                uploadStatus = True
-                try:
-                    upload.uploadTier0Files([filenameDB], username, password)
-                except:
-                    logging.exception("Something went wrong with the Dropbox upload...")
-                    uploadStatus = False
-
-                if uploadStatus:
-                    completeFiles.append(sqliteFile)
-                    completeFiles.append(metaFile)
-                    logging.info("  ==> Upload succeeded for payload %s" % filenamePrefix)
-                else:
+                fout.writelines( [ line.replace('prodMetaData ', '', 1) for line in lines if 'prepMetaData ' not in line] )
+            fout.close()
+
+            os.chmod(filenameDB, stat.S_IREAD | stat.S_IWRITE | stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IWGRP | stat.S_IROTH | stat.S_IWOTH)
+            os.chmod(filenameTXT, stat.S_IREAD | stat.S_IWRITE | stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IWGRP | stat.S_IROTH | stat.S_IWOTH)
+
+            if transfer.username == None or transfer.password == None:
+                completeFiles.append(sqliteFile)
+                completeFiles.append(metaFile)
+                logging.info("No username/password provided for DropBox upload...")
+                logging.info("  ==> Upload skipped for payload %s" % filenamePrefix)
+            elif transfer.serviceProxy == None:
+                completeFiles.append(sqliteFile)
+                completeFiles.append(metaFile)
+                logging.info("No service proxy provided to access EOS for uploaded record...")
+                logging.info("  ==> Upload skipped for payload %s" % filenamePrefix)
+            else:
+                # needed by the PCL monitoring to know whether we uploaded to prod or validation
+                (success, output) = transfer.copy(filenameTXT, metaFile['pfn'] + ".uploaded")
+                if not success:
+                    logging.error("Failure during copy of .uploaded file to EOS: %s" % output)
                     logging.error("  ==> Upload failed for payload %s" % filenamePrefix)
+                else:
+                    uploadStatus = True
+                    try:
+                        transfer.upload(filenameDB)
+                    except:
+                        logging.exception("Something went wrong with the Dropbox upload...")
+                        uploadStatus = False
+
+                    if uploadStatus:
+                        completeFiles.append(sqliteFile)
+                        completeFiles.append(metaFile)
+                        logging.info("  ==> Upload succeeded for payload %s" % filenamePrefix)
+                    else:
+                        logging.error("  ==> Upload failed for payload %s" % filenamePrefix)
 
-    for file2delete in files2delete:
-        os.remove(file2delete)
+    finally:
+        shutil.rmtree(stagingDir, ignore_errors = True)
 
     return completeFiles
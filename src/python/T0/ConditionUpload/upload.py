@@ -13,8 +13,10 @@ __email__ = 'andreas.pfeiffer@cern.ch'
 __version__ = 1
 
 
+import io
 import os
 import sys
+import bz2
 import optparse
 import hashlib
 import tarfile
@@ -30,12 +32,15 @@ defaultHostname = 'cms-conddb-prod.cern.ch'
 defaultHostnamePrep = 'cms-conddb-dev.cern.ch'
 defaultUrlTemplate = 'https://%s/cmsDbUpload/'
 defaultTemporaryFile = 'upload.tar.bz2'
+defaultCompressLevel = 9
+defaultSpoolSize = 64 * 1024 * 1024
 defaultNetrcHost = 'Dropbox'
 defaultWorkflow = 'offline'
 
 # common/http.py start (plus the "# Try to extract..." section bit)
 import time
 import logging
+import threading
 import cStringIO
 
 import pycurl
@@ -332,7 +337,9 @@ class HTTP(object):
 
         self.curl.setopt(pycurl.HTTPHEADER, ['Accept: application/json'])
         # self.curl.setopt( self.curl.POST, {})
-        self.curl.setopt(self.curl.HTTPGET, 0)
+        # the handle may be reused after an upload, make sure
+        # the form data from that POST isn't sent again
+        self.curl.setopt(self.curl.HTTPGET, 1)
 
         response = cStringIO.StringIO()
         self.curl.setopt(pycurl.WRITEFUNCTION, response.write)
@@ -365,7 +372,7 @@ class HTTP(object):
         If some data is specified, a POST request will be used.
 
         If files is specified, it must be a dictionary like data but
-        the values are filenames.
+        the values are filenames (or tuples of curl form options).
 
         By default, cookies are kept in-between requests.
 
@@ -408,7 +415,11 @@ class HTTP(object):
 
                     if files is not None:
                         for (key, fileName) in files.items():
-                            finalData[key] = (self.curl.FORM_FILE, fileName)
+                            if isinstance(fileName, tuple):
+                                # already prepared form options
+                                finalData[key] = fileName
+                            else:
+                                finalData[key] = (self.curl.FORM_FILE, fileName)
                     self.curl.setopt( self.curl.HTTPPOST, finalData.items() )
 
                 self.curl.setopt(pycurl.VERBOSE, 0)
@@ -442,6 +453,103 @@ def addToTarFile(tarFile, fileobj, arcname):
     tarInfo.uname = tarInfo.gname = 'root'
     tarFile.addfile(tarInfo, fileobj)
 
+class PayloadPackage(object):
+    '''The tar.bz2 upload package for a payload.
+
+    The tar stream is compressed and hashed in a single pass while it
+    is written. Packages up to spoolSize bytes stay in memory, larger
+    ones are spooled to a uniquely named temporary file in tempDir, so
+    concurrent uploads never share a file.
+
+    compressLevel trades package size for speed, 1 is several times
+    faster than the default 9 for typical sqlite payloads.
+    '''
+
+    def __init__(self, basepath, compressLevel = defaultCompressLevel, spoolSize = defaultSpoolSize, tempDir = None):
+        self.spoolSize = spoolSize
+        self.tempDir = tempDir
+        self.buffer = io.BytesIO()
+        self.tempFile = None
+        self.size = 0
+
+        self.compressor = bz2.BZ2Compressor(compressLevel)
+        self.hash = hashlib.sha1()
+
+        try:
+            tarFile = tarfile.open(mode = 'w|', fileobj = self)
+
+            with open('%s.db' % basepath, 'rb') as data:
+                addToTarFile(tarFile, data, 'data.db')
+
+            with open('%s.txt' % basepath, 'rb') as originalMetadata:
+                metadata = json.dumps(json.load(originalMetadata), sort_keys = True, indent = 4)
+            if not isinstance(metadata, bytes):
+                metadata = metadata.encode('utf-8')
+
+            tarInfo = tarfile.TarInfo('metadata.txt')
+            tarInfo.size = len(metadata)
+            tarInfo.mode = 0o400
+            tarInfo.uid = tarInfo.gid = tarInfo.mtime = 0
+            tarInfo.uname = tarInfo.gname = 'root'
+            tarFile.addfile(tarInfo, io.BytesIO(metadata))
+
+            tarFile.close()
+            self._output(self.compressor.flush())
+        except Exception as e:
+            self.close()
+            msg = 'Error when creating tar file: %s\n' % str(e)
+            msg += 'Please check that you have write access to the temporary directory,\n'
+            msg += 'and that you have enough space on this disk (df -h .)\n'
+            logging.error(msg)
+            raise Exception(msg)
+
+        if self.tempFile is not None:
+            self.tempFile.close()
+
+        self.fileHash = self.hash.hexdigest()
+
+    def write(self, data):
+        '''Called by tarfile with the uncompressed tar stream.
+        '''
+        self._output(self.compressor.compress(data))
+
+    def _output(self, data):
+        if not data:
+            return
+
+        self.hash.update(data)
+        self.size += len(data)
+
+        if self.tempFile is None and self.size > self.spoolSize:
+            self.tempFile = tempfile.NamedTemporaryFile(prefix = 'upload.', suffix = '.tar.bz2',
+                                                        dir = self.tempDir, delete = False)
+            self.tempFile.write(self.buffer.getvalue())
+            self.buffer = None
+
+        if self.tempFile is None:
+            self.buffer.write(data)
+        else:
+            self.tempFile.write(data)
+
+    def formData(self):
+        '''Returns the curl form options to upload the package.
+
+        The package is uploaded under its hash as filename.
+        '''
+        if self.tempFile is None:
+            return (pycurl.FORM_BUFFER, self.fileHash, pycurl.FORM_BUFFERPTR, self.buffer.getvalue())
+        return (pycurl.FORM_FILE, self.tempFile.name, pycurl.FORM_FILENAME, self.fileHash)
+
+    def close(self):
+        '''Drops the package, removes the temporary file.
+        '''
+        self.buffer = None
+        if self.tempFile is not None:
+            self.tempFile.close()
+            if os.path.exists(self.tempFile.name):
+                os.unlink(self.tempFile.name)
+            self.tempFile = None
+
 class ConditionsUploader(object):
     '''Upload conditions to the CMS conditions uploader service.
     '''
@@ -482,6 +590,12 @@ class ConditionsUploader(object):
         # self.http.query('logout')
         self.token = None
 
+    def close(self):
+        '''Closes the connection.
+        '''
+
+        self.http.curl.close()
+
 
     def _checkForUpdates(self):
         '''Updates this script, if a new version is found.
@@ -517,11 +631,14 @@ class ConditionsUploader(object):
 
         return destDb
 
-    def uploadFile(self, filename, backend = defaultBackend, temporaryFile = defaultTemporaryFile):
+    def uploadFile(self, filename, backend = defaultBackend, temporaryFile = defaultTemporaryFile, compressLevel = defaultCompressLevel):
         '''Uploads a file to the dropBox.
 
         The filename can be without extension, with .db or with .txt extension.
         It will be stripped and then both .db and .txt files are used.
+
+        Packages too large to be kept in memory are written to a uniquely
+        named file in the directory of temporaryFile.
         '''
 
         basepath = filename.rsplit('.db', 1)[0].rsplit('.txt', 1)[0]
@@ -529,7 +646,7 @@ class ConditionsUploader(object):
 
         logging.debug('%s: %s: extracting destDB from MetaData ...', self.hostname, basename)
         destDb = self.getDestDbFromMetaData('%s.txt' %basepath)
-        if 'prep' in destDb:
+        if 'prep' in destDb and self.hostname != defaultHostnamePrep:
             self.hostname = defaultHostnamePrep
             self.http.setBaseUrl(self.urlTemplate % self.hostname)
             logging.info('%s: %s: redirecting upload to %s service as needed for Prep DB',  self.hostname, basename, self.hostname)
@@ -540,46 +657,18 @@ class ConditionsUploader(object):
 
         logging.debug('%s: %s: found destDB "%s" from MetaData, destHost updated as needed', self.hostname, basename, destDb)
 
-        logging.debug('%s: %s: Creating tar file for upload ...', self.hostname, basename)
+        package = PayloadPackage(basepath, compressLevel = compressLevel,
+                                 tempDir = os.path.dirname(temporaryFile) or None)
         try:
-            tarFile = tarfile.open(temporaryFile, 'w:bz2')
+            return self.uploadPackage(basename, package, backend)
+        finally:
+            package.close()
 
-            with open('%s.db' % basepath, 'rb') as data:
-                addToTarFile(tarFile, data, 'data.db')
-        except Exception as e:
-            msg = 'Error when creating tar file. \n'
-            msg += 'Please check that you have write access to the directory you are running,\n'
-            msg += 'and that you have enough space on this disk (df -h .)\n'
-            logging.error(msg)
-            raise Exception(msg)
-
-        with tempfile.NamedTemporaryFile() as metadata:
-            with open('%s.txt' % basepath, 'rb') as originalMetadata:
-                json.dump(json.load(originalMetadata), metadata, sort_keys = True, indent = 4)
-
-            metadata.seek(0)
-            addToTarFile(tarFile, metadata, 'metadata.txt')
-
-        tarFile.close()
-
-        logging.debug('%s: %s: Calculating hash...', self.hostname, basename)
-
-        fileHash = hashlib.sha1()
-        with open(temporaryFile, 'rb') as f:
-            while True:
-                data = f.read(4 * 1024 * 1024)
-                if not data:
-                    break
-                fileHash.update(data)
-
-        fileHash = fileHash.hexdigest()
-        fileInfo = os.stat(temporaryFile)
-        fileSize = fileInfo.st_size
-
-        logging.debug('%s: %s: Hash: %s', self.hostname, basename, fileHash)
+    def uploadPackage(self, basename, package, backend = defaultBackend):
+        '''Uploads an already packaged file to the dropBox.
+        '''
 
-        logging.info('%s: %s: Uploading file (%s, size %s) to the %s backend...', self.hostname, basename, fileHash, fileSize, backend)
-        os.rename(temporaryFile, fileHash)
+        logging.info('%s: %s: Uploading file (%s, size %s) to the %s backend...', self.hostname, basename, package.fileHash, package.size, backend)
         try:
             ret = self.http.query('uploadFile',
                               {
@@ -588,15 +677,19 @@ class ConditionsUploader(object):
                                 'userName': self.userName,
                               },
                               files = {
-                                        'uploadedFile': fileHash,
+                                        'uploadedFile': package.formData(),
                                       }
                               )
+        except HTTPError as e:
+            if e.code == 401:
+                # token expired or revoked, let the caller sign in again
+                raise
+            logging.error('Error from uploading: %s' % str(e))
+            ret = json.dumps( { "status": -1, "upload" : { 'itemStatus' : { basename : {'status':'failed', 'info':str(e)}}}, "error" : str(e)} )
         except Exception as e:
             logging.error('Error from uploading: %s' % str(e))
             ret = json.dumps( { "status": -1, "upload" : { 'itemStatus' : { basename : {'status':'failed', 'info':str(e)}}}, "error" : str(e)} )
 
-        os.unlink(fileHash)
-
         statusInfo = json.loads(ret)['upload']
         logging.debug( 'upload returned: %s', statusInfo )
 
@@ -620,7 +713,7 @@ class ConditionsUploader(object):
         if len(failedTags)  > 0: logging.error  ("tags FAILed  to upload   : %s ", str(failedTags) )
 
         fileLogURL = 'https://cms-conddb-dev.cern.ch/logs/dropBox/getFileLog?fileHash=%s' 
-        logging.info('file log at: %s', fileLogURL % fileHash)
+        logging.info('file log at: %s', fileLogURL % package.fileHash)
 
         return len(okTags)>0
 
@@ -716,17 +809,102 @@ def uploadAllFiles(options, arguments):
 
     return results
 
-def uploadTier0Files(filenames, username, password, cookieFileName = None):
+class UploadSession(object):
+    '''Long lived, signed in connection to the conditions uploader.
+
+    Keeps one ConditionsUploader (and with it one curl handle and its
+    open connections) per host, prod and prep. A token is reused until
+    tokenLifetime seconds have passed or the server answers 401, only
+    then the session signs in again.
+
+    Payloads can be uploaded from several threads, they are packaged
+    concurrently, the requests themselves are serialized.
+    '''
+
+    def __init__(self, username, password, tokenLifetime = 3600, timeout = 0, compressLevel = defaultCompressLevel):
+        self.username = username
+        self.password = password
+        self.tokenLifetime = tokenLifetime
+        self.timeout = timeout
+        self.compressLevel = compressLevel
+        self.uploaders = {}
+        self.signInTimes = {}
+        self.lock = threading.Lock()
+
+    def getUploader(self, hostname, forceSignIn = False):
+        '''Returns the signed in uploader for a host.
+        '''
+
+        uploader = self.uploaders.get(hostname)
+        if uploader is None:
+            uploader = ConditionsUploader(hostname)
+            if self.timeout > 0:
+                uploader.http.setTimeout(self.timeout)
+            self.uploaders[hostname] = uploader
+
+        if forceSignIn or not uploader.userName or \
+               time.time() > self.signInTimes[hostname] + self.tokenLifetime:
+            uploader.userName = None
+            if not uploader.signIn(self.username, self.password):
+                raise Exception('Could not sign in to %s' % hostname)
+            self.signInTimes[hostname] = time.time()
+
+        return uploader
+
+    def uploadFile(self, filename):
+        '''Uploads a file through the uploader for its destination host.
+        '''
+
+        basepath = filename.rsplit('.db', 1)[0].rsplit('.txt', 1)[0]
+        with open('%s.txt' % basepath, 'r') as jFile:
+            md = json.load( jFile )
+
+        hostname = defaultHostname
+        if 'oracle://cms_orcoff_prep' in md['destinationDatabase']:
+            hostname = defaultHostnamePrep
+
+        # package next to the payload files
+        package = PayloadPackage(basepath, compressLevel = self.compressLevel,
+                                 tempDir = os.path.dirname(basepath) or None)
+        try:
+            with self.lock:
+                try:
+                    return self.getUploader(hostname).uploadPackage(os.path.basename(basepath), package)
+                except HTTPError as e:
+                    if e.code != 401:
+                        raise
+
+                logging.info('%s: token rejected, signing in again', hostname)
+                return self.getUploader(hostname, forceSignIn = True).uploadPackage(os.path.basename(basepath), package)
+        finally:
+            package.close()
+
+    def close(self):
+        '''Signs out of all hosts and closes the connections.
+        '''
+
+        with self.lock:
+            for uploader in self.uploaders.values():
+                uploader.signOut()
+                uploader.close()
+            self.uploaders = {}
+            self.signInTimes = {}
+
+
+def uploadTier0Files(filenames, username, password, cookieFileName = None, timeout = 0, session = None):
     '''Uploads a bunch of files coming from Tier0.
     This has the following requirements:
         * Username/Password based authentication.
         * Uses the online backend.
         * Ignores errors related to the upload/content (e.g. duplicated file).
+    A non-zero timeout limits every HTTP request to that many seconds.
+    If a session is passed in it is used and left open, otherwise
+    a new session is made for these files only.
     '''
 
-    dropBox = ConditionsUploader()
-
-    dropBox.signIn(username, password)
+    dropBox = session
+    if dropBox is None:
+        dropBox = UploadSession(username, password, timeout = timeout)
 
     for filename in filenames:
         try:
@@ -751,7 +929,8 @@ def uploadTier0Files(filenames, username, password, cookieFileName = None):
             logging.error('Error from dropbox, upload-related, skipping.')
             continue
 
-    dropBox.signOut()
+    if session is None:
+        dropBox.close()
 
 
 def main():
@@ -0,0 +1,354 @@
+"""
+_ConnectionRegistry_
+
+Managed connections to the external databases used by the Tier0
+(HLTConfDB, StorageManager, PopConLog, Tier0 Data Service).
+
+Databases are registered by name with their connect url. Nothing
+is connected at registration time, connections are made on first
+use and kept in a per database pool. Worker threads borrow a
+database interface from the pool for the duration of a stage:
+
+    with registry.connection("StorageManager") as dbInterface:
+        RunLumiCloseoutAPI.stopRuns(dbInterface)
+
+New connections and connections that were idle for a while are
+health checked before they are handed out. Consecutive failures
+open a circuit breaker, while it is open borrowing fails right
+away with ExternalDatabaseUnavailable instead of waiting for the
+remote database to time out again. After retryDelay seconds the
+next borrow is allowed to try again. Connections that are dropped,
+after a failure or when the circuit breaker opens, are closed.
+
+Every query is timed, per database latency metrics are available
+through metrics().
+
+"""
+import logging
+import threading
+import time
+
+from contextlib import contextmanager
+
+from WMCore.Database.DBFactory import DBFactory
+from WMCore.WMException import WMException
+
+
+class ExternalDatabaseUnavailable(WMException):
+    """
+    _ExternalDatabaseUnavailable_
+
+    Raised when a connection can't be borrowed, either because
+    the circuit breaker is open, the database can't be reached
+    or all pooled connections are busy.
+
+    """
+    pass
+
+
+class TimedDBInterface(object):
+    """
+    _TimedDBInterface_
+
+    Wraps a database interface, times processData calls and
+    reports success or failure back to the pool. Everything
+    else is passed through to the wrapped interface.
+
+    """
+    def __init__(self, pool, dbInterface):
+        self.pool = pool
+        self.dbInterface = dbInterface
+        self.lastUsed = time.time()
+
+    def processData(self, *args, **kwargs):
+        startTime = time.time()
+        try:
+            result = self.dbInterface.processData(*args, **kwargs)
+        except:
+            self.pool.recordFailure(time.time() - startTime)
+            raise
+        self.pool.recordSuccess(time.time() - startTime)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self.dbInterface, name)
+
+
+class ConnectionPool(object):
+    """
+    _ConnectionPool_
+
+    Pool of database interfaces for one external database.
+
+    """
+    healthCheckSql = "SELECT 1 FROM DUAL"
+
+    def __init__(self, name, connectUrl, maxConnections = 2,
+                 failureThreshold = 3, retryDelay = 300,
+                 healthCheckInterval = 600):
+        self.name = name
+        self.connectUrl = connectUrl
+        self.maxConnections = maxConnections
+        self.failureThreshold = failureThreshold
+        self.retryDelay = retryDelay
+        self.healthCheckInterval = healthCheckInterval
+
+        # no DUAL table in SQLite (load test stand-ins)
+        if connectUrl.startswith("sqlite"):
+            self.healthCheckSql = "SELECT 1"
+
+        self.condition = threading.Condition()
+        self.idle = []
+        self.numConnections = 0
+
+        self.consecutiveFailures = 0
+        self.openUntil = 0
+
+        self.queries = 0
+        self.failures = 0
+        self.totalLatency = 0.0
+        self.maxLatency = 0.0
+
+        return
+
+    def _connect(self):
+        """
+        _connect_
+
+        Create a new database interface
+
+        """
+        dbFactory = DBFactory(logging, dburl = self.connectUrl, options = {})
+        return dbFactory.connect()
+
+    def _healthCheck(self, dbInterface):
+        """
+        _healthCheck_
+
+        Run a trivial query, raises if the database isn't usable
+
+        """
+        dbInterface.processData(self.healthCheckSql, {}, transaction = False)
+        return
+
+    def recordSuccess(self, latency):
+        with self.condition:
+            self.queries += 1
+            self.totalLatency += latency
+            self.maxLatency = max(self.maxLatency, latency)
+            self.consecutiveFailures = 0
+        return
+
+    def _close(self, connection):
+        """
+        _close_
+
+        Close the sessions of a dropped connection
+
+        """
+        try:
+            connection.engine.dispose()
+        except Exception as ex:
+            logging.warning("Can't close connection to %s database : %s" % (self.name, str(ex)))
+        return
+
+    def recordFailure(self, latency):
+        dropped = []
+        with self.condition:
+            self.queries += 1
+            self.failures += 1
+            self.totalLatency += latency
+            self.maxLatency = max(self.maxLatency, latency)
+            self.consecutiveFailures += 1
+            if self.consecutiveFailures >= self.failureThreshold:
+                if self.openUntil < time.time():
+                    logging.error("Too many failures for %s database, not using it for %d seconds" % (self.name, self.retryDelay))
+                self.openUntil = time.time() + self.retryDelay
+                # idle connections are reconnected after the retry delay
+                dropped = self.idle
+                self.idle = []
+                self.numConnections -= len(dropped)
+                self.condition.notify_all()
+        for connection in dropped:
+            self._close(connection)
+        return
+
+    def isAvailable(self):
+        """
+        _isAvailable_
+
+        False while the circuit breaker is open
+
+        """
+        with self.condition:
+            return self.openUntil <= time.time()
+
+    def _acquire(self, timeout):
+        """
+        _acquire_
+
+        Take an idle connection or reserve a slot for a new one.
+        Returns the connection or None if a new one has to be made.
+
+        """
+        deadline = None
+        if timeout != None:
+            deadline = time.time() + timeout
+
+        with self.condition:
+            while True:
+                if self.openUntil > time.time():
+                    raise ExternalDatabaseUnavailable("%s database unavailable, circuit breaker open" % self.name)
+                if len(self.idle) > 0:
+                    return self.idle.pop()
+                if self.numConnections < self.maxConnections:
+                    self.numConnections += 1
+                    return None
+                if deadline == None:
+                    self.condition.wait()
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise ExternalDatabaseUnavailable("No free connection to %s database" % self.name)
+                    self.condition.wait(remaining)
+
+    def _discard(self, connection = None):
+        if connection != None:
+            self._close(connection)
+        with self.condition:
+            self.numConnections -= 1
+            self.condition.notify()
+        return
+
+    def _release(self, connection):
+        with self.condition:
+            connection.lastUsed = time.time()
+            self.idle.append(connection)
+            self.condition.notify()
+        return
+
+    @contextmanager
+    def connection(self, timeout = None):
+        """
+        _connection_
+
+        Borrow a database interface for the duration of the with block.
+
+        """
+        connection = self._acquire(timeout)
+
+        try:
+            if connection == None:
+                connection = TimedDBInterface(self, self._connect())
+                connection.processData(self.healthCheckSql, {}, transaction = False)
+            elif time.time() - connection.lastUsed > self.healthCheckInterval:
+                connection.processData(self.healthCheckSql, {}, transaction = False)
+        except Exception as ex:
+            if connection == None:
+                # connect itself failed
+                self.recordFailure(0.0)
+            self._discard(connection)
+            raise ExternalDatabaseUnavailable("Can't connect to %s database : %s" % (self.name, str(ex)))
+
+        try:
+            yield connection
+        except:
+            # connection state is unknown after an error, don't reuse it
+            self._discard(connection)
+            raise
+        else:
+            self._release(connection)
+
+        return
+
+    def metrics(self):
+        """
+        _metrics_
+
+        Return usage and latency metrics
+
+        """
+        with self.condition:
+            metrics = { 'connections' : self.numConnections,
+                        'idle' : len(self.idle),
+                        'queries' : self.queries,
+                        'failures' : self.failures,
+                        'avg_latency' : 0.0,
+                        'max_latency' : self.maxLatency,
+                        'available' : self.openUntil <= time.time() }
+            if self.queries > 0:
+                metrics['avg_latency'] = self.totalLatency / self.queries
+        return metrics
+
+
+class ConnectionRegistry(object):
+    """
+    _ConnectionRegistry_
+
+    Named connection pools for all external databases
+
+    """
+    def __init__(self):
+        self.pools = {}
+        return
+
+    def register(self, name, connectUrl, **options):
+        """
+        _register_
+
+        Register a database, does not connect
+
+        """
+        self.pools[name] = ConnectionPool(name, connectUrl, **options)
+        return
+
+    def registerFromConfig(self, name, configSection):
+        """
+        _registerFromConfig_
+
+        Register a database from a configuration section, the connectUrl
+        is required, pool and circuit breaker settings are optional.
+        Nothing is registered if the section has no connectUrl.
+
+        """
+        connectUrl = getattr(configSection, "connectUrl", None)
+        if connectUrl == None:
+            return False
+
+        options = {}
+        for option in [ "maxConnections", "failureThreshold",
+                        "retryDelay", "healthCheckInterval" ]:
+            if hasattr(configSection, option):
+                options[option] = getattr(configSection, option)
+
+        self.register(name, connectUrl, **options)
+        return True
+
+    def have(self, name):
+        return name in self.pools
+
+    def isAvailable(self, name):
+        return self.have(name) and self.pools[name].isAvailable()
+
+    def connection(self, name, timeout = None):
+        """
+        _connection_
+
+        Borrow a connection to the named database (context manager)
+
+        """
+        if name not in self.pools:
+            raise ExternalDatabaseUnavailable("%s database not configured" % name)
+        return self.pools[name].connection(timeout)
+
+    def metrics(self):
+        """
+        _metrics_
+
+        Return metrics for all registered databases
+
+        """
+        metrics = {}
+        for name, pool in self.pools.items():
+            metrics[name] = pool.metrics()
+        return metrics
@@ -4,16 +4,13 @@ _AlcaHarvest_
 """
 import os
 import time
-import threading
-import logging
 
 from WMCore.WMBS.File import File
 
-from WMCore.JobSplitting.JobFactory import JobFactory
-from WMCore.DAOFactory import DAOFactory
+from T0.JobSplitting.T0JobFactory import T0JobFactory
 from WMCore.Services.UUID import makeUUID
 
-class AlcaHarvest(JobFactory):
+class AlcaHarvest(T0JobFactory):
     """
     _AlcaHarvest_
 
@@ -30,15 +27,11 @@ class AlcaHarvest(JobFactory):
         _algorithm_
 
         """
-        self.jobNamePrefix = kwargs.get('jobNamePrefix', "AlcaHarvest")
         run = kwargs['runNumber']
         timeout = kwargs['timeout']
 
-        myThread = threading.currentThread()
-
-        self.daoFactory = DAOFactory(package = "T0.WMBS",
-                                     logger = logging,
-                                     dbinterface = myThread.dbi)
+        state = self.newSplitState(jobNamePrefix = kwargs.get('jobNamePrefix', "AlcaHarvest"),
+                                   daoFactory = self.getDAOFactory(kwargs.get('dbinterface', None)))
 
         fileset = self.subscription.getFileset()
         fileset.load()
@@ -47,30 +40,32 @@ class AlcaHarvest(JobFactory):
 
             if timeout != None:
 
-                haveAlcaHarvestJobGroupDAO = self.daoFactory(classname = "Subscriptions.HaveJobGroup")
-                previousAlcaHarvest = haveAlcaHarvestJobGroupDAO.execute(self.subscription["id"])
+                haveAlcaHarvestJobGroupDAO = state.daoFactory(classname = "Subscriptions.HaveJobGroup")
+                previousAlcaHarvest = haveAlcaHarvestJobGroupDAO.execute(self.subscription["id"],
+                                                                         conn = state.conn, transaction = state.transaction)
 
                 if not previousAlcaHarvest:
 
-                    getRunStopTimeDAO = self.daoFactory(classname = "ConditionUpload.GetRunStopTime")
-                    stopTime = getRunStopTimeDAO.execute(run, transaction = False)
+                    getRunStopTimeDAO = state.daoFactory(classname = "ConditionUpload.GetRunStopTime")
+                    stopTime = getRunStopTimeDAO.execute(run, conn = state.conn, transaction = state.transaction)
 
                     if stopTime + timeout < time.time():
 
-                        self.createJob(self.getInputFilesForJob())
+                        self.createJob(state, self.getInputFilesForJob(state))
 
         else:
 
-            haveAvailableFileDAO = self.daoFactory(classname = "Subscriptions.HaveAvailableFile")
-            availableFile = haveAvailableFileDAO.execute(self.subscription["id"])
+            haveAvailableFileDAO = state.daoFactory(classname = "Subscriptions.HaveAvailableFile")
+            availableFile = haveAvailableFileDAO.execute(self.subscription["id"],
+                                                         conn = state.conn, transaction = state.transaction)
 
             if availableFile:
 
-                self.createJob(self.getInputFilesForJob())
+                self.createJob(state, self.getInputFilesForJob(state))
 
         return
 
-    def getInputFilesForJob(self):
+    def getInputFilesForJob(self, state):
         """
         _getInputFilesForJob_
 
@@ -78,10 +73,11 @@ class AlcaHarvest(JobFactory):
         and the needed metadata
 
         """
-        getAllFilesDAO = self.daoFactory(classname = "Subscriptions.GetAllFiles")
-        return getAllFilesDAO.execute(self.subscription["id"])
+        getAllFilesDAO = state.daoFactory(classname = "Subscriptions.GetAllFiles")
+        return getAllFilesDAO.execute(self.subscription["id"],
+                                      conn = state.conn, transaction = state.transaction)
 
-    def createJob(self, fileList):
+    def createJob(self, state, fileList):
         """
         _createJob_
 
@@ -90,7 +86,7 @@ class AlcaHarvest(JobFactory):
         """
         self.newGroup()
 
-        self.newJob(name = "%s-%s" % (self.jobNamePrefix, makeUUID()))
+        self.newJob(name = "%s-%s" % (state.jobNamePrefix, makeUUID()))
 
         for fileInfo in fileList:
             f = File(id = fileInfo['id'],
@@ -4,17 +4,14 @@ _Condition_
 Splitting algorithm for PCL condition handling
 """
 
-import logging
-import threading
 import time
 
 from WMCore.WMBS.File import File
 
-from WMCore.JobSplitting.JobFactory import JobFactory
-from WMCore.DAOFactory import DAOFactory
+from T0.JobSplitting.T0JobFactory import T0JobFactory
 
 
-class Condition(JobFactory):
+class Condition(T0JobFactory):
     """
     Split jobs by set of files
 
@@ -37,14 +34,14 @@ class Condition(JobFactory):
         run = kwargs['runNumber']
         stream = kwargs['streamName']
 
-        myThread = threading.currentThread()
-        daoFactory = DAOFactory(package = "T0.WMBS",
-                                logger = logging,
-                                dbinterface = myThread.dbi)
+        state = self.newSplitState()
+
+        daoFactory = self.getDAOFactory(kwargs.get('dbinterface', None))
 
         # data discovery
         getFilesDAO = daoFactory(classname = "Subscriptions.GetAvailableConditionFiles")
-        availableFiles = getFilesDAO.execute(self.subscription["id"])
+        availableFiles = getFilesDAO.execute(self.subscription["id"],
+                                             conn = state.conn, transaction = state.transaction)
 
         # nothing to do, stop immediately
         if len(availableFiles) == 0:
@@ -59,6 +56,7 @@ class Condition(JobFactory):
 
         if len(bindVarList) > 0:
             insertPromptCalibrationFileDAO = daoFactory(classname = "JobSplitting.InsertPromptCalibrationFile")
-            insertPromptCalibrationFileDAO.execute(bindVarList)
+            insertPromptCalibrationFileDAO.execute(bindVarList,
+                                                   conn = state.conn, transaction = state.transaction)
 
         return
@@ -2,19 +2,27 @@
 _Express_
 
 Splitting algorithm for express processing.
+
+Lumis with more than maxInputRate events are failed. If an
+inputEventBudget is set instead, lumis over the budget are
+prescaled: a deterministic subset of the streamers (selected
+by a checksum of the lfn) up to the budget is processed and
+only the excess is failed. The applied prescale is recorded
+per lumi and taken into account when more streamers for the
+same lumi arrive later.
 """
 
+import math
+import zlib
 import logging
-import threading
 
 from WMCore.WMBS.File import File
 
-from WMCore.JobSplitting.JobFactory import JobFactory
-from WMCore.DAOFactory import DAOFactory
+from T0.JobSplitting.T0JobFactory import T0JobFactory
 from WMCore.Services.UUID import makeUUID
 
 
-class Express(JobFactory):
+class Express(T0JobFactory):
     """
     Split jobs by set of files
 
@@ -28,31 +36,37 @@ class Express(JobFactory):
 
         """
         # extract some global scheduling parameters
-        self.jobNamePrefix = kwargs.get('jobNamePrefix', "Express")
-        self.maxInputRate = kwargs['maxInputRate']
-        self.maxInputEvents = kwargs['maxInputEvents']
-
-        self.createdGroup = False
+        state = self.newSplitState(jobNamePrefix = kwargs.get('jobNamePrefix', "Express"),
+                                   maxInputRate = kwargs['maxInputRate'],
+                                   maxInputEvents = kwargs['maxInputEvents'],
+                                   inputEventBudget = kwargs.get('inputEventBudget', None),
+                                   createdGroup = False)
         
         timePerEvent, sizePerEvent, memoryRequirement = \
                     self.getPerformanceParameters(kwargs.get('performance', {}))
         
-        myThread = threading.currentThread()
-        daoFactory = DAOFactory(package = "T0.WMBS",
-                                logger = logging,
-                                dbinterface = myThread.dbi)
+        daoFactory = self.getDAOFactory(kwargs.get('dbinterface', None))
 
         # keep for later
-        self.insertSplitLumisDAO = daoFactory(classname = "JobSplitting.InsertSplitLumis")
+        state.insertSplitLumisDAO = daoFactory(classname = "JobSplitting.InsertSplitLumis")
+        state.updateLumiPrescalesDAO = daoFactory(classname = "JobSplitting.UpdateLumiPrescales")
 
         # data discovery
         getFilesDAO = daoFactory(classname = "Subscriptions.GetAvailableExpressFiles")
-        availableFiles = getFilesDAO.execute(self.subscription["id"])
+        availableFiles = getFilesDAO.execute(self.subscription["id"],
+                                             conn = state.conn, transaction = state.transaction)
 
         # nothing to do, stop immediately
         if len(availableFiles) == 0:
             return
 
+        # already applied prescales
+        state.lumiPrescales = {}
+        if state.inputEventBudget != None:
+            getLumiPrescalesDAO = daoFactory(classname = "JobSplitting.GetLumiPrescales")
+            state.lumiPrescales = getLumiPrescalesDAO.execute(self.subscription["id"],
+                                                              conn = state.conn, transaction = state.transaction)
+
         # sort by lumi
         streamersByLumi = {}
         for result in availableFiles:
@@ -62,12 +76,12 @@ class Express(JobFactory):
             else:
                 streamersByLumi[lumi] = [ result ]
 
-        self.defineJobs(streamersByLumi, timePerEvent, sizePerEvent, memoryRequirement)
+        self.defineJobs(state, streamersByLumi, timePerEvent, sizePerEvent, memoryRequirement)
 
         return
 
 
-    def defineJobs(self, streamersByLumi, timePerEvent, sizePerEvent, memoryRequirement):
+    def defineJobs(self, state, streamersByLumi, timePerEvent, sizePerEvent, memoryRequirement):
         """
         _defineJobs_
 
@@ -77,6 +91,7 @@ class Express(JobFactory):
         logging.debug("defineJobs(): Running...")
 
         splitLumis = []
+        lumiPrescales = []
 
         for lumi in sorted(streamersByLumi.keys()):
 
@@ -89,8 +104,15 @@ class Express(JobFactory):
                 lumiEventsTotal += streamer['events']
                 lumiSizeTotal += streamer['filesize']
 
+            # rate budget mode, only process a prescaled subset
+            if state.inputEventBudget != None:
+                lumiStreamerList, lumiPrescale = self.prescaleLumi(state, lumi, lumiStreamerList, lumiEventsTotal)
+                lumiPrescales.append(lumiPrescale)
+                if len(lumiStreamerList) == 0:
+                    continue
+
             # check if we are over the max allowed rate
-            if lumiEventsTotal > self.maxInputRate:
+            elif lumiEventsTotal > state.maxInputRate:
                 self.markFailed(lumiStreamerList)
                 continue
 
@@ -114,12 +136,12 @@ class Express(JobFactory):
                         newEventsTotal = eventsTotal + streamer['events']
                         newSizeTotal = sizeTotal + streamer['filesize']
 
-                        if newEventsTotal <= self.maxInputEvents:
+                        if newEventsTotal <= state.maxInputEvents:
                             eventsTotal = newEventsTotal
                             sizeTotal = newSizeTotal
                             streamerList.append(streamer)
 
-                self.createJob(streamerList, eventsTotal, sizeTotal, timePerEvent, sizePerEvent, memoryRequirement)
+                self.createJob(state, streamerList, eventsTotal, sizeTotal, timePerEvent, sizePerEvent, memoryRequirement)
 
                 for streamer in streamerList:
                     lumiStreamerList.remove(streamer)
@@ -131,12 +153,66 @@ class Express(JobFactory):
                                      'LUMI' : lumi, 'NFILES' : nFiles } )
 
         if len(splitLumis) > 0:
-            self.insertSplitLumisDAO.execute(binds = splitLumis)
+            state.insertSplitLumisDAO.execute(binds = splitLumis,
+                                              conn = state.conn, transaction = state.transaction)
+
+        if len(lumiPrescales) > 0:
+            state.updateLumiPrescalesDAO.execute(binds = lumiPrescales,
+                                                 conn = state.conn, transaction = state.transaction)
 
         return
 
 
-    def createJob(self, streamerList, jobEvents, jobSize, timePerEvent, sizePerEvent, memoryRequirement):
+    def prescaleLumi(self, state, lumi, streamerList, eventsTotal):
+        """
+        _prescaleLumi_
+
+        Select the streamers of a lumi to be processed within the
+        input event budget, fail the excess. Streamers processed or
+        failed in earlier passes count against the budget.
+
+        The first streamer of a lumi is always processed so every
+        lumi keeps some express coverage.
+
+        Return the selected streamers and the prescale record
+
+        """
+        previous = state.lumiPrescales.get(lumi, { 'events_total' : 0,
+                                                   'events_accepted' : 0 })
+
+        eventsSeen = previous['events_total'] + eventsTotal
+        eventsAccepted = previous['events_accepted']
+
+        prescale = max(1, int(math.ceil(float(eventsSeen) / state.inputEventBudget)))
+
+        acceptedList = []
+        excessList = []
+        for streamer in sorted(streamerList, key = lambda x: x['lfn']):
+
+            selected = (zlib.crc32(streamer['lfn'].encode("utf-8")) & 0xffffffff) % prescale == 0
+
+            if eventsAccepted == 0 or \
+                   ( selected and eventsAccepted + streamer['events'] <= state.inputEventBudget ):
+                eventsAccepted += streamer['events']
+                acceptedList.append(streamer)
+            else:
+                excessList.append(streamer)
+
+        if len(excessList) > 0:
+            logging.info("Express lumi %d over input budget, prescale %d, failing %d streamers" % (lumi, prescale,
+                                                                                                   len(excessList)))
+            self.markFailed(excessList)
+
+        lumiPrescale = { 'SUB' : self.subscription["id"],
+                         'LUMI' : lumi,
+                         'PRESCALE' : prescale,
+                         'EVENTS_TOTAL' : eventsSeen,
+                         'EVENTS_ACCEPTED' : eventsAccepted }
+
+        return (acceptedList, lumiPrescale)
+
+
+    def createJob(self, state, streamerList, jobEvents, jobSize, timePerEvent, sizePerEvent, memoryRequirement):
         """
         _createJob_
 
@@ -144,11 +220,9 @@ class Express(JobFactory):
         the passed in list of streamers
 
         """
-        if not self.createdGroup:
-            self.newGroup()
-            self.createdGroup = True
+        self.newGroupOnce(state)
 
-        self.newJob(name = "%s-%s" % (self.jobNamePrefix, makeUUID()))
+        self.newJob(name = "%s-%s" % (state.jobNamePrefix, makeUUID()))
 
         for streamer in streamerList:
             f = File(id = streamer['id'],
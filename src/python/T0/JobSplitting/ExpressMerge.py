@@ -5,17 +5,15 @@ Splitting algorithm for express merging
 """
 
 import logging
-import threading
 import time
 
 from WMCore.WMBS.File import File
 
-from WMCore.JobSplitting.JobFactory import JobFactory
-from WMCore.DAOFactory import DAOFactory
+from T0.JobSplitting.T0JobFactory import T0JobFactory
 from WMCore.Services.UUID import makeUUID
 
 
-class ExpressMerge(JobFactory):
+class ExpressMerge(T0JobFactory):
     """
     Split jobs by set of files
 
@@ -29,22 +27,19 @@ class ExpressMerge(JobFactory):
 
         """
         # extract some global scheduling parameters
-        self.jobNamePrefix = kwargs.get('jobNamePrefix', "ExpressMerge")
-        self.maxInputSize = kwargs['maxInputSize']
-        self.maxInputFiles = kwargs['maxInputFiles']
-        self.maxLatency = kwargs['maxLatency']
-        self.currentTime = time.time()
+        state = self.newSplitState(jobNamePrefix = kwargs.get('jobNamePrefix', "ExpressMerge"),
+                                   maxInputSize = kwargs['maxInputSize'],
+                                   maxInputFiles = kwargs['maxInputFiles'],
+                                   maxLatency = kwargs['maxLatency'],
+                                   currentTime = time.time(),
+                                   createdGroup = False)
 
-        self.createdGroup = False
-
-        myThread = threading.currentThread()
-        daoFactory = DAOFactory(package = "T0.WMBS",
-                                logger = logging,
-                                dbinterface = myThread.dbi)
+        daoFactory = self.getDAOFactory(kwargs.get('dbinterface', None))
 
         # data discovery
         getFilesDAO = daoFactory(classname = "Subscriptions.GetAvailableExpressMergeFiles")
-        availableFiles = getFilesDAO.execute(self.subscription["id"])
+        availableFiles = getFilesDAO.execute(self.subscription["id"],
+                                             conn = state.conn, transaction = state.transaction)
 
         # nothing to do, stop immediately
         if len(availableFiles) == 0:
@@ -59,12 +54,12 @@ class ExpressMerge(JobFactory):
             else:
                 filesByLumi[lumi] = [ result ]
 
-        self.defineJobs(filesByLumi)
+        self.defineJobs(state, filesByLumi)
 
         return
 
 
-    def defineJobs(self, filesByLumi):
+    def defineJobs(self, state, filesByLumi):
         """
         _defineJobs_
 
@@ -83,8 +78,8 @@ class ExpressMerge(JobFactory):
         #     4. don't merge too many lumi sections as the jobs run too long
         #     5. last, don't produce too big files
         #
-        #     merge whatever we have (without holes) if oldest lumi section older than self.maxLatency
-        #     if self.maxLatency is 0, merge lumi by lumi
+        #     merge whatever we have (without holes) if oldest lumi section older than maxLatency
+        #     if maxLatency is 0, merge lumi by lumi
         #
 
         lastLumi = 0
@@ -100,7 +95,7 @@ class ExpressMerge(JobFactory):
             for fileInfo in lumiFileList:
                 if fileInfo['insert_time'] > lumiDoneTime:
                     lumiDoneTime = fileInfo['insert_time']
-            lumiAge = self.currentTime - lumiDoneTime
+            lumiAge = state.currentTime - lumiDoneTime
 
             # calculate lumi size and new total size and file count
             lumiSizeTotal = 0
@@ -112,15 +107,15 @@ class ExpressMerge(JobFactory):
 
             # first lumi, if not old enough bail out
             if len(jobFileList) == 0:
-                if lumiAge > self.maxLatency:
+                if lumiAge > state.maxLatency:
                     jobFileList.extend(lumiFileList)
                     lastLumi = lumi
                     jobSizeTotal = lumiSizeTotal
                 else:
                     break
-            # if self.maxLatency 0, just expressmerge lumi by lumi
-            elif self.maxLatency == 0:
-                self.createJob(jobFileList, jobSizeTotal)
+            # if maxLatency 0, just expressmerge lumi by lumi
+            elif state.maxLatency == 0:
+                self.createJob(state, jobFileList, jobSizeTotal)
                 jobFileList = lumiFileList
                 lastLumi = lumi
                 jobSizeTotal = lumiSizeTotal
@@ -128,8 +123,8 @@ class ExpressMerge(JobFactory):
             # triggers new age check on next out of sequence lumi
             # bail if not old enough
             elif lumi != lastLumi + 1:
-                self.createJob(jobFileList, jobSizeTotal)
-                if lumiAge > self.maxLatency:
+                self.createJob(state, jobFileList, jobSizeTotal)
+                if lumiAge > state.maxLatency:
                     jobFileList = lumiFileList
                     lastLumi = lumi
                     jobSizeTotal = lumiSizeTotal
@@ -137,26 +132,26 @@ class ExpressMerge(JobFactory):
                     jobFileList = []
                     break
             # if below limits just add to expressmerge job
-            elif newFileCount <= self.maxInputFiles and \
-                     newSizeTotal <= self.maxInputSize:
+            elif newFileCount <= state.maxInputFiles and \
+                     newSizeTotal <= state.maxInputSize:
                 jobFileList.extend(lumiFileList)
                 lastLumi = lumi
                 jobSizeTotal = newSizeTotal
             # over limits => expressmerge
             else:
-                self.createJob(jobFileList, jobSizeTotal)
+                self.createJob(state, jobFileList, jobSizeTotal)
                 jobFileList = lumiFileList
                 lastLumi = lumi
                 jobSizeTotal = lumiSizeTotal
 
         # sequential leftovers that are old enough
         if len(jobFileList) > 0:
-            self.createJob(jobFileList, jobSizeTotal)
+            self.createJob(state, jobFileList, jobSizeTotal)
 
         return
 
 
-    def createJob(self, fileList, jobSize):
+    def createJob(self, state, fileList, jobSize):
         """
         _createJob_
 
@@ -164,11 +159,9 @@ class ExpressMerge(JobFactory):
         the passed in list of files
 
         """
-        if not self.createdGroup:
-            self.newGroup()
-            self.createdGroup = True
+        self.newGroupOnce(state)
 
-        self.newJob(name = "%s-%s" % (self.jobNamePrefix, makeUUID()))
+        self.newJob(name = "%s-%s" % (state.jobNamePrefix, makeUUID()))
 
         largestFile = 0
         for fileInfo in fileList:
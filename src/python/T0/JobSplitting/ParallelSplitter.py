@@ -0,0 +1,195 @@
+"""
+_ParallelSplitter_
+
+Split many Repack/Express subscriptions concurrently on a
+thread or process pool.
+
+Every worker opens its own database connection when the pool
+starts, the splitters get it passed in as dbinterface and the
+WMBS objects pick it up as the thread database interface.
+Each subscription is split in its own transaction, the WMBS
+objects and the T0 DAOs of the splitter all run on it, a
+failed split is rolled back completely.
+
+Splitting has the same side effects as in the JobCreator
+(jobs are created and files acquired), only use this against
+a replay or test database.
+
+"""
+import logging
+import threading
+import time
+
+from WMCore.Database.DBFactory import DBFactory
+from WMCore.Database.Transaction import Transaction
+from WMCore.JobSplitting.SplitterFactory import SplitterFactory
+from WMCore.WMBS.Subscription import Subscription
+from WMCore.WMSpec.WMWorkload import WMWorkloadHelper
+from WMCore.DAOFactory import DAOFactory
+
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+
+
+def initWorker(connectUrl):
+    """
+    _initWorker_
+
+    Connect the database for a pool worker
+
+    """
+    myThread = threading.currentThread()
+    myThread.logger = logging.getLogger()
+    myThread.dbFactory = DBFactory(logging, dburl = connectUrl, options = {})
+    myThread.dbi = myThread.dbFactory.connect()
+    myThread.transaction = Transaction(myThread.dbi)
+    myThread.transaction.commit()
+    myThread.workloadCache = {}
+    return
+
+
+def getSplitParams(spec, taskPath):
+    """
+    _getSplitParams_
+
+    Splitting parameters for a workflow task, workloads
+    are cached per worker
+
+    """
+    myThread = threading.currentThread()
+
+    if spec not in myThread.workloadCache:
+        workload = WMWorkloadHelper()
+        workload.load(spec)
+        myThread.workloadCache[spec] = workload
+
+    task = myThread.workloadCache[spec].getTaskByPath(taskPath)
+    splitParams = task.jobSplittingParameters()
+    for key in [ 'algorithm', 'siteWhitelist', 'siteBlacklist' ]:
+        splitParams.pop(key, None)
+
+    return splitParams
+
+
+def splitSubscription(subscriptionInfo):
+    """
+    _splitSubscription_
+
+    Split one subscription in a pool worker
+
+    """
+    myThread = threading.currentThread()
+
+    result = { 'id' : subscriptionInfo['id'],
+               'split_algo' : subscriptionInfo['split_algo'],
+               'jobs' : 0,
+               'duration' : 0.0,
+               'error' : None }
+
+    startTime = time.time()
+    myThread.transaction.begin()
+    try:
+        subscription = Subscription(id = subscriptionInfo['id'])
+        subscription.load()
+
+        splitParams = getSplitParams(subscriptionInfo['spec'], subscriptionInfo['task'])
+        splitParams['dbinterface'] = myThread.dbi
+
+        splitterFactory = SplitterFactory(package = "T0.JobSplitting")
+        jobFactory = splitterFactory(package = "WMCore.WMBS",
+                                     subscription = subscription)
+        jobGroups = jobFactory(**splitParams)
+
+        for jobGroup in jobGroups:
+            result['jobs'] += len(jobGroup.jobs)
+
+        myThread.transaction.commit()
+    except Exception as ex:
+        myThread.transaction.rollback()
+        logging.exception("Failed to split subscription %d" % subscriptionInfo['id'])
+        result['error'] = str(ex)
+
+    result['duration'] = time.time() - startTime
+
+    return result
+
+
+def summarizeResults(results, elapsed):
+    """
+    _summarizeResults_
+
+    Throughput and per subscription timing for a parallel split
+
+    """
+    summary = { 'subscriptions' : len(results),
+                'failed' : 0,
+                'jobs' : 0,
+                'elapsed' : elapsed,
+                'subscriptions_per_second' : 0.0,
+                'avg_duration' : 0.0,
+                'max_duration' : 0.0 }
+
+    totalDuration = 0.0
+    for result in results:
+        if result['error'] != None:
+            summary['failed'] += 1
+        summary['jobs'] += result['jobs']
+        totalDuration += result['duration']
+        summary['max_duration'] = max(summary['max_duration'], result['duration'])
+
+    if len(results) > 0:
+        summary['avg_duration'] = totalDuration / len(results)
+    if elapsed > 0:
+        summary['subscriptions_per_second'] = len(results) / elapsed
+
+    return summary
+
+
+class ParallelSplitter(object):
+    """
+    _ParallelSplitter_
+
+    Split subscriptions on a pool of workers
+
+    """
+    def __init__(self, connectUrl, workers = 4, useProcesses = False):
+        self.connectUrl = connectUrl
+        self.workers = workers
+        self.useProcesses = useProcesses
+        return
+
+    def findSubscriptions(self, splitAlgos = [ "Repack", "Express" ]):
+        """
+        _findSubscriptions_
+
+        Subscriptions for the splitting algorithms that have available files
+
+        """
+        dbFactory = DBFactory(logging, dburl = self.connectUrl, options = {})
+        daoFactory = DAOFactory(package = "T0.WMBS",
+                                logger = logging,
+                                dbinterface = dbFactory.connect())
+
+        getSplittableSubscriptionsDAO = daoFactory(classname = "Subscriptions.GetSplittableSubscriptions")
+        return getSplittableSubscriptionsDAO.execute(splitAlgos)
+
+    def split(self, subscriptions):
+        """
+        _split_
+
+        Split all subscriptions, returns the per subscription results
+
+        """
+        if self.useProcesses:
+            poolClass = Pool
+        else:
+            poolClass = ThreadPool
+
+        pool = poolClass(self.workers, initWorker, (self.connectUrl,))
+        try:
+            results = pool.map(splitSubscription, subscriptions, chunksize = 1)
+        finally:
+            pool.close()
+            pool.join()
+
+        return results
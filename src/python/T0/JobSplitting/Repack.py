@@ -2,20 +2,26 @@
 _Repack_
 
 Splitting algorithm for repacking.
+
+In direct to merged mode (minMergeSize passed) repack outputs that
+are larger than minMergeSize (or have more than maxMergeEvents) are
+staged out directly to merged and skip the RepackMerge step. The
+size of each output is predicted from the stream trigger to dataset
+fractions and multi lumi jobs are allowed to grow (up to
+maxSizeSingleLumi) until the outputs holding directToMergedFraction
+of the output bytes are expected to pass the merge threshold.
 """
 
 import time
 import logging
-import threading
 
 from WMCore.WMBS.File import File
 
-from WMCore.JobSplitting.JobFactory import JobFactory
-from WMCore.DAOFactory import DAOFactory
+from T0.JobSplitting.T0JobFactory import T0JobFactory
 from WMCore.Services.UUID import makeUUID
 
 
-class Repack(JobFactory):
+class Repack(T0JobFactory):
     """
     Split jobs by set of files
 
@@ -29,44 +35,57 @@ class Repack(JobFactory):
 
         """
         # extract some global scheduling parameters
-        self.jobNamePrefix = kwargs.get('jobNamePrefix', "Repack")
-        self.maxSizeSingleLumi = kwargs['maxSizeSingleLumi']
-        self.maxSizeMultiLumi = kwargs['maxSizeMultiLumi']
-        self.maxInputEvents = kwargs['maxInputEvents']
-        self.maxInputFiles = kwargs['maxInputFiles']
-        self.maxLatency = kwargs['maxLatency']
-
-        self.currentTime = time.time()
-
-        self.createdGroup = False
+        state = self.newSplitState(jobNamePrefix = kwargs.get('jobNamePrefix', "Repack"),
+                                   maxSizeSingleLumi = kwargs['maxSizeSingleLumi'],
+                                   maxSizeMultiLumi = kwargs['maxSizeMultiLumi'],
+                                   maxInputEvents = kwargs['maxInputEvents'],
+                                   maxInputFiles = kwargs['maxInputFiles'],
+                                   maxLatency = kwargs['maxLatency'],
+                                   minMergeSize = kwargs.get('minMergeSize', None),
+                                   maxMergeEvents = kwargs.get('maxMergeEvents', None),
+                                   directToMergedFraction = kwargs.get('directToMergedFraction', 0.9),
+                                   currentTime = time.time(),
+                                   createdGroup = False)
 
         timePerEvent, sizePerEvent, memoryRequirement = \
                     self.getPerformanceParameters(kwargs.get('performance', {}))
         
-        myThread = threading.currentThread()
-        daoFactory = DAOFactory(package = "T0.WMBS",
-                                logger = logging,
-                                dbinterface = myThread.dbi)
+        daoFactory = self.getDAOFactory(kwargs.get('dbinterface', None))
 
         # keep for later
-        self.insertSplitLumisDAO = daoFactory(classname = "JobSplitting.InsertSplitLumis")
+        state.insertSplitLumisDAO = daoFactory(classname = "JobSplitting.InsertSplitLumis")
 
         # data discovery
         getAvailableFilesDAO = daoFactory(classname = "Subscriptions.GetAvailableRepackFiles")
-        availableFiles = getAvailableFilesDAO.execute(self.subscription["id"])
+        availableFiles = getAvailableFilesDAO.execute(self.subscription["id"],
+                                                      conn = state.conn, transaction = state.transaction)
 
         # nothing to do, stop immediately
         if len(availableFiles) == 0:
             return
 
+        # predicted output fractions for direct to merged sizing
+        state.outputFractions = {}
+        state.multiLumiSize = state.maxSizeMultiLumi
+        if state.minMergeSize != None:
+            getOutputFractionsDAO = daoFactory(classname = "Subscriptions.GetRepackOutputFractions")
+            state.outputFractions = getOutputFractionsDAO.execute(self.subscription["id"],
+                                                                  conn = state.conn, transaction = state.transaction)
+            state.multiLumiSize = self.getDirectToMergedSize(state)
+
+        state.directToMergedBytes = 0
+        state.unmergedBytes = 0
+
         # data discovery for already used lumis
         getUsedLumisDAO = daoFactory(classname = "Subscriptions.GetUsedLumis")
-        usedLumis = getUsedLumisDAO.execute(self.subscription["id"], False)
+        usedLumis = getUsedLumisDAO.execute(self.subscription["id"], False,
+                                            conn = state.conn, transaction = state.transaction)
 
         # empty lumis (as declared by StorageManager) are treated the
         # same way as used lumis, ie. we process around them
         getEmptyLumisDAO = daoFactory(classname = "Subscriptions.GetLumiHolesForRepack")
-        usedLumis |= getEmptyLumisDAO.execute(self.subscription["id"])
+        usedLumis |= getEmptyLumisDAO.execute(self.subscription["id"],
+                                              conn = state.conn, transaction = state.transaction)
 
         # sort available files by lumi
         availableFileLumiDict = {}
@@ -94,14 +113,14 @@ class Repack(JobFactory):
 
                     if haveLumiHole:
                         # if lumi hole check for maxLatency first
-                        if self.getDataAge(filesByLumi) > self.maxLatency:
-                            self.defineJobs(filesByLumi, True, memoryRequirement)
+                        if self.getDataAge(state, filesByLumi) > state.maxLatency:
+                            self.defineJobs(state, filesByLumi, True, memoryRequirement)
                             filesByLumi = {}
                         # if maxLatency not met ignore data for now
                         else:
                             filesByLumi = {}
                     else:
-                        self.defineJobs(filesByLumi, True, memoryRequirement)
+                        self.defineJobs(state, filesByLumi, True, memoryRequirement)
                         filesByLumi = {}
 
                 # if we had a lumi hole it is now not relevant anymore
@@ -115,13 +134,13 @@ class Repack(JobFactory):
                 if len(filesByLumi) > 0:
 
                     # forceClose if maxLatency trigger is met
-                    if self.getDataAge(filesByLumi) > self.maxLatency:
-                        self.defineJobs(filesByLumi, True, memoryRequirement)
+                    if self.getDataAge(state, filesByLumi) > state.maxLatency:
+                        self.defineJobs(state, filesByLumi, True, memoryRequirement)
                         filesByLumi = {}
                     # follow the normal thresholds, but only if
                     # there is no lumi hole in front of the data
                     elif not haveLumiHole:
-                        self.defineJobs(filesByLumi, False, memoryRequirement)
+                        self.defineJobs(state, filesByLumi, False, memoryRequirement)
                         filesByLumi = {}
                     # otherwise ignore the data for now
                     else:
@@ -131,16 +150,59 @@ class Repack(JobFactory):
 
         # now handle whatever data is still left (at the high end of the lumi range)
         if haveLumiHole:
-            if self.getDataAge(filesByLumi) > self.maxLatency:
-                self.defineJobs(filesByLumi, True, memoryRequirement)
+            if self.getDataAge(state, filesByLumi) > state.maxLatency:
+                self.defineJobs(state, filesByLumi, True, memoryRequirement)
         else:
             fileset = self.subscription.getFileset()
             fileset.load()
-            self.defineJobs(filesByLumi, not fileset.open, memoryRequirement)
+            self.defineJobs(state, filesByLumi, not fileset.open, memoryRequirement)
+
+        if state.directToMergedBytes + state.unmergedBytes > 0:
+            logging.info("Repack subscription %d : predicted %d bytes direct to merged (merge bytes avoided), %d bytes unmerged" % \
+                         (self.subscription["id"], state.directToMergedBytes, state.unmergedBytes))
+
+        return
+
+    def getDirectToMergedSize(self, state):
+        """
+        _getDirectToMergedSize_
+
+        Return the multi lumi job size for which the outputs holding
+        directToMergedFraction of the output bytes reach minMergeSize.
+        Never smaller than maxSizeMultiLumi or larger than maxSizeSingleLumi.
+
+        """
+        if len(state.outputFractions) == 0:
+            return state.maxSizeMultiLumi
+
+        coveredFraction = 0.0
+        for fraction in sorted(state.outputFractions.values(), reverse = True):
+            coveredFraction += fraction
+            if coveredFraction >= state.directToMergedFraction:
+                break
+
+        requiredSize = state.minMergeSize / fraction
+
+        return min(max(requiredSize, state.maxSizeMultiLumi), state.maxSizeSingleLumi)
+
+    def predictOutputs(self, state, jobEvents, jobSize):
+        """
+        _predictOutputs_
+
+        Account the predicted output of a job as direct to merged or unmerged
+
+        """
+        for fraction in state.outputFractions.values():
+            outputSize = jobSize * fraction
+            if outputSize >= state.minMergeSize or \
+                   (state.maxMergeEvents != None and jobEvents * fraction >= state.maxMergeEvents):
+                state.directToMergedBytes += outputSize
+            else:
+                state.unmergedBytes += outputSize
 
         return
 
-    def getDataAge(self, filesByLumi):
+    def getDataAge(self, state, filesByLumi):
         """
         _getDataAge_
 
@@ -152,14 +214,17 @@ class Repack(JobFactory):
                 if fileInfo['insert_time'] > maxInsertTime:
                     maxInsertTime = fileInfo['insert_time']
 
-        return self.currentTime - maxInsertTime
+        return state.currentTime - maxInsertTime
 
-    def defineJobs(self, streamersByLumi, forceClose, memoryRequirement):
+    def defineJobs(self, state, streamersByLumi, forceClose, memoryRequirement):
         """
         _defineStrictJobs_
 
         schedule jobs
 
+        multi lumi jobs are limited to multiLumiSize, which is
+        maxSizeMultiLumi unless sized for direct to merged output
+
         """
         logging.debug("defineJobs(): Running...")
 
@@ -186,12 +251,12 @@ class Repack(JobFactory):
             #
             # => handle lumi individually and split
             #
-            if lumiSizeTotal > self.maxSizeSingleLumi or \
-                   lumiEventsTotal > self.maxInputEvents:
+            if lumiSizeTotal > state.maxSizeSingleLumi or \
+                   lumiEventsTotal > state.maxInputEvents:
 
                 # repack what we have to preserve order
                 if len(jobStreamerList) > 0:
-                    self.createJob(jobStreamerList, jobEventsTotal, jobSizeTotal, memoryRequirement)
+                    self.createJob(state, jobStreamerList, jobEventsTotal, jobSizeTotal, memoryRequirement)
                     jobSizeTotal = 0
                     jobEventsTotal = 0
                     jobStreamerList = []
@@ -216,14 +281,14 @@ class Repack(JobFactory):
                             newEventsTotal = eventsTotal + streamer['events']
                             newSizeTotal = sizeTotal + streamer['filesize']                        
 
-                            if newSizeTotal <= self.maxSizeSingleLumi and \
-                                   newEventsTotal <= self.maxInputEvents:
+                            if newSizeTotal <= state.maxSizeSingleLumi and \
+                                   newEventsTotal <= state.maxInputEvents:
 
                                 eventsTotal = newEventsTotal
                                 sizeTotal = newSizeTotal
                                 streamerList.append(streamer)
 
-                    self.createJob(streamerList, eventsTotal, sizeTotal, memoryRequirement)
+                    self.createJob(state, streamerList, eventsTotal, sizeTotal, memoryRequirement)
 
                     for streamer in streamerList:
                         lumiStreamerList.remove(streamer)
@@ -255,9 +320,9 @@ class Repack(JobFactory):
                     jobStreamerList.extend(lumiStreamerList)
 
                 # still safe with new lumi, just add it
-                elif newSizeTotal <= self.maxSizeMultiLumi and \
-                       newEventsTotal <= self.maxInputEvents and \
-                       newInputfiles <= self.maxInputFiles:
+                elif newSizeTotal <= state.multiLumiSize and \
+                       newEventsTotal <= state.maxInputEvents and \
+                       newInputfiles <= state.maxInputFiles:
 
                     jobSizeTotal = newSizeTotal
                     jobEventsTotal = newEventsTotal
@@ -266,7 +331,7 @@ class Repack(JobFactory):
                 # over limits with new lumi, issue repack job
                 else:
 
-                    self.createJob(jobStreamerList, jobEventsTotal, jobSizeTotal, memoryRequirement)
+                    self.createJob(state, jobStreamerList, jobEventsTotal, jobSizeTotal, memoryRequirement)
 
                     jobSizeTotal = lumiSizeTotal
                     jobEventsTotal = lumiEventsTotal
@@ -274,24 +339,25 @@ class Repack(JobFactory):
 
         # if we are in closeout issue repack job for leftovers
         if len(jobStreamerList) > 0 and forceClose:
-            self.createJob(jobStreamerList, jobEventsTotal, jobSizeTotal, memoryRequirement)
+            self.createJob(state, jobStreamerList, jobEventsTotal, jobSizeTotal, memoryRequirement)
 
         if len(splitLumis) > 0:
-            self.insertSplitLumisDAO.execute(binds = splitLumis)
+            state.insertSplitLumisDAO.execute(binds = splitLumis,
+                                              conn = state.conn, transaction = state.transaction)
 
         return
 
 
-    def createJob(self, streamerList, jobEvents, jobSize, memoryRequirement):
+    def createJob(self, state, streamerList, jobEvents, jobSize, memoryRequirement):
         """
         _createJob_
 
         """
-        if not self.createdGroup:
-            self.newGroup()
-            self.createdGroup = True
+        self.newGroupOnce(state)
+
+        self.newJob(name = "%s-%s" % (state.jobNamePrefix, makeUUID()))
 
-        self.newJob(name = "%s-%s" % (self.jobNamePrefix, makeUUID()))
+        self.predictOutputs(state, jobEvents, jobSize)
 
         for streamer in streamerList:
             f = File(id = streamer['id'],
@@ -6,16 +6,14 @@ Splitting algorithm for express merging
 
 import time
 import logging
-import threading
 
 from WMCore.WMBS.File import File
 
-from WMCore.JobSplitting.JobFactory import JobFactory
-from WMCore.DAOFactory import DAOFactory
+from T0.JobSplitting.T0JobFactory import T0JobFactory
 from WMCore.Services.UUID import makeUUID
 
 
-class RepackMerge(JobFactory):
+class RepackMerge(T0JobFactory):
     """
     Split jobs by set of files
 
@@ -29,30 +27,26 @@ class RepackMerge(JobFactory):
 
         """
         # extract some global scheduling parameters
-        self.jobNamePrefix = kwargs.get('jobNamePrefix', "RepackMerge")
-        self.minInputSize = kwargs['minInputSize']
-        self.maxInputSize = kwargs['maxInputSize']
-        self.maxInputFiles = kwargs['maxInputFiles']
-        self.maxEdmSize = kwargs['maxEdmSize']
-        self.maxOverSize = kwargs['maxOverSize']
-        self.maxLatency = kwargs['maxLatency']
+        state = self.newSplitState(jobNamePrefix = kwargs.get('jobNamePrefix', "RepackMerge"),
+                                   minInputSize = kwargs['minInputSize'],
+                                   maxInputSize = kwargs['maxInputSize'],
+                                   maxInputFiles = kwargs['maxInputFiles'],
+                                   maxEdmSize = kwargs['maxEdmSize'],
+                                   maxOverSize = kwargs['maxOverSize'],
+                                   maxLatency = kwargs['maxLatency'],
+                                   currentTime = time.time(),
+                                   createdGroup = False)
 
         # catch configuration errors
-        if self.maxOverSize > self.maxEdmSize:
-            self.maxOverSize = self.maxEdmSize
+        if state.maxOverSize > state.maxEdmSize:
+            state.maxOverSize = state.maxEdmSize
 
-        self.currentTime = time.time()
-
-        self.createdGroup = False
-
-        myThread = threading.currentThread()
-        daoFactory = DAOFactory(package = "T0.WMBS",
-                                logger = logging,
-                                dbinterface = myThread.dbi)
+        daoFactory = self.getDAOFactory(kwargs.get('dbinterface', None))
 
         # data discovery
         getAvailableFilesDAO = daoFactory(classname = "Subscriptions.GetAvailableRepackMergeFiles")
-        availableFiles = getAvailableFilesDAO.execute(self.subscription["id"])
+        availableFiles = getAvailableFilesDAO.execute(self.subscription["id"],
+                                                      conn = state.conn, transaction = state.transaction)
 
         # nothing to do, stop immediately
         if len(availableFiles) == 0:
@@ -60,12 +54,14 @@ class RepackMerge(JobFactory):
 
         # data discovery for already used lumis
         getUsedLumisDAO = daoFactory(classname = "Subscriptions.GetUsedLumis")
-        usedLumis = getUsedLumisDAO.execute(self.subscription["id"], True)
+        usedLumis = getUsedLumisDAO.execute(self.subscription["id"], True,
+                                            conn = state.conn, transaction = state.transaction)
 
         # empty lumis (as declared by StorageManager) are treated the
         # same way as used lumis, ie. we process around them
         getEmptyLumisDAO = daoFactory(classname = "Subscriptions.GetLumiHolesForRepackMerge")
-        usedLumis |= getEmptyLumisDAO.execute(self.subscription["id"])
+        usedLumis |= getEmptyLumisDAO.execute(self.subscription["id"],
+                                              conn = state.conn, transaction = state.transaction)
 
         # sort available files by lumi
         availableFileLumiDict = {}
@@ -94,14 +90,14 @@ class RepackMerge(JobFactory):
 
                     if haveLumiHole:
                         # if lumi hole check for maxLatency first
-                        if self.getDataAge(filesByLumi) > self.maxLatency:
-                            self.defineJobs(filesByLumi, True)
+                        if self.getDataAge(state, filesByLumi) > state.maxLatency:
+                            self.defineJobs(state, filesByLumi, True)
                             filesByLumi = {}
                         # if maxLatency not met ignore data for now
                         else:
                             filesByLumi = {}
                     else:
-                        self.defineJobs(filesByLumi, True)
+                        self.defineJobs(state, filesByLumi, True)
                         filesByLumi = {}
 
                 # if we had a lumi hole it is now not relevant anymore
@@ -115,13 +111,13 @@ class RepackMerge(JobFactory):
                 if len(filesByLumi) > 0:
 
                     # forceClose if maxLatency trigger is met
-                    if self.getDataAge(filesByLumi) > self.maxLatency:
-                        self.defineJobs(filesByLumi, True)
+                    if self.getDataAge(state, filesByLumi) > state.maxLatency:
+                        self.defineJobs(state, filesByLumi, True)
                         filesByLumi = {}
                     # follow the normal thresholds, but only if
                     # there is no lumi hole in front of the data
                     elif not haveLumiHole:
-                        self.defineJobs(filesByLumi, False)
+                        self.defineJobs(state, filesByLumi, False)
                         filesByLumi = {}
                     # otherwise ignore the data for now
                     else:
@@ -131,16 +127,16 @@ class RepackMerge(JobFactory):
 
         # now handle whatever data is still left (at the high end of the lumi range)
         if haveLumiHole:
-            if self.getDataAge(filesByLumi) > self.maxLatency:
-                self.defineJobs(filesByLumi, True)
+            if self.getDataAge(state, filesByLumi) > state.maxLatency:
+                self.defineJobs(state, filesByLumi, True)
         else:
             fileset = self.subscription.getFileset()
             fileset.load()
-            self.defineJobs(filesByLumi, not fileset.open)
+            self.defineJobs(state, filesByLumi, not fileset.open)
 
         return
 
-    def getDataAge(self, filesByLumi):
+    def getDataAge(self, state, filesByLumi):
         """
         _getDataAge_
 
@@ -152,9 +148,9 @@ class RepackMerge(JobFactory):
                 if fileInfo['insert_time'] > maxInsertTime:
                     maxInsertTime = fileInfo['insert_time']
 
-        return self.currentTime - maxInsertTime
+        return state.currentTime - maxInsertTime
 
-    def defineJobs(self, filesByLumi, forceClose):
+    def defineJobs(self, state, filesByLumi, forceClose):
         """
         _defineJobs_
 
@@ -187,11 +183,11 @@ class RepackMerge(JobFactory):
             #
             # => split up lumi and merge individual parts
             #
-            if lumiSizeTotal > self.maxEdmSize:
+            if lumiSizeTotal > state.maxEdmSize:
 
                 # merge what we have to preserve order
                 if len(jobFileList) > 0:
-                    self.createJob(jobFileList, jobSizeTotal)
+                    self.createJob(state, jobFileList, jobSizeTotal)
                     jobSizeTotal = 0
                     jobEventsTotal = 0
                     jobInputFiles = 0
@@ -216,30 +212,30 @@ class RepackMerge(JobFactory):
                             newEventsTotal = eventsTotal + fileInfo['events']
                             newSizeTotal = sizeTotal + fileInfo['filesize']
 
-                            if newSizeTotal <= self.maxEdmSize:
+                            if newSizeTotal <= state.maxEdmSize:
 
                                 eventsTotal = newEventsTotal
                                 sizeTotal = newSizeTotal
                                 fileList.append(fileInfo)
 
-                    self.createJob(fileList, eventsTotal, errorDataset = True)
+                    self.createJob(state, fileList, eventsTotal, errorDataset = True)
 
                     for fileInfo in fileList:
                         lumiFileList.remove(fileInfo)
 
-            elif lumiSizeTotal > self.maxInputSize or \
-                     lumiInputFiles > self.maxInputFiles:
+            elif lumiSizeTotal > state.maxInputSize or \
+                     lumiInputFiles > state.maxInputFiles:
 
                 # merge what we have to preserve order
                 if len(jobFileList) > 0:
-                    self.createJob(jobFileList, jobSizeTotal)
+                    self.createJob(state, jobFileList, jobSizeTotal)
                     jobSizeTotal = 0
                     jobEventsTotal = 0
                     jobInputFiles = 0
                     jobFileList = []
 
                 # then issue merge on new lumi
-                self.createJob(lumiFileList, lumiSizeTotal)
+                self.createJob(state, lumiFileList, lumiSizeTotal)
 
             else:
 
@@ -248,8 +244,8 @@ class RepackMerge(JobFactory):
                 newInputFiles = jobInputFiles + lumiInputFiles
 
                 # still safe with new file, just add it
-                if newSizeTotal <= self.maxInputSize and \
-                       newInputFiles <= self.maxInputFiles:
+                if newSizeTotal <= state.maxInputSize and \
+                       newInputFiles <= state.maxInputFiles:
 
                     jobSizeTotal = newSizeTotal
                     jobEventsTotal = newEventsTotal
@@ -258,9 +254,9 @@ class RepackMerge(JobFactory):
 
                 # over limits with new file, over minimum without it
                 # issue merge job (regular)
-                elif jobSizeTotal > self.minInputSize:
+                elif jobSizeTotal > state.minInputSize:
 
-                    self.createJob(jobFileList, jobSizeTotal)
+                    self.createJob(state, jobFileList, jobSizeTotal)
                     jobSizeTotal = lumiSizeTotal
                     jobEventsTotal = lumiEventsTotal
                     jobInputFiles = lumiInputFiles
@@ -270,10 +266,10 @@ class RepackMerge(JobFactory):
                 # over limits with new file, below minimum without it
                 # still below override limits (and below event limit)
                 # add file, issue merge job (too large)
-                elif newSizeTotal <= self.maxOverSize:
+                elif newSizeTotal <= state.maxOverSize:
 
                     jobFileList.extend(lumiFileList)
-                    self.createJob(jobFileList, jobSizeTotal)
+                    self.createJob(state, jobFileList, jobSizeTotal)
                     jobSizeTotal = 0
                     jobEventsTotal = 0
                     jobInputFiles = 0
@@ -284,7 +280,7 @@ class RepackMerge(JobFactory):
                 # issue merge job (too small)
                 else:
 
-                    self.createJob(jobFileList, jobSizeTotal)
+                    self.createJob(state, jobFileList, jobSizeTotal)
                     jobSizeTotal = lumiSizeTotal
                     jobEventsTotal = lumiEventsTotal
                     jobInputFiles = lumiInputFiles
@@ -292,12 +288,12 @@ class RepackMerge(JobFactory):
 
         # finish out leftovers if we are in closeout
         if len(jobFileList) > 0 and forceClose:
-            self.createJob(jobFileList, jobSizeTotal)
+            self.createJob(state, jobFileList, jobSizeTotal)
 
         return
 
 
-    def createJob(self, fileList, jobSize, errorDataset = False):
+    def createJob(self, state, fileList, jobSize, errorDataset = False):
         """
         _createJob_
 
@@ -305,11 +301,9 @@ class RepackMerge(JobFactory):
         the passed in list of files
 
         """
-        if not self.createdGroup:
-            self.newGroup()
-            self.createdGroup = True
+        self.newGroupOnce(state)
 
-        self.newJob(name = "%s-%s" % (self.jobNamePrefix, makeUUID()))
+        self.newJob(name = "%s-%s" % (state.jobNamePrefix, makeUUID()))
 
         largestFile = 0
         for fileInfo in fileList:
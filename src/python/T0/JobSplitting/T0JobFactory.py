@@ -0,0 +1,83 @@
+"""
+_T0JobFactory_
+
+Base class for the T0 splitting algorithms
+
+The database interface is passed in with the dbinterface
+splitting argument, the one of the calling thread is used
+if there is none. The WMBS objects used by the WMCore
+JobFactory still use the thread database interface, a
+thread running splitters needs its own connection either
+way (see ParallelSplitter).
+
+The algorithms keep their per call state (parameters, DAOs,
+timestamps) in a SplitState passed to their helpers, nothing
+of it is kept on the splitter. If the calling thread has a
+transaction open (JobCreator, ParallelSplitter) the DAOs run
+on its connection, so the T0 tables written by a splitter are
+committed or rolled back together with the jobs it created. Only the job groups the WMCore
+JobFactory creates live on the instance, every subscription
+gets its own splitter instance from the SplitterFactory.
+
+"""
+import logging
+import threading
+
+from WMCore.JobSplitting.JobFactory import JobFactory
+from WMCore.DAOFactory import DAOFactory
+
+
+class SplitState(object):
+    """
+    _SplitState_
+
+    State of one call of a splitting algorithm
+
+    """
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class T0JobFactory(JobFactory):
+
+    def getDAOFactory(self, dbinterface = None):
+        """
+        _getDAOFactory_
+
+        DAOFactory for the passed in database interface
+        or the one of the calling thread
+
+        """
+        if dbinterface == None:
+            dbinterface = threading.currentThread().dbi
+
+        return DAOFactory(package = "T0.WMBS",
+                          logger = logging,
+                          dbinterface = dbinterface)
+
+    def newSplitState(self, **kwargs):
+        """
+        _newSplitState_
+
+        SplitState for a call, with the connection of the open
+        transaction of the calling thread (or None) as conn and
+        the matching transaction flag for the DAO calls
+
+        """
+        transaction = getattr(threading.currentThread(), "transaction", None)
+        conn = getattr(transaction, "conn", None)
+
+        return SplitState(conn = conn, transaction = conn != None, **kwargs)
+
+    def newGroupOnce(self, state):
+        """
+        _newGroupOnce_
+
+        Start the job group of this call on its first job
+
+        """
+        if not state.createdGroup:
+            self.newGroup()
+            state.createdGroup = True
+
+        return
@@ -0,0 +1,309 @@
+"""
+_FeederBenchmark_
+
+Drives Tier0Feeder cycles against a LoadGenerator
+
+Every cycle writes what the generator produced since the
+previous cycle (external records into the stand-in database,
+runs and streamers into T0AST) and then runs the selected
+feeder stages once, in the order of the feeder scheduler.
+The stage cadence of the scheduler is bypassed, every selected
+stage runs in every cycle.
+
+Reported are per stage cycle times and the work the stages
+found, the number of records injected and the latency from
+streamer registration to feeding into the run/stream fileset,
+as well as the DAOs created and reused by the stages (DAOCache).
+
+Runs, streamers and whatever the feeder creates for them are
+committed to T0AST, only use this against a test database.
+
+"""
+import logging
+import threading
+import time
+
+from T0.LoadTest.LoadGenerator import batchKinds
+from T0.Monitoring.LatencyReport import percentile
+from T0.WMBS import DAOCache
+from T0.WMBS.DAOCache import cachedDAOFactory
+
+# feeder stages that only need T0AST and the external databases
+defaultStages = [ "configureRuns", "stopCloseRuns", "releaseExpress",
+                  "closeLumiSections", "feedStreamers", "closeRunStreamFilesets" ]
+
+
+def summarizeCycles(cycles, latencies):
+    """
+    _summarizeCycles_
+
+    Per stage cycle times and work, injected records and
+    streamer to fileset latency percentiles
+
+    """
+    summary = { 'cycles' : len(cycles),
+                'elapsed' : 0.0,
+                'injected' : dict([ (kind, 0) for kind in batchKinds ]),
+                'stages' : {},
+                'daos' : { 'created' : 0, 'reused' : 0, 'create_time' : 0.0 },
+                'feed_latency' : { 'count' : len(latencies) } }
+
+    if len(cycles) > 0:
+        summary['elapsed'] = cycles[-1]['end'] - cycles[0]['start']
+
+    stageDurations = {}
+    for cycle in cycles:
+
+        for kind, count in cycle['injected'].items():
+            summary['injected'][kind] += count
+
+        for key, value in cycle.get('daos', {}).items():
+            summary['daos'][key] += value
+
+        for name, (duration, work, failed) in cycle['stages'].items():
+            stageSummary = summary['stages'].setdefault(name, { 'runs' : 0,
+                                                                'failed' : 0,
+                                                                'work' : 0 })
+            stageSummary['runs'] += 1
+            if failed:
+                stageSummary['failed'] += 1
+            if work != None:
+                stageSummary['work'] += work
+            stageDurations.setdefault(name, []).append(duration)
+
+    for name, durations in stageDurations.items():
+        durations.sort()
+        summary['stages'][name]['avg_duration'] = sum(durations) / len(durations)
+        summary['stages'][name]['p90_duration'] = percentile(durations, 90)
+        summary['stages'][name]['max_duration'] = durations[-1]
+
+    if len(latencies) > 0:
+        latencies = sorted(latencies)
+        for p in [ 50, 90, 99 ]:
+            summary['feed_latency']['p%d' % p] = percentile(latencies, p)
+        summary['feed_latency']['max'] = latencies[-1]
+
+    return summary
+
+def summaryAsText(summary):
+    """
+    _summaryAsText_
+
+    Summary as a plain text table, durations and latencies in seconds
+
+    """
+    lines = []
+    lines.append("%d cycles in %.1f s" % (summary['cycles'], summary['elapsed']))
+
+    lines.append("Injected : %s" % ", ".join([ "%s %d" % (kind, summary['injected'][kind])
+                                               for kind in batchKinds ]))
+
+    lines.append("  %-25s %6s %6s %10s %8s %8s %8s" % ("stage", "runs", "failed", "work",
+                                                       "avg", "p90", "max"))
+    for name in sorted(summary['stages'].keys()):
+        stageSummary = summary['stages'][name]
+        lines.append("  %-25s %6d %6d %10d %8.2f %8.2f %8.2f" % (name, stageSummary['runs'],
+                                                                 stageSummary['failed'],
+                                                                 stageSummary['work'],
+                                                                 stageSummary['avg_duration'],
+                                                                 stageSummary['p90_duration'],
+                                                                 stageSummary['max_duration']))
+
+    lines.append("DAOs : %d created (%.3f s), %d reused" % (summary['daos']['created'],
+                                                          summary['daos']['create_time'],
+                                                          summary['daos']['reused']))
+
+    feedLatency = summary['feed_latency']
+    if feedLatency['count'] > 0:
+        lines.append("Streamer to fileset latency : %d streamers, p50 %d s, p90 %d s, p99 %d s, max %d s" % \
+                     (feedLatency['count'], feedLatency['p50'], feedLatency['p90'],
+                      feedLatency['p99'], feedLatency['max']))
+    else:
+        lines.append("Streamer to fileset latency : no streamers fed")
+
+    return "\n".join(lines)
+
+
+class FeederBenchmark(object):
+    """
+    _FeederBenchmark_
+
+    Runs feeder cycles on synthetic data taking
+
+    """
+    def __init__(self, poller, generator, standInWriter, stages = None,
+                 cmsswVersion = "CMSSW_LoadTest"):
+        """
+        poller is a Tier0FeederPoller that uses the stand-in database
+        for the external databases, stages the names of the feeder
+        stages to run (default defaultStages)
+
+        """
+        myThread = threading.currentThread()
+
+        self.poller = poller
+        self.generator = generator
+        self.standInWriter = standInWriter
+        self.cmsswVersion = cmsswVersion
+
+        if stages == None:
+            stages = defaultStages
+        for name in stages:
+            if name not in [ stage.name for stage in poller.scheduler.stages ]:
+                raise RuntimeError("Unknown Tier0Feeder stage %s" % name)
+        self.stages = [ stage for stage in poller.scheduler.stages if stage.name in stages ]
+
+        self.daoFactory = cachedDAOFactory(package = "T0.WMBS",
+                                           logger = logging,
+                                           dbinterface = myThread.dbi)
+
+        self.insertCMSSWVersionDAO = self.daoFactory(classname = "RunConfig.InsertCMSSWVersion")
+        self.insertStreamDAO = self.daoFactory(classname = "RunConfig.InsertStream")
+        self.insertRunDAO = self.daoFactory(classname = "RunConfig.InsertRun")
+        self.insertStreamCMSSWVersionDAO = self.daoFactory(classname = "RunConfig.InsertStreamCMSSWVersion")
+        self.insertLumiDAO = self.daoFactory(classname = "RunConfig.InsertLumiSection")
+        self.insertStreamerDAO = self.daoFactory(classname = "RunConfig.InsertStreamer")
+
+        self.startTime = None
+        self.cycles = []
+
+        return
+
+    def setup(self):
+        """
+        _setup_
+
+        Streams and CMSSW version the streamers are registered with
+
+        """
+        self.insertCMSSWVersionDAO.execute(binds = { 'VERSION' : self.cmsswVersion },
+                                           transaction = False)
+
+        binds = []
+        for stream in self.generator.streams:
+            binds.append( { 'STREAM' : stream } )
+        self.insertStreamDAO.execute(binds = binds, transaction = False)
+
+        return
+
+    def inject(self, batch):
+        """
+        _inject_
+
+        Register new runs and streamers in T0AST
+
+        """
+        if len(batch['runs']) > 0:
+
+            self.insertRunDAO.execute(binds = batch['runs'], transaction = False)
+
+            binds = []
+            for runBinds in batch['runs']:
+                for stream in self.generator.streams:
+                    binds.append( { 'RUN' : runBinds['RUN'],
+                                    'STREAM' : stream,
+                                    'VERSION' : self.cmsswVersion } )
+            self.insertStreamCMSSWVersionDAO.execute(binds = binds, transaction = False)
+
+        if len(batch['streamers']) > 0:
+
+            runLumis = set()
+            for streamerBinds in batch['streamers']:
+                runLumis.add( (streamerBinds['RUN'], streamerBinds['LUMI']) )
+
+            binds = []
+            for (run, lumi) in sorted(runLumis):
+                binds.append( { 'RUN' : run,
+                                'LUMI' : lumi } )
+            self.insertLumiDAO.execute(binds = binds, transaction = False)
+
+            self.insertStreamerDAO.execute(binds = batch['streamers'], transaction = False)
+
+        return
+
+    def cycle(self):
+        """
+        _cycle_
+
+        Inject what is due and run the feeder stages once
+
+        """
+        cycle = { 'start' : time.time(),
+                  'injected' : {},
+                  'stages' : {},
+                  'daos' : {} }
+
+        batch = self.generator.generate(cycle['start'])
+        self.standInWriter.write(batch)
+        self.inject(batch)
+
+        for kind in batchKinds:
+            cycle['injected'][kind] = len(batch[kind])
+
+        daoMetrics = DAOCache.metrics()
+        for stage in self.stages:
+            startTime = time.time()
+            work = None
+            failed = False
+            try:
+                work = stage.function()
+            except Exception:
+                logging.exception("Tier0Feeder stage %s failed" % stage.name)
+                failed = True
+            cycle['stages'][stage.name] = (time.time() - startTime, work, failed)
+
+        cycle['daos'] = dict([ (key, value - daoMetrics[key])
+                               for key, value in DAOCache.metrics().items() ])
+
+        cycle['end'] = time.time()
+        self.cycles.append(cycle)
+
+        logging.info("Cycle %d took %.2f s, injected %d streamers" % (len(self.cycles),
+                                                                      cycle['end'] - cycle['start'],
+                                                                      cycle['injected']['streamers']))
+
+        return cycle
+
+    def run(self, interval = 0, drainCycles = 3, maxDuration = None):
+        """
+        _run_
+
+        Run cycles until the generator is done, followed by drainCycles
+        cycles to let the feeder catch up. Cycles start at most every
+        interval seconds.
+
+        """
+        self.startTime = time.time()
+        self.setup()
+
+        remainingDrain = drainCycles
+        while remainingDrain > 0:
+
+            cycle = self.cycle()
+
+            if self.generator.finished():
+                remainingDrain -= 1
+
+            if maxDuration != None and time.time() - self.startTime > maxDuration:
+                logging.info("Maximum duration reached, stopping")
+                break
+
+            wait = interval - (cycle['end'] - cycle['start'])
+            if wait > 0 and remainingDrain > 0:
+                time.sleep(wait)
+
+        return
+
+    def summary(self):
+        """
+        _summary_
+
+        Summarize all cycles run so far
+
+        """
+        latencies = []
+        if self.startTime != None:
+            getStreamerFeedLatencyDAO = self.daoFactory(classname = "Tier0Feeder.GetStreamerFeedLatency")
+            latencies = getStreamerFeedLatencyDAO.execute(int(self.startTime) - 1, transaction = False)
+
+        return summarizeCycles(self.cycles, latencies)
@@ -0,0 +1,264 @@
+"""
+_LoadGenerator_
+
+Synthetic data taking for load tests of the Tier0Feeder
+
+Simulates the inputs the Tier0Feeder sees during data taking
+for a number of consecutive runs, every run has the same
+streams, lumi sections and StorageManager instances:
+
+  run start    - run registered in T0AST, HLT menu in HLTConfDB,
+                 start time in RunSummary, one open record per
+                 instance in the StorageManager runs table
+  lumi end     - for every instance and stream the streamers
+                 are registered in T0AST and an EoLS record with
+                 the file count is written to the StorageManager
+  run end      - stop time in RunSummary and EoR records for
+                 all instances in the StorageManager
+
+Failure patterns are configurable: empty lumis (EoLS with a
+zero file count and no streamers), late EoLS records, a late
+EoR record from one instance and a delayed Express release
+(PopConLog runinfo IOV).
+
+The generator runs on wall clock time. Every call to generate()
+returns a batch with everything that became due since the
+previous call, as lists of bind dictionaries keyed by kind.
+Writing the batch is left to the caller, see StandIns and
+FeederBenchmark.
+
+"""
+import heapq
+import random
+
+# kinds of records in a batch
+batchKinds = [ "runs", "hltMenus", "runStarts", "instanceStarts",
+               "streamers", "eols", "runStops", "eors", "expressReady" ]
+
+
+class LoadGenerator(object):
+    """
+    _LoadGenerator_
+
+    Generates the records for a synthetic data taking period
+
+    """
+    def __init__(self, streams = 50, lumisPerRun = 3000, instances = 10,
+                 runs = 1, lumiLength = 23.31, runGap = 60,
+                 filesPerLumi = 1, eventsPerFile = 1000, fileSize = 1000000000,
+                 emptyLumiFraction = 0.0, lateEoLSFraction = 0.0, lateEoLSDelay = 300,
+                 lateEoRDelay = 0, expressReadyDelay = 0,
+                 firstRun = 900000, hltkey = "/cdaq/loadtest/HLT/V1", seed = None):
+        self.streams = [ "LoadTest%02d" % i for i in range(streams) ]
+        self.lumisPerRun = lumisPerRun
+        self.instances = instances
+        self.runs = runs
+        self.lumiLength = lumiLength
+        self.runGap = runGap
+        self.filesPerLumi = filesPerLumi
+        self.eventsPerFile = eventsPerFile
+        self.fileSize = fileSize
+        self.emptyLumiFraction = emptyLumiFraction
+        self.lateEoLSFraction = lateEoLSFraction
+        self.lateEoLSDelay = lateEoLSDelay
+        self.lateEoRDelay = lateEoRDelay
+        self.expressReadyDelay = expressReadyDelay
+        self.firstRun = firstRun
+        self.hltkey = hltkey
+
+        self.random = random.Random(seed)
+
+        self.startTime = None
+        self.runInfos = []
+        self.hltMenuDone = False
+
+        # records that are due later, (due, sequence, kind, binds)
+        self.delayed = []
+        self.sequence = 0
+
+        self.counters = dict([ (kind, 0) for kind in batchKinds ])
+
+        return
+
+    def start(self, now):
+        """
+        _start_
+
+        Lay out the run timeline, the first run starts now
+
+        """
+        self.startTime = now
+        runLength = self.lumisPerRun * self.lumiLength
+        for i in range(self.runs):
+            runStart = now + i * (runLength + self.runGap)
+            self.runInfos.append( { 'run' : self.firstRun + i,
+                                    'start' : runStart,
+                                    'stop' : runStart + runLength,
+                                    'lumi' : 0,
+                                    'started' : False,
+                                    'stopped' : False } )
+        return
+
+    def schedule(self, due, kind, binds):
+        heapq.heappush(self.delayed, (due, self.sequence, kind, binds))
+        self.sequence += 1
+        return
+
+    def streamDataset(self, stream):
+        return stream.replace("LoadTest", "LoadTestDataset")
+
+    def startRun(self, runInfo, batch):
+        """
+        _startRun_
+
+        Records written at run start
+
+        """
+        run = runInfo['run']
+        runStart = int(runInfo['start'])
+
+        batch['runs'].append( { 'RUN' : run,
+                                'HLTKEY' : self.hltkey,
+                                'TIME' : runStart } )
+
+        if not self.hltMenuDone:
+            for stream in self.streams:
+                batch['hltMenus'].append( { 'HLTKEY' : self.hltkey,
+                                            'STREAM' : stream,
+                                            'DATASET' : self.streamDataset(stream),
+                                            'PATH' : "HLT_%s_v1" % stream,
+                                            'PROCESS' : "HLT" } )
+            self.hltMenuDone = True
+
+        batch['runStarts'].append( { 'RUN' : run,
+                                     'START_TIME' : runStart } )
+
+        for instance in range(self.instances):
+            batch['instanceStarts'].append( { 'RUN' : run,
+                                              'INSTANCE' : instance,
+                                              'N_INSTANCES' : self.instances } )
+
+        self.schedule(runInfo['start'] + self.expressReadyDelay,
+                      "expressReady", { 'RUN' : run,
+                                        'TAG' : "runinfo_start_%d_hlt" % run })
+
+        runInfo['started'] = True
+        return
+
+    def endLumi(self, runInfo, batch):
+        """
+        _endLumi_
+
+        Streamers and EoLS records for a lumi section
+
+        """
+        run = runInfo['run']
+        lumi = runInfo['lumi']
+        lumiEnd = runInfo['start'] + lumi * self.lumiLength
+
+        for instance in range(self.instances):
+            for stream in self.streams:
+
+                filecount = self.filesPerLumi
+                if self.random.random() < self.emptyLumiFraction:
+                    filecount = 0
+
+                for i in range(filecount):
+                    lfn = "/store/t0streamer/LoadTest/%s/%09d/run%d_ls%04d_%s_sm%02d_%d.dat" % \
+                          (stream, run, run, lumi, stream, instance, i)
+                    batch['streamers'].append( { 'RUN' : run,
+                                                 'LUMI' : lumi,
+                                                 'STREAM' : stream,
+                                                 'LFN' : lfn,
+                                                 'FILESIZE' : self.fileSize,
+                                                 'EVENTS' : self.eventsPerFile,
+                                                 'TIME' : int(lumiEnd) } )
+
+                eols = { 'RUN' : run,
+                         'INSTANCE' : instance,
+                         'STREAM' : stream,
+                         'LUMI' : lumi,
+                         'FILECOUNT' : filecount }
+
+                if self.random.random() < self.lateEoLSFraction:
+                    self.schedule(lumiEnd + self.lateEoLSDelay, "eols", eols)
+                else:
+                    batch['eols'].append(eols)
+
+        return
+
+    def stopRun(self, runInfo, batch):
+        """
+        _stopRun_
+
+        Records written at run end, the last instance is late
+        with its EoR record if lateEoRDelay is set
+
+        """
+        run = runInfo['run']
+
+        batch['runStops'].append( { 'RUN' : run,
+                                    'STOP_TIME' : int(runInfo['stop']) } )
+
+        for instance in range(self.instances):
+            eor = { 'RUN' : run,
+                    'INSTANCE' : instance,
+                    'LUMICOUNT' : self.lumisPerRun }
+            if instance == self.instances - 1 and self.lateEoRDelay > 0:
+                self.schedule(runInfo['stop'] + self.lateEoRDelay, "eors", eor)
+            else:
+                batch['eors'].append(eor)
+
+        runInfo['stopped'] = True
+        return
+
+    def generate(self, now):
+        """
+        _generate_
+
+        Everything that became due up to now
+
+        """
+        if self.startTime == None:
+            self.start(now)
+
+        batch = dict([ (kind, []) for kind in batchKinds ])
+
+        for runInfo in self.runInfos:
+
+            if now < runInfo['start']:
+                continue
+
+            if not runInfo['started']:
+                self.startRun(runInfo, batch)
+
+            lumis = min(int((now - runInfo['start']) / self.lumiLength), self.lumisPerRun)
+            while runInfo['lumi'] < lumis:
+                runInfo['lumi'] += 1
+                self.endLumi(runInfo, batch)
+
+            if runInfo['lumi'] == self.lumisPerRun and not runInfo['stopped']:
+                self.stopRun(runInfo, batch)
+
+        while len(self.delayed) > 0 and self.delayed[0][0] <= now:
+            (due, sequence, kind, binds) = heapq.heappop(self.delayed)
+            batch[kind].append(binds)
+
+        for kind in batchKinds:
+            self.counters[kind] += len(batch[kind])
+
+        return batch
+
+    def finished(self):
+        """
+        _finished_
+
+        All runs ended and all delayed records written
+
+        """
+        if self.startTime == None:
+            return False
+        for runInfo in self.runInfos:
+            if not runInfo['stopped']:
+                return False
+        return len(self.delayed) == 0
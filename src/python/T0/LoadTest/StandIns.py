@@ -0,0 +1,177 @@
+"""
+_StandIns_
+
+Local stand-ins for the external databases the Tier0Feeder
+reads from, for load tests against a SQLite database:
+
+  runs, streams  - StorageManager run (EoR) and EoLS records
+                   (CMS_STOMGR.runs and CMS_STOMGR.streams)
+  runsummary     - run start and stop times (CMS_WBM.RUNSUMMARY),
+                   as seconds since the epoch
+  hlt_menu       - flattened stream/dataset/path mapping of the
+                   HLT menus (HLTConfDB)
+  iov            - runinfo IOVs used for the Express release
+                   (CMS_CONDITIONS.IOV in PopConLog)
+
+The SQLite implementations of the DAOs used with these
+databases (RunConfig.GetHLTConfig, RunLumiCloseout.FindStoppedRuns,
+FindClosedRuns, FindClosedLumis, CheckEndOfRunRecords and
+Tier0Feeder.GetExpressReadyRuns) query these tables. Register
+the stand-in database in the ConnectionRegistry under the names
+of the external databases.
+
+"""
+import threading
+
+from WMCore.Database.DBCreator import DBCreator
+from WMCore.Database.Transaction import Transaction
+
+
+class CreateStandIns(DBCreator):
+
+    def __init__(self, logger = None, dbi = None, params = None):
+        """
+        _init_
+
+        Call the DBCreator constructor and initialize the schema
+
+        """
+        myThread = threading.currentThread()
+        if logger == None:
+            logger = myThread.logger
+        if dbi == None:
+            dbi = myThread.dbi
+
+        DBCreator.__init__(self, logger, dbi)
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE runs (
+                 runnumber       int  not null,
+                 instance        int  not null,
+                 status          int  not null,
+                 n_instances     int  not null,
+                 n_lumisections  int,
+                 primary key(runnumber, instance)
+               ) WITHOUT ROWID"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE streams (
+                 runnumber    int          not null,
+                 instance     int          not null,
+                 stream       varchar(255) not null,
+                 lumisection  int          not null,
+                 filecount    int          not null,
+                 primary key(runnumber, stream, lumisection, instance)
+               ) WITHOUT ROWID"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE runsummary (
+                 runnumber  int  not null,
+                 starttime  int,
+                 stoptime   int,
+                 primary key(runnumber)
+               ) WITHOUT ROWID"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE hlt_menu (
+                 hltkey   varchar(255) not null,
+                 stream   varchar(255) not null,
+                 dataset  varchar(255) not null,
+                 path     varchar(255) not null,
+                 process  varchar(255) not null,
+                 primary key(hltkey, stream, dataset, path)
+               ) WITHOUT ROWID"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE iov (
+                 tag_name  varchar(255) not null,
+                 since     int          not null,
+                 primary key(tag_name, since)
+               ) WITHOUT ROWID"""
+
+        return
+
+    def execute(self, conn = None, transaction = None):
+        """
+        _execute_
+
+        """
+        DBCreator.execute(self, conn, transaction)
+
+        return True
+
+
+class StandInWriter(object):
+    """
+    _StandInWriter_
+
+    Writes the external database records of a LoadGenerator
+    batch into the stand-in database
+
+    """
+    # batch kind, sql
+    statements = [ ("hltMenus",
+                    """INSERT INTO hlt_menu
+                       (HLTKEY, STREAM, DATASET, PATH, PROCESS)
+                       VALUES (:HLTKEY, :STREAM, :DATASET, :PATH, :PROCESS)
+                       """),
+                   ("runStarts",
+                    """INSERT INTO runsummary
+                       (RUNNUMBER, STARTTIME)
+                       VALUES (:RUN, :START_TIME)
+                       """),
+                   ("instanceStarts",
+                    """INSERT INTO runs
+                       (RUNNUMBER, INSTANCE, STATUS, N_INSTANCES)
+                       VALUES (:RUN, :INSTANCE, 1, :N_INSTANCES)
+                       """),
+                   ("eols",
+                    """INSERT INTO streams
+                       (RUNNUMBER, INSTANCE, STREAM, LUMISECTION, FILECOUNT)
+                       VALUES (:RUN, :INSTANCE, :STREAM, :LUMI, :FILECOUNT)
+                       """),
+                   ("runStops",
+                    """UPDATE runsummary
+                       SET stoptime = :STOP_TIME
+                       WHERE runnumber = :RUN
+                       """),
+                   ("eors",
+                    """UPDATE runs
+                       SET status = 0,
+                           n_lumisections = :LUMICOUNT
+                       WHERE runnumber = :RUN
+                       AND instance = :INSTANCE
+                       """),
+                   ("expressReady",
+                    """INSERT INTO iov
+                       (TAG_NAME, SINCE)
+                       VALUES (:TAG, :RUN)
+                       """) ]
+
+    def __init__(self, dbInterface):
+        self.dbInterface = dbInterface
+        self.transaction = Transaction(dbInterface)
+        self.transaction.commit()
+        return
+
+    def write(self, batch):
+        """
+        _write_
+
+        Write the batch in one transaction
+
+        """
+        self.transaction.begin()
+        try:
+            for kind, sql in self.statements:
+                if len(batch[kind]) > 0:
+                    self.dbInterface.processData(sql, batch[kind],
+                                                 conn = self.transaction.conn,
+                                                 transaction = True)
+        except:
+            self.transaction.rollback()
+            raise
+        else:
+            self.transaction.commit()
+
+        return
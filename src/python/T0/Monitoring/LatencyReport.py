@@ -0,0 +1,127 @@
+"""
+_LatencyReport_
+
+Latency percentiles per stream and acquisition era from the
+latency ledger.
+
+The ledger has the first and last time every run/stream passed
+a processing milestone. A stage is the time between two
+milestones, taken from the time the run/stream completed the
+first one (or started it, for data taking) to the time it
+completed the second one. Run/streams that didn't reach both
+milestones are left out of that stage.
+
+"""
+import json
+import math
+
+# stage name, (milestone, first or last), (milestone, first or last)
+stages = [ ("data_taking", ("streamer", 0), ("streamer", 1)),
+           ("eols", ("streamer", 1), ("eols", 1)),
+           ("lumi_close", ("streamer", 1), ("lumi_closed", 1)),
+           ("feed", ("lumi_closed", 1), ("feed", 1)),
+           ("fileset_close", ("feed", 1), ("fileset_closed", 1)),
+           ("prompt_calibration", ("fileset_closed", 1), ("pcl_finished", 1)),
+           ("conditions_upload", ("fileset_closed", 1), ("conditions_uploaded", 1)),
+           ("reco_release", ("fileset_closed", 1), ("reco_released", 1)) ]
+
+percentiles = [ 50, 90, 99 ]
+
+
+def percentile(values, p):
+    """
+    _percentile_
+
+    Nearest rank percentile of a sorted list
+
+    """
+    rank = int(math.ceil(p / 100.0 * len(values)))
+    return values[max(rank, 1) - 1]
+
+def stageLatencies(runStreamMilestones):
+    """
+    _stageLatencies_
+
+    Latency of every stage a run/stream went through, plus the
+    end to end latency from the first streamer to the last
+    milestone reached
+
+    """
+    latencies = {}
+    for name, (fromMilestone, fromIndex), (toMilestone, toIndex) in stages:
+        if fromMilestone in runStreamMilestones and toMilestone in runStreamMilestones:
+            latencies[name] = runStreamMilestones[toMilestone][toIndex] - runStreamMilestones[fromMilestone][fromIndex]
+
+    if "streamer" in runStreamMilestones:
+        lastTime = max([ times[1] for times in runStreamMilestones.values() ])
+        latencies['end_to_end'] = lastTime - runStreamMilestones['streamer'][0]
+
+    return latencies
+
+def buildLatencyReport(ledger):
+    """
+    _buildLatencyReport_
+
+    Takes the ledger as returned by Latency.GetLatencyLedger and
+    returns the stage percentiles in seconds per stream and era
+
+    { (stream, era) : { stage : { 'count' : N, 'p50' : s, 'p90' : s,
+                                  'p99' : s, 'max' : s } } }
+
+    """
+    samples = {}
+    for (run, stream), runStreamInfo in ledger.items():
+        key = (stream, runStreamInfo['era'])
+        for stage, latency in stageLatencies(runStreamInfo['milestones']).items():
+            samples.setdefault(key, {}).setdefault(stage, []).append(latency)
+
+    report = {}
+    for key, stageSamples in samples.items():
+        report[key] = {}
+        for stage, values in stageSamples.items():
+            values.sort()
+            summary = { 'count' : len(values),
+                        'max' : values[-1] }
+            for p in percentiles:
+                summary['p%d' % p] = percentile(values, p)
+            report[key][stage] = summary
+
+    return report
+
+def reportAsJSON(report):
+    """
+    _reportAsJSON_
+
+    Report as a JSON list, one entry per stream and era
+
+    """
+    entries = []
+    for (stream, era) in sorted(report.keys()):
+        entries.append( { 'stream' : stream,
+                          'era' : era,
+                          'stages' : report[(stream, era)] } )
+    return json.dumps(entries, sort_keys = True, indent = 2)
+
+def reportAsText(report):
+    """
+    _reportAsText_
+
+    Report as a plain text table, latencies in minutes
+
+    """
+    stageNames = [ stage[0] for stage in stages ] + [ "end_to_end" ]
+
+    lines = []
+    for (stream, era) in sorted(report.keys()):
+        lines.append("Stream %s, era %s" % (stream, era))
+        lines.append("  %-15s %6s %8s %8s %8s %8s" % ("stage", "count", "p50", "p90", "p99", "max"))
+        for stage in stageNames:
+            if stage not in report[(stream, era)]:
+                continue
+            summary = report[(stream, era)][stage]
+            lines.append("  %-15s %6d %8.1f %8.1f %8.1f %8.1f" % (stage, summary['count'],
+                                                                  summary['p50'] / 60.0, summary['p90'] / 60.0,
+                                                                  summary['p99'] / 60.0, summary['max'] / 60.0))
+        lines.append("")
+
+    return "\n".join(lines)
@@ -0,0 +1,80 @@
+"""
+_QueryReport_
+
+DAO time per hour and slow statements from the slow query log
+written by T0.WMBS.QueryLog.
+
+"""
+import json
+import time
+
+
+def readQueryLog(lines):
+    """
+    _readQueryLog_
+
+    Parse the slow query log, returns the hourly summaries and
+    the slow statements. Lines that can't be parsed are skipped.
+
+    """
+    hours = []
+    slowQueries = []
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if entry.get('type') == "hour":
+            hours.append(entry)
+        elif entry.get('type') == "slow":
+            slowQueries.append(entry)
+    return hours, slowQueries
+
+def buildQueryReport(hours, since = 0):
+    """
+    _buildQueryReport_
+
+    DAOs ranked by total time for every hour starting at or
+    after since
+
+    [ (hour, [ (dao, stats), ... ]), ... ]
+
+    """
+    report = []
+    for entry in sorted(hours, key = lambda entry: entry['time']):
+        if entry['time'] < since:
+            continue
+        ranking = sorted(entry['daos'].items(), key = lambda item: item[1]['total_time'], reverse = True)
+        report.append( (entry['time'], ranking) )
+    return report
+
+def reportAsText(report, slowQueries = [], top = 10):
+    """
+    _reportAsText_
+
+    Report as a plain text table, the top DAOs per hour followed
+    by the execution plans captured for slow statements
+
+    """
+    lines = []
+    for hour, ranking in report:
+        lines.append("Hour %s UTC" % time.strftime("%Y-%m-%d %H:00", time.gmtime(hour)))
+        lines.append("  %-45s %8s %10s %8s %8s %10s %6s %6s" % ("dao", "calls", "total", "avg", "max", "rows", "slow", "errors"))
+        for dao, stats in ranking[:top]:
+            lines.append("  %-45s %8d %10.2f %8.3f %8.3f %10d %6d %6d" % (dao, stats['calls'], stats['total_time'],
+                                                                          stats['total_time'] / max(stats['calls'], 1),
+                                                                          stats['max_time'], stats['rows'],
+                                                                          stats['slow'], stats['errors']))
+        lines.append("")
+
+    for entry in slowQueries:
+        if entry.get('plan') == None:
+            continue
+        lines.append("%s %s : %.3fs, %d bind sets" % (time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(entry['time'])),
+                                                      entry['dao'], entry['elapsed'], entry['binds']))
+        lines.append("  %s" % entry['sql'])
+        for planLine in entry['plan']:
+            lines.append("  %s" % planLine)
+        lines.append("")
+
+    return "\n".join(lines)
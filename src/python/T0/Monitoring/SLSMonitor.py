@@ -0,0 +1,516 @@
+"""
+_SLSMonitor_
+
+Tier0 SLS availability monitoring.
+
+All job based checks (backlog, long jobs, paused jobs) are computed
+from one snapshot of the job state, taken with two queries per
+monitoring cycle. The late workflows check uses the request database.
+The agent database is accessed through one pooled connection shared
+by all checks. Every check is timed, results and timings of the last
+cycle are kept in memory and every check writes its SLS XML file.
+
+Configuration comes from etc/SLSAlarmsConfig.py, one section per
+check plus the common Settings section.
+
+"""
+import os
+import re
+import time
+import logging
+import threading
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+
+runNumberRegex = re.compile(r"([A-Za-z]+)_Run([0-9]{6})_([A-Za-z0-9_]+)")
+
+
+class JobStateSnapshot(DBFormatter):
+    """
+    _JobStateSnapshot_
+
+    Job counts per state and workflow for the created and paused
+    states plus details for all executing jobs, taken in one go.
+
+    """
+    sqlCounts = """SELECT wmbs_job_state.name AS state,
+                          wmbs_workflow.name AS workflow,
+                          COUNT(*) AS jobs
+                   FROM wmbs_job
+                   INNER JOIN wmbs_job_state ON
+                     wmbs_job_state.id = wmbs_job.state
+                   INNER JOIN wmbs_jobgroup ON
+                     wmbs_jobgroup.id = wmbs_job.jobgroup
+                   INNER JOIN wmbs_subscription ON
+                     wmbs_subscription.id = wmbs_jobgroup.subscription
+                   INNER JOIN wmbs_workflow ON
+                     wmbs_workflow.id = wmbs_subscription.workflow
+                   WHERE wmbs_job_state.name = 'created'
+                   OR wmbs_job_state.name LIKE '%paused'
+                   GROUP BY wmbs_job_state.name, wmbs_workflow.name
+                   """
+
+    sqlExecuting = """SELECT wmbs_job.id AS job_id,
+                             wmbs_sub_types.name AS job_type,
+                             bl_runjob.status_time AS timestamp,
+                             bl_status.name AS status,
+                             wmbs_location.plugin AS plugin,
+                             wmbs_workflow.name AS workflow
+                      FROM wmbs_job
+                      INNER JOIN bl_runjob ON
+                        bl_runjob.wmbs_id = wmbs_job.id AND
+                        bl_runjob.retry_count = wmbs_job.retry_count
+                      INNER JOIN wmbs_jobgroup ON
+                        wmbs_jobgroup.id = wmbs_job.jobgroup
+                      INNER JOIN wmbs_subscription ON
+                        wmbs_subscription.id = wmbs_jobgroup.subscription
+                      INNER JOIN wmbs_sub_types ON
+                        wmbs_sub_types.id = wmbs_subscription.subtype
+                      INNER JOIN bl_status ON
+                        bl_status.id = bl_runjob.sched_status
+                      INNER JOIN wmbs_location ON
+                        wmbs_location.id = wmbs_job.location
+                      INNER JOIN wmbs_workflow ON
+                        wmbs_workflow.id = wmbs_subscription.workflow
+                      WHERE wmbs_job.state = (SELECT id FROM wmbs_job_state
+                                              WHERE wmbs_job_state.name = 'executing')
+                      """
+
+    def execute(self, conn = None, transaction = False):
+
+        results = self.dbi.processData(self.sqlCounts, {}, conn = conn,
+                                       transaction = transaction)
+
+        snapshot = { 'time' : time.time(),
+                     'created' : {},
+                     'paused' : {},
+                     'executing' : [] }
+
+        for entry in self.formatDict(results):
+            if entry['state'] == 'created':
+                snapshot['created'][entry['workflow']] = entry['jobs']
+            else:
+                snapshot['paused'][entry['workflow']] = snapshot['paused'].get(entry['workflow'], 0) + entry['jobs']
+
+        results = self.dbi.processData(self.sqlExecuting, {}, conn = conn,
+                                       transaction = transaction)
+
+        snapshot['executing'] = self.formatDict(results)
+
+        return snapshot
+
+
+def workflowType(workflow):
+    return workflow.split("_")[0]
+
+def isBlacklisted(config, workflow):
+    """
+    _isBlacklisted_
+
+    Check the run of a workflow against the run blacklist
+
+    """
+    match = runNumberRegex.match(workflow)
+    if match == None:
+        return False
+    return match.groups()[1] in getattr(config, "RunBlacklist", [])
+
+def checkBacklog(config, snapshot):
+    """
+    _checkBacklog_
+
+    Created jobs by workflow type against configured limits
+
+    0 - There is backlog
+    100 - There is no backlog
+
+    """
+    jobCounts = { "Express" : 0,
+                  "Repack" : 0,
+                  "PromptReco" : 0 }
+
+    for workflow, jobs in snapshot['created'].items():
+        if workflowType(workflow) in jobCounts:
+            jobCounts[workflowType(workflow)] += jobs
+
+    availability = 100
+    for jobType, jobs in jobCounts.items():
+        if jobs > getattr(config, jobType):
+            availability = 0
+
+    data = """<numericvalue name="promptreco_count" desc="Backlogged PromptReco">%d</numericvalue>
+            <numericvalue name="repack_count" desc="Backlogged Repack">%d</numericvalue>
+            <numericvalue name="express_count" desc="Backlogged Express">%d</numericvalue>""" % \
+           (jobCounts["PromptReco"], jobCounts["Repack"], jobCounts["Express"])
+
+    return { 'id' : "CMST0-wma-backlog",
+             'availability' : availability,
+             'data' : data,
+             'details' : jobCounts }
+
+def checkPausedJobs(config, snapshot):
+    """
+    _checkPausedJobs_
+
+    Paused jobs outside blacklisted runs
+
+    100 - no paused jobs
+    70-n - for n paused jobs, n < 70
+    0 - 70 or more paused jobs
+
+    """
+    numPaused = 0
+    for workflow, jobs in snapshot['paused'].items():
+        if not isBlacklisted(config, workflow):
+            numPaused += jobs
+
+    availability = 100
+    if numPaused > 0 and numPaused <= 70:
+        availability = 70 - numPaused
+    elif numPaused > 70:
+        availability = 0
+
+    data = '<numericvalue name="paused_jobs" desc="Paused jobs">%d</numericvalue>' % numPaused
+
+    return { 'id' : "CMST0-paused-jobs",
+             'availability' : availability,
+             'data' : data,
+             'details' : numPaused }
+
+def checkLongJobs(config, snapshot, pluginStateMaps):
+    """
+    _checkLongJobs_
+
+    Running or pending jobs beyond the configured thresholds
+
+    0 - At least one Express or Repack job is running longer than expected
+    50 - At least one PromptReco job is running longer than expected
+    75 - A LogCollect/Cleanup job is running longer than expected
+    100 - All jobs are running on time
+
+    """
+    longJobs = {}
+    for job in snapshot['executing']:
+
+        if runNumberRegex.match(job['workflow']) == None:
+            continue
+        if isBlacklisted(config, job['workflow']):
+            continue
+
+        plugin = job['plugin']
+        if plugin not in pluginStateMaps:
+            module = __import__("WMCore.BossAir.Plugins.%s" % plugin,
+                                globals(), locals(), [plugin])
+            pluginStateMaps[plugin] = getattr(module, plugin).stateMap()
+        status = pluginStateMaps[plugin].get(job['status'])
+        if status not in [ "Running", "Pending" ]:
+            continue
+
+        statusTime = job['timestamp']
+        if statusTime is None:
+            statusTime = snapshot['time']
+        elapsedTime = int(snapshot['time'] - float(statusTime))
+
+        thresholdsForStatus = getattr(config.Thresholds, status)
+        if hasattr(thresholdsForStatus, job['job_type']):
+            threshold = getattr(thresholdsForStatus, job['job_type'])
+            if elapsedTime > 3600 * threshold:
+                longJobs.setdefault(job['workflow'], {}).setdefault(job['job_type'], []).append( { "status" : status,
+                                                                                                   "elapsedTime" : elapsedTime / 3600.0,
+                                                                                                   "jobId" : job['job_id'] } )
+
+    availability = 100
+    for workflow in longJobs:
+        for jobType in longJobs[workflow]:
+            if jobType in [ "Repack", "Express", "Merge", "Processing", "Harvesting" ]:
+                if "Repack" in workflow or "Express" in workflow:
+                    availability = 0
+                elif "PromptReco" in workflow and availability > 50:
+                    availability = 50
+            elif jobType in [ "LogCollect", "Cleanup" ]:
+                if availability == 100:
+                    availability = 75
+
+    data = "<textvalue>Jobs are running on schedule</textvalue>"
+    if availability < 100:
+        data = "<textvalue>There are long running jobs, check %s for details.</textvalue>" % \
+               getattr(config, "reportUrl", "http://cmst1.web.cern.ch/CMST1/LongJobs/LongJobs.html")
+
+    return { 'id' : "CMST0-long-jobs",
+             'availability' : availability,
+             'data' : data,
+             'details' : longJobs }
+
+def writeLongJobsReport(config, longJobs):
+    """
+    _writeLongJobsReport_
+
+    Write detailed information about the long jobs in a simple
+    HTML page
+
+    """
+    reportFile = getattr(config, "reportFile", None)
+    if reportFile == None:
+        return
+
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+    separator = '---------------------------------------------------------------------------------------\n'
+
+    lines = [ '<html>\n', '<pre>\n',
+              '<meta http-equiv="Content-Type" content="text/html; charset=UTF-8"/>\n',
+              separator, 'Report generated on %s UTC\n' % timestamp, separator, '\n\n' ]
+    for workflow in longJobs:
+        lines.extend( [ separator, 'Workflow: %s\n' % workflow, separator ] )
+        for jobType in longJobs[workflow]:
+            lines.extend( [ separator, 'Job type: %s\n' % jobType, separator ] )
+            if len(longJobs[workflow][jobType]) > 5:
+                lines.append('More than 5 jobs for this workflow/job type, displaying the oldest five.\n')
+            jobs = sorted(longJobs[workflow][jobType], key = lambda x : x['elapsedTime'], reverse = True)[:5]
+            for job in jobs:
+                lines.append('Job WMBS ID: %12s\tElapsed Time: %2.1f hours\tStatus: %s\n' % (job['jobId'], job['elapsedTime'],
+                                                                                             job['status']))
+        lines.append('\n\n')
+    lines.extend( [ '</pre>\n', '</html>\n' ] )
+
+    with open(reportFile, 'w') as htmlFile:
+        htmlFile.writelines(lines)
+
+    return
+
+def loadWorkflowLimits(config):
+    """
+    _loadWorkflowLimits_
+
+    Time limits per workflow type and state
+
+    """
+    limits = {}
+    for workflowType in config.WorkflowTimeouts.listSections_():
+        limits[workflowType] = {}
+        workflowTypeInfo = getattr(config.WorkflowTimeouts, workflowType)
+        for state in getattr(workflowTypeInfo, "states"):
+            limits[workflowType][state] = getattr(workflowTypeInfo, state)
+    return limits
+
+def checkLateWorkflows(config, requestDBReader):
+    """
+    _checkLateWorkflows_
+
+    Workflows that stayed in a state longer than configured
+
+    0 - At least one Express or Repack workflow is late
+    50 - At least one PromptReco workflow is late
+    100 - No workflow is late
+
+    """
+    statusList = [ "new", "Closed", "Merge", "Harvesting", "Processing Done", "AlcaSkim", "completed" ]
+    workflowLimits = loadWorkflowLimits(config)
+
+    workflowStates = {}
+    workflowInfo = requestDBReader.getRequestByStatus(statusList, detail = True)
+    for workflow in workflowInfo.keys():
+        workflowStatus = workflowInfo[workflow]['RequestStatus']
+        for stateInfo in workflowInfo[workflow]['RequestTransition']:
+            if stateInfo['Status'] == workflowStatus:
+                workflowStates.setdefault(workflowStatus, {})[workflow] = stateInfo['UpdateTime']
+
+    lateWorkflows = []
+    currentTime = int(time.time())
+    for workflowType in workflowLimits:
+        for state in workflowLimits[workflowType]:
+            for workflow, stateTime in workflowStates.get(state, {}).items():
+                if not workflow.startswith(workflowType + "_"):
+                    continue
+                if currentTime - stateTime > 3600 * float(workflowLimits[workflowType][state]):
+                    lateWorkflows.append( { 'workflow' : workflow,
+                                            'elapsedTime' : currentTime - stateTime,
+                                            'state' : state } )
+
+    availability = 100
+    for entry in lateWorkflows:
+        if isBlacklisted(config, entry['workflow']):
+            continue
+        if entry['workflow'].startswith("PromptReco_"):
+            availability = min(availability, 50)
+        elif entry['workflow'].startswith("Repack_") or entry['workflow'].startswith("Express_"):
+            availability = 0
+
+    textLines = []
+    for entry in sorted(lateWorkflows, key = lambda x : x['elapsedTime'], reverse = True):
+        textLines.append("<textvalue>%s has been in %s for %i hours</textvalue>" % (entry['workflow'],
+                                                                                    entry['state'],
+                                                                                    int(entry['elapsedTime'] / 3600.0)))
+
+    return { 'id' : "CMST0-late-workflows",
+             'availability' : availability,
+             'data' : "\n            ".join(textLines),
+             'details' : lateWorkflows }
+
+def buildSLSXML(config, xmlDir, xmlFile, result):
+    """
+    _buildSLSXML_
+
+    Builds the SLS update XML file for a check result
+
+    """
+    timezone = str(int(-time.timezone / 3600)).zfill(2)
+    timestamp = time.strftime("%Y-%m-%dT%H:%M:%S+")
+    timestamp += "%s:00" % timezone
+
+    # Retrieve the intervention info if any
+    intervention = ""
+    if hasattr(config, "Intervention"):
+        startTime = config.Intervention.startTime
+        duration = config.Intervention.duration
+        message = config.Intervention.message
+
+        # Check that the intervention is present or in the future
+        structStartTime = time.strptime(startTime, "%Y-%m-%dT%H:%M:%S")
+        startTimeSeconds = time.mktime(structStartTime)
+        if (startTimeSeconds + duration * 3600) >= time.time():
+            intervention = """        <interventions>
+            <intervention start="{startTime}" length="PT{duration}H">
+                {message}
+            </intervention>
+        </interventions>""".format(startTime = startTime, duration = duration, message = message)
+
+    data = result['data']
+    data += '\n            <numericvalue name="check_time" desc="Check duration in seconds">%.2f</numericvalue>' % result['seconds']
+
+    template = """<?xml version="1.0" encoding="utf-8"?>
+    <serviceupdate>
+        <id>{id}</id>
+        <availability>{availability}</availability>
+        <timestamp>{timestamp}</timestamp>
+        <data>
+            {data}
+        </data>
+{intervention}
+    </serviceupdate>\n"""
+
+    xml = template.format(id = result['id'], data = data,
+                          availability = result['availability'],
+                          timestamp = timestamp, intervention = intervention)
+
+    with open(os.path.join(xmlDir, getattr(config, "xmlFile", xmlFile)), 'w') as outputFile:
+        outputFile.write(xml)
+
+    return
+
+
+class SLSMonitor(object):
+    """
+    _SLSMonitor_
+
+    Runs all SLS checks periodically from one process
+
+    """
+    checks = [ "cmst0_backlog_wma", "cmst0_paused_jobs",
+               "cmst0_long_jobs", "cmst0_late_workflows" ]
+
+    def __init__(self, config, pool = None, requestDBReader = None):
+        self.config = config
+        self.xmlDir = config.Settings.xmlDir
+        self.pollInterval = getattr(config.Settings, "pollInterval", 300)
+        self.requestDBInterval = getattr(config.Settings, "requestDBInterval", 900)
+
+        # shared pooled connection to the agent database
+        self.pool = pool
+        self.requestDBReader = requestDBReader
+
+        self.pluginStateMaps = {}
+        self.lastRequestDBCheck = 0
+
+        # check name -> result of last run, incl. timing
+        self.results = {}
+        self.lock = threading.Lock()
+
+        return
+
+    def runCheck(self, name, function, *args):
+        """
+        _runCheck_
+
+        Run and time one check, write its SLS XML file
+
+        """
+        config = getattr(self.config, name)
+
+        startTime = time.time()
+        try:
+            result = function(config, *args)
+        except Exception:
+            logging.exception("SLS check %s failed" % name)
+            return
+        result['seconds'] = time.time() - startTime
+        result['time'] = startTime
+
+        try:
+            buildSLSXML(config, self.xmlDir, "%s.xml" % name, result)
+        except Exception:
+            logging.exception("Couldn't write the XML file for %s" % name)
+
+        logging.info("SLS check %s : availability %d (%.2fs)" % (name, result['availability'], result['seconds']))
+
+        with self.lock:
+            self.results[name] = result
+
+        return result
+
+    def runOnce(self):
+        """
+        _runOnce_
+
+        One monitoring cycle
+
+        """
+        if self.pool != None:
+
+            startTime = time.time()
+            try:
+                with self.pool.connection() as dbInterface:
+                    snapshot = JobStateSnapshot(logging, dbInterface).execute()
+            except Exception:
+                logging.exception("Can't take job state snapshot")
+                snapshot = None
+            logging.info("Job state snapshot took %.2fs" % (time.time() - startTime))
+
+            if snapshot != None:
+                self.runCheck("cmst0_backlog_wma", checkBacklog, snapshot)
+                self.runCheck("cmst0_paused_jobs", checkPausedJobs, snapshot)
+                result = self.runCheck("cmst0_long_jobs", checkLongJobs, snapshot, self.pluginStateMaps)
+                if result != None:
+                    try:
+                        writeLongJobsReport(self.config.cmst0_long_jobs, result['details'])
+                    except Exception:
+                        logging.exception("Couldn't write the long jobs report")
+
+        # request database changes slowly, check it less often
+        if self.requestDBReader != None and time.time() > self.lastRequestDBCheck + self.requestDBInterval:
+            self.lastRequestDBCheck = time.time()
+            self.runCheck("cmst0_late_workflows", checkLateWorkflows, self.requestDBReader)
+
+        return
+
+    def timings(self):
+        """
+        _timings_
+
+        Duration of the last run of every check
+
+        """
+        with self.lock:
+            return dict( [ (name, result['seconds']) for name, result in self.results.items() ] )
+
+    def run(self):
+        """
+        _run_
+
+        Monitor until killed
+
+        """
+        while True:
+            startTime = time.time()
+            self.runOnce()
+            time.sleep(max(0, self.pollInterval - (time.time() - startTime)))
@@ -8,8 +8,6 @@ import logging
 import threading
 import time
 
-from WMCore.DAOFactory import DAOFactory
-
 from WMCore.WorkQueue.WMBSHelper import WMBSHelper
 from WMCore.WMBS.Fileset import Fileset
 
@@ -17,6 +15,8 @@ from T0.RunConfig.Tier0Config import retrieveDatasetConfig
 from T0.RunConfig.Tier0Config import addRepackConfig
 from T0.RunConfig.Tier0Config import deleteStreamConfig
 
+from T0.WMBS.DAOCache import cachedDAOFactory
+
 from T0.WMSpec.StdSpecs.Repack import RepackWorkloadFactory
 from T0.WMSpec.StdSpecs.Express import ExpressWorkloadFactory
 from WMCore.WMSpec.StdSpecs.PromptReco import PromptRecoWorkloadFactory
@@ -34,9 +34,9 @@ def configureRun(tier0Config, run, hltConfig, referenceHltConfig = None):
     logging.debug("configureRun() : %d" % run)
     myThread = threading.currentThread()
 
-    daoFactory = DAOFactory(package = "T0.WMBS",
-                            logger = logging,
-                            dbinterface = myThread.dbi)
+    daoFactory = cachedDAOFactory(package = "T0.WMBS",
+                                  logger = logging,
+                                  dbinterface = myThread.dbi)
 
     # dao to update global run settings
     insertStorageNodeDAO = daoFactory(classname = "RunConfig.InsertStorageNode")
@@ -143,7 +143,23 @@ def configureRun(tier0Config, run, hltConfig, referenceHltConfig = None):
 
     return
 
-def configureRunStream(tier0Config, run, stream, specDirectory, dqmUploadProxy):
+def storeSpecs(specStore, wmSpecs):
+    """
+    _storeSpecs_
+
+    Move the specs of newly created workflows into the spec
+    store. A spec that can't be stored keeps its spec file.
+
+    """
+    for wmSpec in wmSpecs:
+        try:
+            specStore.storeSpec(wmSpec)
+        except Exception as ex:
+            logging.error("Could not store spec for workflow %s : %s" % (wmSpec.name(), str(ex)))
+
+    return
+
+def configureRunStream(tier0Config, run, stream, specDirectory, dqmUploadProxy, specStore = None):
     """
     _configureRunStream_
 
@@ -156,13 +172,15 @@ def configureRunStream(tier0Config, run, stream, specDirectory, dqmUploadProxy):
     Create workflows, filesets and subscriptions for
     the processing of runs/streams.
 
+    With a spec store the workflow spec is moved into it.
+
     """
     logging.debug("configureRunStream() : %d , %s" % (run, stream))
     myThread = threading.currentThread()
 
-    daoFactory = DAOFactory(package = "T0.WMBS",
-                            logger = logging,
-                            dbinterface = myThread.dbi)
+    daoFactory = cachedDAOFactory(package = "T0.WMBS",
+                                  logger = logging,
+                                  dbinterface = myThread.dbi)
 
     # retrieve some basic run information
     getRunInfoDAO = daoFactory(classname = "RunConfig.GetRunInfo")
@@ -494,6 +512,7 @@ def configureRunStream(tier0Config, run, stream, specDirectory, dqmUploadProxy):
             # parameters for repack direct to merge stageout
             specArguments['MinMergeSize'] = streamConfig.Repack.MinInputSize
             specArguments['MaxMergeEvents'] = streamConfig.Repack.MaxInputEvents
+            specArguments['DirectToMerged'] = streamConfig.Repack.DirectToMerged
 
             specArguments['UnmergedLFNBase'] = "/store/unmerged/%s" % runInfo['bulk_data_type']
             if runInfo['backfill']:
@@ -543,6 +562,7 @@ def configureRunStream(tier0Config, run, stream, specDirectory, dqmUploadProxy):
             specArguments['GlobalTagConnect'] = streamConfig.Express.GlobalTagConnect
 
             specArguments['MaxInputRate'] = streamConfig.Express.MaxInputRate
+            specArguments['InputEventBudget'] = streamConfig.Express.InputEventBudget
             specArguments['MaxInputEvents'] = streamConfig.Express.MaxInputEvents
             specArguments['MaxInputSize'] = streamConfig.Express.MaxInputSize
             specArguments['MaxInputFiles'] = streamConfig.Express.MaxInputFiles
@@ -649,13 +669,36 @@ def configureRunStream(tier0Config, run, stream, specDirectory, dqmUploadProxy):
         else:
             myThread.transaction.commit()
 
+        if specStore != None and streamConfig.ProcessingStyle in [ 'Bulk', 'Express' ]:
+            storeSpecs(specStore, [ wmSpec ])
+
     else:
 
         # should we do anything for local runs ?
         pass
     return
 
-def releasePromptReco(tier0Config, specDirectory, dqmUploadProxy):
+def changedRecoReleaseDelays(tier0Config, recoReleaseDatasets):
+    """
+    _changedRecoReleaseDelays_
+
+    Takes the dataset delays as returned by FindRecoReleaseDatasets
+    and returns the UpdateRecoReleaseDelays binds for the datasets
+    whose delays differ from the Tier0 configuration (or that have
+    none yet).
+
+    """
+    bindsRecoReleaseDelays = []
+    for dataset, delays in recoReleaseDatasets.items():
+        datasetConfig = retrieveDatasetConfig(tier0Config, dataset)
+        if delays != (datasetConfig.RecoDelay, datasetConfig.RecoDelayOffset):
+            bindsRecoReleaseDelays.append( { 'PRIMDS' : dataset,
+                                             'DELAY' : datasetConfig.RecoDelay,
+                                             'DELAY_OFFSET' : datasetConfig.RecoDelayOffset } )
+
+    return bindsRecoReleaseDelays
+
+def releasePromptReco(tier0Config, specDirectory, dqmUploadProxy, specStore = None):
     """
     _releasePromptReco_
 
@@ -664,18 +707,24 @@ def releasePromptReco(tier0Config, specDirectory, dqmUploadProxy):
     Finds all run/primds that need to be released for PromptReco
     ( run.stop_time + reco_release_config.delay > now AND run.stop_time > 0 )
 
+    The dataset delays are kept in reco_release_delay, they are
+    only written when they changed in the Tier0 configuration.
+
     Create workflows and subscriptions for the processing
     of runs/datasets.
 
+    With a spec store the workflow specs are moved into it.
+
     """
     logging.debug("releasePromptReco()")
     myThread = threading.currentThread()
 
-    daoFactory = DAOFactory(package = "T0.WMBS",
-                            logger = logging,
-                            dbinterface = myThread.dbi)
+    daoFactory = cachedDAOFactory(package = "T0.WMBS",
+                                  logger = logging,
+                                  dbinterface = myThread.dbi)
 
     findRecoReleaseDatasetsDAO = daoFactory(classname = "RunConfig.FindRecoReleaseDatasets")
+    updateRecoReleaseDelaysDAO = daoFactory(classname = "RunConfig.UpdateRecoReleaseDelays")
     findRecoReleaseDAO = daoFactory(classname = "RunConfig.FindRecoRelease")
     insertDatasetScenarioDAO = daoFactory(classname = "RunConfig.InsertDatasetScenario")
     insertCMSSWVersionDAO = daoFactory(classname = "RunConfig.InsertCMSSWVersion")
@@ -686,9 +735,9 @@ def releasePromptReco(tier0Config, specDirectory, dqmUploadProxy):
     insertWorkflowMonitoringDAO = daoFactory(classname = "RunConfig.InsertWorkflowMonitoring")
 
     # mark workflows as injected
-    wmbsDaoFactory = DAOFactory(package = "WMCore.WMBS",
-                                logger = logging,
-                                dbinterface = myThread.dbi)
+    wmbsDaoFactory = cachedDAOFactory(package = "WMCore.WMBS",
+                                      logger = logging,
+                                      dbinterface = myThread.dbi)
     markWorkflowsInjectedDAO   = wmbsDaoFactory(classname = "Workflow.MarkInjectedWorkflows")
 
     #
@@ -696,12 +745,12 @@ def releasePromptReco(tier0Config, specDirectory, dqmUploadProxy):
     #
     recoReleaseDatasets = findRecoReleaseDatasetsDAO.execute(transaction = False)
 
-    datasetDelays = {}
-    for dataset in recoReleaseDatasets:
-        datasetConfig = retrieveDatasetConfig(tier0Config, dataset)
-        datasetDelays[dataset] = (datasetConfig.RecoDelay, datasetConfig.RecoDelayOffset)
+    bindsRecoReleaseDelays = changedRecoReleaseDelays(tier0Config, recoReleaseDatasets)
+    if len(bindsRecoReleaseDelays) > 0:
+        updateRecoReleaseDelaysDAO.execute(bindsRecoReleaseDelays, transaction = False)
 
-    recoRelease = findRecoReleaseDAO.execute(datasetDelays, transaction = False)
+    # run information and PhEDEx configs come with the run/datasets
+    recoRelease = findRecoReleaseDAO.execute(transaction = False)
     for run in sorted(recoRelease.keys()):
 
         # for creating PromptReco specs
@@ -716,15 +765,9 @@ def releasePromptReco(tier0Config, specDirectory, dqmUploadProxy):
         bindsStorageNode = []
         bindsReleasePromptReco = []
 
-        # retrieve some basic run information
-        getRunInfoDAO = daoFactory(classname = "RunConfig.GetRunInfo")
-        runInfo = getRunInfoDAO.execute(run, transaction = False)[0]
+        runInfo = recoRelease[run]['runInfo']
 
-        # retrieve phedex configs for run
-        getPhEDExConfigDAO = daoFactory(classname = "RunConfig.GetPhEDExConfig")
-        phedexConfigs = getPhEDExConfigDAO.execute(run, transaction = False)
-
-        for (dataset, fileset, repackProcVer) in recoRelease[run]:
+        for (dataset, fileset, repackProcVer, phedexConfig) in recoRelease[run]['datasets']:
 
             bindsReleasePromptReco.append( { 'RUN' : run,
                                              'PRIMDS' : dataset,
@@ -773,9 +816,7 @@ def releasePromptReco(tier0Config, specDirectory, dqmUploadProxy):
                                       'GLOBAL_TAG' : datasetConfig.GlobalTag } )
 
             # check if the dataset has any phedex config
-            if dataset in phedexConfigs:
-
-                phedexConfig = phedexConfigs[dataset]
+            if phedexConfig != None:
 
                 tapeDataTiers = set()
                 diskDataTiers = set()
@@ -1011,4 +1052,7 @@ def releasePromptReco(tier0Config, specDirectory, dqmUploadProxy):
         else:
             myThread.transaction.commit()
 
+        if specStore != None:
+            storeSpecs(specStore, [ wmSpec for (wmbsHelper, wmSpec, fileset) in recoSpecs.values() ])
+
     return
@@ -93,6 +93,8 @@ Tier0Configuration - Global configuration object
 |             |     |
 |             |     |--> MaxLatency - max latency to trigger repack or repack merge job
 |             |     |
+|             |     |--> DirectToMerged - size repack jobs so most outputs are written directly to merged
+|             |     |
 |             |     |--> BlockCloseDelay - delay to close block in WMAgent
 |             |
 |             |--> Express - Configuration section for express streams
@@ -120,6 +122,9 @@ Tier0Configuration - Global configuration object
 |             |     |--> MaxInputRate - max input rate that is accepted for processing
 |             |     |                       (in events per lumi section) 
 |             |     |
+|             |     |--> InputEventBudget - if set, lumis over this many events are prescaled
+|             |     |                       instead of failed (replaces MaxInputRate)
+|             |     |
 |             |     |--> MaxInputEvents - max input events for express processing job
 |             |     |
 |             |     |--> MaxInputSize - max input size for express merge job
@@ -669,6 +674,11 @@ def addRepackConfig(config, streamName, **options):
     else:
         streamConfig.Repack.MaxLatency = options.get("maxLatency", 12 * 3600)
 
+    if hasattr(streamConfig.Repack, "DirectToMerged"):
+        streamConfig.Repack.DirectToMerged = options.get("directToMerged", streamConfig.Repack.DirectToMerged)
+    else:
+        streamConfig.Repack.DirectToMerged = options.get("directToMerged", False)
+
     if streamConfig.Repack.MaxOverSize > streamConfig.Repack.MaxEdmSize:
         streamConfig.Repack.MaxOverSize = streamConfig.Repack.MaxEdmSize
 
@@ -735,6 +745,7 @@ def addExpressConfig(config, streamName, **options):
     streamConfig.Express.SizePerEvent = sizePerEvent
 
     streamConfig.Express.MaxInputRate = options.get("maxInputRate", 23 * 1000)
+    streamConfig.Express.InputEventBudget = options.get("inputEventBudget", None)
     streamConfig.Express.MaxInputEvents = options.get("maxInputEvents", 200)
     streamConfig.Express.MaxInputSize = options.get("maxInputSize", 2 * 1024 * 1024 * 1024)
     streamConfig.Express.MaxInputFiles = options.get("maxInputFiles", 500)
@@ -0,0 +1,185 @@
+"""
+_RunDiagnosis_
+
+Find out why runs are still active.
+
+All requested runs are diagnosed together, every check is a single
+query over all runs still in question and the request database is
+read once and indexed by run. The result is a report keyed by run
+number, every entry has a status, a human readable message and the
+details behind it:
+
+  active_without_eor   - run not ended, some SM instances lack EoR records
+  ended_in_sm          - run ended according to SM but not in T0AST
+  not_ended            - run not ended yet according to SM
+  unknown              - run not known to SM
+  not_in_requestdb     - no workflows for the run in the request database
+  workflows_closed     - all workflows for the run are closed
+  missing_eols         - streams with missing or spurious EoLS records
+  incomplete_lumis     - closed lumis with missing or extra streamers
+  no_problem_found     - none of the above
+
+"""
+import re
+
+requestStatusList = [ "new", "Closed", "Merge", "Harvesting", "Processing Done", "AlcaSkim", "completed" ]
+
+workflowRunRegex = re.compile(r"^[\w]+_Run([0-9]+)_[\w]+$")
+
+
+def buildLumiRanges(lumiList):
+    """
+    _buildLumiRanges_
+
+    Get a sorted list of integer lumi ids and build
+    a list of closed lumi ranges
+    """
+    lumiRanges = []
+    firstLumi = lumiList[0]
+    lastLumi = lumiList[0]
+    for singleLumi in lumiList[1:]:
+        if singleLumi != lastLumi + 1:
+            lumiRanges.append((firstLumi, lastLumi))
+            firstLumi = singleLumi
+        lastLumi = singleLumi
+    lumiRanges.append((firstLumi, lastLumi))
+    return lumiRanges
+
+def indexWorkflowsByRun(requestDBReader):
+    """
+    _indexWorkflowsByRun_
+
+    Read the request database once, return a
+    run -> { workflow : status } index
+
+    """
+    workflowIndex = {}
+    workflowInfo = requestDBReader.getRequestByStatus(requestStatusList, detail = True)
+    for workflow in workflowInfo.keys():
+        match = workflowRunRegex.match(workflow)
+        if match == None:
+            continue
+        run = int(match.groups()[0])
+        workflowIndex.setdefault(run, {})[workflow] = workflowInfo[workflow]['RequestStatus']
+    return workflowIndex
+
+def diagnoseRuns(runs, daoFactoryT0AST, daoFactorySM, requestDBReader):
+    """
+    _diagnoseRuns_
+
+    Diagnose all runs, returns the report
+
+    """
+    report = {}
+    def setStatus(run, status, message, **details):
+        report[run] = dict(details, run = run, status = status, message = message)
+
+    runs = sorted(set([ int(run) for run in runs ]))
+    if len(runs) == 0:
+        return report
+
+    findActiveRunsDAO = daoFactoryT0AST(classname = "RunLumiCloseout.FindActiveRuns")
+    checkEoRRecordsDAO = daoFactorySM(classname = "RunLumiCloseout.CheckEndOfRunRecords")
+    lumiCloseDAO = daoFactoryT0AST(classname = "RunLumiCloseout.CheckClosedLumis")
+    closedLumisDAO = daoFactoryT0AST(classname = "RunLumiCloseout.GetClosedLumisForStream")
+    openLumisDAO = daoFactoryT0AST(classname = "RunLumiCloseout.GetFileCountOnOpenLumis")
+
+    activeRuns = set(findActiveRunsDAO.execute())
+    eorRecords = checkEoRRecordsDAO.execute(runs)
+
+    # runs that did not end yet, check if it's an issue with EoR records
+    endedRuns = []
+    for run in runs:
+        if run not in activeRuns:
+            if run in eorRecords:
+                endedRuns.append(run)
+            else:
+                setStatus(run, "unknown", "Run %d does not exist in SM." % run)
+            continue
+        result = eorRecords.get(run, { "totalInstances" : 0,
+                                       "instancesWithEoR" : [],
+                                       "instancesWithoutEoR" : [] })
+        if result["instancesWithEoR"] and result["instancesWithoutEoR"]:
+            setStatus(run, "active_without_eor",
+                      "Instances %s didn't write an EoR record." % ", ".join([ str(x) for x in result["instancesWithoutEoR"] ]),
+                      instancesWithoutEoR = result["instancesWithoutEoR"],
+                      instanceCountMismatch = result["totalInstances"] != (len(result["instancesWithEoR"]) + len(result["instancesWithoutEoR"])))
+        elif result["instancesWithEoR"]:
+            setStatus(run, "ended_in_sm",
+                      "Run %d has already ended according to SM, but not in T0AST. Check the Tier0Feeder" % run)
+        else:
+            setStatus(run, "not_ended", "Run %d has not ended yet according to SM." % run)
+
+    if len(endedRuns) == 0:
+        return report
+
+    # ended runs, check the request database
+    workflowIndex = indexWorkflowsByRun(requestDBReader)
+
+    checkRuns = []
+    for run in endedRuns:
+        workflows = workflowIndex.get(run, {})
+        activeWorkflows = sorted([ workflow for workflow, status in workflows.items() if status == "new" ])
+        if len(workflows) == 0:
+            setStatus(run, "not_in_requestdb", "Run %d is not yet available in WMStats." % run)
+        elif len(activeWorkflows) == 0:
+            setStatus(run, "workflows_closed", "All workflows associated to run %d are closed already." % run)
+        else:
+            report[run] = { 'run' : run, 'activeWorkflows' : activeWorkflows }
+            checkRuns.append(run)
+
+    if len(checkRuns) == 0:
+        return report
+
+    # check for missing EoLS records
+    affectedStreams = {}
+    for entry in lumiCloseDAO.execute(checkRuns):
+        if entry["closed_lumi_count"] != entry["expected_lumi_count"] or \
+           entry["closed_lumi_count"] != entry["max_lumi"]:
+            affectedStreams[(entry["run_id"], entry["stream_id"])] = range(1, entry["expected_lumi_count"] + 1)
+
+    if affectedStreams:
+
+        closedLumis = closedLumisDAO.execute(list(affectedStreams.keys()))
+
+        for key in sorted(affectedStreams.keys()):
+            run = key[0]
+            streamInfo = closedLumis.get(key, { "name" : str(key[1]), "closedLumis" : [] })
+
+            openLumis = set(affectedStreams[key]) - set(streamInfo["closedLumis"])
+            spuriousLumis = set(streamInfo["closedLumis"]) - set(affectedStreams[key])
+
+            streams = report[run].setdefault('streams', {})
+            streams[streamInfo["name"]] = { 'missingEoLS' : [],
+                                            'spuriousEoLS' : [] }
+            if openLumis:
+                streams[streamInfo["name"]]['missingEoLS'] = buildLumiRanges(sorted(openLumis))
+            if spuriousLumis:
+                streams[streamInfo["name"]]['spuriousEoLS'] = buildLumiRanges(sorted(spuriousLumis))
+
+            report[run]['status'] = "missing_eols"
+            report[run]['message'] = "There are missing EoLS records"
+
+    # check for incomplete data in lumis
+    checkRuns = [ run for run in checkRuns if 'status' not in report[run] ]
+    if len(checkRuns) == 0:
+        return report
+
+    openLumis = openLumisDAO.execute(checkRuns)
+
+    for run in checkRuns:
+        if run not in openLumis:
+            report[run]['status'] = "no_problem_found"
+            report[run]['message'] = "No problem was found, check WMStats monitoring if run is still marked as Active."
+            continue
+
+        streams = report[run].setdefault('streams', {})
+        for (streamId, streamName), lumis in openLumis[run].items():
+            streams[streamName] = { 'id' : streamId,
+                                    'inconsistentLumis' : dict([ (lumi, { 'expected' : expected, 'found' : found })
+                                                                 for lumi, (expected, found) in lumis.items() ]) }
+
+        report[run]['status'] = "incomplete_lumis"
+        report[run]['message'] = "There are lumis with inconsistent data"
+
+    return report
@@ -4,11 +4,13 @@ _RunLumiCloseoutAPI_
 API for anyting RunConfig related
 
 """
+import os
 import logging
 import threading
+import subprocess
 import time
 
-from WMCore.DAOFactory import DAOFactory
+from T0.WMBS.DAOCache import cachedDAOFactory
 
 
 def stopRuns(dbInterfaceStorageManager):
@@ -23,17 +25,19 @@ def stopRuns(dbInterfaceStorageManager):
     Replays are handled differently, they will update stop_time with
     close_time (once that has been set) and leave start_time as-is.
 
+    Returns the number of active runs.
+
     """
     logging.debug("stopRuns()")
     myThread = threading.currentThread()
     
-    daoFactory = DAOFactory(package = "T0.WMBS",
-                            logger = logging,
-                            dbinterface = myThread.dbi)
+    daoFactory = cachedDAOFactory(package = "T0.WMBS",
+                                  logger = logging,
+                                  dbinterface = myThread.dbi)
 
-    daoFactoryStorageManager = DAOFactory(package = "T0.WMBS",
-                                          logger = logging,
-                                          dbinterface = dbInterfaceStorageManager)
+    daoFactoryStorageManager = cachedDAOFactory(package = "T0.WMBS",
+                                                logger = logging,
+                                                dbinterface = dbInterfaceStorageManager)
 
     findActiveRunsDAO = daoFactory(classname = "RunLumiCloseout.FindActiveRuns")
     findStoppedRunsDAO = daoFactoryStorageManager(classname = "RunLumiCloseout.FindStoppedRuns")
@@ -60,7 +64,7 @@ def stopRuns(dbInterfaceStorageManager):
         if len(bindVarList) > 0:
             stopRunsDAO.execute(binds = bindVarList, transaction = False)
 
-    return
+    return len(activeRuns)
 
 
 def closeRuns(dbInterfaceStorageManager):
@@ -72,17 +76,19 @@ def closeRuns(dbInterfaceStorageManager):
     For all open runs check the StorageManager EoR records to see if the
     run has ended. If it has, update T0AST to reflect this.
 
+    Returns the number of open runs.
+
     """
     logging.debug("closeRuns()")
     myThread = threading.currentThread()
 
-    daoFactory = DAOFactory(package = "T0.WMBS",
-                            logger = logging,
-                            dbinterface = myThread.dbi)
+    daoFactory = cachedDAOFactory(package = "T0.WMBS",
+                                  logger = logging,
+                                  dbinterface = myThread.dbi)
 
-    daoFactoryStorageManager = DAOFactory(package = "T0.WMBS",
-                                          logger = logging,
-                                          dbinterface = dbInterfaceStorageManager)
+    daoFactoryStorageManager = cachedDAOFactory(package = "T0.WMBS",
+                                                logger = logging,
+                                                dbinterface = dbInterfaceStorageManager)
 
     findOpenRunsDAO = daoFactory(classname = "RunLumiCloseout.FindOpenRuns")
     findClosedRunsDAO = daoFactoryStorageManager(classname = "RunLumiCloseout.FindClosedRuns")
@@ -107,10 +113,10 @@ def closeRuns(dbInterfaceStorageManager):
         if len(bindVarList) > 0:
             closeRunsDAO.execute(binds = bindVarList, transaction = False)
 
-    return
+    return len(openRuns)
 
 
-def closeLumiSections(dbInterfaceStorageManager):
+def closeLumiSections(dbInterfaceStorageManager, lease = None):
     """
     _closeLumiSections_
 
@@ -124,17 +130,22 @@ def closeLumiSections(dbInterfaceStorageManager):
     of streamers matches the filecount in the lumi_section_closed
     record and final close them if it does
 
+    With lease binds only run/streams in the partitions
+    held by the feeder instance are handled.
+
+    Returns the number of active run/streams.
+
     """
     logging.debug("closeLumiSections()")
     myThread = threading.currentThread()
 
-    daoFactory = DAOFactory(package = "T0.WMBS",
-                            logger = logging,
-                            dbinterface = myThread.dbi)
+    daoFactory = cachedDAOFactory(package = "T0.WMBS",
+                                  logger = logging,
+                                  dbinterface = myThread.dbi)
 
-    daoFactoryStorageManager = DAOFactory(package = "T0.WMBS",
-                                          logger = logging,
-                                          dbinterface = dbInterfaceStorageManager)
+    daoFactoryStorageManager = cachedDAOFactory(package = "T0.WMBS",
+                                                logger = logging,
+                                                dbinterface = dbInterfaceStorageManager)
 
     findHighContLumiDAO = daoFactory(classname = "RunLumiCloseout.FindHighContLumi")
     findClosedLumisDAO = daoFactoryStorageManager(classname = "RunLumiCloseout.FindClosedLumis")
@@ -146,11 +157,11 @@ def closeLumiSections(dbInterfaceStorageManager):
 
     # find active run/streams and their highest lumi
     # in a continious 1...lumi sequence
-    runStreamLumis = findHighContLumiDAO.execute(transaction = False)
+    runStreamLumis = findHighContLumiDAO.execute(lease = lease, transaction = False)
 
     # nothing active, nothing to do
     if len(runStreamLumis) == 0:
-        return
+        return 0
 
     # find new closed lumis based on EoLS records for
     # any given run/stream and lumi > N 
@@ -190,12 +201,12 @@ def closeLumiSections(dbInterfaceStorageManager):
         insertClosedLumiDAO.execute(binds = closedLumis, transaction = False)
 
     # final lumi closing
-    finalCloseLumiDAO.execute(currentTime, transaction = False)
+    finalCloseLumiDAO.execute(currentTime, lease = lease, transaction = False)
 
-    return
+    return len(runStreamLumis)
 
 
-def closeRunStreamFilesets():
+def closeRunStreamFilesets(lease = None):
     """
     _closeRunStreamFilesets_
 
@@ -207,21 +218,22 @@ def closeRunStreamFilesets():
     have all the data there is. Close the run/stream
     fileset to start processing closeout.
 
-    This is all done in a single query.
+    With lease binds only run/streams in the partitions
+    held by the feeder instance are handled.
+
+    Returns the number of closed filesets.
 
     """
     logging.debug("closeRunStreamFilesets()")
     myThread = threading.currentThread()
     
-    daoFactory = DAOFactory(package = "T0.WMBS",
-                            logger = logging,
-                            dbinterface = myThread.dbi)
+    daoFactory = cachedDAOFactory(package = "T0.WMBS",
+                                  logger = logging,
+                                  dbinterface = myThread.dbi)
 
     closeRunStreamFilesetsDAO = daoFactory(classname = "RunLumiCloseout.CloseRunStreamFilesets")
 
-    closeRunStreamFilesetsDAO.execute(transaction = False)
-
-    return
+    return closeRunStreamFilesetsDAO.execute(lease = lease, transaction = False)
 
 
 def checkActiveSplitLumis():
@@ -241,12 +253,170 @@ def checkActiveSplitLumis():
     logging.debug("checkActiveSplitLumi()")
     myThread = threading.currentThread()
 
-    daoFactory = DAOFactory(package = "T0.WMBS",
-                            logger = logging,
-                            dbinterface = myThread.dbi)
+    daoFactory = cachedDAOFactory(package = "T0.WMBS",
+                                  logger = logging,
+                                  dbinterface = myThread.dbi)
 
     checkActiveSplitLumisDAO = daoFactory(classname = "RunLumiCloseout.CheckActiveSplitLumis")
 
     checkActiveSplitLumisDAO.execute(transaction = False)
 
     return
+
+
+def purgeRuns(streamerNotification):
+    """
+    _purgeRuns_
+
+    Called by Tier0Feeder
+
+    Find runs that are fully done (closed, all filesets cleaned
+    up, no active split lumis and streamers deleted if we notify
+    P5 about them) and remove their streamer and lumi bookkeeping.
+
+    The streamer and lumi tables are partitioned by run, the
+    purge drops the partitions for the run. This keeps the hot
+    closeout and feeding queries limited to active runs.
+
+    """
+    logging.debug("purgeRuns()")
+    myThread = threading.currentThread()
+
+    daoFactory = cachedDAOFactory(package = "T0.WMBS",
+                                  logger = logging,
+                                  dbinterface = myThread.dbi)
+
+    findPurgeableRunsDAO = daoFactory(classname = "RunLumiCloseout.FindPurgeableRuns")
+    purgeRunDAO = daoFactory(classname = "RunLumiCloseout.PurgeRun")
+
+    runs = findPurgeableRunsDAO.execute(streamerNotification, transaction = False)
+
+    for run in sorted(runs):
+        try:
+            purgeRunDAO.execute(run, transaction = False)
+        except:
+            logging.exception("Can't purge run %d" % run)
+        else:
+            logging.info("Purged streamer and lumi records for run %d" % run)
+
+    return
+
+def notifyStorageManager(transferSystemBaseDir, budget, batchSize):
+    """
+    _notifyStorageManager_
+
+    Called by Tier0Feeder
+
+    Find finished streamers for closed run/streams
+    Send the notification message to StorageManager
+    Update the streamer status to finished (deleted = 1)
+    Returns the number of streamers handled
+
+    Streamers are paged per run/stream and handled in batches
+    of batchSize, each batch is marked finished right away so
+    a restart continues where we left off. At most budget
+    streamers are handled per call, the rest waits for the
+    next call.
+
+    """
+    logging.debug("notifyStorageManager()")
+    myThread = threading.currentThread()
+
+    daoFactory = cachedDAOFactory(package = "T0.WMBS",
+                                  logger = logging,
+                                  dbinterface = myThread.dbi)
+
+    getFinishedRunStreamsDAO = daoFactory(classname = "SMNotification.GetFinishedRunStreams")
+    getFinishedStreamersDAO = daoFactory(classname = "SMNotification.GetFinishedStreamers")
+    markStreamersFinishedDAO = daoFactory(classname = "SMNotification.MarkStreamersFinished")
+
+    notified = 0
+
+    for (run, stream) in getFinishedRunStreamsDAO.execute(transaction = False):
+
+        lastId = 0
+        while budget > 0:
+
+            finishedStreamers = getFinishedStreamersDAO.execute(run, stream, lastId,
+                                                                min(batchSize, budget),
+                                                                transaction = False)
+
+            if len(finishedStreamers) == 0:
+                break
+
+            streamers = []
+            lfns = []
+            for (id, lfn) in finishedStreamers:
+                streamers.append(id)
+                lfns.append(lfn)
+
+            logging.debug("Notifying transfer system about %d processed streamers for run %d" % (len(streamers), run))
+            sendRepackedStatus(transferSystemBaseDir, lfns)
+
+            markStreamersFinishedDAO.execute(streamers, transaction = False)
+
+            lastId = streamers[-1]
+            budget -= len(streamers)
+            notified += len(streamers)
+
+        if budget <= 0:
+            logging.info("StorageManager notification budget used up, continuing next cycle")
+            break
+
+    return notified
+
+def clearFinishedStreamers():
+    """
+    _clearFinishedStreamers_
+
+    Called by Tier0Feeder
+
+    Without StorageManager notification remove the completely
+    processed streamers from the notification queue, otherwise
+    the queue only shrinks when runs are purged.
+
+    """
+    logging.debug("clearFinishedStreamers()")
+    myThread = threading.currentThread()
+
+    daoFactory = cachedDAOFactory(package = "T0.WMBS",
+                                  logger = logging,
+                                  dbinterface = myThread.dbi)
+
+    clearFinishedStreamersDAO = daoFactory(classname = "SMNotification.ClearFinishedStreamers")
+    clearFinishedStreamersDAO.execute(transaction = False)
+
+    return
+
+def sendRepackedStatus(transferSystemBaseDir, lfns):
+    """
+    _sendRepackedStatus_
+
+    Tell the transfer system that the streamers are processed
+
+    """
+    filenameParams = ""
+    for lfn in lfns:
+        filenameParams += "-FILENAME %s " % os.path.basename(lfn)
+
+    p = subprocess.Popen("/bin/bash", stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    output, error = p.communicate("""
+    export T0_BASE_DIR=%s
+    export T0ROOT=${T0_BASE_DIR}/T0
+    export CONFIG=${T0_BASE_DIR}/Config/TransferSystem_CERN.cfg
+
+    export PERL5LIB=${T0ROOT}/perl_lib
+
+    unset LANGUAGE
+    unset LC_ALL
+    unset LC_CTYPE
+    export LANG=C
+
+    ${T0ROOT}/operations/sendRepackedStatus.pl --config $CONFIG %s
+    """ % (transferSystemBaseDir, filenameParams))
+
+    if len(error) > 0:
+        logging.error("ERROR: Could not notify transfer system about processed streamers")
+        logging.error("ERROR: %s" % error)
+
+    return
@@ -0,0 +1,322 @@
+"""
+_Replication_
+
+Replication of T0AST records into the Tier0 Data Service.
+
+Every replicated entity is declared once as a ReplicatedEntity:
+
+  source  - T0AST DAO returning the rows that still need replication
+  upsert  - Tier0 Data Service DAO that merges rows into the target
+  confirm - T0AST DAO that records rows as replicated (flags, queue)
+  key     - row fields identifying a row, used for logging and
+            as default confirm binds
+
+plus how to build the upsert and confirm binds from a row. A bind
+spec maps bind names to row fields or to callables taking the row.
+
+The ReplicationEngine replicates all entities concurrently, each
+entity in its own thread with its own Tier0 Data Service connection.
+Rows are upserted in array bind batches of bounded size and only
+rows of batches the target accepted are confirmed in T0AST. If a
+batch fails because of the data in some of its rows (constraint or
+value errors) it is split up to isolate the offending rows,
+everything else still goes through. Any other failure (lost
+connection, listener down) stops the entity for this cycle, it
+is retried in the next one. Upserts are idempotent, so a failure
+between upsert and confirm just means the rows are upserted again
+next time.
+
+Per entity throughput (rows per second) and lag (seconds since the
+entity was last completely caught up) are logged every cycle.
+
+"""
+import time
+import logging
+import threading
+
+from sqlalchemy.exc import IntegrityError, DataError
+
+from T0.ExternalDatabase.ConnectionRegistry import ExternalDatabaseUnavailable
+from T0.WMBS.DAOCache import cachedDAOFactory
+
+# Oracle errors caused by the values of a row, the Oracle
+# client reports most of them as plain DatabaseError
+dataErrorCodes = [ "ORA-00001",   # unique constraint violated
+                   "ORA-01400",   # cannot insert NULL
+                   "ORA-01407",   # cannot update to NULL
+                   "ORA-01438",   # value larger than precision
+                   "ORA-01722",   # invalid number
+                   "ORA-02290",   # check constraint violated
+                   "ORA-02291",   # parent key not found
+                   "ORA-12899" ]  # value too large for column
+
+
+def isDataError(ex):
+    """
+    _isDataError_
+
+    Whether an upsert failed because of the data in some rows,
+    as opposed to the connection or the database
+
+    """
+    if isinstance(ex, (IntegrityError, DataError)):
+        return True
+    message = str(ex)
+    for code in dataErrorCodes:
+        if code in message:
+            return True
+    return False
+
+
+class ReplicatedEntity(object):
+    """
+    _ReplicatedEntity_
+
+    Declaration of one replicated entity
+
+    """
+    def __init__(self, name, source, upsert, confirm, key,
+                 upsertBinds, confirmBinds = None):
+        self.name = name
+        self.source = source
+        self.upsert = upsert
+        self.confirm = confirm
+        self.key = key
+        self.upsertBinds = upsertBinds
+        self.confirmBinds = confirmBinds
+        if self.confirmBinds == None:
+            self.confirmBinds = dict( [ (x.upper(), x) for x in key ] )
+        return
+
+    def makeBinds(self, bindSpec, row):
+        binds = {}
+        for bindName, field in bindSpec.items():
+            if callable(field):
+                binds[bindName] = field(row)
+            else:
+                binds[bindName] = row[field]
+        return binds
+
+    def rowKey(self, row):
+        return tuple( [ row[x] for x in self.key ] )
+
+
+#
+# everything the Tier0Feeder replicates into the Tier0 Data Service
+#
+t0DataSvcEntities = [
+    ReplicatedEntity("RunStreamDone",
+                     source = "T0DataSvc.GetRunStreamDone",
+                     upsert = "T0DataSvc.InsertRunStreamDone",
+                     confirm = "T0DataSvc.UpdateRunStreamDone",
+                     key = [ 'run', 'stream' ],
+                     upsertBinds = { 'RUN' : 'run',
+                                     'STREAM' : 'stream' }),
+    ReplicatedEntity("ExpressConfig",
+                     source = "T0DataSvc.GetExpressConfigs",
+                     upsert = "T0DataSvc.InsertExpressConfigs",
+                     confirm = "T0DataSvc.UpdateExpressConfigs",
+                     key = [ 'run', 'stream' ],
+                     upsertBinds = { 'RUN' : 'run',
+                                     'STREAM' : 'stream',
+                                     'CMSSW' : 'cmssw',
+                                     'SCRAM_ARCH' : 'scram_arch',
+                                     'RECO_CMSSW' : 'reco_cmssw',
+                                     'RECO_SCRAM_ARCH' : 'reco_scram_arch',
+                                     'ALCA_SKIM' : 'alca_skim',
+                                     'DQM_SEQ' : 'dqm_seq',
+                                     'GLOBAL_TAG' : lambda row: row['global_tag'][:50],
+                                     'SCENARIO' : 'scenario' }),
+    ReplicatedEntity("RecoConfig",
+                     source = "T0DataSvc.GetRecoConfigs",
+                     upsert = "T0DataSvc.InsertRecoConfigs",
+                     confirm = "T0DataSvc.UpdateRecoConfigs",
+                     key = [ 'run', 'primds' ],
+                     upsertBinds = { 'RUN' : 'run',
+                                     'PRIMDS' : 'primds',
+                                     'CMSSW' : 'cmssw',
+                                     'SCRAM_ARCH' : 'scram_arch',
+                                     'ALCA_SKIM' : 'alca_skim',
+                                     'PHYSICS_SKIM' : 'physics_skim',
+                                     'DQM_SEQ' : 'dqm_seq',
+                                     'GLOBAL_TAG' : lambda row: row['global_tag'][:50],
+                                     'SCENARIO' : 'scenario' }),
+    # aggregated by run, if one primary dataset is released
+    # the whole run is considered released
+    ReplicatedEntity("RecoReleaseConfig",
+                     source = "T0DataSvc.GetRecoReleaseConfigs",
+                     upsert = "T0DataSvc.InsertRecoReleaseConfigs",
+                     confirm = "T0DataSvc.UpdateRecoReleaseConfigs",
+                     key = [ 'run' ],
+                     upsertBinds = { 'RUN' : 'run',
+                                     'LOCKED' : lambda row: int(row['released'] > 0) },
+                     confirmBinds = { 'RUN' : 'run',
+                                      'IN_DATASVC' : lambda row: int(row['released'] > 0) + 1 }),
+    ReplicatedEntity("DatasetLocked",
+                     source = "T0DataSvc.GetDatasetLocked",
+                     upsert = "T0DataSvc.InsertDatasetLocked",
+                     confirm = "T0DataSvc.UpdateDatasetLocked",
+                     key = [ 'id' ],
+                     upsertBinds = { 'PATH' : 'path' },
+                     confirmBinds = { 'ID' : 'id' }),
+    ]
+
+
+class ReplicationEngine(object):
+    """
+    _ReplicationEngine_
+
+    Replicates a list of entities from T0AST into a target database
+    borrowed from a ConnectionRegistry.
+
+    """
+    def __init__(self, entities, daoFactory, databases, targetName,
+                 batchSize = 500, maxWorkers = 2, connectionTimeout = 60):
+        self.entities = entities
+        self.daoFactory = daoFactory
+        self.databases = databases
+        self.targetName = targetName
+        self.batchSize = batchSize
+        self.maxWorkers = maxWorkers
+        self.connectionTimeout = connectionTimeout
+
+        # entity name -> time the entity was last caught up
+        self.caughtUp = {}
+        now = time.time()
+        for entity in self.entities:
+            self.caughtUp[entity.name] = now
+
+        return
+
+    def targetDAOFactory(self, dbInterface):
+        """
+        _targetDAOFactory_
+
+        DAOFactory for a borrowed target database connection
+
+        """
+        return cachedDAOFactory(package = "T0.WMBS",
+                                logger = logging,
+                                dbinterface = dbInterface)
+
+    def replicate(self):
+        """
+        _replicate_
+
+        Replicate all entities, returns per entity metrics
+
+        """
+        entities = list(self.entities)
+        metrics = {}
+        lock = threading.Lock()
+
+        def worker():
+            while True:
+                with lock:
+                    if len(entities) == 0:
+                        return
+                    entity = entities.pop(0)
+                try:
+                    result = self.replicateEntity(entity)
+                except ExternalDatabaseUnavailable as ex:
+                    logging.error("Can't replicate %s : %s" % (entity.name, str(ex)))
+                    result = None
+                except Exception:
+                    logging.exception("Replication of %s failed" % entity.name)
+                    result = None
+                with lock:
+                    metrics[entity.name] = result
+
+        workers = []
+        for i in range(min(self.maxWorkers, len(entities))):
+            thread = threading.Thread(target = worker)
+            thread.start()
+            workers.append(thread)
+        for thread in workers:
+            thread.join()
+
+        now = time.time()
+        for entity in self.entities:
+            result = metrics.get(entity.name)
+            if result == None:
+                result = { 'rows' : 0, 'failed' : 0, 'seconds' : 0.0, 'rate' : 0.0 }
+                metrics[entity.name] = result
+            elif result['failed'] == 0:
+                self.caughtUp[entity.name] = now
+            result['lag'] = now - self.caughtUp[entity.name]
+
+            logging.info("Replicated %d %s rows to %s (%d failed) at %.1f rows/s, lag %ds" % \
+                         (result['rows'], entity.name, self.targetName, result['failed'],
+                          result['rate'], result['lag']))
+
+        return metrics
+
+    def replicateEntity(self, entity):
+        """
+        _replicateEntity_
+
+        Replicate one entity, returns its metrics
+
+        """
+        startTime = time.time()
+
+        sourceDAO = self.daoFactory(classname = entity.source)
+        rows = sourceDAO.execute(transaction = False)
+
+        replicated = 0
+        failed = 0
+
+        if len(rows) > 0:
+
+            confirmDAO = self.daoFactory(classname = entity.confirm)
+
+            with self.databases.connection(self.targetName, timeout = self.connectionTimeout) as dbInterface:
+
+                upsertDAO = self.targetDAOFactory(dbInterface)(classname = entity.upsert)
+
+                for i in range(0, len(rows), self.batchSize):
+
+                    batch = rows[i:i+self.batchSize]
+
+                    accepted = self.upsertBatch(entity, upsertDAO, batch)
+                    failed += len(batch) - len(accepted)
+
+                    if len(accepted) > 0:
+                        confirmBinds = [ entity.makeBinds(entity.confirmBinds, row) for row in accepted ]
+                        confirmDAO.execute(binds = confirmBinds, transaction = False)
+                        replicated += len(accepted)
+
+        seconds = time.time() - startTime
+        rate = 0.0
+        if seconds > 0:
+            rate = replicated / seconds
+
+        return { 'rows' : replicated,
+                 'failed' : failed,
+                 'seconds' : seconds,
+                 'rate' : rate }
+
+    def upsertBatch(self, entity, upsertDAO, batch):
+        """
+        _upsertBatch_
+
+        Upsert a batch into the target, split it up if rows are
+        rejected for their data. Returns the rows the target accepted,
+        raises on connection and database errors.
+
+        """
+        binds = [ entity.makeBinds(entity.upsertBinds, row) for row in batch ]
+
+        try:
+            upsertDAO.execute(binds = binds, transaction = False)
+        except Exception as ex:
+            if not isDataError(ex):
+                raise
+            if len(batch) == 1:
+                logging.error("Can't replicate %s %s : %s" % (entity.name, entity.rowKey(batch[0]), str(ex)))
+                return []
+            half = len(batch) // 2
+            return self.upsertBatch(entity, upsertDAO, batch[:half]) + \
+                   self.upsertBatch(entity, upsertDAO, batch[half:])
+
+        return batch
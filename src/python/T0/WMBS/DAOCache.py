@@ -0,0 +1,186 @@
+"""
+_DAOCache_
+
+Process wide DAO and statement caching
+
+DAOs don't keep state between calls, one instance per class
+and database interface can be shared by all callers. Use
+cachedDAOFactory instead of DAOFactory:
+
+    daoFactory = cachedDAOFactory(package = "T0.WMBS",
+                                  logger = logging,
+                                  dbinterface = myThread.dbi)
+    findOpenRunsDAO = daoFactory(classname = "RunLumiCloseout.FindOpenRuns")
+
+The factories are kept with the database interface (the cache
+goes away with the interface) per package, DAOs are only
+imported and created on first use.
+
+On the database side, the Oracle client statement cache keeps
+parsed statements per connection, enableStatementCache sizes it
+for the number of hot statements. IN-list DAOs use inListBinds
+so the number of distinct statements stays small.
+
+With a QueryLog set (setQueryLog), the T0.WMBS DAOs created
+from then on record their queries, see T0.WMBS.QueryLog.
+
+"""
+import logging
+import threading
+import time
+import weakref
+
+from sqlalchemy import event
+
+from WMCore.DAOFactory import DAOFactory
+
+from T0.WMBS.QueryLog import ProfiledDBInterface
+
+_lock = threading.Lock()
+
+_metrics = { 'created' : 0,
+             'reused' : 0,
+             'create_time' : 0.0 }
+
+# engines the statement cache size is set for
+_statementCacheEngines = weakref.WeakKeyDictionary()
+
+_queryLog = None
+
+
+class CachedDAOFactory(object):
+    """
+    _CachedDAOFactory_
+
+    DAOFactory that creates every DAO only once
+
+    """
+    def __init__(self, package, logger, dbinterface):
+        self.package = package
+        self.daoFactory = DAOFactory(package = package,
+                                     logger = logger,
+                                     dbinterface = dbinterface)
+        self.daos = {}
+        return
+
+    def __call__(self, classname):
+
+        with _lock:
+            dao = self.daos.get(classname, None)
+            if dao != None:
+                _metrics['reused'] += 1
+                return dao
+
+            startTime = time.time()
+            dao = self.daoFactory(classname = classname)
+            _metrics['create_time'] += time.time() - startTime
+            _metrics['created'] += 1
+
+            if _queryLog != None and self.package == "T0.WMBS":
+                dao.dbi = ProfiledDBInterface(_queryLog, classname, dao.dbi)
+
+            self.daos[classname] = dao
+
+        return dao
+
+
+def cachedDAOFactory(package, logger, dbinterface):
+    """
+    _cachedDAOFactory_
+
+    The shared factory for the package and database interface
+
+    """
+    with _lock:
+        # the cached DAOs reference the database interface, keeping
+        # them in the interface itself doesn't keep it alive, wrappers
+        # like TimedDBInterface get their own DAOs
+        packageFactories = vars(dbinterface).setdefault("_daoFactories", {})
+        if package not in packageFactories:
+            packageFactories[package] = CachedDAOFactory(package, logger, dbinterface)
+        return packageFactories[package]
+
+def metrics():
+    """
+    _metrics_
+
+    DAOs created and reused since process start, and the
+    time spent creating them
+
+    """
+    with _lock:
+        return dict(_metrics)
+
+def setQueryLog(queryLog):
+    """
+    _setQueryLog_
+
+    Record the queries of the T0.WMBS DAOs created from now on
+    in the QueryLog, None turns it off for new DAOs
+
+    """
+    global _queryLog
+    with _lock:
+        _queryLog = queryLog
+    return
+
+def enableStatementCache(dbinterface, size):
+    """
+    _enableStatementCache_
+
+    Set the Oracle client statement cache size for all
+    connections of the database interface. Does nothing
+    for other databases.
+
+    """
+    engine = dbinterface.engine
+    if engine.dialect.name != "oracle":
+        return False
+
+    with _lock:
+        if engine in _statementCacheEngines:
+            _statementCacheEngines[engine] = size
+            return True
+        _statementCacheEngines[engine] = size
+
+    def setStatementCacheSize(dbapiConnection, connectionRecord, connectionProxy):
+        size = _statementCacheEngines.get(engine, None)
+        if size != None and dbapiConnection.stmtcachesize != size:
+            dbapiConnection.stmtcachesize = size
+        return
+
+    # pooled connections are handed out on checkout, this
+    # covers new and already existing connections
+    event.listen(engine, "checkout", setStatementCacheSize)
+
+    logging.info("Oracle statement cache size set to %d" % size)
+
+    return True
+
+def inListBinds(name, values, maxSize):
+    """
+    _inListBinds_
+
+    Binds and bind names for an IN-list. The list is padded to
+    the next power of two (at most maxSize) by repeating the last
+    value, so there are only a few distinct statements to parse
+    and cache instead of one per list length.
+
+    Returns the binds and the comma separated bind names.
+
+    """
+    values = list(values)
+
+    size = 1
+    while size < len(values):
+        size *= 2
+    size = max(min(size, maxSize), len(values))
+
+    binds = {}
+    bindNames = []
+    for i in range(size):
+        bindName = "%s_%d" % (name, i)
+        binds[bindName] = values[min(i, len(values) - 1)]
+        bindNames.append(":%s" % bindName)
+
+    return binds, ", ".join(bindNames)
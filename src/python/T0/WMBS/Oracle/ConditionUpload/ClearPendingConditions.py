@@ -0,0 +1,34 @@
+"""
+_ClearPendingConditions_
+
+Oracle implementation of ClearPendingConditions
+
+Remove run/streams from the pending queue once
+they have no acquired payload files anymore.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class ClearPendingConditions(DBFormatter):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """DELETE FROM prompt_calib_pending
+                 WHERE run_id = :RUN
+                 AND stream_id = :STREAMID
+                 AND NOT EXISTS (
+                   SELECT 1
+                   FROM prompt_calib_file
+                   INNER JOIN wmbs_sub_files_acquired ON
+                     wmbs_sub_files_acquired.subscription = prompt_calib_file.subscription AND
+                     wmbs_sub_files_acquired.fileid = prompt_calib_file.fileid
+                   WHERE prompt_calib_file.run_id = prompt_calib_pending.run_id
+                   AND prompt_calib_file.stream_id = prompt_calib_pending.stream_id
+                 )
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,26 @@
+"""
+_ClearUploadFailures_
+
+Oracle implementation of ClearUploadFailures
+
+Forget about failed upload attempts for a
+number of payloads after they were uploaded.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class ClearUploadFailures(DBFormatter):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """DELETE FROM prompt_calib_upload
+                 WHERE run_id = :RUN
+                 AND stream_id = :STREAMID
+                 AND payload = :PAYLOAD
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,56 @@
+"""
+_GetPendingConditions_
+
+Oracle implementation of GetPendingConditions
+
+Return all still to be uploaded files for the run/streams
+in the pending queue, ie. the run/streams that had new
+payload files since they were last handled.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetPendingConditions(DBFormatter):
+
+    def execute(self, conn = None, transaction = False):
+
+        sql = """SELECT prompt_calib_pending.run_id,
+                        prompt_calib_pending.stream_id,
+                        prompt_calib.finished,
+                        prompt_calib_file.fileid,
+                        prompt_calib_file.subscription,
+                        wmbs_file_details.lfn
+                 FROM prompt_calib_pending
+                 INNER JOIN prompt_calib ON
+                   prompt_calib.run_id = prompt_calib_pending.run_id AND
+                   prompt_calib.stream_id = prompt_calib_pending.stream_id
+                 LEFT OUTER JOIN prompt_calib_file ON
+                   prompt_calib_file.run_id = prompt_calib_pending.run_id AND
+                   prompt_calib_file.stream_id = prompt_calib_pending.stream_id
+                 LEFT OUTER JOIN wmbs_sub_files_acquired ON
+                   wmbs_sub_files_acquired.subscription = prompt_calib_file.subscription AND
+                   wmbs_sub_files_acquired.fileid = prompt_calib_file.fileid
+                 LEFT OUTER JOIN wmbs_file_details ON
+                   wmbs_file_details.id = wmbs_sub_files_acquired.fileid
+                 """
+
+        results = self.dbi.processData(sql, {}, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        conditions = {}
+        for result in results:
+
+            runStream = (result[0], result[1])
+
+            if runStream not in conditions:
+                conditions[runStream] = { 'finished' : result[2] == 1,
+                                          'files' : [] }
+
+            # only return file information for aquired files
+            if result[5] != None:
+                conditions[runStream]['files'].append( { 'fileid' : result[3],
+                                                         'subscription' : result[4],
+                                                         'lfn' : result[5] } )
+
+        return conditions
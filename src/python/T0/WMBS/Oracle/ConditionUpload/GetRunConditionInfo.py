@@ -0,0 +1,77 @@
+"""
+_GetRunConditionInfo_
+
+Oracle implementation of GetRunConditionInfo
+
+Returns condition upload timeout, validation mode and
+stop time for the given runs. The stop time is the run
+stop time or the insert time of the last streamer if
+the run hasn't stopped yet.
+
+All runs are queried at once (IN-list bind, split into
+chunks of 1000 runs). Nothing changes anymore once a run
+is stopped, stopped runs are cached and not queried again.
+The cache belongs to the DAO instance and only keeps runs
+that are still passed in.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+from T0.WMBS.DAOCache import inListBinds
+
+class GetRunConditionInfo(DBFormatter):
+
+    chunkSize = 1000
+
+    def __init__(self, logger, dbinterface):
+
+        DBFormatter.__init__(self, logger, dbinterface)
+
+        self.stoppedRunsCache = {}
+
+        return
+
+    def execute(self, runs, conn = None, transaction = False):
+
+        # runs not passed in anymore are finished, evict them
+        for run in set(self.stoppedRunsCache) - set(runs):
+            del self.stoppedRunsCache[run]
+
+        sql = """SELECT run.run_id,
+                        run.cond_timeout,
+                        run.valid_mode,
+                        run.stop_time,
+                        CASE
+                          WHEN run.stop_time > 0 THEN run.stop_time
+                          ELSE (SELECT MAX(streamer.insert_time)
+                                FROM streamer
+                                WHERE streamer.run_id = run.run_id)
+                        END
+                 FROM run
+                 WHERE run.run_id IN (%s)
+                 """
+
+        runInfo = {}
+        queryRuns = []
+        for run in runs:
+            if run in self.stoppedRunsCache:
+                runInfo[run] = self.stoppedRunsCache[run]
+            else:
+                queryRuns.append(run)
+
+        for i in range(0, len(queryRuns), self.chunkSize):
+
+            binds, bindNames = inListBinds("RUN", queryRuns[i:i+self.chunkSize], self.chunkSize)
+
+            results = self.dbi.processData(sql % bindNames, binds, conn = conn,
+                                           transaction = transaction)[0].fetchall()
+
+            for result in results:
+                runInfo[result[0]] = { 'condUploadTimeout' : result[1],
+                                       'validationMode' : bool(result[2]),
+                                       'stopTime' : result[4] }
+                if result[3] > 0:
+                    self.stoppedRunsCache[result[0]] = runInfo[result[0]]
+
+        return runInfo
@@ -0,0 +1,28 @@
+"""
+_GetUnfinishedRunStreams_
+
+Oracle implementation of GetUnfinishedRunStreams
+
+Return all run/streams that have not finished the PCL yet.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetUnfinishedRunStreams(DBFormatter):
+
+    def execute(self, conn = None, transaction = False):
+
+        sql = """SELECT run_id, stream_id
+                 FROM prompt_calib
+                 WHERE checkForZeroState(finished) = 0
+                 """
+
+        results = self.dbi.processData(sql, {}, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        runStreams = {}
+        for result in results:
+            runStreams.setdefault(result[0], []).append(result[1])
+
+        return runStreams
@@ -0,0 +1,34 @@
+"""
+_GetUploadAttempts_
+
+Oracle implementation of GetUploadAttempts
+
+Returns the failed upload attempts for all
+payloads of a run/stream.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetUploadAttempts(DBFormatter):
+
+    def execute(self, run, streamid, conn = None, transaction = False):
+
+        sql = """SELECT payload, attempts, last_attempt
+                 FROM prompt_calib_upload
+                 WHERE run_id = :RUN
+                 AND stream_id = :STREAMID
+                 """
+
+        binds = { 'RUN' : run,
+                  'STREAMID' : streamid }
+
+        results = self.dbi.processData(sql, binds, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        attempts = {}
+        for result in results:
+            attempts[result[0]] = { 'attempts' : result[1],
+                                    'last_attempt' : result[2] }
+
+        return attempts
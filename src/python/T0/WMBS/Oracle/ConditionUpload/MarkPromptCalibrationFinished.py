@@ -3,10 +3,13 @@ _MarkPromptCalibrationFinished_
 
 Oracle implementation of MarkPromptCalibrationFinished
 
-Mark the PCL finished for the given run and stream.
+Mark the PCL finished for the given run and stream and
+record the pcl_finished milestone in the latency ledger.
 
 """
 
+import time
+
 from WMCore.Database.DBFormatter import DBFormatter
 
 class MarkPromptCalibrationFinished(DBFormatter):
@@ -41,6 +44,26 @@ class MarkPromptCalibrationFinished(DBFormatter):
         binds = { 'RUN' : run,
                   'STREAMID' : streamid }
 
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        sql = """MERGE INTO latency_ledger a
+                 USING (
+                   SELECT run_id, stream_id
+                   FROM prompt_calib
+                   WHERE run_id = :RUN
+                   AND stream_id = :STREAMID
+                   AND finished = 1
+                 ) b ON ( b.run_id = a.run_id AND
+                          b.stream_id = a.stream_id AND
+                          a.milestone = 'pcl_finished' )
+                 WHEN NOT MATCHED THEN
+                   INSERT (run_id, stream_id, milestone, first_time, last_time)
+                   VALUES (b.run_id, b.stream_id, 'pcl_finished', :TIME, :TIME)
+                 """
+
+        binds['TIME'] = int(time.time())
+
         self.dbi.processData(sql, binds, conn = conn,
                              transaction = transaction)
 
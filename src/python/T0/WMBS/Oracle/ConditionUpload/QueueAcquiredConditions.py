@@ -0,0 +1,41 @@
+"""
+_QueueAcquiredConditions_
+
+Oracle implementation of QueueAcquiredConditions
+
+Queue all run/streams with acquired payload files in
+prompt_calib_pending that aren't queued yet. Payload
+files are only queued on insert, this covers files
+inserted before there was a pending queue.
+
+"""
+
+import time
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class QueueAcquiredConditions(DBFormatter):
+
+    def execute(self, conn = None, transaction = False):
+
+        sql = """INSERT INTO prompt_calib_pending
+                 (RUN_ID, STREAM_ID, INSERT_TIME)
+                 SELECT DISTINCT prompt_calib_file.run_id,
+                                 prompt_calib_file.stream_id,
+                                 :TIME
+                 FROM prompt_calib_file
+                 INNER JOIN wmbs_sub_files_acquired ON
+                   wmbs_sub_files_acquired.subscription = prompt_calib_file.subscription AND
+                   wmbs_sub_files_acquired.fileid = prompt_calib_file.fileid
+                 WHERE NOT EXISTS (
+                   SELECT 1
+                   FROM prompt_calib_pending
+                   WHERE prompt_calib_pending.run_id = prompt_calib_file.run_id
+                   AND prompt_calib_pending.stream_id = prompt_calib_file.stream_id
+                 )
+                 """
+
+        self.dbi.processData(sql, { 'TIME' : int(time.time()) }, conn = conn,
+                             transaction = transaction)
+
+        return
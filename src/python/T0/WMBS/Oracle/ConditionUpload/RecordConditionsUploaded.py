@@ -0,0 +1,35 @@
+"""
+_RecordConditionsUploaded_
+
+Oracle implementation of RecordConditionsUploaded
+
+Record the conditions_uploaded milestone in the latency
+ledger for run/streams that had payloads uploaded.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class RecordConditionsUploaded(DBFormatter):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """MERGE INTO latency_ledger a
+                 USING (
+                   SELECT :RUN AS run_id,
+                          :STREAMID AS stream_id
+                   FROM DUAL
+                 ) b ON ( b.run_id = a.run_id AND
+                          b.stream_id = a.stream_id AND
+                          a.milestone = 'conditions_uploaded' )
+                 WHEN MATCHED THEN UPDATE
+                   SET a.last_time = GREATEST(a.last_time, :TIME)
+                 WHEN NOT MATCHED THEN
+                   INSERT (run_id, stream_id, milestone, first_time, last_time)
+                   VALUES (b.run_id, b.stream_id, 'conditions_uploaded', :TIME, :TIME)
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
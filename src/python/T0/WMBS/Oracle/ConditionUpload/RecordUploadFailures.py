@@ -0,0 +1,36 @@
+"""
+_RecordUploadFailures_
+
+Oracle implementation of RecordUploadFailures
+
+Count a failed upload attempt for a number of payloads.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class RecordUploadFailures(DBFormatter):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """MERGE INTO prompt_calib_upload a
+                 USING (
+                   SELECT :RUN AS run_id,
+                          :STREAMID AS stream_id,
+                          :PAYLOAD AS payload
+                   FROM DUAL
+                 ) b ON ( b.run_id = a.run_id AND
+                          b.stream_id = a.stream_id AND
+                          b.payload = a.payload )
+                 WHEN MATCHED THEN UPDATE
+                   SET a.attempts = a.attempts + 1,
+                       a.last_attempt = :TIME
+                 WHEN NOT MATCHED THEN
+                   INSERT (run_id, stream_id, payload, attempts, last_attempt)
+                   VALUES (b.run_id, b.stream_id, b.payload, 1, :TIME)
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
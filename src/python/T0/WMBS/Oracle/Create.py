@@ -213,6 +213,18 @@ class Create(DBCreator):
                  primary key(run_id, lumi_id)
                ) ORGANIZATION INDEX"""
 
+        #
+        # The streamer and lumi bookkeeping tables grow with every
+        # run, they are partitioned by run (one interval partition
+        # per run) so that queries for active runs only touch a few
+        # partitions and completed runs can be purged by dropping
+        # their partitions (see RunLumiCloseoutAPI.purgeRuns).
+        #
+        # Interval partitioning isn't supported for index organized
+        # tables, therefore these are heap tables with local indexes.
+        # The lumi_section parent table stays index organized and is
+        # purged with a plain delete after its children are gone.
+        #
         self.create[len(self.create)] = \
             """CREATE TABLE lumi_section_closed (
                  run_id      int   not null,
@@ -222,7 +234,9 @@ class Create(DBCreator):
                  insert_time int   not null,
                  close_time  int   default 0 not null,
                  primary key(run_id, stream_id, lumi_id)
-               ) ORGANIZATION INDEX"""
+                   using index local
+               ) PARTITION BY RANGE (run_id) INTERVAL (1)
+                 ( PARTITION lumi_section_closed_p0 VALUES LESS THAN (1) )"""
 
         self.create[len(self.create)] = \
             """CREATE TABLE lumi_section_split_active (
@@ -231,7 +245,22 @@ class Create(DBCreator):
                  lumi_id        int not null,
                  nfiles         int not null,
                  primary key(subscription, run_id, lumi_id)
-               ) ORGANIZATION INDEX"""
+                   using index local
+               ) PARTITION BY RANGE (run_id) INTERVAL (1)
+                 ( PARTITION lumi_section_split_active_p0 VALUES LESS THAN (1) )"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE lumi_section_prescale (
+                 subscription    int not null,
+                 run_id          int not null,
+                 lumi_id         int not null,
+                 prescale        int not null,
+                 events_total    int not null,
+                 events_accepted int not null,
+                 primary key(subscription, run_id, lumi_id)
+                   using index local
+               ) PARTITION BY RANGE (run_id) INTERVAL (1)
+                 ( PARTITION lumi_section_prescale_p0 VALUES LESS THAN (1) )"""
 
         self.create[len(self.create)] = \
             """CREATE TABLE streamer (
@@ -243,7 +272,8 @@ class Create(DBCreator):
                  used          int default 0 not null,
                  deleted       int default 0 not null,
                  primary key(id)
-               )"""
+               ) PARTITION BY RANGE (run_id) INTERVAL (1)
+                 ( PARTITION streamer_p0 VALUES LESS THAN (1) )"""
 
         self.create[len(self.create)] = \
             """CREATE TABLE repack_config (
@@ -308,6 +338,32 @@ class Create(DBCreator):
                  primary key (run_id, stream_id, fileid)
                ) ORGANIZATION INDEX"""
 
+        #
+        # run/streams with new PCL payload files, the
+        # condition upload only looks at these
+        #
+        self.create[len(self.create)] = \
+            """CREATE TABLE prompt_calib_pending (
+                 run_id        int not null,
+                 stream_id     int not null,
+                 insert_time   int not null,
+                 primary key (run_id, stream_id)
+               ) ORGANIZATION INDEX"""
+
+        #
+        # failed PCL payload uploads, used to back off
+        # before trying the same payload again
+        #
+        self.create[len(self.create)] = \
+            """CREATE TABLE prompt_calib_upload (
+                 run_id        int           not null,
+                 stream_id     int           not null,
+                 payload       varchar2(255) not null,
+                 attempts      int           not null,
+                 last_attempt  int           not null,
+                 primary key (run_id, stream_id, payload)
+               ) ORGANIZATION INDEX"""
+
         self.create[len(self.create)] = \
             """CREATE TABLE reco_config (
                  run_id         int            not null,
@@ -355,6 +411,125 @@ class Create(DBCreator):
                  primary key (dataset_id)
                ) ORGANIZATION INDEX"""
 
+        #
+        # Work queues for the pollers, a row is inserted (by trigger)
+        # when a record enters a state that needs processing and is
+        # deleted by the DAO that completes the work. Poller queries
+        # scan these small tables instead of the full state tables.
+        #
+        self.create[len(self.create)] = \
+            """CREATE TABLE streamer_pending_feed (
+                 id          int not null,
+                 run_id      int not null,
+                 stream_id   int not null,
+                 lumi_id     int not null,
+                 primary key(id)
+               ) ORGANIZATION INDEX"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE streamer_pending_delete (
+                 id          int not null,
+                 run_id      int not null,
+                 stream_id   int not null,
+                 primary key(id)
+               ) ORGANIZATION INDEX"""
+
+        #
+        # record_type is one of RunStreamDone, ExpressConfig,
+        # RecoConfig or RecoReleaseConfig, item_id is the
+        # stream or primary dataset id of the record
+        #
+        self.create[len(self.create)] = \
+            """CREATE TABLE datasvc_pending (
+                 record_type   varchar2(25) not null,
+                 run_id        int          not null,
+                 item_id       int          not null,
+                 primary key(record_type, run_id, item_id)
+               ) ORGANIZATION INDEX"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE reco_release_pending (
+                 run_id      int not null,
+                 primds_id   int not null,
+                 primary key(run_id, primds_id)
+               ) ORGANIZATION INDEX"""
+
+        #
+        # PromptReco delay and delay offset per primary dataset from
+        # the Tier0 configuration, only updated when they change
+        #
+        self.create[len(self.create)] = \
+            """CREATE TABLE reco_release_delay (
+                 primds_id      int not null,
+                 delay          int not null,
+                 delay_offset   int not null,
+                 primary key(primds_id)
+               ) ORGANIZATION INDEX"""
+
+        #
+        # Tier0Auditor bookkeeping, last_change is the newest streamer
+        # or lumi record seen when the run/stream was last verified,
+        # findings are replaced every time a run/stream is verified
+        #
+        self.create[len(self.create)] = \
+            """CREATE TABLE audit_checkpoint (
+                 run_id        int not null,
+                 stream_id     int not null,
+                 last_change   int not null,
+                 check_time    int not null,
+                 findings      int default 0 not null,
+                 primary key(run_id, stream_id)
+               ) ORGANIZATION INDEX"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE audit_finding (
+                 run_id        int            not null,
+                 stream_id     int            not null,
+                 check_name    varchar2(50)   not null,
+                 detail        varchar2(4000) not null,
+                 found_time    int            not null,
+                 primary key(run_id, stream_id, check_name)
+               ) ORGANIZATION INDEX"""
+
+        #
+        # latency ledger, first and last time every run/stream
+        # passed a processing milestone (streamer, eols, lumi_closed,
+        # feed, fileset_closed, conditions_uploaded, pcl_finished,
+        # reco_released). Kept when runs are purged.
+        #
+        self.create[len(self.create)] = \
+            """CREATE TABLE latency_ledger (
+                 run_id        int          not null,
+                 stream_id     int          not null,
+                 milestone     varchar2(25) not null,
+                 first_time    int          not null,
+                 last_time     int          not null,
+                 primary key(run_id, stream_id, milestone)
+               ) ORGANIZATION INDEX COMPRESS 2"""
+
+        #
+        # Tier0Feeder run/stream partition leases, a run/stream belongs
+        # to partition MOD(run_id + stream_id, partitions) and is handled
+        # by the feeder instance holding the unexpired lease. Live feeder
+        # instances are registered as members to balance the partitions.
+        #
+        self.create[len(self.create)] = \
+            """CREATE TABLE feeder_lease (
+                 partition_id  int           not null,
+                 owner         varchar2(255),
+                 heartbeat     int default 0 not null,
+                 expire_time   int default 0 not null,
+                 primary key(partition_id)
+               ) ORGANIZATION INDEX"""
+
+        self.create[len(self.create)] = \
+            """CREATE TABLE feeder_member (
+                 owner         varchar2(255) not null,
+                 heartbeat     int           not null,
+                 expire_time   int           not null,
+                 primary key(owner)
+               ) ORGANIZATION INDEX"""
+
         self.create[len(self.create)] = \
             """CREATE FUNCTION checkForZeroState (value IN int)
                RETURN int DETERMINISTIC IS
@@ -381,6 +556,67 @@ class Create(DBCreator):
                END checkForZeroOneState;
                """
 
+        self.create[len(self.create)] = \
+            """CREATE TRIGGER streamer_pending_trg
+               AFTER INSERT ON streamer
+               FOR EACH ROW
+               BEGIN
+                 INSERT INTO streamer_pending_feed
+                   (id, run_id, stream_id, lumi_id)
+                   VALUES (:new.id, :new.run_id, :new.stream_id, :new.lumi_id);
+                 INSERT INTO streamer_pending_delete
+                   (id, run_id, stream_id)
+                   VALUES (:new.id, :new.run_id, :new.stream_id);
+               END streamer_pending_trg;
+               """
+
+        self.create[len(self.create)] = \
+            """CREATE TRIGGER run_stream_done_pending_trg
+               AFTER INSERT ON run_stream_done
+               FOR EACH ROW
+               BEGIN
+                 INSERT INTO datasvc_pending
+                   (record_type, run_id, item_id)
+                   VALUES ('RunStreamDone', :new.run_id, :new.stream_id);
+               END run_stream_done_pending_trg;
+               """
+
+        self.create[len(self.create)] = \
+            """CREATE TRIGGER express_config_pending_trg
+               AFTER INSERT ON express_config
+               FOR EACH ROW
+               BEGIN
+                 INSERT INTO datasvc_pending
+                   (record_type, run_id, item_id)
+                   VALUES ('ExpressConfig', :new.run_id, :new.stream_id);
+               END express_config_pending_trg;
+               """
+
+        self.create[len(self.create)] = \
+            """CREATE TRIGGER reco_config_pending_trg
+               AFTER INSERT ON reco_config
+               FOR EACH ROW
+               BEGIN
+                 INSERT INTO datasvc_pending
+                   (record_type, run_id, item_id)
+                   VALUES ('RecoConfig', :new.run_id, :new.primds_id);
+               END reco_config_pending_trg;
+               """
+
+        self.create[len(self.create)] = \
+            """CREATE TRIGGER reco_release_config_pending_trg
+               AFTER INSERT ON reco_release_config
+               FOR EACH ROW
+               BEGIN
+                 INSERT INTO datasvc_pending
+                   (record_type, run_id, item_id)
+                   VALUES ('RecoReleaseConfig', :new.run_id, :new.primds_id);
+                 INSERT INTO reco_release_pending
+                   (run_id, primds_id)
+                   VALUES (:new.run_id, :new.primds_id);
+               END reco_release_config_pending_trg;
+               """
+
         self.create[len(self.create)] = \
             """CREATE SEQUENCE cmssw_version_SEQ
                START WITH 1
@@ -439,36 +675,15 @@ class Create(DBCreator):
         self.indexes[len(self.indexes)] = \
             """CREATE INDEX idx_run_primds_stream_1 ON run_primds_stream_assoc (run_id, stream_id)"""
 
-        self.indexes[len(self.indexes)] = \
-            """CREATE INDEX idx_run_stream_done_1 ON run_stream_done (checkForZeroOneState(in_datasvc))"""
-
-        self.indexes[len(self.indexes)] = \
-            """CREATE INDEX idx_reco_release_config_2 ON reco_release_config (checkForZeroOneState(in_datasvc))"""
-
-        self.indexes[len(self.indexes)] = \
-            """CREATE INDEX idx_reco_release_config_3 ON reco_release_config (checkForZeroOneState(released))"""
-
         self.indexes[len(self.indexes)] = \
             """CREATE INDEX idx_lumi_section_closed_1 ON lumi_section_closed (checkForZeroState(close_time))"""
 
         self.indexes[len(self.indexes)] = \
-            """CREATE INDEX idx_streamer_1 ON streamer (run_id, stream_id, lumi_id)"""
-
-        self.indexes[len(self.indexes)] = \
-            """CREATE INDEX idx_streamer_2 ON streamer (checkForZeroState(used))"""
-
-        self.indexes[len(self.indexes)] = \
-            """CREATE INDEX idx_streamer_3 ON streamer (checkForZeroState(deleted))"""
+            """CREATE INDEX idx_streamer_1 ON streamer (run_id, stream_id, lumi_id) LOCAL"""
 
         self.indexes[len(self.indexes)] = \
             """CREATE INDEX idx_prompt_calib_1 ON prompt_calib (checkForZeroState(finished))"""
 
-        self.indexes[len(self.indexes)] = \
-            """CREATE INDEX idx_express_config_1 ON express_config (checkForZeroState(in_datasvc))"""
-
-        self.indexes[len(self.indexes)] = \
-            """CREATE INDEX idx_reco_config_1 ON reco_config (checkForZeroState(in_datasvc))"""
-
         self.indexes[len(self.indexes)] = \
             """CREATE INDEX idx_workflow_monitoring_0 ON workflow_monitoring (checkForZeroState(tracked))"""
 
@@ -635,6 +850,19 @@ class Create(DBCreator):
                  REFERENCES wmbs_fileset(id)
                  ON DELETE CASCADE"""
 
+        self.constraints[len(self.constraints)] = \
+            """ALTER TABLE reco_release_pending
+                 ADD CONSTRAINT rec_rel_pen_rp_id_fk
+                 FOREIGN KEY (run_id, primds_id)
+                 REFERENCES reco_release_config(run_id, primds_id)
+                 ON DELETE CASCADE"""
+
+        self.constraints[len(self.constraints)] = \
+            """ALTER TABLE reco_release_delay
+                 ADD CONSTRAINT rec_rel_del_pri_id_fk
+                 FOREIGN KEY (primds_id)
+                 REFERENCES primary_dataset(id)"""
+
         self.constraints[len(self.constraints)] = \
             """ALTER TABLE stream_special_primds_assoc
                  ADD CONSTRAINT str_spe_pri_str_id_fk
@@ -677,6 +905,18 @@ class Create(DBCreator):
                  FOREIGN KEY (subscription)
                  REFERENCES wmbs_subscription(id)"""
 
+        self.constraints[len(self.constraints)] = \
+            """ALTER TABLE lumi_section_prescale
+                 ADD CONSTRAINT lum_sec_pre_rl_id_fk
+                 FOREIGN KEY (run_id, lumi_id)
+                 REFERENCES lumi_section(run_id, lumi_id)"""
+
+        self.constraints[len(self.constraints)] = \
+            """ALTER TABLE lumi_section_prescale
+                 ADD CONSTRAINT lum_sec_pre_sub_id_fk
+                 FOREIGN KEY (subscription)
+                 REFERENCES wmbs_subscription(id)"""
+
         self.constraints[len(self.constraints)] = \
             """ALTER TABLE streamer
                  ADD CONSTRAINT str_run_id_fk
@@ -763,6 +1003,36 @@ class Create(DBCreator):
                  REFERENCES wmbs_subscription(id)
                  ON DELETE CASCADE"""
 
+        self.constraints[len(self.constraints)] = \
+            """ALTER TABLE prompt_calib_pending
+                 ADD CONSTRAINT pro_cal_pen_pro_cal_fk
+                 FOREIGN KEY (run_id, stream_id)
+                 REFERENCES prompt_calib(run_id, stream_id)"""
+
+        self.constraints[len(self.constraints)] = \
+            """ALTER TABLE prompt_calib_upload
+                 ADD CONSTRAINT pro_cal_upl_pro_cal_fk
+                 FOREIGN KEY (run_id, stream_id)
+                 REFERENCES prompt_calib(run_id, stream_id)"""
+
+        self.constraints[len(self.constraints)] = \
+            """ALTER TABLE audit_checkpoint
+                 ADD CONSTRAINT aud_che_run_id_fk
+                 FOREIGN KEY (run_id)
+                 REFERENCES run(run_id)"""
+
+        self.constraints[len(self.constraints)] = \
+            """ALTER TABLE audit_finding
+                 ADD CONSTRAINT aud_fin_run_id_fk
+                 FOREIGN KEY (run_id)
+                 REFERENCES run(run_id)"""
+
+        self.constraints[len(self.constraints)] = \
+            """ALTER TABLE latency_ledger
+                 ADD CONSTRAINT lat_led_run_id_fk
+                 FOREIGN KEY (run_id)
+                 REFERENCES run(run_id)"""
+
         self.constraints[len(self.constraints)] = \
             """ALTER TABLE reco_config
                  ADD CONSTRAINT rec_con_run_id_fk
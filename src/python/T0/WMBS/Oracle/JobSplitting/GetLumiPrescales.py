@@ -0,0 +1,33 @@
+"""
+_GetLumiPrescales_
+
+Oracle implementation of GetLumiPrescales
+
+Return the applied input prescales for a subscription
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetLumiPrescales(DBFormatter):
+
+    sql = """SELECT lumi_id,
+                    prescale,
+                    events_total,
+                    events_accepted
+             FROM lumi_section_prescale
+             WHERE subscription = :SUB
+             """
+
+    def execute(self, subscription, conn = None, transaction = False):
+
+        results = self.dbi.processData(self.sql, { 'SUB' : subscription },
+                                       conn = conn, transaction = transaction)[0].fetchall()
+
+        prescales = {}
+        for result in results:
+            prescales[result[0]] = { 'prescale' : result[1],
+                                     'events_total' : result[2],
+                                     'events_accepted' : result[3] }
+
+        return prescales
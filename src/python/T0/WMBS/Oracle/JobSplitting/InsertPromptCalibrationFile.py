@@ -8,8 +8,13 @@ marks them as acquired for the subscription. The files
 will then be picked up by another piece of code,
 uploaded to the DropBox and be marked as completed.
 
+The run/streams are queued for that piece of code
+in prompt_calib_pending.
+
 """
 
+import time
+
 from WMCore.Database.DBFormatter import DBFormatter
 
 class InsertPromptCalibrationFile(DBFormatter):
@@ -28,6 +33,37 @@ class InsertPromptCalibrationFile(DBFormatter):
         self.dbi.processData(sql, binds, conn = conn,
                              transaction = transaction)
 
+        #
+        # update on match to lock a queued run/stream
+        # against a concurrent dequeue
+        #
+        sql = """MERGE INTO prompt_calib_pending a
+                 USING (
+                   SELECT prompt_calib.run_id,
+                          prompt_calib.stream_id
+                   FROM prompt_calib
+                   INNER JOIN stream ON
+                     stream.id = prompt_calib.stream_id
+                   WHERE prompt_calib.run_id = :RUN_ID
+                   AND stream.name = :STREAM
+                 ) b ON ( b.run_id = a.run_id AND
+                          b.stream_id = a.stream_id )
+                 WHEN MATCHED THEN UPDATE
+                   SET a.insert_time = :TIME
+                 WHEN NOT MATCHED THEN
+                   INSERT (run_id, stream_id, insert_time)
+                   VALUES (b.run_id, b.stream_id, :TIME)
+                 """
+
+        pendingBinds = {}
+        for bind in binds:
+            pendingBinds[(bind['RUN_ID'], bind['STREAM'])] = { 'RUN_ID' : bind['RUN_ID'],
+                                                               'STREAM' : bind['STREAM'],
+                                                               'TIME' : int(time.time()) }
+
+        self.dbi.processData(sql, list(pendingBinds.values()), conn = conn,
+                             transaction = transaction)
+
         for bind in binds:
             del bind['RUN_ID']
             del bind['STREAM']
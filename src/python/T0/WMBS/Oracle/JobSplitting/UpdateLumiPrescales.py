@@ -0,0 +1,40 @@
+"""
+_UpdateLumiPrescales_
+
+Oracle implementation of UpdateLumiPrescales
+
+Record the applied input prescale for subscription lumis
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class UpdateLumiPrescales(DBFormatter):
+
+    sql = """MERGE INTO lumi_section_prescale
+             USING (
+               SELECT run_id,
+                      :SUB AS subscription,
+                      :LUMI AS lumi_id
+               FROM run_stream_fileset_assoc
+               WHERE fileset = (SELECT fileset FROM wmbs_subscription WHERE id = :SUB)
+             ) new_prescale ON (
+               lumi_section_prescale.subscription = new_prescale.subscription AND
+               lumi_section_prescale.run_id = new_prescale.run_id AND
+               lumi_section_prescale.lumi_id = new_prescale.lumi_id
+             )
+             WHEN MATCHED THEN
+               UPDATE SET lumi_section_prescale.prescale = :PRESCALE,
+                          lumi_section_prescale.events_total = :EVENTS_TOTAL,
+                          lumi_section_prescale.events_accepted = :EVENTS_ACCEPTED
+             WHEN NOT MATCHED THEN
+               INSERT (subscription, run_id, lumi_id, prescale, events_total, events_accepted)
+               VALUES (new_prescale.subscription, new_prescale.run_id, new_prescale.lumi_id,
+                       :PRESCALE, :EVENTS_TOTAL, :EVENTS_ACCEPTED)
+             """
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        self.dbi.processData(self.sql, binds, conn = conn,
+                             transaction = transaction)
+        return
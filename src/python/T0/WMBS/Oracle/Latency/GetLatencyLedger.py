@@ -0,0 +1,40 @@
+"""
+_GetLatencyLedger_
+
+Oracle implementation of GetLatencyLedger
+
+Return the latency ledger for all runs started after the
+given time, together with stream name and acquisition era.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetLatencyLedger(DBFormatter):
+
+    def execute(self, since, conn = None, transaction = False):
+
+        sql = """SELECT latency_ledger.run_id,
+                        stream.name,
+                        run.acq_era,
+                        latency_ledger.milestone,
+                        latency_ledger.first_time,
+                        latency_ledger.last_time
+                 FROM latency_ledger
+                 INNER JOIN run ON
+                   run.run_id = latency_ledger.run_id AND
+                   run.start_time >= :SINCE
+                 INNER JOIN stream ON
+                   stream.id = latency_ledger.stream_id
+                 """
+
+        results = self.dbi.processData(sql, { 'SINCE' : since }, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        ledger = {}
+        for result in results:
+            runStream = ledger.setdefault((result[0], result[1]), { 'era' : result[2],
+                                                                    'milestones' : {} })
+            runStream['milestones'][result[3]] = (result[4], result[5])
+
+        return ledger
@@ -3,17 +3,17 @@ _FindRecoRelease_
 
 Oracle implementation of FindRecoRelease
 
-Take the list of passed in datasets and
-their delays and delay offsets and find
-all run/dataset that can be pre-released.
-
-On pre-release update the delay and offset
-in reco_release_config so that on final
-release the second query can move the
+Pre-release all run/dataset that passed their
+delay minus delay offset, with the dataset delays
+from reco_release_delay. On pre-release copy the
+delay and offset to reco_release_config so that
+on final release the second query can move the
 status forward.
 
 Then return information for all run/dataset
-that are ready for final release.
+that are ready for final release, together with
+the run information and the dataset PhEDEx
+configuration (None if there is none).
 
 """
 import time
@@ -22,60 +22,74 @@ from WMCore.Database.DBFormatter import DBFormatter
 
 class FindRecoRelease(DBFormatter):
 
-    def execute(self, datasetDelays, conn = None, transaction = False):
-
-        now = int(time.time())
-
-        binds = []
-        for dataset, delays in datasetDelays.items():
-            binds.append( { 'NOW' : now,
-                            'DATASET' : dataset,
-                            'DELAY' : delays[0],
-                            'DELAY_OFFSET' : delays[1] } )
-
-        sql = """UPDATE ( SELECT reco_release_config.released AS released,
-                                 reco_release_config.delay AS delay,
-                                 reco_release_config.delay_offset AS delay_offset
-                          FROM reco_release_config
-                          INNER JOIN run ON
-                            run.run_id = reco_release_config.run_id
-                          INNER JOIN primary_dataset ON
-                            primary_dataset.id = reco_release_config.primds_id AND
-                            primary_dataset.name = :DATASET
-                          WHERE checkForZeroOneState(reco_release_config.released) = 0
-                          AND run.stop_time + :DELAY - :DELAY_OFFSET < :NOW
-                          AND run.stop_time > 0 ) t
-                 SET t.released = 1,
-                     t.delay = :DELAY,
-                     t.delay_offset = :DELAY_OFFSET
-                 """
-
-        if len(binds) > 0:
-            self.dbi.processData(sql, binds, conn = conn,
-                                 transaction = transaction)
-
-        binds = { 'NOW' : now }
-
-        sql = """SELECT reco_release_config.run_id,
-                        primary_dataset.name,
-                        reco_release_config.fileset,
-                        repack_config.proc_version
-                 FROM reco_release_config
-                 INNER JOIN run ON
-                   run.run_id = reco_release_config.run_id
-                 INNER JOIN primary_dataset ON
-                   primary_dataset.id = reco_release_config.primds_id
-                 INNER JOIN run_primds_stream_assoc ON
-                   run_primds_stream_assoc.run_id = reco_release_config.run_id AND
-                   run_primds_stream_assoc.primds_id = reco_release_config.primds_id
-                 INNER JOIN repack_config ON
-                   repack_config.run_id = reco_release_config.run_id AND
-                   repack_config.stream_id = run_primds_stream_assoc.stream_id
-                 WHERE checkForZeroOneState(reco_release_config.released) = 1
-                 AND run.stop_time + reco_release_config.delay < :NOW
-                 """
-
-        results = self.dbi.processData(sql, binds, conn = conn,
+    preReleaseSql = """UPDATE ( SELECT reco_release_config.released AS released,
+                                       reco_release_config.delay AS delay,
+                                       reco_release_config.delay_offset AS delay_offset,
+                                       reco_release_delay.delay AS new_delay,
+                                       reco_release_delay.delay_offset AS new_delay_offset
+                                FROM reco_release_pending
+                                INNER JOIN reco_release_config ON
+                                  reco_release_config.run_id = reco_release_pending.run_id AND
+                                  reco_release_config.primds_id = reco_release_pending.primds_id
+                                INNER JOIN run ON
+                                  run.run_id = reco_release_config.run_id
+                                INNER JOIN reco_release_delay ON
+                                  reco_release_delay.primds_id = reco_release_config.primds_id
+                                WHERE reco_release_config.released = 0
+                                AND run.stop_time + reco_release_delay.delay - reco_release_delay.delay_offset < :NOW
+                                AND run.stop_time > 0 ) t
+                       SET t.released = 1,
+                           t.delay = t.new_delay,
+                           t.delay_offset = t.new_delay_offset
+                       """
+
+    releaseSql = """SELECT reco_release_config.run_id,
+                           primary_dataset.name,
+                           reco_release_config.fileset,
+                           repack_config.proc_version,
+                           run.acq_era,
+                           run.backfill,
+                           run.bulk_data_type,
+                           run.dqmuploadurl,
+                           phedex_config.primds_id,
+                           archival_node.name,
+                           tape_node.name,
+                           disk_node.name
+                    FROM reco_release_pending
+                    INNER JOIN reco_release_config ON
+                      reco_release_config.run_id = reco_release_pending.run_id AND
+                      reco_release_config.primds_id = reco_release_pending.primds_id
+                    INNER JOIN run ON
+                      run.run_id = reco_release_config.run_id
+                    INNER JOIN primary_dataset ON
+                      primary_dataset.id = reco_release_config.primds_id
+                    INNER JOIN run_primds_stream_assoc ON
+                      run_primds_stream_assoc.run_id = reco_release_config.run_id AND
+                      run_primds_stream_assoc.primds_id = reco_release_config.primds_id
+                    INNER JOIN repack_config ON
+                      repack_config.run_id = reco_release_config.run_id AND
+                      repack_config.stream_id = run_primds_stream_assoc.stream_id
+                    LEFT OUTER JOIN phedex_config ON
+                      phedex_config.run_id = reco_release_config.run_id AND
+                      phedex_config.primds_id = reco_release_config.primds_id
+                    LEFT OUTER JOIN storage_node archival_node ON
+                      archival_node.id = phedex_config.archival_node_id
+                    LEFT OUTER JOIN storage_node tape_node ON
+                      tape_node.id = phedex_config.tape_node_id
+                    LEFT OUTER JOIN storage_node disk_node ON
+                      disk_node.id = phedex_config.disk_node_id
+                    WHERE reco_release_config.released = 1
+                    AND run.stop_time + reco_release_config.delay < :NOW
+                    """
+
+    def execute(self, conn = None, transaction = False):
+
+        binds = { 'NOW' : int(time.time()) }
+
+        self.dbi.processData(self.preReleaseSql, binds, conn = conn,
+                             transaction = transaction)
+
+        results = self.dbi.processData(self.releaseSql, binds, conn = conn,
                                        transaction = transaction)[0].fetchall()
 
         recoRelease = {}
@@ -84,10 +98,21 @@ class FindRecoRelease(DBFormatter):
             run = result[0]
 
             if run not in recoRelease:
-                recoRelease[run] = []
-
-            recoRelease[run].append((result[1],
-                                     result[2],
-                                     result[3]))
+                recoRelease[run] = { 'runInfo' : { 'acq_era' : result[4],
+                                                   'backfill' : result[5],
+                                                   'bulk_data_type' : result[6],
+                                                   'dqmuploadurl' : result[7] },
+                                     'datasets' : [] }
+
+            phedexConfig = None
+            if result[8] != None:
+                phedexConfig = { 'archival_node' : result[9],
+                                 'tape_node' : result[10],
+                                 'disk_node' : result[11] }
+
+            recoRelease[run]['datasets'].append((result[1],
+                                                 result[2],
+                                                 result[3],
+                                                 phedexConfig))
 
         return recoRelease
@@ -3,8 +3,10 @@ _FindRecoReleaseDatasets_
 
 Oracle implementation of FindRecoReleaseDatasets
 
-Return a list of datasets in any runs that wait
-for PromptReco release.
+Return the datasets in any runs that wait
+for PromptReco release, with their delay and
+delay offset from reco_release_delay (None
+if they have none yet).
 
 """
 
@@ -14,13 +16,20 @@ class FindRecoReleaseDatasets(DBFormatter):
 
     def execute(self, conn = None, transaction = False):
 
-        sql = """SELECT primary_dataset.name
-                 FROM reco_release_config
+        sql = """SELECT primary_dataset.name,
+                        MAX(reco_release_delay.delay),
+                        MAX(reco_release_delay.delay_offset)
+                 FROM reco_release_pending
+                 INNER JOIN reco_release_config ON
+                   reco_release_config.run_id = reco_release_pending.run_id AND
+                   reco_release_config.primds_id = reco_release_pending.primds_id
                  INNER JOIN run ON
                    run.run_id = reco_release_config.run_id
                  INNER JOIN primary_dataset ON
                    primary_dataset.id = reco_release_config.primds_id
-                 WHERE checkForZeroOneState(reco_release_config.released) = 0
+                 LEFT OUTER JOIN reco_release_delay ON
+                   reco_release_delay.primds_id = reco_release_config.primds_id
+                 WHERE reco_release_config.released = 0
                  AND run.stop_time > 0
                  GROUP BY primary_dataset.name
                  """
@@ -28,8 +37,11 @@ class FindRecoReleaseDatasets(DBFormatter):
         results = self.dbi.processData(sql, binds = {}, conn = conn,
                                        transaction = transaction)[0].fetchall()
 
-        datasets = []
+        datasets = {}
         for result in results:
-            datasets.append(result[0])
+            if result[1] == None:
+                datasets[result[0]] = None
+            else:
+                datasets[result[0]] = (result[1], result[2])
 
         return datasets
@@ -3,6 +3,10 @@ _InsertStreamer_
 
 Oracle implementation of InsertStreamer
 
+Also records the streamer milestone in the latency
+ledger, one bind per run/stream with the first and
+last streamer insert time of the batch.
+
 """
 
 from WMCore.Database.DBFormatter import DBFormatter
@@ -29,4 +33,42 @@ class InsertStreamer(DBFormatter):
         self.dbi.processData(sql, binds, conn = conn,
                              transaction = transaction)
 
+        if type(binds) == dict:
+            binds = [ binds ]
+
+        milestones = {}
+        for bind in binds:
+            key = (bind['RUN'], bind['STREAM'])
+            if key in milestones:
+                milestones[key]['FIRST'] = min(milestones[key]['FIRST'], bind['TIME'])
+                milestones[key]['LAST'] = max(milestones[key]['LAST'], bind['TIME'])
+            else:
+                milestones[key] = { 'RUN' : bind['RUN'],
+                                    'STREAM' : bind['STREAM'],
+                                    'FIRST' : bind['TIME'],
+                                    'LAST' : bind['TIME'] }
+
+        if len(milestones) == 0:
+            return
+
+        sql = """MERGE INTO latency_ledger a
+                 USING (
+                   SELECT :RUN AS run_id,
+                          id AS stream_id
+                   FROM stream
+                   WHERE name = :STREAM
+                 ) b ON ( b.run_id = a.run_id AND
+                          b.stream_id = a.stream_id AND
+                          a.milestone = 'streamer' )
+                 WHEN MATCHED THEN UPDATE
+                   SET a.first_time = LEAST(a.first_time, :FIRST),
+                       a.last_time = GREATEST(a.last_time, :LAST)
+                 WHEN NOT MATCHED THEN
+                   INSERT (run_id, stream_id, milestone, first_time, last_time)
+                   VALUES (b.run_id, b.stream_id, 'streamer', :FIRST, :LAST)
+                 """
+
+        self.dbi.processData(sql, list(milestones.values()), conn = conn,
+                             transaction = transaction)
+
         return
@@ -2,6 +2,8 @@
 _ReleasePromptReco_
 Oracle implementation of ReleasePromptReco
 Release PromptReco for given run and primary dataset.
+Records the reco_released milestone in the latency ledger
+for the stream the primary dataset belongs to.
 """
 
 from WMCore.Database.DBFormatter import DBFormatter
@@ -19,4 +21,38 @@ class ReleasePromptReco(DBFormatter):
         self.dbi.processData(sql, binds, conn = conn,
                              transaction = transaction)
 
+        sql = """MERGE INTO latency_ledger a
+                 USING (
+                   SELECT run_primds_stream_assoc.run_id,
+                          run_primds_stream_assoc.stream_id
+                   FROM run_primds_stream_assoc
+                   WHERE run_primds_stream_assoc.run_id = :RUN
+                   AND run_primds_stream_assoc.primds_id = (SELECT id FROM primary_dataset WHERE name = :PRIMDS)
+                 ) b ON ( b.run_id = a.run_id AND
+                          b.stream_id = a.stream_id AND
+                          a.milestone = 'reco_released' )
+                 WHEN MATCHED THEN UPDATE
+                   SET a.first_time = LEAST(a.first_time, :NOW),
+                       a.last_time = GREATEST(a.last_time, :NOW)
+                 WHEN NOT MATCHED THEN
+                   INSERT (run_id, stream_id, milestone, first_time, last_time)
+                   VALUES (b.run_id, b.stream_id, 'reco_released', :NOW, :NOW)
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        sql = """DELETE FROM reco_release_pending
+                 WHERE EXISTS (
+                   SELECT 1
+                   FROM reco_release_config
+                   WHERE reco_release_config.run_id = reco_release_pending.run_id
+                   AND reco_release_config.primds_id = reco_release_pending.primds_id
+                   AND reco_release_config.released > 1
+                 )
+                 """
+
+        self.dbi.processData(sql, {}, conn = conn,
+                             transaction = transaction)
+
         return
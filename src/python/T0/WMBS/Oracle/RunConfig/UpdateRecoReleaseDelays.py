@@ -0,0 +1,35 @@
+"""
+_UpdateRecoReleaseDelays_
+
+Oracle implementation of UpdateRecoReleaseDelays
+
+Insert or update the PromptReco delay and
+delay offset of primary datasets
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class UpdateRecoReleaseDelays(DBFormatter):
+
+    sql = """MERGE INTO reco_release_delay
+             USING (
+               SELECT id AS primds_id
+               FROM primary_dataset
+               WHERE name = :PRIMDS
+             ) new_delay ON (
+               reco_release_delay.primds_id = new_delay.primds_id
+             )
+             WHEN MATCHED THEN
+               UPDATE SET reco_release_delay.delay = :DELAY,
+                          reco_release_delay.delay_offset = :DELAY_OFFSET
+             WHEN NOT MATCHED THEN
+               INSERT (primds_id, delay, delay_offset)
+               VALUES (new_delay.primds_id, :DELAY, :DELAY_OFFSET)
+             """
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        self.dbi.processData(self.sql, binds, conn = conn,
+                             transaction = transaction)
+        return
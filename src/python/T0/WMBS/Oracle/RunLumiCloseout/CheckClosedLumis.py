@@ -10,33 +10,51 @@ Created on Nov 29, 2012
 
 from WMCore.Database.DBFormatter import DBFormatter
 
+from T0.WMBS.DAOCache import inListBinds
+
 class CheckClosedLumis(DBFormatter):
     """
     _CheckClosedLumis_
 
     Cross-checks the number of closed lumis for
-    every stream in a run with the lumicount
+    every stream in the given runs with the lumicount
     in the run table
+
+    All runs are checked with a single query (IN-list
+    bind, split into chunks of 1000 runs).
     """
 
-    sql = """SELECT stream_id,
+    sql = """SELECT lumi_section_closed.run_id,
+                    lumi_section_closed.stream_id,
                     COUNT(*) AS closed_lumi_count,
-                    MAX(lumi_id) AS max_lumi,
-                    (SELECT lumicount
-                     FROM run
-                     WHERE run_id = :RUN_ID) AS expected_lumi_count
+                    MAX(lumi_section_closed.lumi_id) AS max_lumi,
+                    run.lumicount AS expected_lumi_count
              FROM lumi_section_closed
-             WHERE run_id = :RUN_ID
-             GROUP BY stream_id
+             INNER JOIN run ON
+               run.run_id = lumi_section_closed.run_id
+             WHERE lumi_section_closed.run_id IN (%s)
+             GROUP BY lumi_section_closed.run_id,
+                      lumi_section_closed.stream_id,
+                      run.lumicount
           """
 
-    def execute(self, run, conn = None, transaction = False):
+    chunkSize = 1000
+
+    def execute(self, runs, conn = None, transaction = False):
         """
         _execute_
 
         Basic execute query plus formatDict
         """
-        result = self.dbi.processData(self.sql, {'RUN_ID': run}, conn = conn,
-                                      transaction = transaction)
+        runs = list(runs)
+        formattedResult = []
+        for i in range(0, len(runs), self.chunkSize):
+
+            binds, bindNames = inListBinds("RUN", runs[i:i+self.chunkSize], self.chunkSize)
+
+            result = self.dbi.processData(self.sql % bindNames, binds, conn = conn,
+                                          transaction = transaction)
+
+            formattedResult.extend(self.formatDict(result))
 
-        return self.formatDict(result)
+        return formattedResult
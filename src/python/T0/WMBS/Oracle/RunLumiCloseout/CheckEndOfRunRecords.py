@@ -10,46 +10,58 @@ Created on Nov 28, 2012
 
 from WMCore.Database.DBFormatter import DBFormatter
 
+from T0.WMBS.DAOCache import inListBinds
+
 class CheckEndOfRunRecords(DBFormatter):
     """
     _CheckEndOfRunRecords_
 
     Checks the CMS StorageManager database for
     End of Run records from the different instances
+
+    All runs are checked with a single query (IN-list
+    bind, split into chunks of 1000 runs).
     """
 
     sql = """
-          SELECT smdb.instance, smdb.status, smdb.n_instances
+          SELECT smdb.runnumber, smdb.instance, smdb.status, smdb.n_instances
                  FROM CMS_STOMGR.runs smdb
-                 WHERE smdb.runnumber = :RUN_ID
+                 WHERE smdb.runnumber IN (%s)
           """
 
-    def execute(self, run, conn = None, transaction = False):
+    chunkSize = 1000
+
+    def execute(self, runs, conn = None, transaction = False):
         """
         _execute_
 
         Execute the query, a dictionary with the following format
-        {totalInstances : <int>,
-         instancesWithEoR : [<str>, <str>],
-         instancesWithoutEoR : [<str>, <str>]
+        {<run> : {totalInstances : <int>,
+                  instancesWithEoR : [<str>, <str>],
+                  instancesWithoutEoR : [<str>, <str>]
+                 }
         }
-        """
 
-        result = self.dbi.processData(self.sql, {'RUN_ID' : run}, conn = conn,
-                                       transaction = transaction)
+        Runs unknown to the StorageManager are not returned.
+        """
+        runs = list(runs)
+        formattedResult = {}
+        for i in range(0, len(runs), self.chunkSize):
 
-        resultDict = self.formatDict(result)
+            binds, bindNames = inListBinds("RUN", runs[i:i+self.chunkSize], self.chunkSize)
 
-        formattedResult = {"totalInstances" : 0,
-                           "instancesWithEoR" : [],
-                           "instancesWithoutEoR" : []
-                           }
+            result = self.dbi.processData(self.sql % bindNames, binds, conn = conn,
+                                          transaction = transaction)
 
-        for entry in resultDict:
-            formattedResult["totalInstances"] = max(entry["n_instances"], formattedResult["totalInstances"])
-            if entry["status"] != 0:
-                formattedResult["instancesWithoutEoR"].append(entry["instance"])
-            else:
-                formattedResult["instancesWithEoR"].append(entry["instance"])
+            for entry in self.formatDict(result):
+                runResult = formattedResult.setdefault(entry["runnumber"], {"totalInstances" : 0,
+                                                                            "instancesWithEoR" : [],
+                                                                            "instancesWithoutEoR" : []
+                                                                            })
+                runResult["totalInstances"] = max(entry["n_instances"], runResult["totalInstances"])
+                if entry["status"] != 0:
+                    runResult["instancesWithoutEoR"].append(entry["instance"])
+                else:
+                    runResult["instancesWithEoR"].append(entry["instance"])
 
         return formattedResult
@@ -8,63 +8,112 @@ run/stream fileset is still open, check for complete lumi_closed records,
 that all lumis are finally closed (all data for them in T0AST) and that
 all data has been feed to the filesets for processing.
 
-If all these conditions are satisifed, close the run/stream fileset.
+If all these conditions are satisifed, close the run/stream fileset
+and record the fileset_closed milestone in the latency ledger.
+
+With lease binds only run/streams in the partitions held
+by the feeder instance are considered.
+
+Returns the number of closed filesets.
 
 """
 import time
 
 from WMCore.Database.DBFormatter import DBFormatter
 
+from T0.WMBS.Oracle.Tier0Feeder.LeaseFilter import leaseJoin
+
 class CloseRunStreamFilesets(DBFormatter):
 
-    def execute(self, conn = None, transaction = False):
+    def execute(self, lease = None, conn = None, transaction = False):
 
-        sql = """MERGE INTO wmbs_fileset a
-                 USING (
-                   SELECT b.run_id AS run_id,
-                          b.stream_id AS stream_id,
-                          b.fileset AS fileset
-                   FROM (
-                     SELECT run_stream_fileset_assoc.run_id AS run_id,
-                            run_stream_fileset_assoc.stream_id AS stream_id,
-                            run_stream_fileset_assoc.fileset AS fileset
-                     FROM run_stream_fileset_assoc
-                     INNER JOIN wmbs_fileset ON
-                       wmbs_fileset.id = run_stream_fileset_assoc.fileset AND
-                       wmbs_fileset.open = 1
-                     INNER JOIN run ON
-                       run.run_id = run_stream_fileset_assoc.run_id AND
-                       run.stop_time > 0 AND
-                       run.close_time > 0
-                     INNER JOIN lumi_section_closed ON
-                       lumi_section_closed.run_id = run_stream_fileset_assoc.run_id AND
-                       lumi_section_closed.stream_id = run_stream_fileset_assoc.stream_id
-                     GROUP BY run_stream_fileset_assoc.run_id,
-                              run_stream_fileset_assoc.stream_id,
-                              run_stream_fileset_assoc.fileset
-                     HAVING SUM(CASE
-                                  WHEN lumi_section_closed.close_time = 0 THEN 0
-                                  ELSE 1
-                                END) = MAX(lumi_section_closed.lumi_id)
-                     AND MAX(lumi_section_closed.lumi_id) = MAX(run.lumicount)
-                   ) b
-                   LEFT OUTER JOIN streamer ON
-                     streamer.run_id = b.run_id AND
-                     streamer.stream_id = b.stream_id AND
-                     checkForZeroState(streamer.used) = 0
-                   WHERE streamer.run_id IS NULL
-                   GROUP BY b.run_id,
-                            b.stream_id,
-                            b.fileset
-                 ) c ON ( c.fileset = a.id )
-                 WHEN MATCHED THEN
-                   UPDATE SET a.open = 0,
-                              a.last_update = :CLOSE_TIME
+        sql = """SELECT b.run_id AS run_id,
+                        b.stream_id AS stream_id,
+                        b.fileset AS fileset
+                 FROM (
+                   SELECT run_stream_fileset_assoc.run_id AS run_id,
+                          run_stream_fileset_assoc.stream_id AS stream_id,
+                          run_stream_fileset_assoc.fileset AS fileset
+                   FROM run_stream_fileset_assoc
+                   INNER JOIN wmbs_fileset ON
+                     wmbs_fileset.id = run_stream_fileset_assoc.fileset AND
+                     wmbs_fileset.open = 1
+                   INNER JOIN run ON
+                     run.run_id = run_stream_fileset_assoc.run_id AND
+                     run.stop_time > 0 AND
+                     run.close_time > 0
+                   %s
+                   INNER JOIN lumi_section_closed ON
+                     lumi_section_closed.run_id = run_stream_fileset_assoc.run_id AND
+                     lumi_section_closed.stream_id = run_stream_fileset_assoc.stream_id
+                   GROUP BY run_stream_fileset_assoc.run_id,
+                            run_stream_fileset_assoc.stream_id,
+                            run_stream_fileset_assoc.fileset
+                   HAVING SUM(CASE
+                                WHEN lumi_section_closed.close_time = 0 THEN 0
+                                ELSE 1
+                              END) = MAX(lumi_section_closed.lumi_id)
+                   AND MAX(lumi_section_closed.lumi_id) = MAX(run.lumicount)
+                 ) b
+                 LEFT OUTER JOIN streamer_pending_feed ON
+                   streamer_pending_feed.run_id = b.run_id AND
+                   streamer_pending_feed.stream_id = b.stream_id
+                 WHERE streamer_pending_feed.run_id IS NULL
+                 GROUP BY b.run_id,
+                          b.stream_id,
+                          b.fileset
                  """
 
-        binds = { 'CLOSE_TIME' : int(time.time()) }
+        binds = {}
+        if lease == None:
+            sql = sql % ""
+        else:
+            sql = sql % leaseJoin("run_stream_fileset_assoc")
+            binds.update(lease)
+
+        results = self.dbi.processData(sql, binds, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        if len(results) == 0:
+            return 0
+
+        closeTime = int(time.time())
+
+        bindsFileset = []
+        bindsLedger = []
+        for result in results:
+            bindsFileset.append( { 'FILESET' : result[2],
+                                   'CLOSE_TIME' : closeTime } )
+            bindsLedger.append( { 'RUN' : result[0],
+                                  'STREAMID' : result[1],
+                                  'CLOSE_TIME' : closeTime } )
+
+        sql = """UPDATE wmbs_fileset
+                 SET open = 0,
+                     last_update = :CLOSE_TIME
+                 WHERE id = :FILESET
+                 AND open = 1
+                 """
+
+        self.dbi.processData(sql, bindsFileset, conn = conn,
+                             transaction = transaction)
+
+        sql = """MERGE INTO latency_ledger a
+                 USING (
+                   SELECT :RUN AS run_id,
+                          :STREAMID AS stream_id
+                   FROM DUAL
+                 ) b ON ( b.run_id = a.run_id AND
+                          b.stream_id = a.stream_id AND
+                          a.milestone = 'fileset_closed' )
+                 WHEN MATCHED THEN UPDATE
+                   SET a.last_time = :CLOSE_TIME
+                 WHEN NOT MATCHED THEN
+                   INSERT (run_id, stream_id, milestone, first_time, last_time)
+                   VALUES (b.run_id, b.stream_id, 'fileset_closed', :CLOSE_TIME, :CLOSE_TIME)
+                 """
 
-        self.dbi.processData(sql, binds, conn = conn,
+        self.dbi.processData(sql, bindsLedger, conn = conn,
                              transaction = transaction)
 
-        return
+        return len(results)
@@ -15,13 +15,20 @@ class DeleteStreamers(DBFormatter):
     _DeleteStreamers_
 
     Delete the streamers with the given IDs from
-    the streamer table
+    the streamer table and the streamer queues
     """
 
     sql = """DELETE FROM streamer
              WHERE id = :FILEID
           """
 
+    sqlQueues = [ """DELETE FROM streamer_pending_feed
+                     WHERE id = :FILEID
+                  """,
+                  """DELETE FROM streamer_pending_delete
+                     WHERE id = :FILEID
+                  """ ]
+
     def execute(self, fileList, conn = None, transaction = False):
         """
         _execute_
@@ -34,6 +41,10 @@ class DeleteStreamers(DBFormatter):
         for fileId in fileList:
             binds.append({"FILEID" : fileId})
 
+        for sql in self.sqlQueues:
+            self.dbi.processData(sql, binds = binds, conn = conn,
+                                 transaction = transaction)
+
         self.dbi.processData(self.sql, binds = binds, conn = conn,
                              transaction = transaction)
 
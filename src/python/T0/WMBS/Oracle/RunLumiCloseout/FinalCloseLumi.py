@@ -6,13 +6,59 @@ Oracle implementation of FinalCloseLumi
 Check all not yet closed run/stream/lumis for complete file
 counts and close them if all files are present.
 
+The lumi_closed milestone is recorded in the latency ledger
+for the run/streams of these lumis before they are closed.
+
+With lease binds only lumis of run/streams in the partitions
+held by the feeder instance are closed.
+
 """
 
 from WMCore.Database.DBFormatter import DBFormatter
 
+from T0.WMBS.Oracle.Tier0Feeder.LeaseFilter import leaseJoin
+
 class FinalCloseLumi(DBFormatter):
 
-    def execute(self, currentTime, conn = None, transaction = False):
+    def execute(self, currentTime, lease = None, conn = None, transaction = False):
+
+        binds = { 'CLOSE_TIME' : currentTime }
+
+        leaseFilter = ""
+        if lease != None:
+            leaseFilter = leaseJoin("lumi_section_closed")
+            binds.update(lease)
+
+        sql = """MERGE INTO latency_ledger a
+                 USING (
+                   SELECT DISTINCT c.run_id, c.stream_id
+                   FROM (
+                     SELECT lumi_section_closed.run_id,
+                            lumi_section_closed.stream_id
+                     FROM lumi_section_closed
+                     INNER JOIN streamer ON
+                       streamer.run_id = lumi_section_closed.run_id AND
+                       streamer.stream_id = lumi_section_closed.stream_id AND
+                       streamer.lumi_id = lumi_section_closed.lumi_id
+                     %s
+                     WHERE checkForZeroState(lumi_section_closed.close_time) = 0
+                     GROUP BY lumi_section_closed.run_id,
+                              lumi_section_closed.stream_id,
+                              lumi_section_closed.lumi_id
+                     HAVING COUNT(*) = MAX(lumi_section_closed.filecount)
+                   ) c
+                 ) b ON ( b.run_id = a.run_id AND
+                          b.stream_id = a.stream_id AND
+                          a.milestone = 'lumi_closed' )
+                 WHEN MATCHED THEN UPDATE
+                   SET a.last_time = :CLOSE_TIME
+                 WHEN NOT MATCHED THEN
+                   INSERT (run_id, stream_id, milestone, first_time, last_time)
+                   VALUES (b.run_id, b.stream_id, 'lumi_closed', :CLOSE_TIME, :CLOSE_TIME)
+                 """ % leaseFilter
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
 
         sql = """MERGE INTO lumi_section_closed a
                  USING (
@@ -24,6 +70,7 @@ class FinalCloseLumi(DBFormatter):
                      streamer.run_id = lumi_section_closed.run_id AND
                      streamer.stream_id = lumi_section_closed.stream_id AND
                      streamer.lumi_id = lumi_section_closed.lumi_id
+                   %s
                    WHERE checkForZeroState(lumi_section_closed.close_time) = 0
                    GROUP BY lumi_section_closed.run_id,
                             lumi_section_closed.stream_id,
@@ -34,9 +81,7 @@ class FinalCloseLumi(DBFormatter):
                           b.lumi_id = a.lumi_id )
                  WHEN MATCHED THEN UPDATE
                  SET a.close_time = :CLOSE_TIME
-                 """
-
-        binds = { 'CLOSE_TIME' : currentTime }
+                 """ % leaseFilter
 
         self.dbi.processData(sql, binds, conn = conn,
                              transaction = transaction)
@@ -24,6 +24,42 @@ from sqlalchemy.exc import DatabaseError
 
 class FindClosedLumis(DBFormatter):
 
+    runsSql = """SELECT a.runnumber
+                 FROM CMS_STOMGR.runs a
+                 WHERE a.runnumber = :RUN
+                 GROUP BY a.runnumber
+                 HAVING COUNT(*) = MAX(a.n_instances)
+                 """
+
+    lumisSql = """SELECT a.runnumber, a.stream, a.lumisection, SUM(a.filecount)
+                  FROM CMS_STOMGR.streams a
+                  INNER JOIN CMS_STOMGR.runs b ON
+                    b.runnumber = a.runnumber AND
+                    b.instance = a.instance
+                  WHERE a.runnumber = :RUN
+                  AND a.stream = :STREAM
+                  AND a.lumisection > :LUMI
+                  GROUP BY a.runnumber, a.stream, a.lumisection
+                  HAVING ( COUNT(*) = ( SELECT COUNT(*)
+                                        FROM CMS_STOMGR.runs c
+                                        WHERE c.runnumber = a.runnumber ) AND
+                           COUNT(*) = ( SELECT MAX(c.n_instances)
+                                        FROM CMS_STOMGR.runs c
+                                        WHERE c.runnumber = a.runnumber ) )
+                  OR ( COUNT(*) = SUM(CASE
+                                        WHEN b.status = 1 THEN 1000
+                                        WHEN b.n_lumisections < a.lumisection THEN 0
+                                        ELSE 1
+                                      END) AND
+                       COUNT(*) = ( SELECT SUM(CASE
+                                                 WHEN c.status = 1 THEN 1000
+                                                 WHEN c.n_lumisections < a.lumisection THEN 0
+                                                 ELSE 1
+                                               END)
+                                           FROM CMS_STOMGR.runs c
+                                           WHERE c.runnumber = a.runnumber ) )
+                  """
+
     def execute(self, binds, conn = None, transaction = False):
 
         # query has problems because of the way the join work
@@ -49,18 +85,11 @@ class FindClosedLumis(DBFormatter):
 ##                  )
 ##                  """
 
-        sql = """SELECT a.runnumber
-                 FROM CMS_STOMGR.runs a
-                 WHERE a.runnumber = :RUN
-                 GROUP BY a.runnumber
-                 HAVING COUNT(*) = MAX(a.n_instances)
-                 """
-
         bindVars = []
         for b in binds:
             bindVars.append( { 'RUN' : b['RUN'] } )
 
-        results = self.dbi.processData(sql, bindVars, conn = conn,
+        results = self.dbi.processData(self.runsSql, bindVars, conn = conn,
                                        transaction = transaction)[0].fetchall()
 
         goodRuns = []
@@ -75,37 +104,8 @@ class FindClosedLumis(DBFormatter):
         if len(bindVars) == 0:
             return []
 
-        sql = """SELECT a.runnumber, a.stream, a.lumisection, SUM(a.filecount)
-                 FROM CMS_STOMGR.streams a
-                 INNER JOIN CMS_STOMGR.runs b ON
-                   b.runnumber = a.runnumber AND
-                   b.instance = a.instance
-                 WHERE a.runnumber = :RUN
-                 AND a.stream = :STREAM
-                 AND a.lumisection > :LUMI
-                 GROUP BY a.runnumber, a.stream, a.lumisection
-                 HAVING ( COUNT(*) = ( SELECT COUNT(*)
-                                       FROM CMS_STOMGR.runs c
-                                       WHERE c.runnumber = a.runnumber ) AND
-                          COUNT(*) = ( SELECT MAX(c.n_instances)
-                                       FROM CMS_STOMGR.runs c
-                                       WHERE c.runnumber = a.runnumber ) )
-                 OR ( COUNT(*) = SUM(CASE
-                                       WHEN b.status = 1 THEN 1000
-                                       WHEN b.n_lumisections < a.lumisection THEN 0
-                                       ELSE 1
-                                     END) AND
-                      COUNT(*) = ( SELECT SUM(CASE
-                                                WHEN c.status = 1 THEN 1000
-                                                WHEN c.n_lumisections < a.lumisection THEN 0
-                                                ELSE 1
-                                              END)
-                                          FROM CMS_STOMGR.runs c
-                                          WHERE c.runnumber = a.runnumber ) )
-                 """
-
         try:
-            results = self.dbi.processData(sql, bindVars, conn = conn,
+            results = self.dbi.processData(self.lumisSql, bindVars, conn = conn,
                                            transaction = transaction)[0].fetchall()
         except DatabaseError as ex:
             logging.error("ERROR: DatabaseError exception when checking for closed run/stream/lumi")
@@ -7,31 +7,61 @@ Checks the given runs whether they are closed according to
 the StorageManager EoR records and returns a list of all
 closed runs together with the high lumi section for each run.
 
+All runs are checked with a single query (IN-list bind, split
+into chunks of 1000 runs). A closed run stays closed, results
+are cached and runs already found closed are not queried again.
+The cache belongs to the DAO instance and only keeps runs that
+are still passed in.
+
 """
 
 from WMCore.Database.DBFormatter import DBFormatter
 
+from T0.WMBS.DAOCache import inListBinds
+
 class FindClosedRuns(DBFormatter):
 
+    sql = """SELECT a.runnumber, MAX(a.n_lumisections)
+             FROM CMS_STOMGR.runs a
+             WHERE a.runnumber IN (%s)
+             AND a.status = 0
+             GROUP BY a.runnumber
+             HAVING COUNT(*) = MAX(a.n_instances)
+             """
+
+    chunkSize = 1000
+
+    def __init__(self, logger, dbinterface):
+
+        DBFormatter.__init__(self, logger, dbinterface)
+
+        self.closedRunsCache = {}
+
+        return
+
     def execute(self, runs, conn = None, transaction = False):
 
-        sql = """SELECT a.runnumber, MAX(a.n_lumisections)
-                 FROM CMS_STOMGR.runs a
-                 WHERE a.runnumber = :RUN
-                 AND a.status = 0
-                 GROUP BY a.runnumber
-                 HAVING COUNT(*) = MAX(a.n_instances)
-                 """
+        # runs not passed in anymore are done, evict them
+        for run in set(self.closedRunsCache) - set(runs):
+            del self.closedRunsCache[run]
 
-        binds = []
+        closedRuns = {}
+        queryRuns = []
         for run in runs:
-            binds.append( { 'RUN' : run } )
+            if run in self.closedRunsCache:
+                closedRuns[run] = self.closedRunsCache[run]
+            else:
+                queryRuns.append(run)
 
-        results = self.dbi.processData(sql, binds, conn = conn,
-                                       transaction = transaction)[0].fetchall()
+        for i in range(0, len(queryRuns), self.chunkSize):
 
-        closedRuns = {}
-        for result in results:
-            closedRuns[result[0]] = result[1]
+            binds, bindNames = inListBinds("RUN", queryRuns[i:i+self.chunkSize], self.chunkSize)
+
+            results = self.dbi.processData(self.sql % bindNames, binds, conn = conn,
+                                           transaction = transaction)[0].fetchall()
+
+            for result in results:
+                closedRuns[result[0]] = result[1]
+                self.closedRunsCache[result[0]] = result[1]
 
         return closedRuns
@@ -23,15 +23,20 @@ checks don't work if the sequence does not start at 1).
 Finally, the LEFT OUTER JOIN ensures that we can
 detect run/stream without any lumis.
 
+With lease binds only run/streams in the partitions
+held by the feeder instance are returned.
+
 Return a list of dictionaries with run/stream/lumi.
 
 """
 
 from WMCore.Database.DBFormatter import DBFormatter
 
+from T0.WMBS.Oracle.Tier0Feeder.LeaseFilter import leaseJoin
+
 class FindHighContLumi(DBFormatter):
 
-    def execute(self, conn = None, transaction = False):
+    def execute(self, lease = None, conn = None, transaction = False):
 
         sql = """SELECT a.run_id, stream.name, a.lumi_id
                  FROM (
@@ -57,6 +62,7 @@ class FindHighContLumi(DBFormatter):
                      INNER JOIN wmbs_fileset ON
                        wmbs_fileset.id = run_stream_fileset_assoc.fileset AND
                        wmbs_fileset.open = 1
+                     %s
                      LEFT OUTER JOIN lumi_section_closed ON
                        lumi_section_closed.run_id = run_stream_fileset_assoc.run_id AND
                        lumi_section_closed.stream_id = run_stream_fileset_assoc.stream_id
@@ -68,7 +74,14 @@ class FindHighContLumi(DBFormatter):
                    stream.id = a.stream_id
                  """
 
-        results = self.dbi.processData(sql, {}, conn = conn,
+        binds = {}
+        if lease == None:
+            sql = sql % ""
+        else:
+            sql = sql % leaseJoin("run_stream_fileset_assoc")
+            binds.update(lease)
+
+        results = self.dbi.processData(sql, binds, conn = conn,
                                        transaction = transaction)[0].fetchall()
 
         runStreamLumis = []
@@ -0,0 +1,62 @@
+"""
+_FindPurgeableRuns_
+
+Oracle implementation of FindPurgeableRuns
+
+Return runs that are fully done and still have
+streamer and lumi bookkeeping in T0AST.
+
+A run is fully done if it is closed, all run/stream
+and PromptReco filesets have been cleaned up (which
+only happens after all workflows are archived), it
+has no active split lumis and (if we notify P5 about
+streamers) all streamers are marked deleted.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class FindPurgeableRuns(DBFormatter):
+
+    sql = """SELECT run.run_id
+             FROM run
+             WHERE run.stop_time > 0
+             AND run.close_time > 0
+             AND EXISTS (
+               SELECT 1 FROM lumi_section
+               WHERE lumi_section.run_id = run.run_id
+             )
+             AND NOT EXISTS (
+               SELECT 1 FROM run_stream_fileset_assoc
+               WHERE run_stream_fileset_assoc.run_id = run.run_id
+             )
+             AND NOT EXISTS (
+               SELECT 1 FROM reco_release_config
+               WHERE reco_release_config.run_id = run.run_id
+             )
+             AND NOT EXISTS (
+               SELECT 1 FROM lumi_section_split_active
+               WHERE lumi_section_split_active.run_id = run.run_id
+             )
+             """
+
+    sqlNotify = """AND NOT EXISTS (
+                     SELECT 1 FROM streamer_pending_delete
+                     WHERE streamer_pending_delete.run_id = run.run_id
+                   )
+                   """
+
+    def execute(self, streamerNotification, conn = None, transaction = False):
+
+        sql = self.sql
+        if streamerNotification:
+            sql += self.sqlNotify
+
+        results = self.dbi.processData(sql, {}, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        runs = []
+        for result in results:
+            runs.append(result[0])
+
+        return runs
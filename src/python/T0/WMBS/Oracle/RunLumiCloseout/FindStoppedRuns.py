@@ -6,42 +6,72 @@ Oracle implementation of FindStoppedRuns
 Checks RunSummary start and stop times for the the given runs
 and returns them if both are greater than null.
 
+All runs are checked with a single query (IN-list bind, split
+into chunks of 1000 runs). Start and stop times never change
+once set, they are cached and runs already found stopped are
+not queried again. The cache belongs to the DAO instance and
+only keeps runs that are still passed in.
+
 """
 
 from WMCore.Database.DBFormatter import DBFormatter
 
+from T0.WMBS.DAOCache import inListBinds
+
 class FindStoppedRuns(DBFormatter):
 
+    sql = """WITH I AS (SELECT (starttime - TO_TIMESTAMP_TZ('01/01/1970 00:00:00 GMT', 'DD/MM/YYYY HH24:MI:SS TZR')) AS start_interval,
+                               (stoptime - TO_TIMESTAMP_TZ('01/01/1970 00:00:00 GMT', 'DD/MM/YYYY HH24:MI:SS TZR')) AS stop_interval,
+                               runnumber AS runnumber
+                        FROM CMS_WBM.RUNSUMMARY
+                        WHERE runnumber IN (%s)
+                        AND starttime IS NOT NULL
+                        AND stoptime IS NOT NULL)
+             SELECT runnumber,
+                    (EXTRACT(DAY FROM start_interval)  * 86400) +
+                    (EXTRACT(HOUR FROM start_interval) * 3600) +
+                    (EXTRACT(MINUTE FROM start_interval) * 60) + 
+                    (EXTRACT(SECOND FROM start_interval)) AS starttime,
+                    (EXTRACT(DAY FROM stop_interval)  * 86400) +
+                    (EXTRACT(HOUR FROM stop_interval) * 3600) +
+                    (EXTRACT(MINUTE FROM stop_interval) * 60) + 
+                    (EXTRACT(SECOND FROM stop_interval)) AS stoptime
+             FROM I
+             """
+
+    chunkSize = 1000
+
+    def __init__(self, logger, dbinterface):
+
+        DBFormatter.__init__(self, logger, dbinterface)
+
+        self.stoppedRunsCache = {}
+
+        return
+
     def execute(self, runs, conn = None, transaction = False):
 
-        sql = """WITH I AS (SELECT (starttime - TO_TIMESTAMP_TZ('01/01/1970 00:00:00 GMT', 'DD/MM/YYYY HH24:MI:SS TZR')) AS start_interval,
-                                   (stoptime - TO_TIMESTAMP_TZ('01/01/1970 00:00:00 GMT', 'DD/MM/YYYY HH24:MI:SS TZR')) AS stop_interval,
-                                   runnumber AS runnumber
-                            FROM CMS_WBM.RUNSUMMARY
-                            WHERE runnumber = :RUN
-                            AND starttime IS NOT NULL
-                            AND stoptime IS NOT NULL)
-                 SELECT runnumber,
-                        (EXTRACT(DAY FROM start_interval)  * 86400) +
-                        (EXTRACT(HOUR FROM start_interval) * 3600) +
-                        (EXTRACT(MINUTE FROM start_interval) * 60) + 
-                        (EXTRACT(SECOND FROM start_interval)) AS starttime,
-                        (EXTRACT(DAY FROM stop_interval)  * 86400) +
-                        (EXTRACT(HOUR FROM stop_interval) * 3600) +
-                        (EXTRACT(MINUTE FROM stop_interval) * 60) + 
-                        (EXTRACT(SECOND FROM stop_interval)) AS stoptime
-                 FROM I
-                 """
-
-        binds = []
+        # runs not passed in anymore are done, evict them
+        for run in set(self.stoppedRunsCache) - set(runs):
+            del self.stoppedRunsCache[run]
+
+        stoppedRuns = {}
+        queryRuns = []
         for run in runs:
-            binds.append( { 'RUN' : run } )
+            if run in self.stoppedRunsCache:
+                stoppedRuns[run] = self.stoppedRunsCache[run]
+            else:
+                queryRuns.append(run)
 
-        results = self.dbi.processData(sql, binds, conn = conn,
-                                       transaction = transaction)[0].fetchall()
+        for i in range(0, len(queryRuns), self.chunkSize):
 
-        stoppedRuns = {}
-        for result in results:
-            stoppedRuns[result[0]] = (result[1], result[2])
+            binds, bindNames = inListBinds("RUN", queryRuns[i:i+self.chunkSize], self.chunkSize)
+
+            results = self.dbi.processData(self.sql % bindNames, binds, conn = conn,
+                                           transaction = transaction)[0].fetchall()
+
+            for result in results:
+                stoppedRuns[result[0]] = (result[1], result[2])
+                self.stoppedRunsCache[result[0]] = (result[1], result[2])
 
         return stoppedRuns
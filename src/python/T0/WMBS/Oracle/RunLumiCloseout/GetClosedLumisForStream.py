@@ -15,36 +15,38 @@ class GetClosedLumisForStream(DBFormatter):
     _GetClosedLumisForStream_
 
     Gets the list of closed lumis for
-    a given stream and run
+    the given run and stream combinations
     """
 
-    sql = """SELECT stream_id,
+    sql = """SELECT lumi_section_closed.run_id,
+                    lumi_section_closed.stream_id,
                     lumi_section_closed.lumi_id,
-                    (SELECT name
-                     FROM stream
-                     WHERE id = :STREAM_ID) AS name
+                    stream.name
              FROM lumi_section_closed
+             INNER JOIN stream ON
+               stream.id = lumi_section_closed.stream_id
              WHERE lumi_section_closed.run_id = :RUN_ID AND
                    lumi_section_closed.stream_id = :STREAM_ID
           """
 
 
-    def execute(self, run, streams, conn = None, transaction = False):
+    def execute(self, runStreams, conn = None, transaction = False):
         """
         _execute_
 
-        Returns a dictionary with the following format:
+        Takes a list of (run, stream) tuples and returns a
+        dictionary with the following format:
 
-        {<streamId> : {name: <str>,
-                       closedLumis: [<int>, <int>]
-                      }
+        {(<run>, <streamId>) : {name: <str>,
+                                closedLumis: [<int>, <int>]
+                               }
         }
         """
 
-        if not streams:
+        if not runStreams:
             return {}
         binds = []
-        for stream in streams:
+        for run, stream in runStreams:
             binds.append({'RUN_ID' : run,
                           'STREAM_ID' : stream})
         result = self.dbi.processData(self.sql, binds = binds,
@@ -53,9 +55,10 @@ class GetClosedLumisForStream(DBFormatter):
         formattedResult = self.formatDict(result)
         streamInfo = {}
         for entry in formattedResult:
-            if entry["stream_id"] not in streamInfo:
-                streamInfo[entry["stream_id"]] = {"name" : entry["name"],
-                                                  "closedLumis" : []}
-            streamInfo[entry["stream_id"]]["closedLumis"].append(int(entry["lumi_id"]))
+            key = (entry["run_id"], entry["stream_id"])
+            if key not in streamInfo:
+                streamInfo[key] = {"name" : entry["name"],
+                                   "closedLumis" : []}
+            streamInfo[key]["closedLumis"].append(int(entry["lumi_id"]))
 
         return streamInfo
@@ -10,15 +10,21 @@ Created on Nov 29, 2012
 
 from WMCore.Database.DBFormatter import DBFormatter
 
+from T0.WMBS.DAOCache import inListBinds
+
 class GetFileCountOnOpenLumis(DBFormatter):
     """
     GetFileCountOnOpenLumis_
 
-    Get filecounts from lumis in the run which
+    Get filecounts from lumis in the given runs which
     are not closed yet in lumi_section_closed
+
+    All runs are checked with a single query (IN-list
+    bind, split into chunks of 1000 runs).
     """
 
-    sql = """SELECT lumi_section_closed.lumi_id,
+    sql = """SELECT lumi_section_closed.run_id,
+                    lumi_section_closed.lumi_id,
                     lumi_section_closed.stream_id,
                     stream.name,
                     lumi_section_closed.filecount AS expected_filecount,
@@ -29,33 +35,44 @@ class GetFileCountOnOpenLumis(DBFormatter):
              LEFT OUTER JOIN streamer ON
                  streamer.lumi_id = lumi_section_closed.lumi_id AND
                  streamer.stream_id = lumi_section_closed.stream_id AND
-                 streamer.run_id = :RUN_ID
+                 streamer.run_id = lumi_section_closed.run_id
              WHERE checkForZeroState(lumi_section_closed.close_time) = 0 AND
-                   lumi_section_closed.run_id = :RUN_ID
-             GROUP BY lumi_section_closed.lumi_id,
+                   lumi_section_closed.run_id IN (%s)
+             GROUP BY lumi_section_closed.run_id,
+                      lumi_section_closed.lumi_id,
                       lumi_section_closed.stream_id,
                       stream.name,
                       lumi_section_closed.filecount
-             ORDER BY lumi_section_closed.lumi_id,
+             ORDER BY lumi_section_closed.run_id,
+                      lumi_section_closed.lumi_id,
                       lumi_section_closed.stream_id,
                       stream.name,
                       lumi_section_closed.filecount
           """
 
-    def execute(self, run, conn = None, transaction = False):
+    chunkSize = 1000
+
+    def execute(self, runs, conn = None, transaction = False):
         """
         _execute_
 
-        Get open lumis for a run and sort it by stream.
+        Get open lumis for the runs and sort them by run and stream.
+
+        {<run> : {(<streamId>, <name>) : {<lumi> : (<expected>, <found>)}}}
         """
-        result = self.dbi.processData(self.sql, {"RUN_ID" : run}, conn = conn,
-                                      transaction = transaction)
+        runs = list(runs)
+        runInfo = {}
+        for i in range(0, len(runs), self.chunkSize):
+
+            binds, bindNames = inListBinds("RUN", runs[i:i+self.chunkSize], self.chunkSize)
+
+            result = self.dbi.processData(self.sql % bindNames, binds, conn = conn,
+                                          transaction = transaction)
 
-        formattedResult = self.formatDict(result)
-        streamInfo = {}
-        for entry in formattedResult:
-            if (entry["stream_id"], entry["name"]) not in streamInfo:
-                streamInfo[(entry["stream_id"], entry["name"])] = {}
-            streamInfo[(entry["stream_id"], entry["name"])][int(entry["lumi_id"])] = (entry["expected_filecount"], entry["filecount"])
+            for entry in self.formatDict(result):
+                streamInfo = runInfo.setdefault(entry["run_id"], {})
+                if (entry["stream_id"], entry["name"]) not in streamInfo:
+                    streamInfo[(entry["stream_id"], entry["name"])] = {}
+                streamInfo[(entry["stream_id"], entry["name"])][int(entry["lumi_id"])] = (entry["expected_filecount"], entry["filecount"])
 
-        return streamInfo
+        return runInfo
@@ -3,6 +3,9 @@ _InsertClosedLumi_
 
 Oracle implementation of InsertClosedLumi
 
+Also records the eols milestone (EoLS record insert
+time) in the latency ledger.
+
 """
 
 from WMCore.Database.DBFormatter import DBFormatter
@@ -31,4 +34,42 @@ class InsertClosedLumi(DBFormatter):
         self.dbi.processData(sql, binds, conn = conn,
                              transaction = transaction)
 
+        if type(binds) == dict:
+            binds = [ binds ]
+
+        milestones = {}
+        for bind in binds:
+            key = (bind['RUN'], bind['STREAM'])
+            if key in milestones:
+                milestones[key]['FIRST'] = min(milestones[key]['FIRST'], bind['INSERT_TIME'])
+                milestones[key]['LAST'] = max(milestones[key]['LAST'], bind['INSERT_TIME'])
+            else:
+                milestones[key] = { 'RUN' : bind['RUN'],
+                                    'STREAM' : bind['STREAM'],
+                                    'FIRST' : bind['INSERT_TIME'],
+                                    'LAST' : bind['INSERT_TIME'] }
+
+        if len(milestones) == 0:
+            return
+
+        sql = """MERGE INTO latency_ledger a
+                 USING (
+                   SELECT :RUN AS run_id,
+                          id AS stream_id
+                   FROM stream
+                   WHERE name = :STREAM
+                 ) b ON ( b.run_id = a.run_id AND
+                          b.stream_id = a.stream_id AND
+                          a.milestone = 'eols' )
+                 WHEN MATCHED THEN UPDATE
+                   SET a.first_time = LEAST(a.first_time, :FIRST),
+                       a.last_time = GREATEST(a.last_time, :LAST)
+                 WHEN NOT MATCHED THEN
+                   INSERT (run_id, stream_id, milestone, first_time, last_time)
+                   VALUES (b.run_id, b.stream_id, 'eols', :FIRST, :LAST)
+                 """
+
+        self.dbi.processData(sql, list(milestones.values()), conn = conn,
+                             transaction = transaction)
+
         return
@@ -0,0 +1,71 @@
+"""
+_PurgeRun_
+
+Oracle implementation of PurgeRun
+
+Remove all streamer and lumi bookkeeping for a
+run by dropping its partitions of the run
+partitioned tables and deleting its streamer
+queue, Tier0 Data Service queue, auditor and
+lumi_section records afterwards.
+
+Partition maintenance is DDL and commits implicitly,
+never call this inside a transaction.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class PurgeRun(DBFormatter):
+
+    partitionedTables = [ "streamer",
+                          "lumi_section_closed",
+                          "lumi_section_split_active",
+                          "lumi_section_prescale" ]
+
+    # datasvc_pending is only emptied by the Tier0 Data
+    # Service replication, which can be disabled
+    runTables = [ "streamer_pending_feed",
+                  "streamer_pending_delete",
+                  "datasvc_pending",
+                  "audit_finding",
+                  "audit_checkpoint",
+                  "lumi_section" ]
+
+    def execute(self, run, conn = None, transaction = False):
+
+        binds = { 'RUN' : run }
+
+        for table in self.partitionedTables:
+
+            # interval partitions only exist once a row for the
+            # run was inserted, dropping a missing one is an error
+            sql = """SELECT COUNT(*)
+                     FROM %s
+                     WHERE run_id = :RUN
+                     AND ROWNUM = 1
+                     """ % table
+
+            results = self.dbi.processData(sql, binds, conn = conn,
+                                           transaction = transaction)[0].fetchall()
+
+            if results[0][0] > 0:
+
+                sql = """ALTER TABLE %s
+                         DROP PARTITION FOR (%d)
+                         UPDATE GLOBAL INDEXES
+                         """ % (table, int(run))
+
+                self.dbi.processData(sql, {}, conn = conn,
+                                     transaction = transaction)
+
+        for table in self.runTables:
+
+            sql = """DELETE FROM %s
+                     WHERE run_id = :RUN
+                     """ % table
+
+            self.dbi.processData(sql, binds, conn = conn,
+                                 transaction = transaction)
+
+        return
@@ -0,0 +1,43 @@
+"""
+_ClearFinishedStreamers_
+
+Oracle implementation of ClearFinishedStreamers
+
+Without StorageManager notification nothing consumes the
+streamer_pending_delete queue. Remove the streamers that
+notification would pick up, completely processed streamers
+of run/streams with a closed fileset (see GetFinishedRunStreams
+and GetFinishedStreamers), without notifying anyone.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class ClearFinishedStreamers(DBFormatter):
+
+    def execute(self, conn = None, transaction = False):
+
+        sql = """DELETE FROM streamer_pending_delete
+                 WHERE EXISTS (
+                   SELECT 1
+                   FROM run_stream_fileset_assoc
+                   INNER JOIN wmbs_fileset ON
+                     wmbs_fileset.id = run_stream_fileset_assoc.fileset AND
+                     wmbs_fileset.open = 0
+                   WHERE run_stream_fileset_assoc.run_id = streamer_pending_delete.run_id
+                   AND run_stream_fileset_assoc.stream_id = streamer_pending_delete.stream_id
+                 )
+                 AND NOT EXISTS (
+                   SELECT 1 FROM wmbs_sub_files_available
+                   WHERE wmbs_sub_files_available.fileid = streamer_pending_delete.id
+                 )
+                 AND NOT EXISTS (
+                   SELECT 1 FROM wmbs_sub_files_acquired
+                   WHERE wmbs_sub_files_acquired.fileid = streamer_pending_delete.id
+                 )
+                 """
+
+        self.dbi.processData(sql, {}, conn = conn,
+                             transaction = transaction)
+
+        return
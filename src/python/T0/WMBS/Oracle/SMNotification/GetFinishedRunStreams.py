@@ -0,0 +1,37 @@
+"""
+_GetFinishedRunStreams_
+
+Oracle implementation of GetFinishedRunStreams
+
+Returns run/stream combinations with closed run/stream
+filesets (run is over and all run/stream files are
+transfered/feed to Tier0) that still have streamers
+for which StorageManager wasn't notified.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetFinishedRunStreams(DBFormatter):
+
+    def execute(self, conn = None, transaction = False):
+
+        sql = """SELECT DISTINCT streamer_pending_delete.run_id,
+                                 streamer_pending_delete.stream_id
+                 FROM streamer_pending_delete
+                 INNER JOIN run_stream_fileset_assoc ON
+                   run_stream_fileset_assoc.run_id = streamer_pending_delete.run_id AND
+                   run_stream_fileset_assoc.stream_id = streamer_pending_delete.stream_id
+                 INNER JOIN wmbs_fileset ON
+                   wmbs_fileset.id = run_stream_fileset_assoc.fileset AND
+                   wmbs_fileset.open = 0
+                 """
+
+        results = self.dbi.processData(sql, {}, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        runStreams = []
+        for result in results:
+            runStreams.append( (result[0], result[1]) )
+
+        return sorted(runStreams)
@@ -3,9 +3,14 @@ _GetFinishedStreamers_
 
 Oracle implementation of GetFinishedStreamers
 
-Returns all streamer files that are in closed run/stream filesets
-(run is over and all run/stream files are transfered/feed to Tier0)
-and which are completely processed (file is not available or acquired).
+Returns one page of streamer files for a run/stream with a closed
+fileset (see GetFinishedRunStreams) which are completely processed
+(file is not available or acquired).
+
+Pages are ordered by streamer id and start after lastId, the
+caller keeps the cursor. Notified streamers are removed from the
+queue (see MarkStreamersFinished), so a restart just continues
+with what is left.
 
 """
 
@@ -13,29 +18,33 @@ from WMCore.Database.DBFormatter import DBFormatter
 
 class GetFinishedStreamers(DBFormatter):
 
-    def execute(self, conn = None, transaction = False):
-
-        sql = """SELECT streamer.id,
-                        wmbs_file_details.lfn
-                 FROM streamer
-                 INNER JOIN run_stream_fileset_assoc ON
-                   run_stream_fileset_assoc.run_id = streamer.run_id AND
-                   run_stream_fileset_assoc.stream_id = streamer.stream_id
-                 INNER JOIN wmbs_fileset ON
-                   wmbs_fileset.id = run_stream_fileset_assoc.fileset AND
-                   wmbs_fileset.open = 0
-                 LEFT OUTER JOIN wmbs_sub_files_available ON
-                   wmbs_sub_files_available.fileid = streamer.id
-                 LEFT OUTER JOIN wmbs_sub_files_acquired ON
-                   wmbs_sub_files_acquired.fileid = streamer.id
-                 INNER JOIN wmbs_file_details ON
-                   wmbs_file_details.id = streamer.id
-                 WHERE checkForZeroState(streamer.deleted) = 0
-                 AND wmbs_sub_files_available.fileid IS NULL
-                 AND wmbs_sub_files_acquired.fileid IS NULL
+    def execute(self, run, stream, lastId, maxStreamers, conn = None, transaction = False):
+
+        sql = """SELECT id, lfn FROM (
+                   SELECT streamer_pending_delete.id AS id,
+                          wmbs_file_details.lfn AS lfn
+                   FROM streamer_pending_delete
+                   LEFT OUTER JOIN wmbs_sub_files_available ON
+                     wmbs_sub_files_available.fileid = streamer_pending_delete.id
+                   LEFT OUTER JOIN wmbs_sub_files_acquired ON
+                     wmbs_sub_files_acquired.fileid = streamer_pending_delete.id
+                   INNER JOIN wmbs_file_details ON
+                     wmbs_file_details.id = streamer_pending_delete.id
+                   WHERE streamer_pending_delete.run_id = :RUN
+                   AND streamer_pending_delete.stream_id = :STREAM
+                   AND streamer_pending_delete.id > :LAST_ID
+                   AND wmbs_sub_files_available.fileid IS NULL
+                   AND wmbs_sub_files_acquired.fileid IS NULL
+                   ORDER BY streamer_pending_delete.id
+                 ) WHERE ROWNUM <= :MAX_STREAMERS
                  """
 
-        results = self.dbi.processData(sql, {}, conn = conn,
+        binds = { 'RUN' : run,
+                  'STREAM' : stream,
+                  'LAST_ID' : lastId,
+                  'MAX_STREAMERS' : maxStreamers }
+
+        results = self.dbi.processData(sql, binds, conn = conn,
                                        transaction = transaction)[0].fetchall()
 
         streamers = []
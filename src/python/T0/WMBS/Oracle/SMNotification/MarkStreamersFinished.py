@@ -28,4 +28,11 @@ class MarkStreamersFinished(DBFormatter):
         self.dbi.processData(sql, binds, conn = conn,
                              transaction = transaction)
 
+        sql = """DELETE FROM streamer_pending_delete
+                 WHERE id = :ID
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
         return
@@ -0,0 +1,46 @@
+"""
+_GetRepackOutputFractions_
+
+Oracle implementation of GetRepackOutputFractions
+
+For a given repack subscription return the fraction of the
+stream triggers that feed each primary dataset. Used as the
+predicted fraction of the repack input that ends up in each
+output dataset.
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetRepackOutputFractions(DBFormatter):
+
+    sql = """SELECT primary_dataset.name,
+                    COUNT(*)
+             FROM wmbs_subscription
+             INNER JOIN run_stream_fileset_assoc ON
+               run_stream_fileset_assoc.fileset = wmbs_subscription.fileset
+             INNER JOIN run_primds_stream_assoc ON
+               run_primds_stream_assoc.run_id = run_stream_fileset_assoc.run_id AND
+               run_primds_stream_assoc.stream_id = run_stream_fileset_assoc.stream_id
+             INNER JOIN run_trig_primds_assoc ON
+               run_trig_primds_assoc.run_id = run_primds_stream_assoc.run_id AND
+               run_trig_primds_assoc.primds_id = run_primds_stream_assoc.primds_id
+             INNER JOIN primary_dataset ON
+               primary_dataset.id = run_primds_stream_assoc.primds_id
+             WHERE wmbs_subscription.id = :subscription
+             GROUP BY primary_dataset.name
+             """
+
+    def execute(self, subscription, conn = None, transaction = False):
+
+        results = self.dbi.processData(self.sql, { 'subscription' : subscription },
+                                       conn = conn, transaction = transaction)[0].fetchall()
+
+        totalTriggers = 0
+        for result in results:
+            totalTriggers += result[1]
+
+        fractions = {}
+        for result in results:
+            fractions[result[0]] = float(result[1]) / totalTriggers
+
+        return fractions
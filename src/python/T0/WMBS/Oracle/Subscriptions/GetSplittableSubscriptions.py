@@ -0,0 +1,47 @@
+"""
+_GetSplittableSubscriptions_
+
+Oracle implementation of GetSplittableSubscriptions
+
+Return all subscriptions for the given splitting algorithms
+that have available files, with their workflow spec and task
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetSplittableSubscriptions(DBFormatter):
+
+    def execute(self, splitAlgos, conn = None, transaction = False):
+
+        binds = {}
+        algoBinds = []
+        for i, splitAlgo in enumerate(splitAlgos):
+            binds['ALGO%d' % i] = splitAlgo
+            algoBinds.append(':ALGO%d' % i)
+
+        sql = """SELECT wmbs_subscription.id,
+                        wmbs_subscription.split_algo,
+                        wmbs_workflow.spec,
+                        wmbs_workflow.task
+                 FROM wmbs_subscription
+                 INNER JOIN wmbs_workflow ON
+                   wmbs_workflow.id = wmbs_subscription.workflow
+                 WHERE wmbs_subscription.split_algo IN (%s)
+                 AND EXISTS (
+                   SELECT 1 FROM wmbs_sub_files_available
+                   WHERE wmbs_sub_files_available.subscription = wmbs_subscription.id
+                 )
+                 ORDER BY wmbs_subscription.id
+                 """ % ", ".join(algoBinds)
+
+        results = self.dbi.processData(sql, binds, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        subscriptions = []
+        for result in results:
+            subscriptions.append( { 'id' : result[0],
+                                    'split_algo' : result[1],
+                                    'spec' : result[2],
+                                    'task' : result[3] } )
+
+        return subscriptions
@@ -23,7 +23,10 @@ class GetExpressConfigs(DBFormatter):
                         express_config.dqm_seq AS dqm_seq,
                         express_config.global_tag AS global_tag,
                         event_scenario.name AS scenario
-                 FROM express_config
+                 FROM datasvc_pending
+                 INNER JOIN express_config ON
+                   express_config.run_id = datasvc_pending.run_id AND
+                   express_config.stream_id = datasvc_pending.item_id
                  INNER JOIN stream ON
                    stream.id = express_config.stream_id
                  INNER JOIN cmssw_version stream_version ON
@@ -37,7 +40,7 @@ class GetExpressConfigs(DBFormatter):
                    run_primds_scenario_assoc.primds_id = stream_special_primds_assoc.primds_id
                  INNER JOIN event_scenario ON
                    event_scenario.id = run_primds_scenario_assoc.scenario_id
-                 WHERE checkForZeroState(express_config.in_datasvc) = 0
+                 WHERE datasvc_pending.record_type = 'ExpressConfig'
                  """
 
         results = self.dbi.processData(sql, binds = {}, conn = conn,
@@ -22,7 +22,10 @@ class GetRecoConfigs(DBFormatter):
                         reco_config.dqm_seq AS dqm_seq,
                         reco_config.global_tag AS global_tag,
                         event_scenario.name AS scenario
-                 FROM reco_config
+                 FROM datasvc_pending
+                 INNER JOIN reco_config ON
+                   reco_config.run_id = datasvc_pending.run_id AND
+                   reco_config.primds_id = datasvc_pending.item_id
                  INNER JOIN primary_dataset ON
                    primary_dataset.id = reco_config.primds_id
                  INNER JOIN cmssw_version ON
@@ -32,7 +35,7 @@ class GetRecoConfigs(DBFormatter):
                    run_primds_scenario_assoc.primds_id = reco_config.primds_id
                  INNER JOIN event_scenario ON
                    event_scenario.id = run_primds_scenario_assoc.scenario_id
-                 WHERE checkForZeroState(reco_config.in_datasvc) = 0
+                 WHERE datasvc_pending.record_type = 'RecoConfig'
                  """
 
         results = self.dbi.processData(sql, binds = {}, conn = conn,
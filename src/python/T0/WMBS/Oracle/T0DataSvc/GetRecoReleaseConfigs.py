@@ -13,16 +13,21 @@ class GetRecoReleaseConfigs(DBFormatter):
 
     def execute(self, conn = None, transaction = False):
 
-        sql = """SELECT run_id AS run,
-                        MAX(released) AS released
-                        FROM (
-                          SELECT run_id, primds_id, in_datasvc, released
-                          FROM reco_release_config
-                          WHERE checkForZeroOneState(in_datasvc) = 0
-                          OR ( checkForZeroOneState(in_datasvc) = 1 AND released > 0 )
-                        )
-                        GROUP BY run_id
-                        """
+        #
+        # records stay queued until in_datasvc = 2 (released
+        # and in Tier0 Data Service), so in_datasvc is 0 or 1
+        #
+        sql = """SELECT reco_release_config.run_id AS run,
+                        MAX(reco_release_config.released) AS released
+                 FROM datasvc_pending
+                 INNER JOIN reco_release_config ON
+                   reco_release_config.run_id = datasvc_pending.run_id AND
+                   reco_release_config.primds_id = datasvc_pending.item_id
+                 WHERE datasvc_pending.record_type = 'RecoReleaseConfig'
+                 AND ( reco_release_config.in_datasvc = 0 OR
+                       reco_release_config.released > 0 )
+                 GROUP BY reco_release_config.run_id
+                 """
 
         results = self.dbi.processData(sql, binds = {}, conn = conn,
                                        transaction = transaction)
@@ -13,15 +13,15 @@ class GetRunStreamDone(DBFormatter):
 
     def execute(self, conn = None, transaction = False):
 
-        sql = """SELECT run_stream_done.run_id AS run,
+        sql = """SELECT datasvc_pending.run_id AS run,
                         stream.name AS stream
-                 FROM run_stream_done
+                 FROM datasvc_pending
                  INNER JOIN stream ON
-                   stream.id = run_stream_done.stream_id
+                   stream.id = datasvc_pending.item_id
                  LEFT OUTER JOIN run_stream_fileset_assoc ON
-                   run_stream_fileset_assoc.run_id = run_stream_done.run_id AND
-                   run_stream_fileset_assoc.stream_id = run_stream_done.stream_id
-                 WHERE checkForZeroState(run_stream_done.in_datasvc) = 0
+                   run_stream_fileset_assoc.run_id = datasvc_pending.run_id AND
+                   run_stream_fileset_assoc.stream_id = datasvc_pending.item_id
+                 WHERE datasvc_pending.record_type = 'RunStreamDone'
                  AND run_stream_fileset_assoc.run_id IS NULL
                  """
 
@@ -22,4 +22,13 @@ class UpdateExpressConfigs(DBFormatter):
         self.dbi.processData(sql, binds, conn = conn,
                              transaction = transaction)
 
+        sql = """DELETE FROM datasvc_pending
+                 WHERE record_type = 'ExpressConfig'
+                 AND run_id = :RUN
+                 AND item_id = (SELECT id FROM stream WHERE name = :STREAM)
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
         return
@@ -22,4 +22,13 @@ class UpdateRecoConfigs(DBFormatter):
         self.dbi.processData(sql, binds, conn = conn,
                              transaction = transaction)
 
+        sql = """DELETE FROM datasvc_pending
+                 WHERE record_type = 'RecoConfig'
+                 AND run_id = :RUN
+                 AND item_id = (SELECT id FROM primary_dataset WHERE name = :PRIMDS)
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
         return
@@ -21,4 +21,18 @@ class UpdateRecoReleaseConfigs(DBFormatter):
         self.dbi.processData(sql, binds, conn = conn,
                              transaction = transaction)
 
+        sql = """DELETE FROM datasvc_pending
+                 WHERE record_type = 'RecoReleaseConfig'
+                 AND EXISTS (
+                   SELECT 1
+                   FROM reco_release_config
+                   WHERE reco_release_config.run_id = datasvc_pending.run_id
+                   AND reco_release_config.primds_id = datasvc_pending.item_id
+                   AND reco_release_config.in_datasvc = 2
+                 )
+                 """
+
+        self.dbi.processData(sql, {}, conn = conn,
+                             transaction = transaction)
+
         return
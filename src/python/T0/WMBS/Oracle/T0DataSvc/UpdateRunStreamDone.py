@@ -22,4 +22,13 @@ class UpdateRunStreamDone(DBFormatter):
         self.dbi.processData(sql, binds, conn = conn,
                              transaction = transaction)
 
+        sql = """DELETE FROM datasvc_pending
+                 WHERE record_type = 'RunStreamDone'
+                 AND run_id = :RUN
+                 AND item_id = (SELECT id FROM stream WHERE name = :STREAM)
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
         return
@@ -0,0 +1,32 @@
+"""
+_GetActiveSplitLumiCount_
+
+Oracle implementation of GetActiveSplitLumiCount
+
+Return the number of lumis of a run that are still
+marked as being split by a subscription on the given
+run/stream fileset.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetActiveSplitLumiCount(DBFormatter):
+
+    def execute(self, run, fileset, conn = None, transaction = False):
+
+        sql = """SELECT COUNT(*)
+                 FROM lumi_section_split_active
+                 INNER JOIN wmbs_subscription ON
+                   wmbs_subscription.id = lumi_section_split_active.subscription AND
+                   wmbs_subscription.fileset = :FILESET
+                 WHERE lumi_section_split_active.run_id = :RUN
+                 """
+
+        binds = { 'RUN' : run,
+                  'FILESET' : fileset }
+
+        results = self.dbi.processData(sql, binds, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        return results[0][0]
@@ -0,0 +1,30 @@
+"""
+_GetClosedLumiCount_
+
+Oracle implementation of GetClosedLumiCount
+
+Return the number of lumis with EoLS records and the
+highest lumi with an EoLS record for a run/stream.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetClosedLumiCount(DBFormatter):
+
+    def execute(self, run, stream, conn = None, transaction = False):
+
+        sql = """SELECT COUNT(*),
+                        NVL(MAX(lumi_id), 0)
+                 FROM lumi_section_closed
+                 WHERE run_id = :RUN
+                 AND stream_id = :STREAM
+                 """
+
+        binds = { 'RUN' : run,
+                  'STREAM' : stream }
+
+        results = self.dbi.processData(sql, binds, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        return (results[0][0], results[0][1])
@@ -0,0 +1,48 @@
+"""
+_GetStreamerCountMismatches_
+
+Oracle implementation of GetStreamerCountMismatches
+
+Return lumis of a run/stream that are closed (have an
+EoLS record) but not finally closed, where the number
+of streamers doesn't match the EoLS file count. Only
+lumis closed before the given time are considered,
+their streamers had time to arrive.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetStreamerCountMismatches(DBFormatter):
+
+    def execute(self, run, stream, closedBefore, conn = None, transaction = False):
+
+        sql = """SELECT lumi_section_closed.lumi_id,
+                        lumi_section_closed.filecount,
+                        COUNT(streamer.id)
+                 FROM lumi_section_closed
+                 LEFT OUTER JOIN streamer ON
+                   streamer.run_id = lumi_section_closed.run_id AND
+                   streamer.stream_id = lumi_section_closed.stream_id AND
+                   streamer.lumi_id = lumi_section_closed.lumi_id
+                 WHERE lumi_section_closed.run_id = :RUN
+                 AND lumi_section_closed.stream_id = :STREAM
+                 AND lumi_section_closed.close_time = 0
+                 AND lumi_section_closed.insert_time < :TIME
+                 GROUP BY lumi_section_closed.lumi_id,
+                          lumi_section_closed.filecount
+                 HAVING COUNT(streamer.id) != lumi_section_closed.filecount
+                 """
+
+        binds = { 'RUN' : run,
+                  'STREAM' : stream,
+                  'TIME' : closedBefore }
+
+        results = self.dbi.processData(sql, binds, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        mismatches = {}
+        for result in results:
+            mismatches[result[0]] = (result[1], result[2])
+
+        return mismatches
@@ -0,0 +1,43 @@
+"""
+_ReplaceAuditFindings_
+
+Oracle implementation of ReplaceAuditFindings
+
+Replace the findings of a number of verified run/streams.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class ReplaceAuditFindings(DBFormatter):
+
+    def execute(self, runStreams, findings, conn = None, transaction = False):
+
+        if len(runStreams) == 0:
+            return
+
+        sql = """DELETE FROM audit_finding
+                 WHERE run_id = :RUN
+                 AND stream_id = :STREAM
+                 """
+
+        binds = []
+        for run, stream in runStreams:
+            binds.append( { 'RUN' : run,
+                            'STREAM' : stream } )
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        if len(findings) == 0:
+            return
+
+        sql = """INSERT INTO audit_finding
+                 (run_id, stream_id, check_name, detail, found_time)
+                 VALUES (:RUN, :STREAM, :CHECK, :DETAIL, :TIME)
+                 """
+
+        self.dbi.processData(sql, findings, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,36 @@
+"""
+_UpdateAuditCheckpoints_
+
+Oracle implementation of UpdateAuditCheckpoints
+
+Record that a number of run/streams were verified, up
+to which change and how many problems were found.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class UpdateAuditCheckpoints(DBFormatter):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """MERGE INTO audit_checkpoint a
+                 USING (
+                   SELECT :RUN AS run_id,
+                          :STREAM AS stream_id
+                   FROM DUAL
+                 ) b ON ( b.run_id = a.run_id AND
+                          b.stream_id = a.stream_id )
+                 WHEN MATCHED THEN UPDATE
+                   SET a.last_change = :LAST_CHANGE,
+                       a.check_time = :TIME,
+                       a.findings = :FINDINGS
+                 WHEN NOT MATCHED THEN
+                   INSERT (run_id, stream_id, last_change, check_time, findings)
+                   VALUES (b.run_id, b.stream_id, :LAST_CHANGE, :TIME, :FINDINGS)
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,31 @@
+"""
+_AcquireLeases_
+
+Oracle implementation of AcquireLeases
+
+Take or renew feeder lease partitions. A partition is
+only taken if it is unowned, expired or already owned
+by the caller, so concurrent feeders can't both win.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class AcquireLeases(DBFormatter):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """UPDATE feeder_lease
+                 SET owner = :OWNER,
+                     heartbeat = :NOW,
+                     expire_time = :EXPIRE_TIME
+                 WHERE partition_id = :PARTITION
+                 AND ( owner IS NULL OR
+                       owner = :OWNER OR
+                       expire_time <= :NOW )
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
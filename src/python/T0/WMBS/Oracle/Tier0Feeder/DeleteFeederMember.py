@@ -0,0 +1,28 @@
+"""
+_DeleteFeederMember_
+
+Oracle implementation of DeleteFeederMember
+
+Unregister a feeder instance, also drops expired
+registrations of other instances.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class DeleteFeederMember(DBFormatter):
+
+    def execute(self, owner, now, conn = None, transaction = False):
+
+        sql = """DELETE FROM feeder_member
+                 WHERE owner = :OWNER
+                 OR expire_time < :NOW
+                 """
+
+        binds = { 'OWNER' : owner,
+                  'NOW' : now }
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -9,6 +9,14 @@ check for new streamers and insert them into the
 appropriate fileset. Also mark streamers as used.
 Only consider streamers that are in closed lumis.
 
+Records the feed milestone in the latency ledger.
+
+With lease binds only streamers of run/streams in the
+partitions held by the feeder instance are fed.
+
+Returns the number of streamers waiting to be fed before
+feeding, a measure of the data taking activity.
+
 """
 
 import time
@@ -16,9 +24,25 @@ import logging
 
 from WMCore.Database.DBFormatter import DBFormatter
 
+from T0.WMBS.Oracle.Tier0Feeder.LeaseFilter import leaseJoin
+
 class FeedStreamers(DBFormatter):
 
-    def execute(self, conn = None, transaction = False):
+    def execute(self, lease = None, conn = None, transaction = False):
+
+        leaseFilter = ""
+        leaseBinds = {}
+        if lease != None:
+            leaseFilter = leaseJoin("streamer_pending_feed")
+            leaseBinds = lease
+
+        sql = """SELECT COUNT(*)
+                 FROM streamer_pending_feed
+                 %s
+                 """ % leaseFilter
+
+        pending = self.dbi.processData(sql, leaseBinds, conn = conn,
+                                       transaction = transaction)[0].fetchall()[0][0]
 
         #
         # query only works under the assumption that there
@@ -31,27 +55,47 @@ class FeedStreamers(DBFormatter):
                    INTO wmbs_sub_files_available
                      (SUBSCRIPTION, FILEID)
                      VALUES (subscription, fileid)
-                 SELECT streamer.id AS fileid,
+                 SELECT streamer_pending_feed.id AS fileid,
                         run_stream_fileset_assoc.fileset AS fileset,
                         wmbs_subscription.id AS subscription
-                 FROM streamer
+                 FROM streamer_pending_feed
                  INNER JOIN run_stream_fileset_assoc ON
-                   run_stream_fileset_assoc.run_id = streamer.run_id AND
-                   run_stream_fileset_assoc.stream_id = streamer.stream_id
+                   run_stream_fileset_assoc.run_id = streamer_pending_feed.run_id AND
+                   run_stream_fileset_assoc.stream_id = streamer_pending_feed.stream_id
                  INNER JOIN wmbs_fileset ON
                    wmbs_fileset.id = run_stream_fileset_assoc.fileset AND
                    wmbs_fileset.open = 1
                  INNER JOIN lumi_section_closed ON
-                   lumi_section_closed.run_id = streamer.run_id AND
-                   lumi_section_closed.stream_id = streamer.stream_id AND
-                   lumi_section_closed.lumi_id = streamer.lumi_id AND
+                   lumi_section_closed.run_id = streamer_pending_feed.run_id AND
+                   lumi_section_closed.stream_id = streamer_pending_feed.stream_id AND
+                   lumi_section_closed.lumi_id = streamer_pending_feed.lumi_id AND
                    lumi_section_closed.close_time > 0
                  INNER JOIN wmbs_subscription ON
                    wmbs_subscription.fileset = run_stream_fileset_assoc.fileset
-                 WHERE checkForZeroState(streamer.used) = 0
-                 """
+                 %s
+                 """ % leaseFilter
 
         binds = { 'TIME' : int(time.time()) }
+        self.dbi.processData(sql, dict(binds, **leaseBinds), conn = conn,
+                             transaction = transaction)
+
+        sql = """MERGE INTO latency_ledger a
+                 USING (
+                   SELECT DISTINCT streamer_pending_feed.run_id,
+                                   streamer_pending_feed.stream_id
+                   FROM streamer_pending_feed
+                   INNER JOIN wmbs_fileset_files ON
+                     wmbs_fileset_files.fileid = streamer_pending_feed.id
+                 ) b ON ( b.run_id = a.run_id AND
+                          b.stream_id = a.stream_id AND
+                          a.milestone = 'feed' )
+                 WHEN MATCHED THEN UPDATE
+                   SET a.last_time = :TIME
+                 WHEN NOT MATCHED THEN
+                   INSERT (run_id, stream_id, milestone, first_time, last_time)
+                   VALUES (b.run_id, b.stream_id, 'feed', :TIME, :TIME)
+                 """
+
         self.dbi.processData(sql, binds, conn = conn,
                              transaction = transaction)
 
@@ -61,11 +105,10 @@ class FeedStreamers(DBFormatter):
         #
         sql = """MERGE INTO streamer a
                  USING (
-                   SELECT streamer.id
-                   FROM streamer
+                   SELECT streamer_pending_feed.id
+                   FROM streamer_pending_feed
                    INNER JOIN wmbs_fileset_files ON
-                     wmbs_fileset_files.fileid = streamer.id
-                   WHERE checkForZeroState(streamer.used) = 0
+                     wmbs_fileset_files.fileid = streamer_pending_feed.id
                  ) b ON ( b.id = a.id )
                  WHEN MATCHED THEN UPDATE
                    SET a.used = 1
@@ -74,4 +117,18 @@ class FeedStreamers(DBFormatter):
         self.dbi.processData(sql, {}, conn = conn,
                              transaction = transaction)
 
-        return
+        #
+        # and removed from the feed queue
+        #
+        sql = """DELETE FROM streamer_pending_feed
+                 WHERE EXISTS (
+                   SELECT 1
+                   FROM wmbs_fileset_files
+                   WHERE wmbs_fileset_files.fileid = streamer_pending_feed.id
+                 )
+                 """
+
+        self.dbi.processData(sql, {}, conn = conn,
+                             transaction = transaction)
+
+        return pending
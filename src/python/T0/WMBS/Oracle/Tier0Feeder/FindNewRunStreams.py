@@ -6,13 +6,18 @@ Oracle implementation of FindNewRunStreams
 Returns a dictionary of run:streams for all run
 and stream combinations that are not configured.
 
+With lease binds only run/streams in the partitions
+held by the feeder instance are returned.
+
 """
 
 from WMCore.Database.DBFormatter import DBFormatter
 
+from T0.WMBS.Oracle.Tier0Feeder.LeaseFilter import leaseJoin
+
 class FindNewRunStreams(DBFormatter):
 
-    def execute(self, conn = None, transaction = False):
+    def execute(self, lease = None, conn = None, transaction = False):
 
         sql = """SELECT run_stream_cmssw_assoc.run_id,
                         stream.name
@@ -25,10 +30,18 @@ class FindNewRunStreams(DBFormatter):
                    run_stream_style_assoc.stream_id = run_stream_cmssw_assoc.stream_id
                  INNER JOIN stream ON
                    stream.id = run_stream_cmssw_assoc.stream_id
+                 %s
                  WHERE run_stream_style_assoc.run_id IS NULL
                  """
 
-        results = self.dbi.processData(sql, {}, conn = conn,
+        binds = {}
+        if lease == None:
+            sql = sql % ""
+        else:
+            sql = sql % leaseJoin("run_stream_cmssw_assoc")
+            binds.update(lease)
+
+        results = self.dbi.processData(sql, binds, conn = conn,
                                        transaction = transaction)[0].fetchall()
 
         runStreams = {}
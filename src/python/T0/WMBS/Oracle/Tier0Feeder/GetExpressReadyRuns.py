@@ -17,18 +17,18 @@ from sqlalchemy.exc import DatabaseError
 
 class GetExpressReadyRuns(DBFormatter):
 
-    def execute(self, binds, conn = None, transaction = False):
+    sql = """SELECT since
+             FROM CMS_CONDITIONS.IOV
+             WHERE tag_name LIKE 'runinfo_start_%_hlt'
+             AND SINCE = :RUN
+             GROUP BY since
+             HAVING COUNT(*) > 0
+             """
 
-        sql = """SELECT since
-                 FROM CMS_CONDITIONS.IOV
-                 WHERE tag_name LIKE 'runinfo_start_%_hlt'
-                 AND SINCE = :RUN
-                 GROUP BY since
-                 HAVING COUNT(*) > 0
-                 """
+    def execute(self, binds, conn = None, transaction = False):
 
         try:
-            results = self.dbi.processData(sql, binds, conn = conn,
+            results = self.dbi.processData(self.sql, binds, conn = conn,
                                            transaction = transaction)[0].fetchall()
         except DatabaseError as ex:
             logging.error("ERROR: DatabaseError exception when checking for express ready runs")
@@ -0,0 +1,28 @@
+"""
+_GetFeederMembers_
+
+Oracle implementation of GetFeederMembers
+
+Return the live (registration not expired) feeder instances.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetFeederMembers(DBFormatter):
+
+    def execute(self, now, conn = None, transaction = False):
+
+        sql = """SELECT owner
+                 FROM feeder_member
+                 WHERE expire_time > :NOW
+                 """
+
+        results = self.dbi.processData(sql, { 'NOW' : now }, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        members = []
+        for result in results:
+            members.append(result[0])
+
+        return members
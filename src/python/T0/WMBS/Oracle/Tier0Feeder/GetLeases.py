@@ -0,0 +1,33 @@
+"""
+_GetLeases_
+
+Oracle implementation of GetLeases
+
+Return owner, heartbeat and expiration time for all
+feeder lease partitions.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetLeases(DBFormatter):
+
+    def execute(self, conn = None, transaction = False):
+
+        sql = """SELECT partition_id,
+                        owner,
+                        heartbeat,
+                        expire_time
+                 FROM feeder_lease
+                 """
+
+        results = self.dbi.processData(sql, {}, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        leases = {}
+        for result in results:
+            leases[result[0]] = { 'owner' : result[1],
+                                  'heartbeat' : result[2],
+                                  'expire_time' : result[3] }
+
+        return leases
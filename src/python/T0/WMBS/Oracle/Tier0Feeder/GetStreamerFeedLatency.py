@@ -0,0 +1,32 @@
+"""
+_GetStreamerFeedLatency_
+
+Oracle implementation of GetStreamerFeedLatency
+
+Return the time in seconds between registration and feeding
+into the run/stream fileset for all streamers registered
+since the given time that have been fed.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class GetStreamerFeedLatency(DBFormatter):
+
+    def execute(self, since, conn = None, transaction = False):
+
+        sql = """SELECT wmbs_fileset_files.insert_time - streamer.insert_time
+                 FROM streamer
+                 INNER JOIN wmbs_fileset_files ON
+                   wmbs_fileset_files.fileid = streamer.id
+                 WHERE streamer.insert_time >= :SINCE
+                 """
+
+        results = self.dbi.processData(sql, { 'SINCE' : since }, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        latencies = []
+        for result in results:
+            latencies.append(result[0])
+
+        return latencies
@@ -0,0 +1,36 @@
+"""
+_InsertLeasePartitions_
+
+Oracle implementation of InsertLeasePartitions
+
+Create the unowned feeder lease records for
+partitions that don't have one yet.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class InsertLeasePartitions(DBFormatter):
+
+    def execute(self, partitions, conn = None, transaction = False):
+
+        sql = """MERGE INTO feeder_lease
+                 USING (
+                   SELECT :PARTITION AS partition_id
+                   FROM DUAL
+                 ) new_lease ON (
+                   feeder_lease.partition_id = new_lease.partition_id
+                 )
+                 WHEN NOT MATCHED THEN
+                   INSERT (partition_id, owner, heartbeat, expire_time)
+                   VALUES (new_lease.partition_id, NULL, 0, 0)
+                 """
+
+        binds = []
+        for partition in range(partitions):
+            binds.append( { 'PARTITION' : partition } )
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
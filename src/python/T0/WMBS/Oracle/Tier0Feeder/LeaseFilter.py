@@ -0,0 +1,25 @@
+"""
+_LeaseFilter_
+
+Restricts run/stream scoped Tier0Feeder queries to the
+partitions held by a feeder instance.
+
+The lease binds (OWNER, PARTITIONS, NOW) are provided by
+PartitionLeases.leaseBinds(), without them the queries
+cover all run/streams.
+
+"""
+
+def leaseJoin(table):
+    """
+    _leaseJoin_
+
+    Join clause matching the run/streams of table against the
+    unexpired leases of the owner
+
+    """
+    return """INNER JOIN feeder_lease ON
+                   feeder_lease.partition_id = MOD(%s.run_id + %s.stream_id, :PARTITIONS) AND
+                   feeder_lease.owner = :OWNER AND
+                   feeder_lease.expire_time > :NOW
+                 """ % (table, table)
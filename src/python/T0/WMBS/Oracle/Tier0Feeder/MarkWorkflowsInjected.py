@@ -44,11 +44,10 @@ class MarkWorkflowsInjected(DBFormatter):
                 run_stream_style_assoc.run_id = run_stream_fileset_assoc.run_id AND
                 run_stream_style_assoc.stream_id =   run_stream_fileset_assoc.stream_id AND
                 run_stream_style_assoc.style_id = (SELECT id FROM processing_style WHERE name = 'Express')
-              LEFT OUTER JOIN streamer ON
-                streamer.run_id = run_stream_fileset_assoc.run_id AND
-                streamer.stream_id = run_stream_fileset_assoc.stream_id AND
-                checkForZeroState(streamer.deleted) = 0
-            WHERE streamer.run_id IS NULL
+              LEFT OUTER JOIN streamer_pending_delete ON
+                streamer_pending_delete.run_id = run_stream_fileset_assoc.run_id AND
+                streamer_pending_delete.stream_id = run_stream_fileset_assoc.stream_id
+            WHERE streamer_pending_delete.run_id IS NULL
             GROUP BY wmbs_workflow.name
           )
           """
@@ -71,17 +70,16 @@ class MarkWorkflowsInjected(DBFormatter):
                 run_stream_style_assoc.run_id = run_stream_fileset_assoc.run_id AND
                 run_stream_style_assoc.stream_id =   run_stream_fileset_assoc.stream_id AND
                 run_stream_style_assoc.style_id = (SELECT id FROM processing_style WHERE name = 'Bulk')
-              LEFT OUTER JOIN streamer ON
-                streamer.run_id = run_stream_fileset_assoc.run_id AND
-                streamer.stream_id = run_stream_fileset_assoc.stream_id AND
-                checkForZeroState(streamer.deleted) = 0
+              LEFT OUTER JOIN streamer_pending_delete ON
+                streamer_pending_delete.run_id = run_stream_fileset_assoc.run_id AND
+                streamer_pending_delete.stream_id = run_stream_fileset_assoc.stream_id
               INNER JOIN run_primds_stream_assoc ON
                 run_primds_stream_assoc.run_id = run_stream_fileset_assoc.run_id AND
                 run_primds_stream_assoc.stream_id =   run_stream_fileset_assoc.stream_id
               LEFT OUTER JOIN reco_config ON
                 reco_config.run_id = run_stream_fileset_assoc.run_id AND
                 reco_config.primds_id = run_primds_stream_assoc.primds_id
-            WHERE streamer.run_id IS NULL
+            WHERE streamer_pending_delete.run_id IS NULL
             GROUP BY wmbs_workflow.name
             HAVING COUNT(reco_config.run_id) = COUNT(*)
           )
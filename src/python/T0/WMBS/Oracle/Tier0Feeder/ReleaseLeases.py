@@ -0,0 +1,26 @@
+"""
+_ReleaseLeases_
+
+Oracle implementation of ReleaseLeases
+
+Give up feeder lease partitions owned by the caller.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class ReleaseLeases(DBFormatter):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """UPDATE feeder_lease
+                 SET owner = NULL,
+                     expire_time = 0
+                 WHERE partition_id = :PARTITION
+                 AND owner = :OWNER
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,38 @@
+"""
+_UpdateFeederMember_
+
+Oracle implementation of UpdateFeederMember
+
+Register a feeder instance or renew its registration.
+
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class UpdateFeederMember(DBFormatter):
+
+    def execute(self, owner, now, expireTime, conn = None, transaction = False):
+
+        sql = """MERGE INTO feeder_member
+                 USING (
+                   SELECT :OWNER AS owner
+                   FROM DUAL
+                 ) new_member ON (
+                   feeder_member.owner = new_member.owner
+                 )
+                 WHEN MATCHED THEN
+                   UPDATE SET feeder_member.heartbeat = :NOW,
+                              feeder_member.expire_time = :EXPIRE_TIME
+                 WHEN NOT MATCHED THEN
+                   INSERT (owner, heartbeat, expire_time)
+                   VALUES (new_member.owner, :NOW, :EXPIRE_TIME)
+                 """
+
+        binds = { 'OWNER' : owner,
+                  'NOW' : now,
+                  'EXPIRE_TIME' : expireTime }
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,320 @@
+"""
+_QueryLog_
+
+Opt-in query instrumentation for the T0.WMBS DAOs
+
+With a QueryLog set in the DAO cache (DAOCache.setQueryLog) every
+DAO created through cachedDAOFactory gets its database interface
+wrapped in a ProfiledDBInterface. Every processData call is recorded
+with the DAO class, elapsed time, number of bind sets and the rows
+returned or changed. Failed calls are recorded as errors.
+
+Statements slower than the threshold go to the slow query log,
+a file with one JSON record per line. The first time a DAO statement
+is slow its execution plan is captured as well (EXPLAIN PLAN with
+DBMS_XPLAN on Oracle, EXPLAIN QUERY PLAN on SQLite).
+
+Calls are summed up per DAO and hour. When the hour is over the
+DAOs are ranked by total time, the top of the ranking is logged
+and the full summary is appended to the slow query log, see
+T0.Monitoring.QueryReport for the report.
+
+"""
+import json
+import logging
+import threading
+import time
+
+# statements EXPLAIN PLAN can be run for
+explainableStatements = [ "SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "MERGE" ]
+
+
+def rowCount(results):
+    """
+    _rowCount_
+
+    Rows returned (queries) or changed (DML) by a processData call
+
+    """
+    rows = 0
+    for result in results:
+        data = getattr(result, 'data', None)
+        if data:
+            rows += len(data)
+        else:
+            rows += max(getattr(result, 'rowcount', 0) or 0, 0)
+    return rows
+
+
+class ProfiledDBInterface(object):
+    """
+    _ProfiledDBInterface_
+
+    Wraps the database interface of a DAO, records processData
+    calls in the query log. Everything else is passed through to
+    the wrapped interface.
+
+    """
+    def __init__(self, queryLog, daoName, dbInterface):
+        self.queryLog = queryLog
+        self.daoName = daoName
+        self.dbInterface = dbInterface
+
+    def processData(self, sqlstmt, binds = {}, conn = None,
+                    transaction = False, returnCursor = False):
+        """
+        _processData_
+
+        Failed calls are recorded with their elapsed time and
+        the error flag, the exception is passed on
+
+        """
+        results = None
+        error = True
+        startTime = time.time()
+        try:
+            results = self.dbInterface.processData(sqlstmt, binds, conn = conn,
+                                                   transaction = transaction,
+                                                   returnCursor = returnCursor)
+            error = False
+        finally:
+            elapsed = time.time() - startTime
+
+            if isinstance(binds, list):
+                bindCount = len(binds)
+            else:
+                bindCount = 1
+
+            rows = None
+            if not returnCursor and not error:
+                rows = rowCount(results)
+
+            self.queryLog.record(self.daoName, sqlstmt, binds, elapsed, bindCount, rows,
+                                 self.dbInterface, error = error)
+
+        return results
+
+    def __getattr__(self, name):
+        return getattr(self.dbInterface, name)
+
+
+class QueryLog(object):
+    """
+    _QueryLog_
+
+    Per DAO and hour query statistics, slow query log and
+    execution plan capture
+
+    """
+    def __init__(self, threshold = 1.0, slowLogFile = None, explain = True, top = 10):
+        """
+        threshold is the elapsed time in seconds above which a
+        statement is logged as slow, slowLogFile the file the slow
+        statements and hourly summaries are appended to (logged
+        only if None), top the number of DAOs logged per hour
+
+        """
+        self.threshold = threshold
+        self.slowLogFile = slowLogFile
+        self.explain = explain
+        self.top = top
+
+        self.lock = threading.Lock()
+
+        # DAO statements that were slow before
+        self.explained = set()
+        self.planCount = 0
+
+        self.hour = None
+        self.daos = {}
+
+        return
+
+    def record(self, daoName, sql, binds, elapsed, bindCount, rows, dbInterface,
+               error = False, now = None):
+        """
+        _record_
+
+        Record one processData call, error if it raised. No execution
+        plan is captured for failed statements.
+
+        """
+        if now == None:
+            now = time.time()
+        hour = int(now // 3600) * 3600
+
+        slow = elapsed > self.threshold
+
+        with self.lock:
+
+            if self.hour != None and hour > self.hour:
+                self._closeHour()
+            if self.hour == None or hour > self.hour:
+                self.hour = hour
+
+            stats = self.daos.setdefault(daoName, { 'calls' : 0,
+                                                    'total_time' : 0.0,
+                                                    'max_time' : 0.0,
+                                                    'binds' : 0,
+                                                    'rows' : 0,
+                                                    'slow' : 0,
+                                                    'errors' : 0 })
+            stats['calls'] += 1
+            stats['total_time'] += elapsed
+            stats['max_time'] = max(stats['max_time'], elapsed)
+            stats['binds'] += bindCount
+            if rows != None:
+                stats['rows'] += rows
+            if error:
+                stats['errors'] += 1
+
+            if not slow:
+                return
+
+            stats['slow'] += 1
+
+            sql = " ".join(sql.split())
+            firstTime = (daoName, sql) not in self.explained
+            self.explained.add( (daoName, sql) )
+
+        entry = { 'type' : "slow",
+                  'time' : int(now),
+                  'dao' : daoName,
+                  'elapsed' : round(elapsed, 3),
+                  'binds' : bindCount,
+                  'rows' : rows,
+                  'error' : error,
+                  'sql' : sql }
+
+        if firstTime and self.explain and not error:
+            if isinstance(binds, list):
+                binds = binds[0] if len(binds) > 0 else {}
+            entry['plan'] = self.explainPlan(dbInterface, sql, binds)
+
+        if error:
+            logging.warning("Slow failed query in %s : %.3fs, %d bind sets" % (daoName, elapsed, bindCount))
+        else:
+            logging.warning("Slow query in %s : %.3fs, %d bind sets, %s rows" % (daoName, elapsed, bindCount, rows))
+
+        self._write(entry)
+
+        return
+
+    def explainPlan(self, dbInterface, sql, binds):
+        """
+        _explainPlan_
+
+        Execution plan of the statement as a list of lines, None
+        if the statement or database isn't supported or the plan
+        can't be retrieved
+
+        """
+        keyword = sql.split(None, 1)[0].upper() if sql.strip() else ""
+        if keyword not in explainableStatements:
+            return None
+
+        dialect = dbInterface.engine.dialect.name
+
+        try:
+
+            if dialect == "sqlite":
+
+                results = dbInterface.processData("EXPLAIN QUERY PLAN %s" % sql, binds,
+                                                  transaction = False)
+                return [ row[3] for row in results[0].fetchall() ]
+
+            elif dialect == "oracle":
+
+                with self.lock:
+                    self.planCount += 1
+                    statementId = "T0QL%d" % self.planCount
+
+                # same connection, PLAN_TABLE is session private
+                conn = dbInterface.connection()
+                try:
+                    dbInterface.processData("EXPLAIN PLAN SET STATEMENT_ID = '%s' FOR %s" % (statementId, sql),
+                                            binds, conn = conn, transaction = False)
+                    results = dbInterface.processData("""SELECT plan_table_output
+                                                         FROM TABLE(DBMS_XPLAN.DISPLAY('PLAN_TABLE', :STATEMENT_ID, 'TYPICAL'))
+                                                         """, { 'STATEMENT_ID' : statementId },
+                                                      conn = conn, transaction = False)
+                    plan = [ row[0] for row in results[0].fetchall() ]
+                    dbInterface.processData("DELETE FROM plan_table WHERE statement_id = :STATEMENT_ID",
+                                            { 'STATEMENT_ID' : statementId },
+                                            conn = conn, transaction = False)
+                finally:
+                    conn.close()
+
+                return plan
+
+        except Exception as ex:
+            logging.warning("Can't capture the execution plan : %s" % str(ex))
+
+        return None
+
+    def summary(self):
+        """
+        _summary_
+
+        Statistics of the current hour per DAO
+
+        """
+        with self.lock:
+            return self.hour, dict([ (daoName, dict(stats)) for daoName, stats in self.daos.items() ])
+
+    def flush(self):
+        """
+        _flush_
+
+        Close the current hour
+
+        """
+        with self.lock:
+            if self.hour != None:
+                self._closeHour()
+                self.hour = None
+        return
+
+    def _closeHour(self):
+        """
+        _closeHour_
+
+        Log the ranking of the finished hour and write its summary,
+        called with the lock held
+
+        """
+        ranking = sorted(self.daos.items(), key = lambda item: item[1]['total_time'], reverse = True)
+
+        hourString = time.strftime("%Y-%m-%d %H:00", time.gmtime(self.hour))
+        for daoName, stats in ranking[:self.top]:
+            logging.info("DAO time %s UTC : %s %.3fs in %d calls (%d slow, %d failed)" % (hourString, daoName,
+                                                                                           stats['total_time'],
+                                                                                           stats['calls'],
+                                                                                           stats['slow'],
+                                                                                           stats['errors']))
+
+        self._write( { 'type' : "hour",
+                       'time' : self.hour,
+                       'daos' : self.daos } )
+
+        self.daos = {}
+
+        return
+
+    def _write(self, entry):
+        """
+        _write_
+
+        Append an entry to the slow query log
+
+        """
+        if self.slowLogFile == None:
+            return
+
+        try:
+            with open(self.slowLogFile, 'a') as logFile:
+                logFile.write(json.dumps(entry, sort_keys = True) + "\n")
+        except IOError as ex:
+            logging.error("Can't write to the slow query log %s : %s" % (self.slowLogFile, str(ex)))
+
+        return
@@ -0,0 +1,25 @@
+"""
+_GetUnfinishedRunStreams_
+
+SQLite implementation of GetUnfinishedRunStreams
+"""
+
+from T0.WMBS.Oracle.ConditionUpload.GetUnfinishedRunStreams import GetUnfinishedRunStreams as OracleGetUnfinishedRunStreams
+
+class GetUnfinishedRunStreams(OracleGetUnfinishedRunStreams):
+
+    def execute(self, conn = None, transaction = False):
+
+        sql = """SELECT run_id, stream_id
+                 FROM prompt_calib
+                 WHERE finished = 0
+                 """
+
+        results = self.dbi.processData(sql, {}, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        runStreams = {}
+        for result in results:
+            runStreams.setdefault(result[0], []).append(result[1])
+
+        return runStreams
@@ -0,0 +1,23 @@
+"""
+_RecordConditionsUploaded_
+
+SQLite implementation of RecordConditionsUploaded
+"""
+
+from T0.WMBS.Oracle.ConditionUpload.RecordConditionsUploaded import RecordConditionsUploaded as OracleRecordConditionsUploaded
+
+class RecordConditionsUploaded(OracleRecordConditionsUploaded):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO latency_ledger
+                 (RUN_ID, STREAM_ID, MILESTONE, FIRST_TIME, LAST_TIME)
+                 VALUES (:RUN, :STREAMID, 'conditions_uploaded', :TIME, :TIME)
+                 ON CONFLICT (run_id, stream_id, milestone) DO UPDATE
+                   SET last_time = MAX(last_time, excluded.last_time)
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
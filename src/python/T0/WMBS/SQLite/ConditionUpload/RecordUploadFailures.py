@@ -0,0 +1,24 @@
+"""
+_RecordUploadFailures_
+
+SQLite implementation of RecordUploadFailures
+"""
+
+from T0.WMBS.Oracle.ConditionUpload.RecordUploadFailures import RecordUploadFailures as OracleRecordUploadFailures
+
+class RecordUploadFailures(OracleRecordUploadFailures):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO prompt_calib_upload
+                 (RUN_ID, STREAM_ID, PAYLOAD, ATTEMPTS, LAST_ATTEMPT)
+                 VALUES (:RUN, :STREAMID, :PAYLOAD, 1, :TIME)
+                 ON CONFLICT (run_id, stream_id, payload) DO UPDATE
+                   SET attempts = attempts + 1,
+                       last_attempt = excluded.last_attempt
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
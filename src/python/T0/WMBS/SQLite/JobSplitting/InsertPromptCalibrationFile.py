@@ -0,0 +1,69 @@
+"""
+_InsertPromptCalibrationFile_
+
+SQLite implementation of InsertPromptCalibrationFile
+"""
+
+import time
+
+from T0.WMBS.Oracle.JobSplitting.InsertPromptCalibrationFile import InsertPromptCalibrationFile as OracleInsertPromptCalibrationFile
+
+class InsertPromptCalibrationFile(OracleInsertPromptCalibrationFile):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO prompt_calib_file
+                 (RUN_ID, STREAM_ID, FILEID, SUBSCRIPTION)
+                 SELECT :RUN_ID, id, :FILEID, :SUBSCRIPTION
+                 FROM stream
+                 WHERE name = :STREAM
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        sql = """INSERT INTO wmbs_sub_files_acquired
+                 (SUBSCRIPTION, FILEID)
+                 SELECT :SUBSCRIPTION, :FILEID
+                 FROM stream
+                 WHERE name = :STREAM
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        sql = """INSERT INTO prompt_calib_pending
+                 (RUN_ID, STREAM_ID, INSERT_TIME)
+                 SELECT prompt_calib.run_id,
+                        prompt_calib.stream_id,
+                        :TIME
+                 FROM prompt_calib
+                 INNER JOIN stream ON
+                   stream.id = prompt_calib.stream_id
+                 WHERE prompt_calib.run_id = :RUN_ID
+                 AND stream.name = :STREAM
+                 ON CONFLICT (run_id, stream_id) DO UPDATE
+                   SET insert_time = excluded.insert_time
+                 """
+
+        pendingBinds = {}
+        for bind in binds:
+            pendingBinds[(bind['RUN_ID'], bind['STREAM'])] = { 'RUN_ID' : bind['RUN_ID'],
+                                                               'STREAM' : bind['STREAM'],
+                                                               'TIME' : int(time.time()) }
+
+        self.dbi.processData(sql, list(pendingBinds.values()), conn = conn,
+                             transaction = transaction)
+
+        for bind in binds:
+            del bind['RUN_ID']
+            del bind['STREAM']
+
+        sql = """DELETE FROM wmbs_sub_files_available
+                 WHERE subscription = :SUBSCRIPTION
+                 AND fileid = :FILEID"""
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
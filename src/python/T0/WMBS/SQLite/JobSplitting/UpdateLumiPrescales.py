@@ -0,0 +1,20 @@
+"""
+_UpdateLumiPrescales_
+
+SQLite implementation of UpdateLumiPrescales
+"""
+
+from T0.WMBS.Oracle.JobSplitting.UpdateLumiPrescales import UpdateLumiPrescales as OracleUpdateLumiPrescales
+
+class UpdateLumiPrescales(OracleUpdateLumiPrescales):
+
+    sql = """INSERT INTO lumi_section_prescale
+             (SUBSCRIPTION, RUN_ID, LUMI_ID, PRESCALE, EVENTS_TOTAL, EVENTS_ACCEPTED)
+             SELECT :SUB, run_id, :LUMI, :PRESCALE, :EVENTS_TOTAL, :EVENTS_ACCEPTED
+             FROM run_stream_fileset_assoc
+             WHERE fileset = (SELECT fileset FROM wmbs_subscription WHERE id = :SUB)
+             ON CONFLICT (subscription, run_id, lumi_id) DO UPDATE
+               SET prescale = excluded.prescale,
+                   events_total = excluded.events_total,
+                   events_accepted = excluded.events_accepted
+             """
@@ -0,0 +1,9 @@
+"""
+_Latency_
+
+SQLite Latency DAOs, falls back to the Oracle module for
+the DAOs without an implementation of their own
+
+"""
+from T0.WMBS.SQLite import addOracleFallback
+addOracleFallback(__path__)
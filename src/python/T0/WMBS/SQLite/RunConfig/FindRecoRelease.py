@@ -0,0 +1,29 @@
+"""
+_FindRecoRelease_
+
+SQLite implementation of FindRecoRelease
+"""
+
+from T0.WMBS.Oracle.RunConfig.FindRecoRelease import FindRecoRelease as OracleFindRecoRelease
+
+class FindRecoRelease(OracleFindRecoRelease):
+
+    preReleaseSql = """UPDATE reco_release_config
+                       SET released = 1,
+                           delay = (SELECT delay FROM reco_release_delay
+                                    WHERE primds_id = reco_release_config.primds_id),
+                           delay_offset = (SELECT delay_offset FROM reco_release_delay
+                                           WHERE primds_id = reco_release_config.primds_id)
+                       WHERE released = 0
+                       AND (run_id, primds_id) IN (
+                         SELECT reco_release_pending.run_id,
+                                reco_release_pending.primds_id
+                         FROM reco_release_pending
+                         INNER JOIN run ON
+                           run.run_id = reco_release_pending.run_id
+                         INNER JOIN reco_release_delay ON
+                           reco_release_delay.primds_id = reco_release_pending.primds_id
+                         WHERE run.stop_time + reco_release_delay.delay - reco_release_delay.delay_offset < :NOW
+                         AND run.stop_time > 0
+                       )
+                       """
@@ -0,0 +1,22 @@
+"""
+_GetHLTConfig_
+
+SQLite implementation of GetHLTConfig
+
+There is no SQLite HLTConfDB, this queries the HLT menu
+stand-in used by the Tier0Feeder load test, see
+T0.LoadTest.StandIns
+"""
+
+from T0.WMBS.Oracle.RunConfig.GetHLTConfig import GetHLTConfig as OracleGetHLTConfig
+
+class GetHLTConfig(OracleGetHLTConfig):
+
+    sql = """SELECT DISTINCT stream AS stream,
+                             dataset AS dataset,
+                             path AS path,
+                             process AS process
+             FROM hlt_menu
+             WHERE hltkey = :HLTKEY
+             ORDER BY stream, dataset, path
+             """
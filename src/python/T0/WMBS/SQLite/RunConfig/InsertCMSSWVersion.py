@@ -0,0 +1,22 @@
+"""
+_InsertCMSSWVersion_
+
+SQLite implementation of InsertCMSSWVersion
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertCMSSWVersion import InsertCMSSWVersion as OracleInsertCMSSWVersion
+
+class InsertCMSSWVersion(OracleInsertCMSSWVersion):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO cmssw_version
+                 (NAME)
+                 VALUES (:VERSION)
+                 ON CONFLICT (name) DO NOTHING
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,22 @@
+"""
+_InsertLumiSection_
+
+SQLite implementation of InsertLumiSection
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertLumiSection import InsertLumiSection as OracleInsertLumiSection
+
+class InsertLumiSection(OracleInsertLumiSection):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO lumi_section
+                 (RUN_ID, LUMI_ID)
+                 VALUES (:RUN, :LUMI)
+                 ON CONFLICT (run_id, lumi_id) DO NOTHING
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
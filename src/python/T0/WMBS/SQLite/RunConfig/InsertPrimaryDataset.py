@@ -0,0 +1,22 @@
+"""
+_InsertPrimaryDataset_
+
+SQLite implementation of InsertPrimaryDataset
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertPrimaryDataset import InsertPrimaryDataset as OracleInsertPrimaryDataset
+
+class InsertPrimaryDataset(OracleInsertPrimaryDataset):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO primary_dataset
+                 (NAME)
+                 VALUES (:PRIMDS)
+                 ON CONFLICT (name) DO NOTHING
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,22 @@
+"""
+_InsertRun_
+
+SQLite implementation of InsertRun
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertRun import InsertRun as OracleInsertRun
+
+class InsertRun(OracleInsertRun):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO run
+                 (RUN_ID, LAST_UPDATED, HLTKEY, START_TIME)
+                 VALUES (:RUN, :TIME, :HLTKEY, :TIME)
+                 ON CONFLICT (run_id) DO NOTHING
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
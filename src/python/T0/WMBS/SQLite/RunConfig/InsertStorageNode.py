@@ -0,0 +1,21 @@
+"""
+_InsertStorageNode_
+
+SQLite implementation of InsertStorageNode
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertStorageNode import InsertStorageNode as OracleInsertStorageNode
+
+class InsertStorageNode(OracleInsertStorageNode):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO storage_node
+                 (NAME)
+                 VALUES (:NODE)
+                 ON CONFLICT (name) DO NOTHING
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+        return
@@ -0,0 +1,22 @@
+"""
+_InsertStream_
+
+SQLite implementation of InsertStream
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertStream import InsertStream as OracleInsertStream
+
+class InsertStream(OracleInsertStream):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO stream
+                 (NAME)
+                 VALUES (:STREAM)
+                 ON CONFLICT (name) DO NOTHING
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,40 @@
+"""
+_InsertStreamFileset_
+
+SQLite implementation of InsertStreamFileset
+"""
+
+import time
+
+from T0.WMBS.Oracle.RunConfig.InsertStreamFileset import InsertStreamFileset as OracleInsertStreamFileset
+
+class InsertStreamFileset(OracleInsertStreamFileset):
+
+    def execute(self, run, stream, name, conn = None, transaction = False):
+
+        binds = { 'RUN' : run,
+                  'STREAM' : stream,
+                  'NAME' : name,
+                  'TIME' : int(time.time()) }
+
+        sql = """INSERT INTO wmbs_fileset
+                 (NAME, LAST_UPDATE, OPEN)
+                 SELECT :NAME, :TIME, 1
+                 FROM stream
+                 WHERE name = :STREAM
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        sql = """INSERT INTO run_stream_fileset_assoc
+                 (RUN_ID, STREAM_ID, FILESET)
+                 SELECT :RUN, stream.id, wmbs_fileset.id
+                 FROM stream, wmbs_fileset
+                 WHERE stream.name = :STREAM
+                 AND wmbs_fileset.name = :NAME
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+        return
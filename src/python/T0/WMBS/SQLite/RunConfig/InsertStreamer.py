@@ -0,0 +1,79 @@
+"""
+_InsertStreamer_
+
+SQLite implementation of InsertStreamer
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertStreamer import InsertStreamer as OracleInsertStreamer
+
+class InsertStreamer(OracleInsertStreamer):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        #
+        # file id is assigned on insert, the other
+        # records look it up by lfn
+        #
+        sql = """INSERT INTO wmbs_file_details
+                 (LFN, FILESIZE, EVENTS, MERGED)
+                 SELECT :LFN, :FILESIZE, :EVENTS, 1
+                 FROM stream
+                 WHERE name = :STREAM
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        sql = """INSERT INTO wmbs_file_runlumi_map
+                 (FILEID, RUN, LUMI)
+                 SELECT id, :RUN, :LUMI
+                 FROM wmbs_file_details
+                 WHERE lfn = :LFN
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        sql = """INSERT INTO streamer
+                 (ID, RUN_ID, STREAM_ID, LUMI_ID, INSERT_TIME)
+                 SELECT wmbs_file_details.id, :RUN, stream.id, :LUMI, :TIME
+                 FROM wmbs_file_details, stream
+                 WHERE wmbs_file_details.lfn = :LFN
+                 AND stream.name = :STREAM
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        if type(binds) == dict:
+            binds = [ binds ]
+
+        milestones = {}
+        for bind in binds:
+            key = (bind['RUN'], bind['STREAM'])
+            if key in milestones:
+                milestones[key]['FIRST'] = min(milestones[key]['FIRST'], bind['TIME'])
+                milestones[key]['LAST'] = max(milestones[key]['LAST'], bind['TIME'])
+            else:
+                milestones[key] = { 'RUN' : bind['RUN'],
+                                    'STREAM' : bind['STREAM'],
+                                    'FIRST' : bind['TIME'],
+                                    'LAST' : bind['TIME'] }
+
+        if len(milestones) == 0:
+            return
+
+        sql = """INSERT INTO latency_ledger
+                 (RUN_ID, STREAM_ID, MILESTONE, FIRST_TIME, LAST_TIME)
+                 SELECT :RUN, id, 'streamer', :FIRST, :LAST
+                 FROM stream
+                 WHERE name = :STREAM
+                 ON CONFLICT (run_id, stream_id, milestone) DO UPDATE
+                   SET first_time = MIN(first_time, excluded.first_time),
+                       last_time = MAX(last_time, excluded.last_time)
+                 """
+
+        self.dbi.processData(sql, list(milestones.values()), conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,22 @@
+"""
+_InsertTrigger_
+
+SQLite implementation of InsertTrigger
+"""
+
+from T0.WMBS.Oracle.RunConfig.InsertTrigger import InsertTrigger as OracleInsertTrigger
+
+class InsertTrigger(OracleInsertTrigger):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO trigger_label
+                 (NAME)
+                 VALUES (:TRIG)
+                 ON CONFLICT (name) DO NOTHING
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
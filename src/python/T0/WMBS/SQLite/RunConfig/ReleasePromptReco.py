@@ -0,0 +1,51 @@
+"""
+_ReleasePromptReco_
+
+SQLite implementation of ReleasePromptReco
+"""
+
+from T0.WMBS.Oracle.RunConfig.ReleasePromptReco import ReleasePromptReco as OracleReleasePromptReco
+
+class ReleasePromptReco(OracleReleasePromptReco):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """UPDATE reco_release_config
+                 SET released = :NOW
+                 WHERE run_id = :RUN
+                 AND primds_id = (SELECT id FROM primary_dataset WHERE name = :PRIMDS)
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        sql = """INSERT INTO latency_ledger
+                 (RUN_ID, STREAM_ID, MILESTONE, FIRST_TIME, LAST_TIME)
+                 SELECT run_primds_stream_assoc.run_id,
+                        run_primds_stream_assoc.stream_id,
+                        'reco_released', :NOW, :NOW
+                 FROM run_primds_stream_assoc
+                 WHERE run_primds_stream_assoc.run_id = :RUN
+                 AND run_primds_stream_assoc.primds_id = (SELECT id FROM primary_dataset WHERE name = :PRIMDS)
+                 ON CONFLICT (run_id, stream_id, milestone) DO UPDATE
+                   SET first_time = MIN(first_time, excluded.first_time),
+                       last_time = MAX(last_time, excluded.last_time)
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        sql = """DELETE FROM reco_release_pending
+                 WHERE EXISTS (
+                   SELECT 1
+                   FROM reco_release_config
+                   WHERE reco_release_config.run_id = reco_release_pending.run_id
+                   AND reco_release_config.primds_id = reco_release_pending.primds_id
+                   AND reco_release_config.released > 1
+                 )
+                 """
+
+        self.dbi.processData(sql, {}, conn = conn,
+                             transaction = transaction)
+
+        return
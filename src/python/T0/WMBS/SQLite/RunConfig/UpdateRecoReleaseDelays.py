@@ -0,0 +1,19 @@
+"""
+_UpdateRecoReleaseDelays_
+
+SQLite implementation of UpdateRecoReleaseDelays
+"""
+
+from T0.WMBS.Oracle.RunConfig.UpdateRecoReleaseDelays import UpdateRecoReleaseDelays as OracleUpdateRecoReleaseDelays
+
+class UpdateRecoReleaseDelays(OracleUpdateRecoReleaseDelays):
+
+    sql = """INSERT INTO reco_release_delay
+             (PRIMDS_ID, DELAY, DELAY_OFFSET)
+             SELECT id, :DELAY, :DELAY_OFFSET
+             FROM primary_dataset
+             WHERE name = :PRIMDS
+             ON CONFLICT (primds_id) DO UPDATE
+               SET delay = excluded.delay,
+                   delay_offset = excluded.delay_offset
+             """
@@ -0,0 +1,18 @@
+"""
+_CheckEndOfRunRecords_
+
+SQLite implementation of CheckEndOfRunRecords
+
+Queries the StorageManager stand-in used by the
+Tier0Feeder load test
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.CheckEndOfRunRecords import CheckEndOfRunRecords as OracleCheckEndOfRunRecords
+
+class CheckEndOfRunRecords(OracleCheckEndOfRunRecords):
+
+    sql = """
+          SELECT smdb.runnumber, smdb.instance, smdb.status, smdb.n_instances
+                 FROM runs smdb
+                 WHERE smdb.runnumber IN (%s)
+          """
@@ -0,0 +1,97 @@
+"""
+_CloseRunStreamFilesets_
+
+SQLite implementation of CloseRunStreamFilesets
+"""
+
+import time
+
+from T0.WMBS.Oracle.RunLumiCloseout.CloseRunStreamFilesets import CloseRunStreamFilesets as OracleCloseRunStreamFilesets
+from T0.WMBS.SQLite.Tier0Feeder.LeaseFilter import leaseJoin
+
+class CloseRunStreamFilesets(OracleCloseRunStreamFilesets):
+
+    def execute(self, lease = None, conn = None, transaction = False):
+
+        sql = """SELECT b.run_id AS run_id,
+                        b.stream_id AS stream_id,
+                        b.fileset AS fileset
+                 FROM (
+                   SELECT run_stream_fileset_assoc.run_id AS run_id,
+                          run_stream_fileset_assoc.stream_id AS stream_id,
+                          run_stream_fileset_assoc.fileset AS fileset
+                   FROM run_stream_fileset_assoc
+                   INNER JOIN wmbs_fileset ON
+                     wmbs_fileset.id = run_stream_fileset_assoc.fileset AND
+                     wmbs_fileset.open = 1
+                   INNER JOIN run ON
+                     run.run_id = run_stream_fileset_assoc.run_id AND
+                     run.stop_time > 0 AND
+                     run.close_time > 0
+                   %s
+                   INNER JOIN lumi_section_closed ON
+                     lumi_section_closed.run_id = run_stream_fileset_assoc.run_id AND
+                     lumi_section_closed.stream_id = run_stream_fileset_assoc.stream_id
+                   GROUP BY run_stream_fileset_assoc.run_id,
+                            run_stream_fileset_assoc.stream_id,
+                            run_stream_fileset_assoc.fileset
+                   HAVING SUM(CASE
+                                WHEN lumi_section_closed.close_time = 0 THEN 0
+                                ELSE 1
+                              END) = MAX(lumi_section_closed.lumi_id)
+                   AND MAX(lumi_section_closed.lumi_id) = MAX(run.lumicount)
+                 ) b
+                 LEFT OUTER JOIN streamer_pending_feed ON
+                   streamer_pending_feed.run_id = b.run_id AND
+                   streamer_pending_feed.stream_id = b.stream_id
+                 WHERE streamer_pending_feed.run_id IS NULL
+                 GROUP BY b.run_id,
+                          b.stream_id,
+                          b.fileset
+                 """
+
+        binds = {}
+        if lease == None:
+            sql = sql % ""
+        else:
+            sql = sql % leaseJoin("run_stream_fileset_assoc")
+            binds.update(lease)
+
+        results = self.dbi.processData(sql, binds, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        if len(results) == 0:
+            return 0
+
+        closeTime = int(time.time())
+
+        bindsFileset = []
+        bindsLedger = []
+        for result in results:
+            bindsFileset.append( { 'FILESET' : result[2],
+                                   'CLOSE_TIME' : closeTime } )
+            bindsLedger.append( { 'RUN' : result[0],
+                                  'STREAMID' : result[1],
+                                  'CLOSE_TIME' : closeTime } )
+
+        sql = """UPDATE wmbs_fileset
+                 SET open = 0,
+                     last_update = :CLOSE_TIME
+                 WHERE id = :FILESET
+                 AND open = 1
+                 """
+
+        self.dbi.processData(sql, bindsFileset, conn = conn,
+                             transaction = transaction)
+
+        sql = """INSERT INTO latency_ledger
+                 (RUN_ID, STREAM_ID, MILESTONE, FIRST_TIME, LAST_TIME)
+                 VALUES (:RUN, :STREAMID, 'fileset_closed', :CLOSE_TIME, :CLOSE_TIME)
+                 ON CONFLICT (run_id, stream_id, milestone) DO UPDATE
+                   SET last_time = excluded.last_time
+                 """
+
+        self.dbi.processData(sql, bindsLedger, conn = conn,
+                             transaction = transaction)
+
+        return len(results)
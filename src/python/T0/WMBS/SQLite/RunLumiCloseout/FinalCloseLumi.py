@@ -0,0 +1,72 @@
+"""
+_FinalCloseLumi_
+
+SQLite implementation of FinalCloseLumi
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.FinalCloseLumi import FinalCloseLumi as OracleFinalCloseLumi
+from T0.WMBS.SQLite.Tier0Feeder.LeaseFilter import leaseJoin
+
+class FinalCloseLumi(OracleFinalCloseLumi):
+
+    def execute(self, currentTime, lease = None, conn = None, transaction = False):
+
+        binds = { 'CLOSE_TIME' : currentTime }
+
+        leaseFilter = ""
+        if lease != None:
+            leaseFilter = leaseJoin("lumi_section_closed")
+            binds.update(lease)
+
+        sql = """INSERT INTO latency_ledger
+                 (RUN_ID, STREAM_ID, MILESTONE, FIRST_TIME, LAST_TIME)
+                 SELECT DISTINCT c.run_id, c.stream_id,
+                                 'lumi_closed', :CLOSE_TIME, :CLOSE_TIME
+                 FROM (
+                     SELECT lumi_section_closed.run_id,
+                            lumi_section_closed.stream_id
+                     FROM lumi_section_closed
+                     INNER JOIN streamer ON
+                       streamer.run_id = lumi_section_closed.run_id AND
+                       streamer.stream_id = lumi_section_closed.stream_id AND
+                       streamer.lumi_id = lumi_section_closed.lumi_id
+                     %s
+                     WHERE lumi_section_closed.close_time = 0
+                     GROUP BY lumi_section_closed.run_id,
+                              lumi_section_closed.stream_id,
+                              lumi_section_closed.lumi_id
+                     HAVING COUNT(*) = MAX(lumi_section_closed.filecount)
+                 ) c
+                 WHERE true
+                 ON CONFLICT (run_id, stream_id, milestone) DO UPDATE
+                   SET last_time = excluded.last_time
+                 """ % leaseFilter
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        sql = """UPDATE lumi_section_closed
+                 SET close_time = :CLOSE_TIME
+                 WHERE close_time = 0
+                 AND (run_id, stream_id, lumi_id) IN (
+                   SELECT lumi_section_closed.run_id,
+                          lumi_section_closed.stream_id,
+                          lumi_section_closed.lumi_id
+                   FROM lumi_section_closed
+                   INNER JOIN streamer ON
+                     streamer.run_id = lumi_section_closed.run_id AND
+                     streamer.stream_id = lumi_section_closed.stream_id AND
+                     streamer.lumi_id = lumi_section_closed.lumi_id
+                   %s
+                   WHERE lumi_section_closed.close_time = 0
+                   GROUP BY lumi_section_closed.run_id,
+                            lumi_section_closed.stream_id,
+                            lumi_section_closed.lumi_id
+                   HAVING COUNT(*) = MAX(lumi_section_closed.filecount)
+                 )
+                 """ % leaseFilter
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
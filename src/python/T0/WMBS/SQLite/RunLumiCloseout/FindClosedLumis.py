@@ -0,0 +1,48 @@
+"""
+_FindClosedLumis_
+
+SQLite implementation of FindClosedLumis
+
+Queries the StorageManager stand-in used by the
+Tier0Feeder load test
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.FindClosedLumis import FindClosedLumis as OracleFindClosedLumis
+
+class FindClosedLumis(OracleFindClosedLumis):
+
+    runsSql = """SELECT a.runnumber
+                 FROM runs a
+                 WHERE a.runnumber = :RUN
+                 GROUP BY a.runnumber
+                 HAVING COUNT(*) = MAX(a.n_instances)
+                 """
+
+    lumisSql = """SELECT a.runnumber, a.stream, a.lumisection, SUM(a.filecount)
+                  FROM streams a
+                  INNER JOIN runs b ON
+                    b.runnumber = a.runnumber AND
+                    b.instance = a.instance
+                  WHERE a.runnumber = :RUN
+                  AND a.stream = :STREAM
+                  AND a.lumisection > :LUMI
+                  GROUP BY a.runnumber, a.stream, a.lumisection
+                  HAVING ( COUNT(*) = ( SELECT COUNT(*)
+                                        FROM runs c
+                                        WHERE c.runnumber = a.runnumber ) AND
+                           COUNT(*) = ( SELECT MAX(c.n_instances)
+                                        FROM runs c
+                                        WHERE c.runnumber = a.runnumber ) )
+                  OR ( COUNT(*) = SUM(CASE
+                                        WHEN b.status = 1 THEN 1000
+                                        WHEN b.n_lumisections < a.lumisection THEN 0
+                                        ELSE 1
+                                      END) AND
+                       COUNT(*) = ( SELECT SUM(CASE
+                                                 WHEN c.status = 1 THEN 1000
+                                                 WHEN c.n_lumisections < a.lumisection THEN 0
+                                                 ELSE 1
+                                               END)
+                                           FROM runs c
+                                           WHERE c.runnumber = a.runnumber ) )
+                  """
@@ -0,0 +1,20 @@
+"""
+_FindClosedRuns_
+
+SQLite implementation of FindClosedRuns
+
+Queries the StorageManager stand-in used by the
+Tier0Feeder load test
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.FindClosedRuns import FindClosedRuns as OracleFindClosedRuns
+
+class FindClosedRuns(OracleFindClosedRuns):
+
+    sql = """SELECT a.runnumber, MAX(a.n_lumisections)
+             FROM runs a
+             WHERE a.runnumber IN (%s)
+             AND a.status = 0
+             GROUP BY a.runnumber
+             HAVING COUNT(*) = MAX(a.n_instances)
+             """
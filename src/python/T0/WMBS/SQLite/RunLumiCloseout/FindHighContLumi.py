@@ -0,0 +1,66 @@
+"""
+_FindHighContLumi_
+
+SQLite implementation of FindHighContLumi
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.FindHighContLumi import FindHighContLumi as OracleFindHighContLumi
+from T0.WMBS.SQLite.Tier0Feeder.LeaseFilter import leaseJoin
+
+class FindHighContLumi(OracleFindHighContLumi):
+
+    def execute(self, lease = None, conn = None, transaction = False):
+
+        sql = """SELECT a.run_id, stream.name, a.lumi_id
+                 FROM (
+                   SELECT run_id AS run_id,
+                          stream_id AS stream_id,
+                          CASE
+                            WHEN MIN(min_lumi) = 1 THEN IFNULL(MIN(current_lumi),0)
+                            ELSE 0
+                          END AS lumi_id
+                   FROM (
+                     SELECT run_stream_fileset_assoc.run_id AS run_id,
+                            run_stream_fileset_assoc.stream_id AS stream_id,
+                            lumi_section_closed.lumi_id AS current_lumi,
+                            LEAD(lumi_section_closed.lumi_id, 1, NULL)
+                              OVER (PARTITION BY run_stream_fileset_assoc.run_id,
+                                                 run_stream_fileset_assoc.stream_id
+                                    ORDER BY lumi_section_closed.lumi_id) AS next_lumi,
+                            MIN(lumi_section_closed.lumi_id)
+                              OVER (PARTITION BY run_stream_fileset_assoc.run_id,
+                                                 run_stream_fileset_assoc.stream_id
+                                    ORDER BY lumi_section_closed.lumi_id) AS min_lumi
+                     FROM run_stream_fileset_assoc
+                     INNER JOIN wmbs_fileset ON
+                       wmbs_fileset.id = run_stream_fileset_assoc.fileset AND
+                       wmbs_fileset.open = 1
+                     %s
+                     LEFT OUTER JOIN lumi_section_closed ON
+                       lumi_section_closed.run_id = run_stream_fileset_assoc.run_id AND
+                       lumi_section_closed.stream_id = run_stream_fileset_assoc.stream_id
+                   )
+                   WHERE current_lumi + 1 != next_lumi OR next_lumi IS NULL
+                   GROUP BY run_id, stream_id
+                 ) a
+                 INNER JOIN stream ON
+                   stream.id = a.stream_id
+                 """
+
+        binds = {}
+        if lease == None:
+            sql = sql % ""
+        else:
+            sql = sql % leaseJoin("run_stream_fileset_assoc")
+            binds.update(lease)
+
+        results = self.dbi.processData(sql, binds, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        runStreamLumis = []
+        for result in results:
+            runStreamLumis.append( { 'RUN' : result[0],
+                                     'STREAM' : result[1],
+                                     'LUMI' : result[2] } )
+
+        return runStreamLumis
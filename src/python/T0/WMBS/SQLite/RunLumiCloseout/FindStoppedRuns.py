@@ -0,0 +1,20 @@
+"""
+_FindStoppedRuns_
+
+SQLite implementation of FindStoppedRuns
+
+Queries the RunSummary stand-in used by the Tier0Feeder
+load test, start and stop times are stored as seconds
+since the epoch
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.FindStoppedRuns import FindStoppedRuns as OracleFindStoppedRuns
+
+class FindStoppedRuns(OracleFindStoppedRuns):
+
+    sql = """SELECT runnumber, starttime, stoptime
+             FROM runsummary
+             WHERE runnumber IN (%s)
+             AND starttime IS NOT NULL
+             AND stoptime IS NOT NULL
+             """
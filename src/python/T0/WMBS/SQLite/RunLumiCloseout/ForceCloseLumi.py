@@ -0,0 +1,17 @@
+"""
+_ForceCloseLumi_
+
+SQLite implementation of ForceCloseLumi
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.ForceCloseLumi import ForceCloseLumi as OracleForceCloseLumi
+
+class ForceCloseLumi(OracleForceCloseLumi):
+
+    sql = """INSERT INTO lumi_section_closed
+             (run_id, lumi_id, stream_id, filecount, insert_time, close_time)
+             VALUES (:RUN_ID, :LUMI_ID, :STREAM_ID, 0, :CURRENT_TIME, :CURRENT_TIME)
+             ON CONFLICT (run_id, stream_id, lumi_id) DO UPDATE
+               SET filecount = 0,
+                   close_time = excluded.close_time
+          """
@@ -0,0 +1,39 @@
+"""
+_GetFileCountOnOpenLumis_
+
+SQLite implementation of GetFileCountOnOpenLumis
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.GetFileCountOnOpenLumis import GetFileCountOnOpenLumis as OracleGetFileCountOnOpenLumis
+
+class GetFileCountOnOpenLumis(OracleGetFileCountOnOpenLumis):
+
+    sql = """SELECT lumi_section_closed.run_id,
+                    lumi_section_closed.lumi_id,
+                    lumi_section_closed.stream_id,
+                    stream.name,
+                    lumi_section_closed.filecount AS expected_filecount,
+                    COUNT(streamer.id) AS filecount
+             FROM lumi_section_closed
+             INNER JOIN stream ON
+                 stream.id = lumi_section_closed.stream_id
+             LEFT OUTER JOIN streamer ON
+                 streamer.lumi_id = lumi_section_closed.lumi_id AND
+                 streamer.stream_id = lumi_section_closed.stream_id AND
+                 streamer.run_id = lumi_section_closed.run_id
+             WHERE lumi_section_closed.close_time = 0 AND
+                   lumi_section_closed.run_id IN (%s)
+             GROUP BY lumi_section_closed.run_id,
+                      lumi_section_closed.lumi_id,
+                      lumi_section_closed.stream_id,
+                      stream.name,
+                      lumi_section_closed.filecount
+             ORDER BY lumi_section_closed.run_id,
+                      lumi_section_closed.lumi_id,
+                      lumi_section_closed.stream_id,
+                      stream.name,
+                      lumi_section_closed.filecount
+          """
+
+    # stay below the default SQLite bind variable limit
+    chunkSize = 500
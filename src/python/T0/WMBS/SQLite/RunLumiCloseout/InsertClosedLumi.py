@@ -0,0 +1,64 @@
+"""
+_InsertClosedLumi_
+
+SQLite implementation of InsertClosedLumi
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.InsertClosedLumi import InsertClosedLumi as OracleInsertClosedLumi
+
+class InsertClosedLumi(OracleInsertClosedLumi):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO lumi_section_closed
+                 (RUN_ID, LUMI_ID, STREAM_ID, FILECOUNT, INSERT_TIME, CLOSE_TIME)
+                 SELECT :RUN,
+                        :LUMI,
+                        stream.id,
+                        :FILECOUNT,
+                        :INSERT_TIME,
+                        :CLOSE_TIME
+                 FROM stream
+                 WHERE stream.name = :STREAM
+                 AND NOT EXISTS (
+                   SELECT * FROM lumi_section_closed
+                   WHERE run_id = :RUN
+                   AND lumi_id = :LUMI
+                   AND stream_id = stream.id
+                 )"""
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        if type(binds) == dict:
+            binds = [ binds ]
+
+        milestones = {}
+        for bind in binds:
+            key = (bind['RUN'], bind['STREAM'])
+            if key in milestones:
+                milestones[key]['FIRST'] = min(milestones[key]['FIRST'], bind['INSERT_TIME'])
+                milestones[key]['LAST'] = max(milestones[key]['LAST'], bind['INSERT_TIME'])
+            else:
+                milestones[key] = { 'RUN' : bind['RUN'],
+                                    'STREAM' : bind['STREAM'],
+                                    'FIRST' : bind['INSERT_TIME'],
+                                    'LAST' : bind['INSERT_TIME'] }
+
+        if len(milestones) == 0:
+            return
+
+        sql = """INSERT INTO latency_ledger
+                 (RUN_ID, STREAM_ID, MILESTONE, FIRST_TIME, LAST_TIME)
+                 SELECT :RUN, id, 'eols', :FIRST, :LAST
+                 FROM stream
+                 WHERE name = :STREAM
+                 ON CONFLICT (run_id, stream_id, milestone) DO UPDATE
+                   SET first_time = MIN(first_time, excluded.first_time),
+                       last_time = MAX(last_time, excluded.last_time)
+                 """
+
+        self.dbi.processData(sql, list(milestones.values()), conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,25 @@
+"""
+_PurgeRun_
+
+SQLite implementation of PurgeRun
+"""
+
+from T0.WMBS.Oracle.RunLumiCloseout.PurgeRun import PurgeRun as OraclePurgeRun
+
+class PurgeRun(OraclePurgeRun):
+
+    def execute(self, run, conn = None, transaction = False):
+
+        binds = { 'RUN' : run }
+
+        # no partitions, the run is deleted from all tables
+        for table in self.partitionedTables + self.runTables:
+
+            sql = """DELETE FROM %s
+                     WHERE run_id = :RUN
+                     """ % table
+
+            self.dbi.processData(sql, binds, conn = conn,
+                                 transaction = transaction)
+
+        return
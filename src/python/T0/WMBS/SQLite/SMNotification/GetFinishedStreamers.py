@@ -0,0 +1,43 @@
+"""
+_GetFinishedStreamers_
+
+SQLite implementation of GetFinishedStreamers
+"""
+
+from T0.WMBS.Oracle.SMNotification.GetFinishedStreamers import GetFinishedStreamers as OracleGetFinishedStreamers
+
+class GetFinishedStreamers(OracleGetFinishedStreamers):
+
+    def execute(self, run, stream, lastId, maxStreamers, conn = None, transaction = False):
+
+        sql = """SELECT streamer_pending_delete.id AS id,
+                        wmbs_file_details.lfn AS lfn
+                 FROM streamer_pending_delete
+                 LEFT OUTER JOIN wmbs_sub_files_available ON
+                   wmbs_sub_files_available.fileid = streamer_pending_delete.id
+                 LEFT OUTER JOIN wmbs_sub_files_acquired ON
+                   wmbs_sub_files_acquired.fileid = streamer_pending_delete.id
+                 INNER JOIN wmbs_file_details ON
+                   wmbs_file_details.id = streamer_pending_delete.id
+                 WHERE streamer_pending_delete.run_id = :RUN
+                 AND streamer_pending_delete.stream_id = :STREAM
+                 AND streamer_pending_delete.id > :LAST_ID
+                 AND wmbs_sub_files_available.fileid IS NULL
+                 AND wmbs_sub_files_acquired.fileid IS NULL
+                 ORDER BY streamer_pending_delete.id
+                 LIMIT :MAX_STREAMERS
+                 """
+
+        binds = { 'RUN' : run,
+                  'STREAM' : stream,
+                  'LAST_ID' : lastId,
+                  'MAX_STREAMERS' : maxStreamers }
+
+        results = self.dbi.processData(sql, binds, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        streamers = []
+        for result in results:
+            streamers.append( (result[0], result[1]) )
+
+        return streamers
@@ -0,0 +1,15 @@
+"""
+_HaveAvailableFile_
+
+SQLite implementation of HaveAvailableFile
+"""
+
+from T0.WMBS.Oracle.Subscriptions.HaveAvailableFile import HaveAvailableFile as OracleHaveAvailableFile
+
+class HaveAvailableFile(OracleHaveAvailableFile):
+
+    sql = """SELECT 1
+             FROM wmbs_sub_files_available
+             WHERE wmbs_sub_files_available.subscription = :subscription
+             LIMIT 1
+             """
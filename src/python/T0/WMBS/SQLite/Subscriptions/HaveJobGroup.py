@@ -0,0 +1,15 @@
+"""
+_HaveJobGroup_
+
+SQLite implementation of HaveJobGroup
+"""
+
+from T0.WMBS.Oracle.Subscriptions.HaveJobGroup import HaveJobGroup as OracleHaveJobGroup
+
+class HaveJobGroup(OracleHaveJobGroup):
+
+    sql = """SELECT 1
+             FROM wmbs_jobgroup
+             WHERE wmbs_jobgroup.subscription = :subscription
+             LIMIT 1
+             """
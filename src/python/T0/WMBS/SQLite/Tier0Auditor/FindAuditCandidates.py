@@ -0,0 +1,63 @@
+"""
+_FindAuditCandidates_
+
+SQLite implementation of FindAuditCandidates
+"""
+
+from T0.WMBS.Oracle.Tier0Auditor.FindAuditCandidates import FindAuditCandidates as OracleFindAuditCandidates
+
+class FindAuditCandidates(OracleFindAuditCandidates):
+
+    def execute(self, conn = None, transaction = False):
+
+        sql = """SELECT run_stream_fileset_assoc.run_id AS run,
+                        run_stream_fileset_assoc.stream_id AS stream,
+                        run_stream_fileset_assoc.fileset AS fileset,
+                        run.stop_time AS stop_time,
+                        run.close_time AS close_time,
+                        run.lumicount AS lumicount,
+                        MAX(IFNULL(lumi_change.last_change, 0),
+                            IFNULL(streamer_change.last_change, 0)) AS last_change,
+                        audit_checkpoint.last_change AS checkpoint,
+                        audit_checkpoint.check_time AS check_time
+                 FROM run_stream_fileset_assoc
+                 INNER JOIN wmbs_fileset ON
+                   wmbs_fileset.id = run_stream_fileset_assoc.fileset AND
+                   wmbs_fileset.open = 1
+                 INNER JOIN run ON
+                   run.run_id = run_stream_fileset_assoc.run_id
+                 LEFT OUTER JOIN (
+                   SELECT run_id, stream_id,
+                          MAX(MAX(insert_time, close_time)) AS last_change
+                   FROM lumi_section_closed
+                   WHERE run_id IN (SELECT a.run_id
+                                    FROM run_stream_fileset_assoc a
+                                    INNER JOIN wmbs_fileset b ON
+                                      b.id = a.fileset AND
+                                      b.open = 1)
+                   GROUP BY run_id, stream_id
+                 ) lumi_change ON
+                   lumi_change.run_id = run_stream_fileset_assoc.run_id AND
+                   lumi_change.stream_id = run_stream_fileset_assoc.stream_id
+                 LEFT OUTER JOIN (
+                   SELECT run_id, stream_id,
+                          MAX(insert_time) AS last_change
+                   FROM streamer
+                   WHERE run_id IN (SELECT a.run_id
+                                    FROM run_stream_fileset_assoc a
+                                    INNER JOIN wmbs_fileset b ON
+                                      b.id = a.fileset AND
+                                      b.open = 1)
+                   GROUP BY run_id, stream_id
+                 ) streamer_change ON
+                   streamer_change.run_id = run_stream_fileset_assoc.run_id AND
+                   streamer_change.stream_id = run_stream_fileset_assoc.stream_id
+                 LEFT OUTER JOIN audit_checkpoint ON
+                   audit_checkpoint.run_id = run_stream_fileset_assoc.run_id AND
+                   audit_checkpoint.stream_id = run_stream_fileset_assoc.stream_id
+                 """
+
+        results = self.dbi.processData(sql, {}, conn = conn,
+                                       transaction = transaction)
+
+        return self.formatDict(results)
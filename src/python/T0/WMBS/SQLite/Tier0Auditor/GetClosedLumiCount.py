@@ -0,0 +1,26 @@
+"""
+_GetClosedLumiCount_
+
+SQLite implementation of GetClosedLumiCount
+"""
+
+from T0.WMBS.Oracle.Tier0Auditor.GetClosedLumiCount import GetClosedLumiCount as OracleGetClosedLumiCount
+
+class GetClosedLumiCount(OracleGetClosedLumiCount):
+
+    def execute(self, run, stream, conn = None, transaction = False):
+
+        sql = """SELECT COUNT(*),
+                        IFNULL(MAX(lumi_id), 0)
+                 FROM lumi_section_closed
+                 WHERE run_id = :RUN
+                 AND stream_id = :STREAM
+                 """
+
+        binds = { 'RUN' : run,
+                  'STREAM' : stream }
+
+        results = self.dbi.processData(sql, binds, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        return (results[0][0], results[0][1])
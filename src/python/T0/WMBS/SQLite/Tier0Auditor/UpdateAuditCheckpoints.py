@@ -0,0 +1,25 @@
+"""
+_UpdateAuditCheckpoints_
+
+SQLite implementation of UpdateAuditCheckpoints
+"""
+
+from T0.WMBS.Oracle.Tier0Auditor.UpdateAuditCheckpoints import UpdateAuditCheckpoints as OracleUpdateAuditCheckpoints
+
+class UpdateAuditCheckpoints(OracleUpdateAuditCheckpoints):
+
+    def execute(self, binds, conn = None, transaction = False):
+
+        sql = """INSERT INTO audit_checkpoint
+                 (RUN_ID, STREAM_ID, LAST_CHANGE, CHECK_TIME, FINDINGS)
+                 VALUES (:RUN, :STREAM, :LAST_CHANGE, :TIME, :FINDINGS)
+                 ON CONFLICT (run_id, stream_id) DO UPDATE
+                   SET last_change = excluded.last_change,
+                       check_time = excluded.check_time,
+                       findings = excluded.findings
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,124 @@
+"""
+_FeedStreamers_
+
+SQLite implementation of FeedStreamers
+"""
+
+import time
+import logging
+
+from T0.WMBS.Oracle.Tier0Feeder.FeedStreamers import FeedStreamers as OracleFeedStreamers
+from T0.WMBS.SQLite.Tier0Feeder.LeaseFilter import leaseJoin
+
+class FeedStreamers(OracleFeedStreamers):
+
+    def execute(self, lease = None, conn = None, transaction = False):
+
+        leaseFilter = ""
+        leaseBinds = {}
+        if lease != None:
+            leaseFilter = leaseJoin("streamer_pending_feed")
+            leaseBinds = lease
+
+        sql = """SELECT COUNT(*)
+                 FROM streamer_pending_feed
+                 %s
+                 """ % leaseFilter
+
+        pending = self.dbi.processData(sql, leaseBinds, conn = conn,
+                                       transaction = transaction)[0].fetchall()[0][0]
+
+        #
+        # query only works under the assumption that there
+        # is a single subscription on the run/stream fileset
+        #
+        sql = """SELECT streamer_pending_feed.id AS fileid,
+                        run_stream_fileset_assoc.fileset AS fileset,
+                        wmbs_subscription.id AS subscription
+                 FROM streamer_pending_feed
+                 INNER JOIN run_stream_fileset_assoc ON
+                   run_stream_fileset_assoc.run_id = streamer_pending_feed.run_id AND
+                   run_stream_fileset_assoc.stream_id = streamer_pending_feed.stream_id
+                 INNER JOIN wmbs_fileset ON
+                   wmbs_fileset.id = run_stream_fileset_assoc.fileset AND
+                   wmbs_fileset.open = 1
+                 INNER JOIN lumi_section_closed ON
+                   lumi_section_closed.run_id = streamer_pending_feed.run_id AND
+                   lumi_section_closed.stream_id = streamer_pending_feed.stream_id AND
+                   lumi_section_closed.lumi_id = streamer_pending_feed.lumi_id AND
+                   lumi_section_closed.close_time > 0
+                 INNER JOIN wmbs_subscription ON
+                   wmbs_subscription.fileset = run_stream_fileset_assoc.fileset
+                 %s
+                 """ % leaseFilter
+
+        binds = { 'TIME' : int(time.time()) }
+
+        #
+        # no multi table insert, both inserts select the same
+        # streamers (nothing changes them in between)
+        #
+        self.dbi.processData("""INSERT INTO wmbs_fileset_files
+                                (FILEID, FILESET, INSERT_TIME)
+                                SELECT fileid, fileset, :TIME
+                                FROM (%s)
+                                """ % sql,
+                             dict(binds, **leaseBinds), conn = conn,
+                             transaction = transaction)
+
+        self.dbi.processData("""INSERT INTO wmbs_sub_files_available
+                                (SUBSCRIPTION, FILEID)
+                                SELECT subscription, fileid
+                                FROM (%s)
+                                """ % sql,
+                             leaseBinds, conn = conn,
+                             transaction = transaction)
+
+        sql = """INSERT INTO latency_ledger
+                 (RUN_ID, STREAM_ID, MILESTONE, FIRST_TIME, LAST_TIME)
+                 SELECT DISTINCT streamer_pending_feed.run_id,
+                                 streamer_pending_feed.stream_id,
+                                 'feed', :TIME, :TIME
+                 FROM streamer_pending_feed
+                 INNER JOIN wmbs_fileset_files ON
+                   wmbs_fileset_files.fileid = streamer_pending_feed.id
+                 WHERE true
+                 ON CONFLICT (run_id, stream_id, milestone) DO UPDATE
+                   SET last_time = excluded.last_time
+                 """
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        #
+        # streamers feed in previous query need to be updated to
+        # used status
+        #
+        sql = """UPDATE streamer
+                 SET used = 1
+                 WHERE id IN (
+                   SELECT streamer_pending_feed.id
+                   FROM streamer_pending_feed
+                   INNER JOIN wmbs_fileset_files ON
+                     wmbs_fileset_files.fileid = streamer_pending_feed.id
+                 )
+                 """
+
+        self.dbi.processData(sql, {}, conn = conn,
+                             transaction = transaction)
+
+        #
+        # and removed from the feed queue
+        #
+        sql = """DELETE FROM streamer_pending_feed
+                 WHERE EXISTS (
+                   SELECT 1
+                   FROM wmbs_fileset_files
+                   WHERE wmbs_fileset_files.fileid = streamer_pending_feed.id
+                 )
+                 """
+
+        self.dbi.processData(sql, {}, conn = conn,
+                             transaction = transaction)
+
+        return pending
@@ -0,0 +1,25 @@
+"""
+_FindNewExpressRuns_
+
+SQLite implementation of FindNewExpressRuns
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.FindNewExpressRuns import FindNewExpressRuns as OracleFindNewExpressRuns
+
+class FindNewExpressRuns(OracleFindNewExpressRuns):
+
+    def execute(self, conn = None, transaction = False):
+
+        sql = """SELECT run_id
+                 FROM run
+                 WHERE express_released = 0
+                 """
+
+        results = self.dbi.processData(sql, {}, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        runs = []
+        for result in results:
+            runs.append(result[0])
+
+        return runs
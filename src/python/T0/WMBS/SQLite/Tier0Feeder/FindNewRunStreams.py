@@ -0,0 +1,47 @@
+"""
+_FindNewRunStreams_
+
+SQLite implementation of FindNewRunStreams
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.FindNewRunStreams import FindNewRunStreams as OracleFindNewRunStreams
+from T0.WMBS.SQLite.Tier0Feeder.LeaseFilter import leaseJoin
+
+class FindNewRunStreams(OracleFindNewRunStreams):
+
+    def execute(self, lease = None, conn = None, transaction = False):
+
+        sql = """SELECT run_stream_cmssw_assoc.run_id,
+                        stream.name
+                 FROM run_stream_cmssw_assoc
+                 INNER JOIN run ON
+                   run.run_id = run_stream_cmssw_assoc.run_id AND
+                   run.acq_era IS NOT NULL
+                 LEFT OUTER JOIN run_stream_style_assoc ON
+                   run_stream_style_assoc.run_id = run_stream_cmssw_assoc.run_id AND
+                   run_stream_style_assoc.stream_id = run_stream_cmssw_assoc.stream_id
+                 INNER JOIN stream ON
+                   stream.id = run_stream_cmssw_assoc.stream_id
+                 %s
+                 WHERE run_stream_style_assoc.run_id IS NULL
+                 """
+
+        binds = {}
+        if lease == None:
+            sql = sql % ""
+        else:
+            sql = sql % leaseJoin("run_stream_cmssw_assoc")
+            binds.update(lease)
+
+        results = self.dbi.processData(sql, binds, conn = conn,
+                                       transaction = transaction)[0].fetchall()
+
+        runStreams = {}
+        for result in results:
+            run = result[0]
+            stream = result[1]
+            if run not in runStreams:
+                runStreams[run] = []
+            runStreams[run].append(stream)
+
+        return runStreams
@@ -0,0 +1,20 @@
+"""
+_GetExpressReadyRuns_
+
+SQLite implementation of GetExpressReadyRuns
+
+Queries the PopConLog IOV stand-in used by the
+Tier0Feeder load test
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.GetExpressReadyRuns import GetExpressReadyRuns as OracleGetExpressReadyRuns
+
+class GetExpressReadyRuns(OracleGetExpressReadyRuns):
+
+    sql = """SELECT since
+             FROM iov
+             WHERE tag_name LIKE 'runinfo_start_%_hlt'
+             AND since = :RUN
+             GROUP BY since
+             HAVING COUNT(*) > 0
+             """
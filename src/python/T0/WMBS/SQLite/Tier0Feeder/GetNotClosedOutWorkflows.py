@@ -0,0 +1,28 @@
+"""
+_GetNotClosedOutWorkflows_
+
+SQLite implementation of GetNotClosedOutWorkflows
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.GetNotClosedOutWorkflows import GetNotClosedOutWorkflows as OracleGetNotClosedOutWorkflows
+
+class GetNotClosedOutWorkflows(OracleGetNotClosedOutWorkflows):
+
+    def execute(self, conn = None, transaction = False):
+
+
+        sql = """SELECT  wmbs_subscription.workflow, wmbs_subscription.fileset, wmbs_fileset.open, wmbs_workflow.name
+                 FROM workflow_monitoring 
+                 INNER JOIN wmbs_subscription ON
+                 workflow_monitoring.workflow = wmbs_subscription.workflow
+                 INNER JOIN wmbs_workflow ON
+                 wmbs_subscription.workflow = wmbs_workflow.id
+                 INNER JOIN wmbs_fileset ON
+                 wmbs_subscription.fileset = wmbs_fileset.id
+                 WHERE workflow_monitoring.closeout = 0"""
+
+        results = self.dbi.processData(sql, [], conn = conn,
+                             transaction = transaction)
+
+        return results[0].fetchall()
+
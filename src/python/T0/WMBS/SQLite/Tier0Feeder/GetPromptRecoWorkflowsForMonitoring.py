@@ -0,0 +1,29 @@
+"""
+_GetPromptRecoWorkflowsForMonitoring_
+
+SQLite implementation of GetPromptRecoWorkflowsForMonitoring
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.GetPromptRecoWorkflowsForMonitoring import GetPromptRecoWorkflowsForMonitoring as OracleGetPromptRecoWorkflowsForMonitoring
+
+class GetPromptRecoWorkflowsForMonitoring(OracleGetPromptRecoWorkflowsForMonitoring):
+
+    def execute(self, conn = None, transaction = False):
+
+        sql = """SELECT workflow_monitoring.workflow,
+                        reco_release_config.run_id,
+                        wmbs_workflow.name
+                 FROM workflow_monitoring
+                   INNER JOIN wmbs_subscription ON
+                     wmbs_subscription.workflow = workflow_monitoring.workflow
+                   INNER JOIN reco_release_config ON
+                     reco_release_config.fileset = wmbs_subscription.fileset
+                   INNER JOIN wmbs_workflow ON
+                     wmbs_workflow.id = workflow_monitoring.workflow
+                 WHERE workflow_monitoring.tracked = 0
+                 """
+
+        results = self.dbi.processData(sql, [], conn = conn,
+                                       transaction = transaction)
+
+        return results[0].fetchall()
@@ -0,0 +1,26 @@
+"""
+_InsertLeasePartitions_
+
+SQLite implementation of InsertLeasePartitions
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.InsertLeasePartitions import InsertLeasePartitions as OracleInsertLeasePartitions
+
+class InsertLeasePartitions(OracleInsertLeasePartitions):
+
+    def execute(self, partitions, conn = None, transaction = False):
+
+        sql = """INSERT INTO feeder_lease
+                 (PARTITION_ID, OWNER, HEARTBEAT, EXPIRE_TIME)
+                 VALUES (:PARTITION, NULL, 0, 0)
+                 ON CONFLICT (partition_id) DO NOTHING
+                 """
+
+        binds = []
+        for partition in range(partitions):
+            binds.append( { 'PARTITION' : partition } )
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,21 @@
+"""
+_LeaseFilter_
+
+SQLite version of the Tier0Feeder lease join, MOD() is
+only available in SQLite builds with math functions.
+
+"""
+
+def leaseJoin(table):
+    """
+    _leaseJoin_
+
+    Join clause matching the run/streams of table against the
+    unexpired leases of the owner
+
+    """
+    return """INNER JOIN feeder_lease ON
+                   feeder_lease.partition_id = (%s.run_id + %s.stream_id) %% :PARTITIONS AND
+                   feeder_lease.owner = :OWNER AND
+                   feeder_lease.expire_time > :NOW
+                 """ % (table, table)
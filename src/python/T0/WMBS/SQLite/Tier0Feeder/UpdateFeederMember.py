@@ -0,0 +1,28 @@
+"""
+_UpdateFeederMember_
+
+SQLite implementation of UpdateFeederMember
+"""
+
+from T0.WMBS.Oracle.Tier0Feeder.UpdateFeederMember import UpdateFeederMember as OracleUpdateFeederMember
+
+class UpdateFeederMember(OracleUpdateFeederMember):
+
+    def execute(self, owner, now, expireTime, conn = None, transaction = False):
+
+        sql = """INSERT INTO feeder_member
+                 (OWNER, HEARTBEAT, EXPIRE_TIME)
+                 VALUES (:OWNER, :NOW, :EXPIRE_TIME)
+                 ON CONFLICT (owner) DO UPDATE
+                   SET heartbeat = excluded.heartbeat,
+                       expire_time = excluded.expire_time
+                 """
+
+        binds = { 'OWNER' : owner,
+                  'NOW' : now,
+                  'EXPIRE_TIME' : expireTime }
+
+        self.dbi.processData(sql, binds, conn = conn,
+                             transaction = transaction)
+
+        return
@@ -0,0 +1,30 @@
+"""
+_SQLite_
+
+SQLite implementation of the T0 WMBS DAOs
+
+Most DAOs use SQL both databases understand, only the ones that
+differ are implemented here. Every subpackage calls addOracleFallback
+on its __path__, for a DAO without a module of its own the import
+(and with it the DAOFactory) then finds the Oracle module instead.
+
+"""
+import os
+
+
+def addOracleFallback(packagePath):
+    """
+    _addOracleFallback_
+
+    Append the matching Oracle subpackage directory to the
+    __path__ of a SQLite subpackage
+
+    """
+    sqliteDir = packagePath[0]
+    oracleDir = os.path.join(os.path.dirname(os.path.dirname(sqliteDir)),
+                             "Oracle", os.path.basename(sqliteDir))
+
+    if oracleDir not in packagePath:
+        packagePath.append(oracleDir)
+
+    return
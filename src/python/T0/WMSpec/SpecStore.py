@@ -0,0 +1,460 @@
+"""
+_SpecStore_
+
+Content addressed, compressed store for workflow specs
+
+A workload is stored as a tree of blobs. Every config section
+of the spec whose pickle is larger than minBlobSize is stored
+as its own blob, referenced from the section above it by the
+SHA1 of its content, the pickle of a section only has the keys
+of the large sections below it. Sections that are the same in
+many workflows (steps, merge and cleanup tasks, output modules)
+are only stored once.
+Blobs are zlib compressed and never change once written.
+
+The spec file WMBSHelper wrote for the workflow is replaced by
+a small pickle that loads the workload from the store, so
+
+    workload = WMWorkloadHelper()
+    workload.load(workflow.spec)
+
+keeps working for specs in the store as well as for spec files
+written before. The spec file references the store by its path
+relative to the spec file, spec and store directory can be moved
+together. Only loads through SpecStore.load know the spec file
+though, plain loads use the store directory the spec was
+stored in. The sandbox is not touched, jobs don't need the store.
+
+Blobs read are checked against their key and kept in a per process
+read cache, bounded by the uncompressed size and shared by all
+loads from the same store.
+
+"""
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import zlib
+
+from io import BytesIO
+from collections import OrderedDict
+
+# same blobs for every python version of the agent
+pickleProtocol = 2
+
+# directory -> SpecStore, shared read caches
+_stores = {}
+_lock = threading.Lock()
+
+# directory of the spec file SpecStore.load is reading
+_loading = threading.local()
+
+
+def isSection(obj):
+    """
+    _isSection_
+
+    Whether the object is a config section (duck typed,
+    WMCore.Configuration.ConfigSection and subclasses)
+
+    """
+    return "_internal_children" in getattr(obj, "__dict__", {})
+
+def sectionChildren(section):
+    """
+    _sectionChildren_
+
+    The config sections directly below a section
+
+    """
+    children = []
+    for name in sorted(section.__dict__.get("_internal_children", [])):
+        child = section.__dict__.get(name, None)
+        if isSection(child):
+            children.append(child)
+    return children
+
+def sortedItems(items):
+    """
+    _sortedItems_
+
+    Set content in a stable order, set iteration order
+    depends on the string hashing of the process
+
+    """
+    try:
+        return sorted(items)
+    except TypeError:
+        return sorted(items, key = repr)
+
+def relink(section):
+    """
+    _relink_
+
+    Point the parent references of the child sections back to
+    their parent, sections loaded from their own blob have it
+    set to None
+
+    """
+    for child in sectionChildren(section):
+        if "_internal_parent_ref" in child.__dict__:
+            child.__dict__["_internal_parent_ref"] = section
+        relink(child)
+    return
+
+def loadStoredSpec(relativeDirectory, key, directory = None):
+    """
+    _loadStoredSpec_
+
+    Called when unpickling the spec file of a stored spec, the
+    store is looked up relative to the spec file if it is known
+
+    """
+    specDirectory = getattr(_loading, "specDirectory", None)
+    if specDirectory != None:
+        directory = os.path.join(specDirectory, relativeDirectory)
+    elif directory == None:
+        # spec files stored before only have the absolute directory
+        directory = relativeDirectory
+    return specStore(directory).get(key)
+
+def specStore(directory, **options):
+    """
+    _specStore_
+
+    The shared store for a directory
+
+    """
+    directory = os.path.abspath(directory)
+    with _lock:
+        if directory not in _stores:
+            _stores[directory] = SpecStore(directory, **options)
+        return _stores[directory]
+
+
+class StoredSpec(object):
+    """
+    _StoredSpec_
+
+    What the spec file of a stored spec contains, unpickles
+    to the workload data from the store
+
+    """
+    def __init__(self, relativeDirectory, key, directory):
+        self.relativeDirectory = relativeDirectory
+        self.key = key
+        self.directory = directory
+
+    def __reduce__(self):
+        return (loadStoredSpec, (self.relativeDirectory, self.key, self.directory))
+
+
+class SectionPickler(pickle.Pickler):
+    """
+    _SectionPickler_
+
+    Pickles a config section, sections below it large enough
+    go to the store and are replaced by their key
+
+    """
+    def __init__(self, file, store, section, sections):
+        pickle.Pickler.__init__(self, file, pickleProtocol)
+        self.store = store
+        self.section = section
+        self.parent = section.__dict__.get("_internal_parent_ref", None)
+        self.sections = sections
+
+    def persistent_id(self, obj):
+        if obj is self.section:
+            return None
+        if self.parent is not None and obj is self.parent:
+            return ("parent",)
+        if isSection(obj):
+            key = self.store.putSection(obj, self.sections)
+            if key != None:
+                return ("section", key)
+            return None
+        if isinstance(obj, frozenset):
+            return ("frozenset", sortedItems(obj))
+        if isinstance(obj, set):
+            return ("set", sortedItems(obj))
+        return None
+
+
+class SectionUnpickler(pickle.Unpickler):
+    """
+    _SectionUnpickler_
+
+    Unpickles a config section, child sections are
+    loaded from the store
+
+    """
+    def __init__(self, file, store):
+        pickle.Unpickler.__init__(self, file)
+        self.store = store
+
+    def persistent_load(self, pid):
+        if pid[0] == "section":
+            return self.store.getSection(pid[1])
+        elif pid[0] == "set":
+            return set(pid[1])
+        elif pid[0] == "frozenset":
+            return frozenset(pid[1])
+        elif pid[0] == "parent":
+            return None
+        raise pickle.UnpicklingError("Unknown persistent id %s" % str(pid))
+
+
+class SpecStore(object):
+    """
+    _SpecStore_
+
+    Blobs are stored in directory/<key[:2]>/<key>.pkl.z
+
+    """
+    def __init__(self, directory, cacheBytes = 64 * 1024 * 1024, minBlobSize = 4096):
+        """
+        cacheBytes is the uncompressed size of the blobs kept in the
+        read cache, minBlobSize the pickled size from which on a
+        section is stored as its own blob
+
+        """
+        self.directory = os.path.abspath(directory)
+        self.cacheBytes = cacheBytes
+        self.minBlobSize = minBlobSize
+
+        self.lock = threading.Lock()
+        self.cache = OrderedDict()
+        self.cachedBytes = 0
+
+        self.stats = { 'blobs_written' : 0,
+                       'blobs_reused' : 0,
+                       'bytes_written' : 0,
+                       'cache_hits' : 0,
+                       'cache_misses' : 0 }
+
+        return
+
+    def blobPath(self, key):
+        """
+        _blobPath_
+
+        """
+        return os.path.join(self.directory, key[:2], "%s.pkl.z" % key)
+
+    def putBlob(self, data):
+        """
+        _putBlob_
+
+        Store a blob unless it is already there, returns its key
+
+        """
+        key = hashlib.sha1(data).hexdigest()
+        path = self.blobPath(key)
+
+        if os.path.exists(path):
+            with self.lock:
+                self.stats['blobs_reused'] += 1
+            return key
+
+        blobDirectory = os.path.dirname(path)
+        if not os.path.isdir(blobDirectory):
+            try:
+                os.makedirs(blobDirectory)
+            except OSError:
+                # created by someone else in the meantime
+                if not os.path.isdir(blobDirectory):
+                    raise
+
+        compressed = zlib.compress(data, 6)
+
+        # readers only ever see complete blobs
+        (fd, tempPath) = tempfile.mkstemp(dir = blobDirectory, prefix = ".%s" % key)
+        try:
+            with os.fdopen(fd, 'wb') as blobFile:
+                blobFile.write(compressed)
+            os.rename(tempPath, path)
+        except:
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+            raise
+
+        with self.lock:
+            self.stats['blobs_written'] += 1
+            self.stats['bytes_written'] += len(compressed)
+
+        return key
+
+    def getBlob(self, key):
+        """
+        _getBlob_
+
+        Uncompressed blob, from the read cache if possible.
+        Blobs read from disk have to match their key.
+
+        """
+        with self.lock:
+            data = self.cache.pop(key, None)
+            if data != None:
+                self.cache[key] = data
+                self.stats['cache_hits'] += 1
+                return data
+            self.stats['cache_misses'] += 1
+
+        with open(self.blobPath(key), 'rb') as blobFile:
+            data = zlib.decompress(blobFile.read())
+
+        if hashlib.sha1(data).hexdigest() != key:
+            raise RuntimeError("Blob %s in spec store %s is corrupted !" % (key, self.directory))
+
+        # blobs larger than the whole cache aren't cached
+        if len(data) > self.cacheBytes:
+            return data
+
+        with self.lock:
+            if key not in self.cache:
+                self.cache[key] = data
+                self.cachedBytes += len(data)
+            while self.cachedBytes > self.cacheBytes:
+                (oldKey, oldData) = self.cache.popitem(last = False)
+                self.cachedBytes -= len(oldData)
+
+        return data
+
+    def dumpSection(self, section, sections):
+        """
+        _dumpSection_
+
+        Pickle of a section with its large sections stored
+
+        """
+        buf = BytesIO()
+        SectionPickler(buf, self, section, sections).dump(section)
+        return buf.getvalue()
+
+    def putSection(self, section, sections):
+        """
+        _putSection_
+
+        Store a section, returns its key or None if it is small
+        enough to stay in its parent. sections has the result for
+        the sections already seen while storing the workload.
+
+        """
+        if id(section) not in sections:
+            key = None
+            data = self.dumpSection(section, sections)
+            if len(data) >= self.minBlobSize:
+                key = self.putBlob(data)
+            sections[id(section)] = key
+        return sections[id(section)]
+
+    def getSection(self, key):
+        """
+        _getSection_
+
+        A new copy of the section, parent references not set
+
+        """
+        return SectionUnpickler(BytesIO(self.getBlob(key)), self).load()
+
+    def put(self, data):
+        """
+        _put_
+
+        Store the workload data (WMWorkloadHelper.data),
+        returns the key of the workload
+
+        """
+        return self.putBlob(self.dumpSection(data, {}))
+
+    def get(self, key):
+        """
+        _get_
+
+        A new copy of the workload data
+
+        """
+        data = self.getSection(key)
+        relink(data)
+        return data
+
+    def storeSpecFile(self, specPath, data = None):
+        """
+        _storeSpecFile_
+
+        Put the spec into the store and replace the spec file with
+        a reference to it. The spec is read from the file if the
+        workload data isn't passed in. Returns the workload key.
+
+        """
+        if data == None:
+            with open(specPath, 'rb') as specFile:
+                data = pickle.load(specFile)
+
+        key = self.put(data)
+
+        specDirectory = os.path.dirname(os.path.abspath(specPath))
+        relativeDirectory = os.path.relpath(self.directory, specDirectory)
+
+        (fd, tempPath) = tempfile.mkstemp(dir = os.path.dirname(os.path.abspath(specPath)),
+                                          prefix = ".%s" % os.path.basename(specPath))
+        try:
+            with os.fdopen(fd, 'wb') as specFile:
+                pickle.dump(StoredSpec(relativeDirectory, key, self.directory), specFile, pickleProtocol)
+            os.rename(tempPath, specPath)
+        except:
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+            raise
+
+        return key
+
+    def storeSpec(self, wmSpec):
+        """
+        _storeSpec_
+
+        Store the spec of a workflow WMBSHelper created and
+        replace its spec file, returns the workload key or
+        None if the spec file isn't there
+
+        """
+        specPath = wmSpec.specUrl()
+        if specPath == None or not os.path.isfile(specPath):
+            logging.warning("No spec file for workflow %s, not storing it" % wmSpec.name())
+            return None
+
+        return self.storeSpecFile(specPath, wmSpec.data)
+
+    def load(self, specPath):
+        """
+        _load_
+
+        Workload data for a spec file, works for spec files
+        replaced by storeSpecFile and plain spec files. The
+        store is looked up relative to the spec file.
+
+        """
+        _loading.specDirectory = os.path.dirname(os.path.abspath(specPath))
+        try:
+            with open(specPath, 'rb') as specFile:
+                data = pickle.load(specFile)
+        finally:
+            _loading.specDirectory = None
+        return data
+
+    def metrics(self):
+        """
+        _metrics_
+
+        Blobs written and reused and read cache hits and misses
+        since the store was created, blobs and bytes in the cache
+
+        """
+        with self.lock:
+            metrics = dict(self.stats)
+            metrics['cache_blobs'] = len(self.cache)
+            metrics['cache_bytes'] = self.cachedBytes
+            return metrics
@@ -454,6 +454,8 @@ class ExpressWorkloadFactory(StdBase):
         self.expressSplitArgs = {}
         self.expressSplitArgs['maxInputRate'] = arguments['MaxInputRate']
         self.expressSplitArgs['maxInputEvents'] = arguments['MaxInputEvents']
+        if self.inputEventBudget != None:
+            self.expressSplitArgs['inputEventBudget'] = self.inputEventBudget
         self.expressMergeSplitArgs = {}
         self.expressMergeSplitArgs['maxInputSize'] = arguments['MaxInputSize']
         self.expressMergeSplitArgs['maxInputFiles'] = arguments['MaxInputFiles']
@@ -494,6 +496,7 @@ class ExpressWorkloadFactory(StdBase):
                     "BlockCloseDelay": {"type" : int, "optional" : False,
                                         "validate" : lambda x : x > 0
                                         },
+                    "InputEventBudget": {"default" : None, "type" : int, "null" : True},
                     }
         baseArgs.update(specArgs)
         StdBase.setDefaultArgumentsProperty(baseArgs)
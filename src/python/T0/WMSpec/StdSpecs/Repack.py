@@ -172,6 +172,10 @@ class RepackWorkloadFactory(StdBase):
         self.repackSplitArgs['maxInputEvents'] = arguments['MaxInputEvents']
         self.repackSplitArgs['maxInputFiles'] = arguments['MaxInputFiles']
         self.repackSplitArgs['maxLatency'] = arguments['MaxLatency']
+        if self.directToMerged:
+            # size repack jobs for direct to merged stageout
+            self.repackSplitArgs['minMergeSize'] = self.minMergeSize
+            self.repackSplitArgs['maxMergeEvents'] = self.maxMergeEvents
         self.repackMergeSplitArgs = {}
         self.repackMergeSplitArgs['minInputSize'] = arguments['MinInputSize']
         self.repackMergeSplitArgs['maxInputSize'] = arguments['MaxInputSize']
@@ -202,6 +206,7 @@ class RepackWorkloadFactory(StdBase):
                     "BlockCloseDelay": {"type": int, "optional": False,
                                         "validate": lambda x : x > 0,
                                         },
+                    "DirectToMerged": {"default" : False, "type" : bool},
                     }
         baseArgs.update(specArgs)
         StdBase.setDefaultArgumentsProperty(baseArgs)
@@ -5,10 +5,9 @@ _Tier0AuditorPoller_
 
 The actual work done by the Tier0Auditor component
 
-Checks for new data
-Populates RunConfig for new runs
-Setup subscriptions for new runs/streams
-Assigns new data to the correct subscriptions
+Incrementally verifies run/streams with open filesets for
+missing EoLS records, streamer count mismatches, stuck split
+lumis and filesets that never close. See T0.Audit.AuditAPI.
 
 """
 import logging
@@ -20,7 +19,7 @@ from WMCore.Database.DBFactory import DBFactory
 from WMCore.WMException import WMException
 from WMCore.Configuration import loadConfigurationFile
 
-from T0.RunLumiCloseout import RunLumiCloseoutAPI
+from T0.Audit import AuditAPI
 
 
 class Tier0AuditorPoller(BaseWorkerThread):
@@ -38,6 +37,13 @@ class Tier0AuditorPoller(BaseWorkerThread):
                                      logger = logging,
                                      dbinterface = myThread.dbi)
 
+        self.auditSettings = {}
+        for name, default in AuditAPI.defaultSettings.items():
+            self.auditSettings[name] = getattr(config.Tier0Auditor, name, default)
+
+        # summary of the last audit pass
+        self.lastAudit = None
+
         return
 
     def algorithm(self, parameters = None):
@@ -48,6 +54,25 @@ class Tier0AuditorPoller(BaseWorkerThread):
         logging.debug("Running Tier0Auditor algorithm...")
         myThread = threading.currentThread()
 
+        try:
+            summary = AuditAPI.auditRunStreams(self.daoFactory, self.auditSettings)
+        except Exception as ex:
+            logging.exception(ex)
+            return
+
+        for run, stream, check, detail in summary['findings']:
+            logging.warning("Audit %s run %d stream %d : %s" % (check, run, stream, detail))
+
+        logging.info("Audit verified %d of %d due run/streams (%d with open filesets), %d failed, %d findings" % (summary['verified'],
+                                                                                                                  summary['due'],
+                                                                                                                  summary['candidates'],
+                                                                                                                  summary['failed'],
+                                                                                                                  len(summary['findings'])))
+        logging.info("Audit durations : %s" % ", ".join([ "%s %.2fs" % (name, duration)
+                                                          for name, duration in sorted(summary['durations'].items()) ]))
+
+        self.lastAudit = summary
+
         return
 
     def terminate(self, params):
@@ -0,0 +1,159 @@
+"""
+_PartitionLeases_
+
+Run/stream partition leases for running several Tier0Feeder
+instances against the same T0AST
+
+Every run/stream belongs to one of a fixed number of partitions
+(MOD(run_id + stream_id, partitions)). A feeder instance only
+handles the run/streams of partitions it holds an unexpired lease
+for. Leases are renewed by a heartbeat every polling cycle, a
+partition whose lease expires (feeder died or hangs) is taken
+over by the other feeders on their next heartbeat.
+
+Feeders register themselves as members with the same heartbeat.
+Partitions are balanced between the live members, every feeder
+holds at most its fair share and gives up the excess when
+another feeder shows up.
+
+The holder of partition 0 is the leader and also runs the
+stages that aren't run/stream scoped.
+
+"""
+import logging
+import time
+
+
+class PartitionLeases(object):
+
+    def __init__(self, daoFactory, owner, partitions, timeout):
+        """
+        owner identifies the feeder instance, timeout is the
+        lease duration in seconds (has to be longer than a
+        polling cycle)
+
+        """
+        self.owner = owner
+        self.partitions = partitions
+        self.timeout = timeout
+
+        self.insertLeasePartitionsDAO = daoFactory(classname = "Tier0Feeder.InsertLeasePartitions")
+        self.getLeasesDAO = daoFactory(classname = "Tier0Feeder.GetLeases")
+        self.acquireLeasesDAO = daoFactory(classname = "Tier0Feeder.AcquireLeases")
+        self.releaseLeasesDAO = daoFactory(classname = "Tier0Feeder.ReleaseLeases")
+        self.updateFeederMemberDAO = daoFactory(classname = "Tier0Feeder.UpdateFeederMember")
+        self.getFeederMembersDAO = daoFactory(classname = "Tier0Feeder.GetFeederMembers")
+        self.deleteFeederMemberDAO = daoFactory(classname = "Tier0Feeder.DeleteFeederMember")
+
+        self.held = set()
+        self.expireTime = 0
+        self.initialized = False
+
+        return
+
+    def heartbeat(self):
+        """
+        _heartbeat_
+
+        Renew our leases, take over free or expired partitions
+        up to our fair share and release partitions above it.
+
+        """
+        if not self.initialized:
+            self.insertLeasePartitionsDAO.execute(self.partitions, transaction = False)
+            self.initialized = True
+
+        now = int(time.time())
+
+        self.updateFeederMemberDAO.execute(self.owner, now, now + self.timeout,
+                                           transaction = False)
+
+        members = set(self.getFeederMembersDAO.execute(now, transaction = False))
+        members.add(self.owner)
+
+        leases = self.getLeasesDAO.execute(transaction = False)
+
+        mine = []
+        free = []
+        for partition, lease in sorted(leases.items()):
+            if lease['owner'] == self.owner:
+                mine.append(partition)
+            elif lease['owner'] == None or lease['expire_time'] <= now:
+                free.append(partition)
+
+        share = (self.partitions + len(members) - 1) // len(members)
+
+        if len(mine) > share:
+            binds = []
+            for partition in mine[share:]:
+                binds.append( { 'PARTITION' : partition,
+                                'OWNER' : self.owner } )
+            self.releaseLeasesDAO.execute(binds, transaction = False)
+            logging.info("Feeder %s releasing %d partitions for rebalancing" % (self.owner, len(binds)))
+            mine = mine[:share]
+
+        wanted = mine + free[:max(0, share - len(mine))]
+
+        if len(wanted) > 0:
+            binds = []
+            for partition in wanted:
+                binds.append( { 'PARTITION' : partition,
+                                'OWNER' : self.owner,
+                                'NOW' : now,
+                                'EXPIRE_TIME' : now + self.timeout } )
+            self.acquireLeasesDAO.execute(binds, transaction = False)
+
+        # another feeder might have been faster, check what we really hold
+        held = set()
+        for partition, lease in self.getLeasesDAO.execute(transaction = False).items():
+            if lease['owner'] == self.owner and lease['expire_time'] > now:
+                held.add(partition)
+
+        if held != self.held:
+            logging.info("Feeder %s holds partitions %s" % (self.owner, sorted(held)))
+
+        self.held = held
+        self.expireTime = now + self.timeout
+
+        return
+
+    def isLeader(self):
+        """
+        _isLeader_
+
+        The holder of partition 0 runs the global stages
+
+        """
+        return 0 in self.held and self.expireTime > time.time()
+
+    def leaseBinds(self):
+        """
+        _leaseBinds_
+
+        Binds for the run/stream lease filter of the feeder DAOs
+
+        """
+        return { 'OWNER' : self.owner,
+                 'PARTITIONS' : self.partitions,
+                 'NOW' : int(time.time()) }
+
+    def release(self):
+        """
+        _release_
+
+        Give up all leases and unregister, used on shutdown
+        so other feeders can take over right away
+
+        """
+        self.deleteFeederMemberDAO.execute(self.owner, int(time.time()),
+                                           transaction = False)
+
+        if len(self.held) > 0:
+            binds = []
+            for partition in self.held:
+                binds.append( { 'PARTITION' : partition,
+                                'OWNER' : self.owner } )
+            self.releaseLeasesDAO.execute(binds, transaction = False)
+            self.held = set()
+
+        return
@@ -0,0 +1,133 @@
+"""
+_StageScheduler_
+
+Per stage polling cadence for the Tier0Feeder
+
+The feeder poller is called every pollInterval seconds, on every
+call only the stages that are due are run. Every stage has a
+minimum and maximum interval. A stage reports how much work it
+found (an int, None if it can't tell):
+
+  no work                  - interval doubles, up to maxInterval
+  work                     - interval back to minInterval
+  work >= backlog          - stage runs on every poll until the
+                             backlog is gone
+  None                     - interval stays at minInterval
+
+Stages run in the order they were added.
+
+"""
+import logging
+import time
+
+
+class Stage(object):
+    """
+    _Stage_
+
+    One feeder stage and its cadence
+
+    """
+    def __init__(self, name, function, minInterval, maxInterval, backlog = None):
+        self.name = name
+        self.function = function
+        self.minInterval = minInterval
+        self.maxInterval = max(minInterval, maxInterval)
+        self.backlog = backlog
+
+        self.interval = minInterval
+        self.nextRun = 0
+        self.runs = 0
+        self.lastWork = None
+        self.lastDuration = 0.0
+
+        return
+
+    def update(self, work, now):
+        """
+        _update_
+
+        Adapt the interval to the amount of work found
+
+        """
+        self.lastWork = work
+        if work == None:
+            self.interval = self.minInterval
+        elif self.backlog != None and work >= self.backlog:
+            self.interval = 0
+        elif work > 0:
+            self.interval = self.minInterval
+        else:
+            self.interval = min(max(2 * self.interval, 1), self.maxInterval)
+        self.nextRun = now + self.interval
+        return
+
+
+class StageScheduler(object):
+    """
+    _StageScheduler_
+
+    Runs the due stages
+
+    """
+    def __init__(self, overrides = {}):
+        """
+        overrides is a dictionary stage name -> (minInterval, maxInterval)
+        replacing the cadence the stage is added with
+
+        """
+        self.overrides = overrides
+        self.stages = []
+        return
+
+    def add(self, name, function, minInterval, maxInterval, backlog = None):
+        if name in self.overrides:
+            minInterval, maxInterval = self.overrides[name]
+        self.stages.append(Stage(name, function, minInterval, maxInterval, backlog))
+        return
+
+    def run(self):
+        """
+        _run_
+
+        Run all due stages. A failing stage is retried after its
+        minimum interval, the exception is passed on.
+
+        """
+        for stage in self.stages:
+
+            now = time.time()
+            if now < stage.nextRun:
+                continue
+
+            try:
+                work = stage.function()
+            except:
+                stage.lastDuration = time.time() - now
+                stage.interval = stage.minInterval
+                stage.nextRun = now + stage.minInterval
+                raise
+
+            stage.lastDuration = time.time() - now
+            stage.runs += 1
+            stage.update(work, now)
+
+            logging.debug("Stage %s found %s work in %.2fs, next run in %ds" % (stage.name, stage.lastWork,
+                                                                                stage.lastDuration, stage.interval))
+
+        return
+
+    def status(self):
+        """
+        _status_
+
+        Cadence and last run information for every stage
+
+        """
+        status = {}
+        for stage in self.stages:
+            status[stage.name] = { 'interval' : stage.interval,
+                                   'runs' : stage.runs,
+                                   'work' : stage.lastWork,
+                                   'duration' : stage.lastDuration }
+        return status
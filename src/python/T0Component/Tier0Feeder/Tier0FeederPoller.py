@@ -12,13 +12,11 @@ Assigns new data to the correct subscriptions
 
 """
 import os
+import socket
 import logging
 import threading
-import subprocess
 
 from WMCore.WorkerThreads.BaseWorkerThread import BaseWorkerThread
-from WMCore.DAOFactory import DAOFactory
-from WMCore.Database.DBFactory import DBFactory
 from WMCore.WMException import WMException
 from WMCore.Configuration import loadConfigurationFile
 from WMCore.Services.RequestDB.RequestDBWriter import RequestDBWriter
@@ -26,6 +24,15 @@ from WMCore.Services.RequestDB.RequestDBWriter import RequestDBWriter
 from T0.RunConfig import RunConfigAPI
 from T0.RunLumiCloseout import RunLumiCloseoutAPI
 from T0.ConditionUpload import ConditionUploadAPI
+from T0.ExternalDatabase.ConnectionRegistry import ConnectionRegistry, ExternalDatabaseUnavailable
+from T0.T0DataSvc.Replication import ReplicationEngine, t0DataSvcEntities
+from T0.WMBS import DAOCache
+from T0.WMBS.DAOCache import cachedDAOFactory
+from T0.WMBS.QueryLog import QueryLog
+from T0.WMSpec.SpecStore import specStore
+
+from T0Component.Tier0Feeder.StageScheduler import StageScheduler
+from T0Component.Tier0Feeder.PartitionLeases import PartitionLeases
 
 
 class Tier0FeederPoller(BaseWorkerThread):
@@ -39,12 +46,36 @@ class Tier0FeederPoller(BaseWorkerThread):
 
         myThread = threading.currentThread()
 
-        self.daoFactory = DAOFactory(package = "T0.WMBS",
-                                     logger = logging,
-                                     dbinterface = myThread.dbi)
+        #
+        # optional slow query log, has to be set before
+        # any DAO is created to cover all of them
+        #
+        self.queryLog = None
+        queryLogThreshold = getattr(config.Tier0Feeder, "queryLogThreshold", None)
+        if queryLogThreshold != None:
+            slowQueryLog = getattr(config.Tier0Feeder, "slowQueryLog",
+                                   os.path.join(config.Tier0Feeder.componentDir, "slowQueries.log"))
+            self.queryLog = QueryLog(queryLogThreshold, slowQueryLog)
+            DAOCache.setQueryLog(self.queryLog)
+
+        self.daoFactory = cachedDAOFactory(package = "T0.WMBS",
+                                           logger = logging,
+                                           dbinterface = myThread.dbi)
+
+        # the feeder runs the same few hundred statements every cycle
+        DAOCache.enableStatementCache(myThread.dbi,
+                                      getattr(config.Tier0Feeder, "statementCacheSize", 100))
+        self.daoMetrics = DAOCache.metrics()
 
         self.tier0ConfigFile = config.Tier0Feeder.tier0ConfigFile
         self.specDirectory = config.Tier0Feeder.specDirectory
+
+        # optional deduplicating, compressed store for the workflow specs
+        self.specStore = None
+        if getattr(config.Tier0Feeder, "specStore", False):
+            self.specStore = specStore(getattr(config.Tier0Feeder, "specStoreDirectory",
+                                               os.path.join(self.specDirectory, "store")))
+
         self.dropboxuser = getattr(config.Tier0Feeder, "dropboxuser", None)
         self.dropboxpass = getattr(config.Tier0Feeder, "dropboxpass", None)
 
@@ -53,45 +84,94 @@ class Tier0FeederPoller(BaseWorkerThread):
             if not os.path.exists(self.transferSystemBaseDir):
                 self.transferSystemBaseDir = None
 
+        self.smNotificationBatchSize = getattr(config.Tier0Feeder, "smNotificationBatchSize", 50)
+        self.smNotificationBudget = getattr(config.Tier0Feeder, "smNotificationBudget", 10000)
+
+        self.purgeRuns = getattr(config.Tier0Feeder, "purgeRuns", False)
+
         self.dqmUploadProxy = getattr(config.Tier0Feeder, "dqmUploadProxy", None)
         self.serviceProxy = getattr(config.Tier0Feeder, "serviceProxy", None)
 
-        self.localRequestCouchDB = RequestDBWriter(config.AnalyticsDataCollector.localT0RequestDBURL, 
-                                                   couchapp = config.AnalyticsDataCollector.RequestCouchApp)
+        self.conditionUploadWorkers = getattr(config.Tier0Feeder, "conditionUploadWorkers", 4)
+        self.conditionUploadTimeout = getattr(config.Tier0Feeder, "conditionUploadTimeout", 1800)
+        self.conditionUploadCompressLevel = getattr(config.Tier0Feeder, "conditionUploadCompressLevel", 9)
 
-        hltConfConnectUrl = config.HLTConfDatabase.connectUrl
-        dbFactoryHltConf = DBFactory(logging, dburl = hltConfConnectUrl, options = {})
-        dbInterfaceHltConf = dbFactoryHltConf.connect()
-        daoFactoryHltConf = DAOFactory(package = "T0.WMBS",
-                                       logger = logging,
-                                       dbinterface = dbInterfaceHltConf)
-        self.getHLTConfigDAO = daoFactoryHltConf(classname = "RunConfig.GetHLTConfig")
+        # keeps the Dropbox session open between polling cycles
+        self.conditionUploadTransfer = ConditionUploadAPI.PayloadTransfer(self.dropboxuser, self.dropboxpass,
+                                                                          self.serviceProxy,
+                                                                          timeout = self.conditionUploadTimeout,
+                                                                          compressLevel = self.conditionUploadCompressLevel)
 
-        storageManagerConnectUrl = config.StorageManagerDatabase.connectUrl
-        dbFactoryStorageManager = DBFactory(logging, dburl = storageManagerConnectUrl, options = {})
-        self.dbInterfaceStorageManager = dbFactoryStorageManager.connect()
+        self.localRequestCouchDB = RequestDBWriter(config.AnalyticsDataCollector.localT0RequestDBURL, 
+                                                   couchapp = config.AnalyticsDataCollector.RequestCouchApp)
 
-        self.getExpressReadyRunsDAO = None
+        #
+        # external databases, nothing is connected here, connections
+        # are made on first use and borrowed by the feeder stages
+        #
+        self.databases = ConnectionRegistry()
+        self.databases.registerFromConfig("HLTConf", config.HLTConfDatabase)
+        self.databases.registerFromConfig("StorageManager", config.StorageManagerDatabase)
         if hasattr(config, "PopConLogDatabase"):
-            popConLogConnectUrl = getattr(config.PopConLogDatabase, "connectUrl", None)
-            if popConLogConnectUrl != None:
-                dbFactoryPopConLog = DBFactory(logging, dburl = popConLogConnectUrl, options = {})
-                dbInterfacePopConLog = dbFactoryPopConLog.connect()
-                daoFactoryPopConLog = DAOFactory(package = "T0.WMBS",
-                                                 logger = logging,
-                                                 dbinterface = dbInterfacePopConLog)
-                self.getExpressReadyRunsDAO = daoFactoryPopConLog(classname = "Tier0Feeder.GetExpressReadyRuns")
-
-        self.haveT0DataSvc = False
+            self.databases.registerFromConfig("PopConLog", config.PopConLogDatabase)
         if hasattr(config, "T0DataSvcDatabase"):
-            t0datasvcConnectUrl = getattr(config.T0DataSvcDatabase, "connectUrl", None)
-            if t0datasvcConnectUrl != None:
-                self.haveT0DataSvc = True
-                dbFactoryT0DataSvc = DBFactory(logging, dburl = t0datasvcConnectUrl, options = {})
-                dbInterfaceT0DataSvc = dbFactoryT0DataSvc.connect()
-                self.daoFactoryT0DataSvc = DAOFactory(package = "T0.WMBS",
-                                                      logger = logging,
-                                                      dbinterface = dbInterfaceT0DataSvc)
+            self.databases.registerFromConfig("T0DataSvc", config.T0DataSvcDatabase)
+
+        self.t0DataSvcReplication = ReplicationEngine(t0DataSvcEntities, self.daoFactory,
+                                                      self.databases, "T0DataSvc",
+                                                      batchSize = getattr(config.Tier0Feeder, "t0DataSvcBatchSize", 500),
+                                                      maxWorkers = getattr(config.Tier0Feeder, "t0DataSvcWorkers", 2))
+
+        #
+        # several feeder instances share the run/streams through
+        # partition leases, the leader also runs the global stages
+        #
+        self.leases = None
+        leasePartitions = getattr(config.Tier0Feeder, "leasePartitions", None)
+        if leasePartitions != None:
+            leaseOwner = getattr(config.Tier0Feeder, "leaseOwner",
+                                 "%s:%d" % (socket.gethostname(), os.getpid()))
+            self.leases = PartitionLeases(self.daoFactory, leaseOwner, leasePartitions,
+                                          getattr(config.Tier0Feeder, "leaseTimeout", 600))
+
+        #
+        # feeder stages in execution order with their minimum and maximum
+        # interval in seconds and the amount of work that counts as backlog,
+        # the intervals can be overridden with the stageIntervals dictionary
+        #
+        self.scheduler = StageScheduler(getattr(config.Tier0Feeder, "stageIntervals", {}))
+        self.scheduler.add("configureRuns", self.configureRuns, 0, 120)
+        self.scheduler.add("stopCloseRuns", self.leaderStage(self.stopCloseRuns), 0, 300)
+        self.scheduler.add("releaseExpress", self.leaderStage(self.releaseExpress), 0, 300)
+        self.scheduler.add("releasePromptReco", self.leaderStage(self.releasePromptReco), 60, 60)
+        self.scheduler.add("t0DataSvc", self.leaderStage(self.replicateT0DataSvc), 300, 300)
+        self.scheduler.add("markWorkflowsInjected", self.leaderStage(self.markWorkflowsInjected), 60, 60)
+        self.scheduler.add("closeLumiSections", self.closeLumiSections, 0, 120, backlog = 1000)
+        self.scheduler.add("feedStreamers", self.feedStreamers, 0, 120, backlog = 10000)
+        self.scheduler.add("closeRunStreamFilesets", self.closeRunStreamFilesets, 30, 300)
+        self.scheduler.add("checkActiveSplitLumis", self.leaderStage(self.checkActiveSplitLumis), 60, 60)
+        self.scheduler.add("feedCouchMonitoring", self.leaderStage(self.feedCouchMonitoring), 300, 1800)
+        self.scheduler.add("closeOutRealTimeWorkflows", self.leaderStage(self.closeOutRealTimeWorkflows), 300, 1800)
+        if self.transferSystemBaseDir != None:
+            self.scheduler.add("notifyStorageManager", self.leaderStage(self.notifyStorageManager), 60, 600,
+                               backlog = self.smNotificationBudget)
+        else:
+            self.scheduler.add("clearFinishedStreamers", self.leaderStage(self.clearFinishedStreamers), 600, 600)
+        if self.purgeRuns:
+            self.scheduler.add("purgeRuns", self.leaderStage(self.purge), 3600, 3600)
+        self.scheduler.add("uploadConditions", self.leaderStage(self.uploadConditions), 120, 120)
+
+        return
+
+    def setup(self, parameters = None):
+        """
+        _setup_
+
+        Queue payload files inserted before the condition
+        upload pending queue existed
+
+        """
+        ConditionUploadAPI.queueAcquiredConditions()
 
         return
 
@@ -99,170 +179,322 @@ class Tier0FeederPoller(BaseWorkerThread):
         """
         _algorithm_
 
+        Runs the feeder stages that are due, see StageScheduler
+
         """
         logging.debug("Running Tier0Feeder algorithm...")
-        myThread = threading.currentThread()
 
-        findNewRunsDAO = self.daoFactory(classname = "Tier0Feeder.FindNewRuns")
-        findNewRunStreamsDAO = self.daoFactory(classname = "Tier0Feeder.FindNewRunStreams")
-        findNewExpressRunsDAO = self.daoFactory(classname = "Tier0Feeder.FindNewExpressRuns")
-        releaseExpressDAO = self.daoFactory(classname = "Tier0Feeder.ReleaseExpress")
-        feedStreamersDAO = self.daoFactory(classname = "Tier0Feeder.FeedStreamers")
-        markWorkflowsInjectedDAO = self.daoFactory(classname = "Tier0Feeder.MarkWorkflowsInjected")
+        if self.leases != None:
+            self.leases.heartbeat()
+
+        self.scheduler.run()
+
+        for name, metrics in self.databases.metrics().items():
+            logging.debug("%s database : %d queries, %d failures, %.3fs avg latency, %.3fs max latency" % \
+                          (name, metrics['queries'], metrics['failures'],
+                           metrics['avg_latency'], metrics['max_latency']))
+
+        daoMetrics = DAOCache.metrics()
+        logging.debug("DAO cache : %d created (%.3fs), %d reused this cycle" % \
+                      (daoMetrics['created'] - self.daoMetrics['created'],
+                       daoMetrics['create_time'] - self.daoMetrics['create_time'],
+                       daoMetrics['reused'] - self.daoMetrics['reused']))
+        self.daoMetrics = daoMetrics
+
+        if self.specStore != None:
+            storeMetrics = self.specStore.metrics()
+            logging.debug("Spec store : %d blobs written (%d bytes), %d reused since start, %d cached (%d bytes)" % \
+                          (storeMetrics['blobs_written'], storeMetrics['bytes_written'],
+                           storeMetrics['blobs_reused'], storeMetrics['cache_blobs'],
+                           storeMetrics['cache_bytes']))
+
+        return
+
+    def leaseBinds(self):
+        """
+        _leaseBinds_
+
+        Lease filter for the run/stream scoped stages, None
+        if this is the only feeder
+
+        """
+        if self.leases == None:
+            return None
+        return self.leases.leaseBinds()
+
+    def isLeader(self):
+        """
+        _isLeader_
+
+        The only feeder or the holder of partition 0
+
+        """
+        return self.leases == None or self.leases.isLeader()
+
+    def leaderStage(self, function):
+        """
+        _leaderStage_
+
+        Wrap a global stage so only the leader runs it
 
-        tier0Config = None
+        """
+        def stage():
+            if not self.isLeader():
+                return None
+            return function()
+        return stage
+
+    def loadTier0Config(self):
+        """
+        _loadTier0Config_
+
+        Load the Tier0 configuration, returns None if it can't be loaded
+
+        """
         try:
-            tier0Config = loadConfigurationFile(self.tier0ConfigFile)
+            return loadConfigurationFile(self.tier0ConfigFile)
         except:
             # usually happens when there are syntax errors in the configuration
-            logging.exception("Cannot load Tier0 configuration file, not configuring new runs and run/streams")
+            logging.exception("Cannot load Tier0 configuration file")
+            return None
 
-        # only configure new runs and run/streams if we have a valid Tier0 configuration
-        if tier0Config != None:
+    def configureRuns(self):
+        """
+        _configureRuns_
+
+        Find new runs, setup global run settings and stream/dataset/trigger mapping
+
+        Find unconfigured run/stream with data, populate RunConfig,
+        setup workflows/filesets/subscriptions
+
+        """
+        findNewRunsDAO = self.daoFactory(classname = "Tier0Feeder.FindNewRuns")
+        findNewRunStreamsDAO = self.daoFactory(classname = "Tier0Feeder.FindNewRunStreams")
 
-            #
-            # find new runs, setup global run settings and stream/dataset/trigger mapping
-            #
+        # only configure new runs and run/streams if we have a valid Tier0 configuration
+        tier0Config = self.loadTier0Config()
+        if tier0Config == None:
+            logging.error("No Tier0 configuration, not configuring new runs and run/streams")
+            return None
+
+        # new runs are global, only configured by the leader
+        runHltkeys = {}
+        if self.isLeader():
             runHltkeys = findNewRunsDAO.execute(transaction = False)
-            for run, hltkey in sorted(runHltkeys.items()):
+        for run, hltkey in sorted(runHltkeys.items()):
+
+            hltConfig = None
 
-                hltConfig = None
+            # local runs have no hltkey and are configured differently
+            if hltkey != None:
 
-                # local runs have no hltkey and are configured differently
-                if hltkey != None:
+                # retrieve HLT configuration and make sure it's usable
+                try:
+                    with self.databases.connection("HLTConf") as dbInterfaceHltConf:
+                        daoFactoryHltConf = cachedDAOFactory(package = "T0.WMBS",
+                                                             logger = logging,
+                                                             dbinterface = dbInterfaceHltConf)
+                        getHLTConfigDAO = daoFactoryHltConf(classname = "RunConfig.GetHLTConfig")
+                        hltConfig = getHLTConfigDAO.execute(hltkey, transaction = False)
+                    if hltConfig['process'] == None or len(hltConfig['mapping']) == 0:
+                        raise RuntimeError("HLTConfDB query returned no process or mapping")
+                except:
+                    logging.exception("Can't retrieve hltkey %s for run %d" % (hltkey, run))
+                    continue
 
-                    # retrieve HLT configuration and make sure it's usable
-                    try:
-                        hltConfig = self.getHLTConfigDAO.execute(hltkey, transaction = False)
-                        if hltConfig['process'] == None or len(hltConfig['mapping']) == 0:
-                            raise RuntimeError("HLTConfDB query returned no process or mapping")
-                    except:
-                        logging.exception("Can't retrieve hltkey %s for run %d" % (hltkey, run))
-                        continue
+            try:
+                RunConfigAPI.configureRun(tier0Config, run, hltConfig)
+            except:
+                logging.exception("Can't configure for run %d" % (run))
 
+        runStreams = findNewRunStreamsDAO.execute(lease = self.leaseBinds(), transaction = False)
+        for run in sorted(runStreams.keys()):
+            for stream in sorted(runStreams[run]):
                 try:
-                    RunConfigAPI.configureRun(tier0Config, run, hltConfig)
+                    RunConfigAPI.configureRunStream(tier0Config,
+                                                    run, stream,
+                                                    self.specDirectory,
+                                                    self.dqmUploadProxy,
+                                                    specStore = self.specStore)
                 except:
-                    logging.exception("Can't configure for run %d" % (run))
-
-            #
-            # find unconfigured run/stream with data
-            # populate RunConfig, setup workflows/filesets/subscriptions
-            # 
-            runStreams = findNewRunStreamsDAO.execute(transaction = False)
-            for run in sorted(runStreams.keys()):
-                for stream in sorted(runStreams[run]):
-                    try:
-                        RunConfigAPI.configureRunStream(tier0Config,
-                                                        run, stream,
-                                                        self.specDirectory,
-                                                        self.dqmUploadProxy)
-                    except:
-                        logging.exception("Can't configure for run %d and stream %s" % (run, stream))
+                    logging.exception("Can't configure for run %d and stream %s" % (run, stream))
 
-        #
-        # stop and close runs based on RunSummary and StorageManager records
-        #
-        RunLumiCloseoutAPI.stopRuns(self.dbInterfaceStorageManager)
-        RunLumiCloseoutAPI.closeRuns(self.dbInterfaceStorageManager)
+        return len(runHltkeys) + sum([ len(x) for x in runStreams.values() ])
+
+    def stopCloseRuns(self):
+        """
+        _stopCloseRuns_
+
+        Stop and close runs based on RunSummary and StorageManager records
+
+        """
+        try:
+            with self.databases.connection("StorageManager") as dbInterfaceStorageManager:
+                work = RunLumiCloseoutAPI.stopRuns(dbInterfaceStorageManager)
+                work += RunLumiCloseoutAPI.closeRuns(dbInterfaceStorageManager)
+        except ExternalDatabaseUnavailable as ex:
+            logging.error("Can't stop and close runs : %s" % str(ex))
+            return None
+
+        return work
+
+    def releaseExpress(self):
+        """
+        _releaseExpress_
+
+        Release runs for Express
+
+        """
+        findNewExpressRunsDAO = self.daoFactory(classname = "Tier0Feeder.FindNewExpressRuns")
+        releaseExpressDAO = self.daoFactory(classname = "Tier0Feeder.ReleaseExpress")
 
-        #
-        # release runs for Express
-        #
         runs = findNewExpressRunsDAO.execute(transaction = False)
 
+        if len(runs) == 0:
+            return 0
+
+        binds = []
+        for run in runs:
+            binds.append( { 'RUN' : run } )
+
+        if self.databases.have("PopConLog"):
+            try:
+                with self.databases.connection("PopConLog") as dbInterfacePopConLog:
+                    daoFactoryPopConLog = cachedDAOFactory(package = "T0.WMBS",
+                                                           logger = logging,
+                                                           dbinterface = dbInterfacePopConLog)
+                    getExpressReadyRunsDAO = daoFactoryPopConLog(classname = "Tier0Feeder.GetExpressReadyRuns")
+                    runs = getExpressReadyRunsDAO.execute(binds = binds, transaction = False)
+            except ExternalDatabaseUnavailable as ex:
+                logging.error("Can't check runs for Express release : %s" % str(ex))
+                return None
+
         if len(runs) > 0:
 
             binds = []
             for run in runs:
                 binds.append( { 'RUN' : run } )
 
-            if self.getExpressReadyRunsDAO != None:
-                runs = self.getExpressReadyRunsDAO.execute(binds = binds, transaction = False)
+            releaseExpressDAO.execute(binds = binds, transaction = False)
 
-            if len(runs) > 0:
+        return len(runs)
 
-                binds = []
-                for run in runs:
-                    binds.append( { 'RUN' : run } )
+    def releasePromptReco(self):
+        """
+        _releasePromptReco_
 
-                releaseExpressDAO.execute(binds = binds, transaction = False)
+        Release runs for PromptReco
 
-        #
-        # release runs for PromptReco
-        #
-        RunConfigAPI.releasePromptReco(tier0Config,
+        """
+        RunConfigAPI.releasePromptReco(self.loadTier0Config(),
                                        self.specDirectory,
-                                       self.dqmUploadProxy)
+                                       self.dqmUploadProxy,
+                                       specStore = self.specStore)
+        return None
 
-        #
-        # insert express and reco configs into Tier0 Data Service
-        #
-        if self.haveT0DataSvc:
-            self.updateRunStreamDoneT0DataSvc()
-            self.updateExpressConfigsT0DataSvc()
-            self.updateRecoConfigsT0DataSvc()
-            self.updateRecoReleaseConfigsT0DataSvc()
-            self.lockDatasetsT0DataSvc()
+    def replicateT0DataSvc(self):
+        """
+        _replicateT0DataSvc_
 
-        #
-        # mark express and repack workflows as injected if certain conditions are met
-        # (we don't do it immediately to prevent the TaskArchiver from cleaning up too early)
-        #
+        Insert express and reco configs into Tier0 Data Service
+
+        """
+        if self.databases.have("T0DataSvc"):
+            self.t0DataSvcReplication.replicate()
+        return None
+
+    def markWorkflowsInjected(self):
+        """
+        _markWorkflowsInjected_
+
+        Mark express and repack workflows as injected if certain conditions are met
+        (we don't do it immediately to prevent the TaskArchiver from cleaning up too early)
+
+        """
+        markWorkflowsInjectedDAO = self.daoFactory(classname = "Tier0Feeder.MarkWorkflowsInjected")
         markWorkflowsInjectedDAO.execute(self.transferSystemBaseDir != None,
                                          transaction = False)
+        return None
 
-        #
-        # close stream/lumis for run/streams that are active (fileset exists and open)
-        #
-        RunLumiCloseoutAPI.closeLumiSections(self.dbInterfaceStorageManager)
+    def closeLumiSections(self):
+        """
+        _closeLumiSections_
+
+        Close stream/lumis for run/streams that are active (fileset exists and open)
+
+        """
+        try:
+            with self.databases.connection("StorageManager") as dbInterfaceStorageManager:
+                return RunLumiCloseoutAPI.closeLumiSections(dbInterfaceStorageManager, lease = self.leaseBinds())
+        except ExternalDatabaseUnavailable as ex:
+            logging.error("Can't close lumi sections : %s" % str(ex))
+            return None
+
+    def feedStreamers(self):
+        """
+        _feedStreamers_
+
+        Feed new data into exisiting filesets
+
+        """
+        myThread = threading.currentThread()
+
+        feedStreamersDAO = self.daoFactory(classname = "Tier0Feeder.FeedStreamers")
 
-        #
-        # feed new data into exisiting filesets
-        #
         try:
             myThread.transaction.begin()
-            feedStreamersDAO.execute(conn = myThread.transaction.conn, transaction = True)
+            work = feedStreamersDAO.execute(lease = self.leaseBinds(),
+                                            conn = myThread.transaction.conn, transaction = True)
         except:
             logging.exception("Can't feed data, bailing out...")
             raise
         else:
             myThread.transaction.commit()
 
-        #
-        # run ended and run/stream fileset open
-        #    => check for complete lumi_closed record, all lumis finally closed and all data feed
-        #          => if all conditions satisfied, close the run/stream fileset
-        #
-        RunLumiCloseoutAPI.closeRunStreamFilesets()
+        return work
 
-        #
-        # check and delete active split lumis
-        #
+    def closeRunStreamFilesets(self):
+        """
+        _closeRunStreamFilesets_
+
+        Run ended and run/stream fileset open
+           => check for complete lumi_closed record, all lumis finally closed and all data feed
+                 => if all conditions satisfied, close the run/stream fileset
+
+        """
+        return RunLumiCloseoutAPI.closeRunStreamFilesets(lease = self.leaseBinds())
+
+    def checkActiveSplitLumis(self):
+        """
+        _checkActiveSplitLumis_
+
+        Check and delete active split lumis
+
+        """
         RunLumiCloseoutAPI.checkActiveSplitLumis()
+        return None
 
-        #
-        # insert workflows into CouchDB for monitoring
-        #
-        self.feedCouchMonitoring()
+    def purge(self):
+        """
+        _purge_
 
-        #
-        # Update Couch when Repack and Express have closed input filesets (analog to old T0 closeout)
-        #
-        self.closeOutRealTimeWorkflows()
+        Drop streamer and lumi bookkeeping for fully done runs
 
-        #
-        # send repacked notifications to StorageManager
-        #
-        if self.transferSystemBaseDir != None:
-            self.notifyStorageManager()
+        """
+        RunLumiCloseoutAPI.purgeRuns(self.transferSystemBaseDir != None)
+        return None
 
-        #
-        # upload PCL conditions to DropBox
-        #
-        ConditionUploadAPI.uploadConditions(self.dropboxuser, self.dropboxpass, self.serviceProxy)
+    def uploadConditions(self):
+        """
+        _uploadConditions_
 
-        return
+        Upload PCL conditions to DropBox
+
+        """
+        ConditionUploadAPI.uploadConditions(self.dropboxuser, self.dropboxpass, self.serviceProxy,
+                                            maxWorkers = self.conditionUploadWorkers,
+                                            transfer = self.conditionUploadTransfer)
+        return None
 
     def feedCouchMonitoring(self):
         """
@@ -295,7 +527,7 @@ class Tier0FeederPoller(BaseWorkerThread):
                     # Here we have to trust the insert, if it doesn't happen will be easy to spot on the logs
                     markTrackedWorkflowMonitoringDAO.execute(workflowId)
 
-        return
+        return len(workflows)
 
     def closeOutRealTimeWorkflows(self):
         """
@@ -325,7 +557,7 @@ class Tier0FeederPoller(BaseWorkerThread):
                     if filesetOpen == '0':
                         self.updateClosedState(workflowName, workflowId)
 
-        return
+        return len(workflows)
 
     def updateClosedState(self, workflowName, workflowId):
         """
@@ -348,210 +580,24 @@ class Tier0FeederPoller(BaseWorkerThread):
         """
         _notifyStorageManager_
 
-        Find all finished streamers for closed all run/stream
-        Send the notification message to StorageManager
-        Update the streamer status to finished (deleted = 1)
-
-        """
-        getFinishedStreamersDAO = self.daoFactory(classname = "SMNotification.GetFinishedStreamers")
-        markStreamersFinishedDAO = self.daoFactory(classname = "SMNotification.MarkStreamersFinished")
-
-        allFinishedStreamers = getFinishedStreamersDAO.execute(transaction = False)
-
-        chunkSize = 50
-        for finishedStreamers in [ allFinishedStreamers[i:i+chunkSize] for i in range(0, len(allFinishedStreamers), chunkSize) ]:
-
-            streamers = []
-            filenameParams = ""
-
-            for (id, lfn) in finishedStreamers:
-                streamers.append(id)
-                filenameParams += "-FILENAME %s " % os.path.basename(lfn)
-
-            logging.debug("Notifying transfer system about processed streamers")
-            p = subprocess.Popen("/bin/bash", stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            output, error = p.communicate("""
-            export T0_BASE_DIR=%s
-            export T0ROOT=${T0_BASE_DIR}/T0
-            export CONFIG=${T0_BASE_DIR}/Config/TransferSystem_CERN.cfg
- 
-            export PERL5LIB=${T0ROOT}/perl_lib
-
-            unset LANGUAGE
-            unset LC_ALL
-            unset LC_CTYPE
-            export LANG=C
-
-            ${T0ROOT}/operations/sendRepackedStatus.pl --config $CONFIG %s
-            """ % (self.transferSystemBaseDir, filenameParams))
+        Notify the StorageManager about finished streamers,
+        at most smNotificationBudget per cycle
 
-            if len(error) > 0:
-                logging.error("ERROR: Could not notify transfer system about processed streamers")
-                logging.error("ERROR: %s" % error)
-
-            markStreamersFinishedDAO.execute(streamers, transaction = False)
-
-        return
-
-    def updateRunStreamDoneT0DataSvc(self):
-        """
-        _updateRunStreamDoneT0DataSvc_
-
-        Check if a run/stream workflow (express or repack) is finished and
-        cleaned up and push a completion record into the Tier0 Data Service.
-
-        """
-        getRunStreamDoneDAO = self.daoFactory(classname = "T0DataSvc.GetRunStreamDone")
-        runStreamDone = getRunStreamDoneDAO.execute(transaction = False)
-
-        if len(runStreamDone) > 0:
-
-            binds = []
-            for runStream in runStreamDone:
-                binds.append( { 'RUN' : runStream['run'],
-                                'STREAM' : runStream['stream'] } )
-
-            insertRunStreamDoneDAO = self.daoFactoryT0DataSvc(classname = "T0DataSvc.InsertRunStreamDone")
-            insertRunStreamDoneDAO.execute(binds = binds, transaction = False)
-
-            updateRunStreamDoneDAO = self.daoFactory(classname = "T0DataSvc.UpdateRunStreamDone")
-            updateRunStreamDoneDAO.execute(binds = binds, transaction = False)
-
-        return
-
-    def updateExpressConfigsT0DataSvc(self):
         """
-        _updateExpressConfigsT0DataSvc_
-
-        Check which express_config rows are missing
-        in the Tier0 Data Service and insert them,
-        also record that fact in t0ast
-
-        """
-        getExpressConfigsDAO = self.daoFactory(classname = "T0DataSvc.GetExpressConfigs")
-        expressConfigs = getExpressConfigsDAO.execute(transaction = False)
-
-        if len(expressConfigs) > 0:
-
-            bindsInsert = []
-            bindsUpdate = []
-            for config in expressConfigs:
-                bindsInsert.append( { 'RUN' : config['run'],
-                                      'STREAM' : config['stream'],
-                                      'CMSSW' : config['cmssw'],
-                                      'SCRAM_ARCH' : config['scram_arch'],
-                                      'RECO_CMSSW' : config['reco_cmssw'],
-                                      'RECO_SCRAM_ARCH' : config['reco_scram_arch'],
-                                      'ALCA_SKIM' : config['alca_skim'],
-                                      'DQM_SEQ' : config['dqm_seq'],
-                                      'GLOBAL_TAG' : config['global_tag'][:50],
-                                      'SCENARIO' : config['scenario'] } )
-                bindsUpdate.append( { 'RUN' : config['run'],
-                                      'STREAM' : config['stream'] } )
+        return RunLumiCloseoutAPI.notifyStorageManager(self.transferSystemBaseDir,
+                                                       self.smNotificationBudget,
+                                                       self.smNotificationBatchSize)
 
-            insertExpressConfigsDAO = self.daoFactoryT0DataSvc(classname = "T0DataSvc.InsertExpressConfigs")
-            insertExpressConfigsDAO.execute(binds = bindsInsert, transaction = False)
-
-            updateExpressConfigsDAO = self.daoFactory(classname = "T0DataSvc.UpdateExpressConfigs")
-            updateExpressConfigsDAO.execute(binds = bindsUpdate, transaction = False)
-
-        return
-
-    def updateRecoConfigsT0DataSvc(self):
+    def clearFinishedStreamers(self):
         """
-        _updateRecoConfigsT0DataSvc_
+        _clearFinishedStreamers_
 
-        Check which reco_config rows are missing
-        in the Tier0 Data Service and insert them,
-        also record that fact in t0ast
+        Without StorageManager notification, keep the
+        notification queue from growing
 
         """
-        getRecoConfigsDAO = self.daoFactory(classname = "T0DataSvc.GetRecoConfigs")
-        recoConfigs = getRecoConfigsDAO.execute(transaction = False)
-
-        if len(recoConfigs) > 0:
-
-            bindsInsert = []
-            bindsUpdate = []
-            for config in recoConfigs:
-                bindsInsert.append( { 'RUN' : config['run'],
-                                      'PRIMDS' : config['primds'],
-                                      'CMSSW' : config['cmssw'],
-                                      'SCRAM_ARCH' : config['scram_arch'],
-                                      'ALCA_SKIM' : config['alca_skim'],
-                                      'PHYSICS_SKIM' : config['physics_skim'],
-                                      'DQM_SEQ' : config['dqm_seq'],
-                                      'GLOBAL_TAG' : config['global_tag'][:50],
-                                      'SCENARIO' : config['scenario'] } )
-                bindsUpdate.append( { 'RUN' : config['run'],
-                                      'PRIMDS' : config['primds'] } )
-
-            insertRecoConfigsDAO = self.daoFactoryT0DataSvc(classname = "T0DataSvc.InsertRecoConfigs")
-            insertRecoConfigsDAO.execute(binds = bindsInsert, transaction = False)
-
-            updateRecoConfigsDAO = self.daoFactory(classname = "T0DataSvc.UpdateRecoConfigs")
-            updateRecoConfigsDAO.execute(binds = bindsUpdate, transaction = False)
-
-        return
-
-    def updateRecoReleaseConfigsT0DataSvc(self):
-        """
-        _updateRecoReleaseConfigsT0DataSvc_
-
-        Insert information about PromptReco release into the Tier0 Data Service.
-        Already aggregate by run, if one primary dataset is released that means
-        the whole run is considered released.
-
-        """
-        getRecoReleaseConfigsDAO = self.daoFactory(classname = "T0DataSvc.GetRecoReleaseConfigs")
-        recoReleaseConfigs = getRecoReleaseConfigsDAO.execute(transaction = False)
-
-        if len(recoReleaseConfigs) > 0:
-
-            bindsInsert = []
-            bindsUpdate = []
-            for config in recoReleaseConfigs:
-
-                locked = int(config['released'] > 0)
-
-                bindsInsert.append( { 'RUN' : config['run'],
-                                      'LOCKED' : locked } )
-                bindsUpdate.append( { 'RUN' : config['run'],
-                                      'IN_DATASVC' : locked + 1 } )
-
-            insertRecoReleaseConfigsDAO = self.daoFactoryT0DataSvc(classname = "T0DataSvc.InsertRecoReleaseConfigs")
-            insertRecoReleaseConfigsDAO.execute(binds = bindsInsert, transaction = False)
-
-            updateRecoReleaseConfigsDAO = self.daoFactory(classname = "T0DataSvc.UpdateRecoReleaseConfigs")
-            updateRecoReleaseConfigsDAO.execute(binds = bindsUpdate, transaction = False)
-
-        return
-
-    def lockDatasetsT0DataSvc(self):
-        """
-        _lockDatasetsT0DataSvc_
-
-        Publish dataset information into the Tier0 Data Service.
-
-        """
-        getDatasetLockedDAO = self.daoFactory(classname = "T0DataSvc.GetDatasetLocked")
-        datasetConfigs = getDatasetLockedDAO.execute(transaction = False)
-
-        if len(datasetConfigs) > 0:
-
-            bindsInsert = []
-            bindsUpdate = []
-            for config in datasetConfigs:
-                bindsInsert.append( { 'PATH' : config['path'] } )
-                bindsUpdate.append( { 'ID' : config['id'] } )
-
-            insertDatasetLockedDAO = self.daoFactoryT0DataSvc(classname = "T0DataSvc.InsertDatasetLocked")
-            insertDatasetLockedDAO.execute(binds = bindsInsert, transaction = False)
-
-            updateDatasetLockedDAO = self.daoFactory(classname = "T0DataSvc.UpdateDatasetLocked")
-            updateDatasetLockedDAO.execute(binds = bindsUpdate, transaction = False)
-
-        return
+        RunLumiCloseoutAPI.clearFinishedStreamers()
+        return None
 
     def terminate(self, params):
         """
@@ -561,3 +607,9 @@ class Tier0FeederPoller(BaseWorkerThread):
 
         """
         logging.debug("terminating immediately")
+        self.conditionUploadTransfer.close()
+        if self.leases != None:
+            self.leases.release()
+        # write the summary of the unfinished hour
+        if self.queryLog != None:
+            self.queryLog.flush()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+"""
+_PartitionLeases_t_
+
+Feeder partition lease test
+
+"""
+
+import unittest
+
+from T0Component.Tier0Feeder.PartitionLeases import PartitionLeases
+from T0_t.FakeDAOFactory import FakeDAOFactory
+
+
+class LeaseDAOFactory(FakeDAOFactory):
+    """
+    _LeaseDAOFactory_
+
+    Serves the lease DAOs from in memory feeder_lease
+    and feeder_member tables
+
+    """
+    def __init__(self):
+        FakeDAOFactory.__init__(self)
+        self.leases = {}
+        self.members = {}
+
+    def InsertLeasePartitions(self, partitions):
+        for partition in range(partitions):
+            self.leases.setdefault(partition, { 'owner' : None,
+                                                'heartbeat' : 0,
+                                                'expire_time' : 0 })
+
+    def UpdateFeederMember(self, owner, now, expireTime):
+        self.members[owner] = expireTime
+
+    def GetFeederMembers(self, now):
+        return [ k for k, v in self.members.items() if v > now ]
+
+    def DeleteFeederMember(self, owner, now):
+        for member in list(self.members.keys()):
+            if member == owner or self.members[member] < now:
+                del self.members[member]
+
+    def GetLeases(self):
+        return dict([ (k, dict(v)) for k, v in self.leases.items() ])
+
+    def AcquireLeases(self, binds):
+        for bind in binds:
+            lease = self.leases[bind['PARTITION']]
+            if lease['owner'] in [ None, bind['OWNER'] ] or lease['expire_time'] <= bind['NOW']:
+                lease.update( { 'owner' : bind['OWNER'],
+                                'heartbeat' : bind['NOW'],
+                                'expire_time' : bind['EXPIRE_TIME'] } )
+
+    def ReleaseLeases(self, binds):
+        for bind in binds:
+            lease = self.leases[bind['PARTITION']]
+            if lease['owner'] == bind['OWNER']:
+                lease.update( { 'owner' : None, 'expire_time' : 0 } )
+
+
+class PartitionLeasesTest(unittest.TestCase):
+    """
+    _PartitionLeasesTest_
+
+    Test for the feeder partition leases
+    """
+
+    def setUp(self):
+        self.daoFactory = LeaseDAOFactory()
+        return
+
+    def testSingleFeeder(self):
+        """
+        _testSingleFeeder_
+
+        A single feeder takes all partitions and is the leader
+
+        """
+        feeder = PartitionLeases(self.daoFactory, "node1:1", 4, 600)
+        feeder.heartbeat()
+
+        self.assertEqual(feeder.held, set([0, 1, 2, 3]))
+        self.assertTrue(feeder.isLeader())
+        self.assertEqual(feeder.leaseBinds()['PARTITIONS'], 4)
+
+        return
+
+    def testRebalance(self):
+        """
+        _testRebalance_
+
+        A second feeder gets half the partitions, there is one leader
+
+        """
+        feeder1 = PartitionLeases(self.daoFactory, "node1:1", 4, 600)
+        feeder2 = PartitionLeases(self.daoFactory, "node2:1", 4, 600)
+
+        feeder1.heartbeat()
+        self.assertEqual(len(feeder1.held), 4)
+
+        # feeder2 registers, nothing is free yet
+        feeder2.heartbeat()
+        self.assertEqual(len(feeder2.held), 0)
+
+        # feeder1 gives up its excess, feeder2 takes it
+        feeder1.heartbeat()
+        feeder2.heartbeat()
+        self.assertEqual(len(feeder1.held), 2)
+        self.assertEqual(len(feeder2.held), 2)
+        self.assertTrue(feeder1.held.isdisjoint(feeder2.held))
+        self.assertTrue(feeder1.isLeader())
+        self.assertFalse(feeder2.isLeader())
+
+        # release on shutdown, feeder2 takes over everything
+        feeder1.release()
+        feeder2.heartbeat()
+        self.assertEqual(feeder2.held, set([0, 1, 2, 3]))
+        self.assertTrue(feeder2.isLeader())
+
+        return
+
+    def testFailover(self):
+        """
+        _testFailover_
+
+        Expired leases of a dead feeder are taken over
+
+        """
+        feeder1 = PartitionLeases(self.daoFactory, "node1:1", 4, 600)
+        feeder2 = PartitionLeases(self.daoFactory, "node2:1", 4, 600)
+
+        feeder1.heartbeat()
+        feeder2.heartbeat()
+        self.assertEqual(len(feeder2.held), 0)
+
+        # feeder1 stops sending heartbeats
+        for lease in self.daoFactory.leases.values():
+            lease['expire_time'] = 0
+        self.daoFactory.members["node1:1"] = 0
+
+        feeder2.heartbeat()
+        self.assertEqual(feeder2.held, set([0, 1, 2, 3]))
+        self.assertTrue(feeder2.isLeader())
+
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+_StageScheduler_t_
+
+Feeder stage scheduler test
+
+"""
+
+import unittest
+
+from T0Component.Tier0Feeder.StageScheduler import StageScheduler
+
+
+class FakeStage(object):
+    """
+    _FakeStage_
+
+    Returns a prepared amount of work per call
+
+    """
+    def __init__(self, work):
+        self.work = list(work)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        result = self.work.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class StageSchedulerTest(unittest.TestCase):
+    """
+    _StageSchedulerTest_
+
+    Test for the per stage feeder cadence
+    """
+
+    def testBackoff(self):
+        """
+        _testBackoff_
+
+        No work doubles the interval up to the maximum, work resets it
+
+        """
+        scheduler = StageScheduler()
+        stage = FakeStage([ 0, 0, 0, 0, 0, 5 ])
+        scheduler.add("test", stage, 10, 60)
+
+        intervals = []
+        for i in range(6):
+            scheduler.stages[0].nextRun = 0
+            scheduler.run()
+            intervals.append(scheduler.status()['test']['interval'])
+
+        self.assertEqual(intervals, [ 20, 40, 60, 60, 60, 10 ])
+        self.assertEqual(stage.calls, 6)
+
+        return
+
+    def testNotDue(self):
+        """
+        _testNotDue_
+
+        Stages are only run when due
+
+        """
+        scheduler = StageScheduler()
+        stage = FakeStage([ 0, 0 ])
+        scheduler.add("test", stage, 3600, 3600)
+
+        scheduler.run()
+        scheduler.run()
+
+        self.assertEqual(stage.calls, 1)
+
+        return
+
+    def testBacklog(self):
+        """
+        _testBacklog_
+
+        A stage with backlog runs on every call, None keeps the minimum
+
+        """
+        scheduler = StageScheduler()
+        stage = FakeStage([ 100, 100, None ])
+        scheduler.add("test", stage, 30, 300, backlog = 100)
+
+        scheduler.run()
+        scheduler.run()
+        self.assertEqual(stage.calls, 2)
+        self.assertEqual(scheduler.status()['test']['interval'], 0)
+
+        scheduler.run()
+        self.assertEqual(stage.calls, 3)
+        self.assertEqual(scheduler.status()['test']['interval'], 30)
+
+        return
+
+    def testFailure(self):
+        """
+        _testFailure_
+
+        A failing stage is rescheduled at its minimum interval and
+        the exception is passed on, overrides replace the cadence
+
+        """
+        scheduler = StageScheduler({ 'test' : (0, 0) })
+        stage = FakeStage([ RuntimeError("failed"), 0 ])
+        scheduler.add("test", stage, 3600, 3600)
+
+        self.assertRaises(RuntimeError, scheduler.run)
+        scheduler.run()
+        self.assertEqual(stage.calls, 2)
+
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+"""
+_AuditAPI_t_
+
+Tier0Auditor consistency checks test
+
+"""
+
+import threading
+import unittest
+
+from T0.Audit import AuditAPI
+from T0_t.FakeDAOFactory import FakeDAOFactory, FakeTransaction
+
+
+class AuditDAOFactory(FakeDAOFactory):
+    """
+    _AuditDAOFactory_
+
+    Serves the auditor DAOs from an in memory state
+
+    """
+    def __init__(self, candidates):
+        FakeDAOFactory.__init__(self)
+        self.candidates = candidates
+        self.checkpoints = {}
+        self.findings = {}
+
+    def FindAuditCandidates(self):
+        candidates = []
+        for candidate in self.candidates:
+            candidate = dict(candidate)
+            checkpoint = self.checkpoints.get((candidate['run'], candidate['stream']))
+            candidate['checkpoint'] = checkpoint and checkpoint['LAST_CHANGE']
+            candidate['check_time'] = checkpoint and checkpoint['TIME']
+            candidates.append(candidate)
+        return candidates
+
+    def GetClosedLumiCount(self, run, stream):
+        return (8, 9)
+
+    def GetStreamerCountMismatches(self, run, stream, closedBefore):
+        return {}
+
+    def GetActiveSplitLumiCount(self, run, fileset):
+        return 0
+
+    def UpdateAuditCheckpoints(self, binds):
+        for bind in binds:
+            self.checkpoints[(bind['RUN'], bind['STREAM'])] = bind
+
+    def ReplaceAuditFindings(self, runStreams, findings):
+        for runStream in runStreams:
+            self.findings.pop(runStream, None)
+        for finding in findings:
+            self.findings.setdefault((finding['RUN'], finding['STREAM']), []).append(finding['CHECK'])
+
+
+class AuditAPITest(unittest.TestCase):
+    """
+    _AuditAPITest_
+
+    Test for the incremental auditor
+
+    """
+    def setUp(self):
+        threading.currentThread().transaction = FakeTransaction()
+        self.settings = dict(AuditAPI.defaultSettings)
+        return
+
+    def candidate(self, run, stream, lastChange, stopTime = 0, closeTime = 0):
+        return { 'run' : run, 'stream' : stream, 'fileset' : run * 10 + stream,
+                 'stop_time' : stopTime, 'close_time' : closeTime, 'lumicount' : 10,
+                 'last_change' : lastChange }
+
+    def testIncremental(self):
+        """
+        _testIncremental_
+
+        Only changed run/streams are verified again
+
+        """
+        daoFactory = AuditDAOFactory([ self.candidate(1, 1, 100, stopTime = 1),
+                                      self.candidate(1, 2, 100) ])
+
+        summary = AuditAPI.auditRunStreams(daoFactory, self.settings)
+        self.assertEqual(summary['verified'], 2)
+        self.assertEqual(daoFactory.findings, { (1, 1) : [ "MissingEoLS" ] })
+        self.assertEqual(daoFactory.checkpoints[(1, 1)]['FINDINGS'], 1)
+
+        # nothing changed
+        summary = AuditAPI.auditRunStreams(daoFactory, self.settings)
+        self.assertEqual(summary['due'], 0)
+        self.assertEqual(summary['verified'], 0)
+
+        # new data for one run/stream
+        daoFactory.candidates[1]['last_change'] = 200
+        daoFactory.calls = {}
+        summary = AuditAPI.auditRunStreams(daoFactory, self.settings)
+        self.assertEqual(summary['verified'], 1)
+        self.assertEqual(set([ args[:2] for args in daoFactory.calls["Tier0Auditor.GetStreamerCountMismatches"] ]),
+                         set([ (1, 2) ]))
+        self.assertEqual(daoFactory.findings, { (1, 1) : [ "MissingEoLS" ] })
+
+        return
+
+    def testTimeBudget(self):
+        """
+        _testTimeBudget_
+
+        Work left over when the budget is used up is done
+        in later cycles, least recently verified first
+
+        """
+        daoFactory = AuditDAOFactory([ self.candidate(1, stream, 100) for stream in range(5) ])
+
+        self.settings['timeBudget'] = -1
+        summary = AuditAPI.auditRunStreams(daoFactory, self.settings)
+        self.assertEqual(summary['due'], 5)
+        self.assertEqual(summary['verified'], 0)
+
+        daoFactory.checkpoints[(1, 0)] = { 'LAST_CHANGE' : 50, 'TIME' : 1 }
+        due = AuditAPI.selectDue(daoFactory.FindAuditCandidates(), 1000, 3600)
+        self.assertEqual([ candidate['stream'] for candidate in due ], [ 1, 2, 3, 4, 0 ])
+
+        return
+
+    def testFailedCheck(self):
+        """
+        _testFailedCheck_
+
+        A run/stream where a check raises gets no checkpoint
+        and is verified again in the next cycle
+
+        """
+        daoFactory = AuditDAOFactory([ self.candidate(1, 1, 100, stopTime = 1),
+                                       self.candidate(1, 2, 100) ])
+
+        def failingCheck(daoFactory, candidate, now, settings):
+            if candidate['stream'] == 1:
+                raise RuntimeError("ORA-03113")
+            return None
+        checks = AuditAPI.auditChecks + [ ("Failing", failingCheck) ]
+
+        summary = AuditAPI.auditRunStreams(daoFactory, self.settings, checks)
+        self.assertEqual(summary['verified'], 1)
+        self.assertEqual(summary['failed'], 1)
+        self.assertEqual(list(daoFactory.checkpoints.keys()), [ (1, 2) ])
+        self.assertEqual(daoFactory.findings, {})
+
+        summary = AuditAPI.auditRunStreams(daoFactory, self.settings)
+        self.assertEqual(summary['due'], 1)
+        self.assertEqual(summary['verified'], 1)
+        self.assertEqual(daoFactory.checkpoints[(1, 1)]['FINDINGS'], 1)
+
+        return
+
+    def testOpenFileset(self):
+        """
+        _testOpenFileset_
+
+        Filesets of runs closed long ago are reported
+
+        """
+        candidate = self.candidate(1, 1, 100, stopTime = 1, closeTime = 10)
+        self.assertEqual(AuditAPI.checkOpenFileset(None, candidate, 100, self.settings), None)
+        self.assertNotEqual(AuditAPI.checkOpenFileset(None, candidate, 10 + 2 * 86400, self.settings), None)
+
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
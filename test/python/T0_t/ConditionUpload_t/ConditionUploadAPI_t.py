@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+"""
+_ConditionUploadAPI_t_
+
+PCL payload upload test
+
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import threading
+
+from T0.ConditionUpload import ConditionUploadAPI
+
+
+class LocalPayloadTransfer(ConditionUploadAPI.PayloadTransfer):
+    """
+    _LocalPayloadTransfer_
+
+    Local directory instead of EOS and a fake Dropbox
+    that remembers what was uploaded
+
+    """
+    def __init__(self, eosDir, workDir):
+        ConditionUploadAPI.PayloadTransfer.__init__(self, "user", "password", "/proxy",
+                                                    workDir = workDir)
+        self.eosDir = eosDir
+        self.uploaded = {}
+        self.failUploads = set()
+        self.lock = threading.Lock()
+        self.copies = 0
+        self.maxCopies = 0
+
+    def pfn(self, lfn):
+        return self.eosDir + lfn
+
+    def copy(self, source, destination):
+        with self.lock:
+            self.copies += 1
+            self.maxCopies = max(self.maxCopies, self.copies)
+        try:
+            time.sleep(0.05)
+            if not os.path.exists(source):
+                return (False, "No such file %s" % source)
+            shutil.copy(source, destination)
+        finally:
+            with self.lock:
+                self.copies -= 1
+        return (True, "")
+
+    def upload(self, filenameDB):
+        payload = os.path.basename(filenameDB).split('.')[0]
+        if payload in self.failUploads:
+            raise RuntimeError("Dropbox said no")
+        with open(filenameDB.replace(".db", ".txt")) as metadata:
+            self.uploaded[payload] = metadata.read()
+        return
+
+
+class ConditionUploadAPITest(unittest.TestCase):
+    """
+    _ConditionUploadAPITest_
+
+    Test for the payload upload part of the PCL condition upload
+    """
+    def setUp(self):
+        self.eosDir = tempfile.mkdtemp()
+        self.workDir = tempfile.mkdtemp()
+        self.transfer = LocalPayloadTransfer(self.eosDir, self.workDir)
+        os.makedirs(os.path.join(self.eosDir, "store", "pcl"))
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.eosDir)
+        shutil.rmtree(self.workDir)
+        return
+
+    def createPayloads(self, count):
+        """
+        _createPayloads_
+
+        Create sqlite and metadata files for a number of payloads
+
+        """
+        condFiles = []
+        for i in range(count):
+            for ext in [ "db", "txt" ]:
+                lfn = "/store/pcl/payload%d.%s" % (i, ext)
+                with open(self.eosDir + lfn, 'w') as f:
+                    if ext == "db":
+                        f.write("sqlite")
+                    else:
+                        f.write("prodMetaData prod\n")
+                        f.write("prepMetaData prep\n")
+                condFiles.append( { 'fileid' : len(condFiles),
+                                    'subscription' : 1,
+                                    'lfn' : lfn } )
+        condFiles.append( { 'fileid' : len(condFiles),
+                            'subscription' : 2,
+                            'lfn' : "/no/output" } )
+        return condFiles
+
+    def testUpload(self):
+        """
+        _testUpload_
+
+        All payloads are uploaded concurrently, the .uploaded
+        record is written and nothing is left in the work area
+
+        """
+        condFiles = self.createPayloads(8)
+
+        (completeFiles, failedPayloads) = ConditionUploadAPI.uploadToDropbox(condFiles, False, self.transfer,
+                                                                             maxWorkers = 4)
+
+        self.assertEqual(len(completeFiles), 17)
+        self.assertEqual(failedPayloads, [])
+        self.assertEqual(len(self.transfer.uploaded), 8)
+        self.assertEqual(self.transfer.uploaded['payload0'], "prod\n")
+        self.assertTrue(os.path.exists(self.eosDir + "/store/pcl/payload0.txt.uploaded"))
+        self.assertTrue(self.transfer.maxCopies > 1)
+        self.assertEqual(os.listdir(self.workDir), [])
+
+        return
+
+    def testValidationMode(self):
+        """
+        _testValidationMode_
+
+        Validation mode uploads with the prep metadata
+
+        """
+        condFiles = self.createPayloads(1)
+
+        ConditionUploadAPI.uploadToDropbox(condFiles, True, self.transfer)
+
+        self.assertEqual(self.transfer.uploaded['payload0'], "prep\n")
+
+        return
+
+    def testFailures(self):
+        """
+        _testFailures_
+
+        Failed payloads are reported, the others still complete
+
+        """
+        condFiles = self.createPayloads(4)
+        os.remove(self.eosDir + "/store/pcl/payload1.db")
+        self.transfer.failUploads.add("payload2")
+
+        (completeFiles, failedPayloads) = ConditionUploadAPI.uploadToDropbox(condFiles, False, self.transfer,
+                                                                             maxWorkers = 4)
+
+        self.assertEqual(failedPayloads, [ "payload1", "payload2" ])
+        self.assertEqual(len(completeFiles), 5)
+        self.assertEqual(sorted(self.transfer.uploaded.keys()), [ "payload0", "payload3" ])
+        self.assertEqual(os.listdir(self.workDir), [])
+
+        return
+
+    def testDeferred(self):
+        """
+        _testDeferred_
+
+        Deferred payloads are neither tried nor reported as failed
+
+        """
+        condFiles = self.createPayloads(2)
+
+        (completeFiles, failedPayloads) = ConditionUploadAPI.uploadToDropbox(condFiles, False, self.transfer,
+                                                                             deferredPayloads = set([ "payload0" ]))
+
+        self.assertEqual(failedPayloads, [])
+        self.assertEqual(len(completeFiles), 3)
+        self.assertEqual(list(self.transfer.uploaded.keys()), [ "payload1" ])
+
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+"""
+_PayloadPackage_t_
+
+Dropbox upload package test
+
+Run with 'benchmark' as argument to compare the packaging
+speed against the old three pass tar, hash and rename
+on a large sqlite payload.
+
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import hashlib
+import tarfile
+import tempfile
+import unittest
+
+from T0.ConditionUpload import upload
+
+
+def createPayload(directory, name, rows):
+    """
+    _createPayload_
+
+    Create a sqlite file with some payload like content plus its metadata
+
+    """
+    basepath = os.path.join(directory, name)
+
+    connection = sqlite3.connect(basepath + ".db")
+    connection.execute("CREATE TABLE IOV (SINCE INTEGER, PAYLOAD BLOB)")
+    for i in range(rows):
+        blob = os.urandom(256) + b"\0" * 768
+        connection.execute("INSERT INTO IOV VALUES (?, ?)", (i, sqlite3.Binary(blob)))
+    connection.commit()
+    connection.close()
+
+    with open(basepath + ".txt", 'w') as metadata:
+        json.dump( { 'destinationDatabase' : "oracle://cms_orcon_prod/CMS_CONDITIONS",
+                     'inputTag' : name }, metadata)
+
+    return basepath
+
+
+class PayloadPackageTest(unittest.TestCase):
+    """
+    _PayloadPackageTest_
+
+    Test for the single pass upload packager
+    """
+    def setUp(self):
+        self.workDir = tempfile.mkdtemp()
+        self.basepath = createPayload(self.workDir, "payload", 100)
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.workDir)
+        return
+
+    def verifyPackage(self, content):
+        """
+        _verifyPackage_
+
+        Package is a valid tar.bz2 with sqlite file and metadata
+
+        """
+        tarFile = tarfile.open(fileobj = io.BytesIO(content), mode = 'r:bz2')
+        self.assertEqual(sorted(tarFile.getnames()), [ 'data.db', 'metadata.txt' ])
+        with open(self.basepath + ".db", 'rb') as data:
+            self.assertEqual(tarFile.extractfile('data.db').read(), data.read())
+        metadata = json.loads(tarFile.extractfile('metadata.txt').read().decode('utf-8'))
+        self.assertEqual(metadata['inputTag'], "payload")
+        self.assertEqual(tarFile.getmember('metadata.txt').mode, 0o400)
+        return
+
+    def testInMemory(self):
+        """
+        _testInMemory_
+
+        Small packages stay in memory and are hashed on the fly
+
+        """
+        package = upload.PayloadPackage(self.basepath, tempDir = self.workDir)
+
+        formData = package.formData()
+        self.assertEqual(formData[0], upload.pycurl.FORM_BUFFER)
+        self.assertEqual(formData[1], package.fileHash)
+        self.assertEqual(hashlib.sha1(formData[3]).hexdigest(), package.fileHash)
+        self.assertEqual(len(formData[3]), package.size)
+        self.verifyPackage(formData[3])
+
+        package.close()
+        self.assertEqual(sorted(os.listdir(self.workDir)), [ "payload.db", "payload.txt" ])
+
+        return
+
+    def testSpooled(self):
+        """
+        _testSpooled_
+
+        Large packages are spooled to a unique temporary file,
+        which is removed when the package is closed
+
+        """
+        package = upload.PayloadPackage(self.basepath, spoolSize = 1024, tempDir = self.workDir)
+        otherPackage = upload.PayloadPackage(self.basepath, spoolSize = 1024, tempDir = self.workDir)
+
+        formData = package.formData()
+        self.assertEqual(formData[0], upload.pycurl.FORM_FILE)
+        self.assertEqual(formData[3], package.fileHash)
+        self.assertNotEqual(formData[1], otherPackage.formData()[1])
+        self.assertEqual(package.fileHash, otherPackage.fileHash)
+
+        with open(formData[1], 'rb') as f:
+            content = f.read()
+        self.assertEqual(hashlib.sha1(content).hexdigest(), package.fileHash)
+        self.verifyPackage(content)
+
+        package.close()
+        otherPackage.close()
+        self.assertEqual(sorted(os.listdir(self.workDir)), [ "payload.db", "payload.txt" ])
+
+        return
+
+    def testCompressLevel(self):
+        """
+        _testCompressLevel_
+
+        Fast compression still makes a valid package
+
+        """
+        package = upload.PayloadPackage(self.basepath, compressLevel = 1)
+        self.verifyPackage(package.formData()[3])
+        package.close()
+
+        return
+
+
+def legacyPackage(basepath, temporaryFile):
+    """
+    _legacyPackage_
+
+    Old way of packaging, bz2 tar file, hashing it and
+    renaming it to the hash
+
+    """
+    tarFile = tarfile.open(temporaryFile, 'w:bz2')
+    with open('%s.db' % basepath, 'rb') as data:
+        upload.addToTarFile(tarFile, data, 'data.db')
+    with tempfile.NamedTemporaryFile(mode = 'w+') as metadata:
+        with open('%s.txt' % basepath, 'r') as originalMetadata:
+            json.dump(json.load(originalMetadata), metadata, sort_keys = True, indent = 4)
+        metadata.seek(0)
+        upload.addToTarFile(tarFile, metadata.buffer if hasattr(metadata, 'buffer') else metadata, 'metadata.txt')
+    tarFile.close()
+
+    fileHash = hashlib.sha1()
+    with open(temporaryFile, 'rb') as f:
+        while True:
+            data = f.read(4 * 1024 * 1024)
+            if not data:
+                break
+            fileHash.update(data)
+    fileHash = fileHash.hexdigest()
+
+    filename = os.path.join(os.path.dirname(temporaryFile), fileHash)
+    os.rename(temporaryFile, filename)
+    os.unlink(filename)
+    return fileHash
+
+def benchmark(rows = 200000):
+    """
+    _benchmark_
+
+    Time packaging of a large sqlite payload
+
+    """
+    workDir = tempfile.mkdtemp()
+    try:
+        basepath = createPayload(workDir, "payload", rows)
+        print("payload size %.1f MB" % (os.path.getsize(basepath + ".db") / 1048576.0))
+
+        startTime = time.time()
+        legacyPackage(basepath, os.path.join(workDir, upload.defaultTemporaryFile))
+        print("legacy tar, hash and rename : %6.2fs" % (time.time() - startTime))
+
+        for compressLevel in [ 9, 1 ]:
+            startTime = time.time()
+            package = upload.PayloadPackage(basepath, compressLevel = compressLevel, tempDir = workDir)
+            print("single pass, level %d        : %6.2fs, %.1f MB" % (compressLevel, time.time() - startTime,
+                                                                   package.size / 1048576.0))
+            package.close()
+    finally:
+        shutil.rmtree(workDir)
+
+    return
+
+
+if __name__ == '__main__':
+    if 'benchmark' in sys.argv[1:]:
+        benchmark()
+    else:
+        unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+"""
+_UploadSession_t_
+
+Dropbox upload session test
+
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from T0.ConditionUpload import upload
+
+
+class FakeConditionsUploader(object):
+    """
+    _FakeConditionsUploader_
+
+    Counts sign ins and uploads, rejects the token on demand
+
+    """
+    instances = []
+
+    def __init__(self, hostname):
+        self.hostname = hostname
+        self.userName = None
+        self.signIns = 0
+        self.uploads = []
+        self.rejectToken = False
+        FakeConditionsUploader.instances.append(self)
+
+    def signIn(self, username, password):
+        self.signIns += 1
+        self.userName = username
+        return True
+
+    def signOut(self):
+        self.userName = None
+
+    def close(self):
+        pass
+
+    def uploadPackage(self, basename, package):
+        if self.rejectToken:
+            self.rejectToken = False
+            raise upload.HTTPError(401, "token expired")
+        self.uploads.append(basename)
+        return True
+
+
+class UploadSessionTest(unittest.TestCase):
+    """
+    _UploadSessionTest_
+
+    Test for the long lived Dropbox session
+    """
+    def setUp(self):
+        self.realConditionsUploader = upload.ConditionsUploader
+        upload.ConditionsUploader = FakeConditionsUploader
+        FakeConditionsUploader.instances = []
+        self.workDir = tempfile.mkdtemp()
+        return
+
+    def tearDown(self):
+        upload.ConditionsUploader = self.realConditionsUploader
+        shutil.rmtree(self.workDir)
+        return
+
+    def createPayload(self, name, destinationDatabase):
+        filename = os.path.join(self.workDir, name)
+        with open(filename + ".db", 'w') as f:
+            f.write("sqlite")
+        with open(filename + ".txt", 'w') as f:
+            json.dump( { 'destinationDatabase' : destinationDatabase }, f)
+        return filename + ".db"
+
+    def testTokenReuse(self):
+        """
+        _testTokenReuse_
+
+        One sign in per host, no matter how many payloads
+
+        """
+        session = upload.UploadSession("user", "password")
+
+        for i in range(3):
+            upload.uploadTier0Files([ self.createPayload("prod%d" % i, "oracle://cms_orcon_prod/CMS_CONDITIONS") ],
+                                    "user", "password", session = session)
+        upload.uploadTier0Files([ self.createPayload("prep", "oracle://cms_orcoff_prep/CMS_CONDITIONS") ],
+                                "user", "password", session = session)
+
+        uploaders = dict( [ (x.hostname, x) for x in FakeConditionsUploader.instances ] )
+        self.assertEqual(len(FakeConditionsUploader.instances), 2)
+        self.assertEqual(uploaders[upload.defaultHostname].signIns, 1)
+        self.assertEqual(len(uploaders[upload.defaultHostname].uploads), 3)
+        self.assertEqual(uploaders[upload.defaultHostnamePrep].signIns, 1)
+        self.assertEqual(len(uploaders[upload.defaultHostnamePrep].uploads), 1)
+
+        session.close()
+        self.assertEqual(session.uploaders, {})
+
+        return
+
+    def testReauthentication(self):
+        """
+        _testReauthentication_
+
+        A rejected token or an expired one means signing in again
+
+        """
+        session = upload.UploadSession("user", "password")
+        filename = self.createPayload("prod", "oracle://cms_orcon_prod/CMS_CONDITIONS")
+
+        session.uploadFile(filename)
+        uploader = FakeConditionsUploader.instances[0]
+
+        uploader.rejectToken = True
+        session.uploadFile(filename)
+        self.assertEqual(uploader.signIns, 2)
+        self.assertEqual(len(uploader.uploads), 2)
+
+        session.tokenLifetime = -1
+        session.uploadFile(filename)
+        self.assertEqual(uploader.signIns, 3)
+        self.assertEqual(len(FakeConditionsUploader.instances), 1)
+
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
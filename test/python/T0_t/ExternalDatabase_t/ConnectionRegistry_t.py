@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+"""
+_ConnectionRegistry_t_
+
+Connection registry test
+
+"""
+
+import unittest
+import threading
+
+from T0.ExternalDatabase.ConnectionRegistry import ConnectionRegistry, ConnectionPool, ExternalDatabaseUnavailable
+
+
+class FakeEngine(object):
+
+    def __init__(self):
+        self.disposed = False
+
+    def dispose(self):
+        self.disposed = True
+
+
+class FakeDBInterface(object):
+    """
+    _FakeDBInterface_
+
+    Stands in for a remote database, fails on demand
+
+    """
+    def __init__(self):
+        self.fail = False
+        self.calls = 0
+        self.engine = FakeEngine()
+
+    def processData(self, sql, binds = {}, conn = None, transaction = False):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("database went away")
+        return []
+
+
+class FakeConnectionPool(ConnectionPool):
+
+    def __init__(self, *args, **kwargs):
+        ConnectionPool.__init__(self, *args, **kwargs)
+        self.connected = []
+        self.refuse = False
+
+    def _connect(self):
+        if self.refuse:
+            raise RuntimeError("connection refused")
+        dbInterface = FakeDBInterface()
+        self.connected.append(dbInterface)
+        return dbInterface
+
+
+class ConnectionRegistryTest(unittest.TestCase):
+    """
+    _ConnectionRegistryTest_
+
+    Test for the external database connection registry
+    """
+
+    def testLazyConnect(self):
+        """
+        _testLazyConnect_
+
+        Nothing is connected before the first borrow, connections are reused
+
+        """
+        pool = FakeConnectionPool("Test", "oracle://fake", maxConnections = 2)
+        self.assertEqual(len(pool.connected), 0)
+
+        with pool.connection() as dbInterface:
+            dbInterface.processData("SELECT 1 FROM DUAL")
+        with pool.connection() as dbInterface:
+            dbInterface.processData("SELECT 1 FROM DUAL")
+
+        self.assertEqual(len(pool.connected), 1)
+
+        metrics = pool.metrics()
+        self.assertEqual(metrics['connections'], 1)
+        self.assertEqual(metrics['idle'], 1)
+        # health check plus two queries
+        self.assertEqual(metrics['queries'], 3)
+        self.assertEqual(metrics['failures'], 0)
+
+        return
+
+    def testPoolLimit(self):
+        """
+        _testPoolLimit_
+
+        Borrowing from a busy pool waits up to the timeout
+
+        """
+        pool = FakeConnectionPool("Test", "oracle://fake", maxConnections = 1)
+
+        with pool.connection():
+            self.assertRaises(ExternalDatabaseUnavailable, pool.connection(timeout = 0.1).__enter__)
+
+        with pool.connection():
+            pass
+
+        self.assertEqual(len(pool.connected), 1)
+
+        return
+
+    def testConcurrentBorrow(self):
+        """
+        _testConcurrentBorrow_
+
+        Worker threads never share a connection
+
+        """
+        pool = FakeConnectionPool("Test", "oracle://fake", maxConnections = 3)
+        inUse = set()
+        errors = []
+        lock = threading.Lock()
+
+        def worker():
+            for i in range(50):
+                with pool.connection() as dbInterface:
+                    with lock:
+                        if id(dbInterface) in inUse:
+                            errors.append("shared connection")
+                        inUse.add(id(dbInterface))
+                    dbInterface.processData("SELECT 1 FROM DUAL")
+                    with lock:
+                        inUse.remove(id(dbInterface))
+
+        threads = [ threading.Thread(target = worker) for i in range(6) ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertTrue(len(pool.connected) <= 3)
+
+        return
+
+    def testCircuitBreaker(self):
+        """
+        _testCircuitBreaker_
+
+        Consecutive failures stop further connection attempts until
+        the retry delay has passed
+
+        """
+        pool = FakeConnectionPool("Test", "oracle://fake",
+                                  failureThreshold = 2, retryDelay = 3600)
+        pool.refuse = True
+
+        for i in range(2):
+            self.assertRaises(ExternalDatabaseUnavailable, pool.connection().__enter__)
+
+        self.assertFalse(pool.isAvailable())
+
+        # breaker is open, we don't even try to connect
+        pool.refuse = False
+        self.assertRaises(ExternalDatabaseUnavailable, pool.connection().__enter__)
+        self.assertEqual(len(pool.connected), 0)
+
+        # retry delay passed
+        pool.openUntil = 0
+        with pool.connection() as dbInterface:
+            dbInterface.processData("SELECT 1 FROM DUAL")
+        self.assertTrue(pool.isAvailable())
+
+        return
+
+    def testQueryFailure(self):
+        """
+        _testQueryFailure_
+
+        A failed query discards the connection
+
+        """
+        pool = FakeConnectionPool("Test", "oracle://fake")
+
+        try:
+            with pool.connection() as dbInterface:
+                dbInterface.dbInterface.fail = True
+                dbInterface.processData("SELECT 1 FROM DUAL")
+        except RuntimeError:
+            pass
+
+        metrics = pool.metrics()
+        self.assertEqual(metrics['connections'], 0)
+        self.assertEqual(metrics['failures'], 1)
+        self.assertTrue(pool.connected[0].engine.disposed)
+
+        with pool.connection():
+            pass
+        self.assertEqual(len(pool.connected), 2)
+
+        return
+
+    def testDroppedConnections(self):
+        """
+        _testDroppedConnections_
+
+        Connections failing the health check and idle connections
+        when the circuit breaker opens are closed
+
+        """
+        pool = FakeConnectionPool("Test", "oracle://fake", maxConnections = 3,
+                                  failureThreshold = 2, retryDelay = 3600,
+                                  healthCheckInterval = 0)
+
+        with pool.connection():
+            with pool.connection():
+                with pool.connection():
+                    pass
+        self.assertEqual(pool.metrics()['idle'], 3)
+
+        # the health check of the next borrow fails
+        for dbInterface in pool.connected:
+            dbInterface.fail = True
+        self.assertRaises(ExternalDatabaseUnavailable, pool.connection().__enter__)
+        self.assertEqual(len([ dbInterface for dbInterface in pool.connected
+                               if dbInterface.engine.disposed ]), 1)
+
+        # the second failure opens the circuit breaker,
+        # the connection still idle is closed as well
+        self.assertRaises(ExternalDatabaseUnavailable, pool.connection().__enter__)
+        self.assertFalse(pool.isAvailable())
+        self.assertEqual([ dbInterface.engine.disposed for dbInterface in pool.connected ],
+                         [ True, True, True ])
+
+        metrics = pool.metrics()
+        self.assertEqual(metrics['connections'], 0)
+        self.assertEqual(metrics['idle'], 0)
+
+        return
+
+    def testRegistry(self):
+        """
+        _testRegistry_
+
+        Unknown databases can't be borrowed
+
+        """
+        registry = ConnectionRegistry()
+        registry.register("StorageManager", "oracle://fake")
+
+        self.assertTrue(registry.have("StorageManager"))
+        self.assertFalse(registry.have("PopConLog"))
+        self.assertRaises(ExternalDatabaseUnavailable, registry.connection, "PopConLog")
+        self.assertTrue("StorageManager" in registry.metrics())
+
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+_FakeDAOFactory_
+
+In memory stand-in for a T0.WMBS DAOFactory, for unit tests
+of code that only talks to the database through DAOs. Import
+it as T0_t.FakeDAOFactory with test/python in the PYTHONPATH.
+
+A DAO returns the canned result passed in for its classname,
+calls the function passed in for its classname or, for neither,
+calls the factory method named like the last part of the
+classname. This way a test can either pass in the results or
+subclass FakeDAOFactory and keep an in memory state.
+
+Every call is recorded as the tuple of its positional arguments.
+
+"""
+
+
+class FakeTransaction(object):
+    """
+    _FakeTransaction_
+
+    Stand-in for myThread.transaction
+
+    """
+    conn = None
+
+    def begin(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class FakeDAO(object):
+    """
+    _FakeDAO_
+
+    """
+    def __init__(self, result, calls):
+        self.result = result
+        self.calls = calls
+
+    def execute(self, *args, **kwargs):
+        kwargs.pop('conn', None)
+        kwargs.pop('transaction', None)
+        self.calls.append(args)
+        if callable(self.result):
+            return self.result(*args, **kwargs)
+        return self.result
+
+
+class FakeDAOFactory(object):
+    """
+    _FakeDAOFactory_
+
+    """
+    def __init__(self, results = None):
+        self.results = results or {}
+        self.calls = {}
+
+    def __call__(self, classname):
+        if classname in self.results:
+            result = self.results[classname]
+        else:
+            result = getattr(self, classname.split(".")[-1])
+        return FakeDAO(result, self.calls.setdefault(classname, []))
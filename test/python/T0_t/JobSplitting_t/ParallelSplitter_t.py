@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+_ParallelSplitter_t_
+
+Parallel splitter summary test
+
+"""
+
+import unittest
+
+from T0.JobSplitting.ParallelSplitter import summarizeResults
+
+
+class ParallelSplitterTest(unittest.TestCase):
+    """
+    _ParallelSplitterTest_
+
+    Test for the parallel splitter throughput summary
+    """
+
+    def testSummary(self):
+        """
+        _testSummary_
+
+        Throughput, job counts and failures are summed up over
+        all subscriptions
+
+        """
+        results = [ { 'id' : 1, 'split_algo' : "Repack", 'jobs' : 3, 'duration' : 0.5, 'error' : None },
+                    { 'id' : 2, 'split_algo' : "Express", 'jobs' : 1, 'duration' : 1.5, 'error' : None },
+                    { 'id' : 3, 'split_algo' : "Repack", 'jobs' : 0, 'duration' : 1.0, 'error' : "ORA-00060" },
+                    { 'id' : 4, 'split_algo' : "Express", 'jobs' : 2, 'duration' : 1.0, 'error' : None } ]
+
+        summary = summarizeResults(results, 2.0)
+
+        self.assertEqual(summary['subscriptions'], 4)
+        self.assertEqual(summary['failed'], 1)
+        self.assertEqual(summary['jobs'], 6)
+        self.assertEqual(summary['subscriptions_per_second'], 2.0)
+        self.assertEqual(summary['avg_duration'], 1.0)
+        self.assertEqual(summary['max_duration'], 1.5)
+
+        return
+
+    def testEmpty(self):
+        """
+        _testEmpty_
+
+        Nothing split, nothing divided by zero
+
+        """
+        summary = summarizeResults([], 0.0)
+
+        self.assertEqual(summary['subscriptions'], 0)
+        self.assertEqual(summary['subscriptions_per_second'], 0.0)
+        self.assertEqual(summary['avg_duration'], 0.0)
+
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+"""
+_LoadGenerator_t_
+
+Synthetic data taking load generator test
+
+"""
+
+import unittest
+
+from T0.LoadTest.LoadGenerator import LoadGenerator
+from T0.LoadTest.FeederBenchmark import summarizeCycles
+
+
+class LoadGeneratorTest(unittest.TestCase):
+    """
+    _LoadGeneratorTest_
+
+    Test for the load generator timeline and failure patterns
+
+    """
+    def testTimeline(self):
+        """
+        _testTimeline_
+
+        Lumis end every lumiLength seconds, the run ends
+        after the last lumi
+
+        """
+        generator = LoadGenerator(streams = 2, lumisPerRun = 3, instances = 2,
+                                  lumiLength = 10, seed = 1)
+
+        batch = generator.generate(1000)
+        self.assertEqual(len(batch['runs']), 1)
+        self.assertEqual(len(batch['hltMenus']), 2)
+        self.assertEqual(len(batch['instanceStarts']), 2)
+        self.assertEqual(len(batch['expressReady']), 1)
+        self.assertEqual(len(batch['streamers']), 0)
+
+        batch = generator.generate(1015)
+        self.assertEqual(len(batch['streamers']), 4)
+        self.assertEqual(len(batch['eols']), 4)
+        for binds in batch['streamers']:
+            self.assertEqual(binds['LUMI'], 1)
+            self.assertEqual(binds['TIME'], 1010)
+
+        batch = generator.generate(1030)
+        self.assertEqual(len(batch['streamers']), 8)
+        self.assertEqual(len(batch['runStops']), 1)
+        self.assertEqual(len(batch['eors']), 2)
+        for binds in batch['eors']:
+            self.assertEqual(binds['LUMICOUNT'], 3)
+
+        self.assertTrue(generator.finished())
+        self.assertEqual(generator.counters['streamers'], 12)
+
+        # LFNs are unique
+        generator = LoadGenerator(streams = 2, lumisPerRun = 3, instances = 2,
+                                  runs = 2, lumiLength = 10, runGap = 5, filesPerLumi = 2)
+        lfns = set()
+        now = 1000
+        while not generator.finished():
+            for binds in generator.generate(now)['streamers']:
+                lfns.add(binds['LFN'])
+            now += 1
+        self.assertEqual(len(lfns), 2 * 2 * 3 * 2 * 2)
+
+        return
+
+    def testFailurePatterns(self):
+        """
+        _testFailurePatterns_
+
+        Empty lumis, late EoLS, late EoR and delayed Express release
+
+        """
+        generator = LoadGenerator(streams = 1, lumisPerRun = 2, instances = 2,
+                                  lumiLength = 10, emptyLumiFraction = 1.0)
+        generator.generate(1000)
+        batch = generator.generate(1100)
+        self.assertEqual(len(batch['streamers']), 0)
+        self.assertEqual(len(batch['eols']), 4)
+        for binds in batch['eols']:
+            self.assertEqual(binds['FILECOUNT'], 0)
+
+        generator = LoadGenerator(streams = 1, lumisPerRun = 2, instances = 2,
+                                  lumiLength = 10, lateEoLSFraction = 1.0, lateEoLSDelay = 100,
+                                  lateEoRDelay = 50, expressReadyDelay = 30)
+        batch = generator.generate(1000)
+        self.assertEqual(len(batch['expressReady']), 0)
+
+        batch = generator.generate(1020)
+        self.assertEqual(len(batch['streamers']), 4)
+        self.assertEqual(len(batch['eols']), 0)
+        self.assertEqual(len(batch['eors']), 1)
+        self.assertFalse(generator.finished())
+
+        batch = generator.generate(1030)
+        self.assertEqual(len(batch['expressReady']), 1)
+
+        batch = generator.generate(1070)
+        self.assertEqual(len(batch['eors']), 1)
+        self.assertEqual(batch['eors'][0]['INSTANCE'], 1)
+
+        batch = generator.generate(1110)
+        self.assertEqual(len(batch['eols']), 2)
+        self.assertFalse(generator.finished())
+
+        batch = generator.generate(1120)
+        self.assertEqual(len(batch['eols']), 2)
+        self.assertTrue(generator.finished())
+
+        return
+
+    def testSummary(self):
+        """
+        _testSummary_
+
+        Per stage cycle times and latency percentiles
+
+        """
+        cycles = []
+        for i in range(10):
+            cycles.append( { 'start' : 100.0 + 10 * i,
+                             'end' : 105.0 + 10 * i,
+                             'injected' : { 'streamers' : 100 },
+                             'daos' : { 'created' : 10 if i == 0 else 0,
+                                        'reused' : 10,
+                                        'create_time' : 0.0 },
+                             'stages' : { 'feedStreamers' : (float(i), 100, False),
+                                          'closeLumiSections' : (1.0, None, i == 9) } } )
+
+        summary = summarizeCycles(cycles, range(100, 0, -1))
+
+        self.assertEqual(summary['cycles'], 10)
+        self.assertEqual(summary['elapsed'], 95.0)
+        self.assertEqual(summary['injected']['streamers'], 1000)
+
+        self.assertEqual(summary['daos']['created'], 10)
+        self.assertEqual(summary['daos']['reused'], 100)
+
+        self.assertEqual(summary['stages']['feedStreamers']['work'], 1000)
+        self.assertEqual(summary['stages']['feedStreamers']['max_duration'], 9.0)
+        self.assertEqual(summary['stages']['feedStreamers']['p90_duration'], 8.0)
+        self.assertEqual(summary['stages']['closeLumiSections']['failed'], 1)
+        self.assertEqual(summary['stages']['closeLumiSections']['work'], 0)
+
+        self.assertEqual(summary['feed_latency']['count'], 100)
+        self.assertEqual(summary['feed_latency']['p50'], 50)
+        self.assertEqual(summary['feed_latency']['p99'], 99)
+        self.assertEqual(summary['feed_latency']['max'], 100)
+
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
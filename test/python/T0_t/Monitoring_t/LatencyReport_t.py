@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+_LatencyReport_t_
+
+Latency report test
+
+"""
+
+import json
+import unittest
+
+from T0.Monitoring.LatencyReport import buildLatencyReport, stageLatencies, reportAsJSON, reportAsText
+
+
+class LatencyReportTest(unittest.TestCase):
+    """
+    _LatencyReportTest_
+
+    Test for the latency percentiles
+
+    """
+    def testStageLatencies(self):
+        """
+        _testStageLatencies_
+
+        Stages are measured between milestones, missing
+        milestones leave the stage out
+
+        """
+        latencies = stageLatencies( { 'streamer' : (100, 1000),
+                                      'eols' : (150, 1200),
+                                      'lumi_closed' : (200, 1300),
+                                      'feed' : (300, 1400),
+                                      'fileset_closed' : (2000, 2000),
+                                      'pcl_finished' : (4000, 4000),
+                                      'conditions_uploaded' : (4500, 4500),
+                                      'reco_released' : (9000, 9500) } )
+
+        self.assertEqual(latencies, { 'data_taking' : 900,
+                                      'eols' : 200,
+                                      'lumi_close' : 300,
+                                      'feed' : 100,
+                                      'fileset_close' : 600,
+                                      'prompt_calibration' : 2000,
+                                      'conditions_upload' : 2500,
+                                      'reco_release' : 7500,
+                                      'end_to_end' : 9400 })
+        return
+
+    def testPercentiles(self):
+        """
+        _testPercentiles_
+
+        Percentiles per stream and era
+
+        """
+        ledger = {}
+        for run in range(1, 101):
+            ledger[(run, "A")] = { 'era' : "Run2016B",
+                                   'milestones' : { 'streamer' : (0, 100),
+                                                    'lumi_closed' : (0, 100 + run) } }
+        ledger[(1, "Express")] = { 'era' : "Run2016B",
+                                   'milestones' : { 'streamer' : (0, 10) } }
+
+        report = buildLatencyReport(ledger)
+
+        self.assertEqual(sorted(report.keys()), [ ("A", "Run2016B"), ("Express", "Run2016B") ])
+        lumiClose = report[("A", "Run2016B")]['lumi_close']
+        self.assertEqual(lumiClose['count'], 100)
+        self.assertEqual(lumiClose['p50'], 50)
+        self.assertEqual(lumiClose['p90'], 90)
+        self.assertEqual(lumiClose['p99'], 99)
+        self.assertEqual(lumiClose['max'], 100)
+        self.assertFalse('lumi_close' in report[("Express", "Run2016B")])
+
+        self.assertEqual(len(json.loads(reportAsJSON(report))), 2)
+        self.assertTrue("lumi_close" in reportAsText(report))
+
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+"""
+_SLSMonitor_t_
+
+SLS monitoring checks test
+
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from T0.Monitoring.SLSMonitor import checkBacklog, checkPausedJobs, checkLongJobs, SLSMonitor
+
+
+class Section(object):
+    """
+    _Section_
+
+    Minimal configuration section
+
+    """
+    def __init__(self, **options):
+        for name, value in options.items():
+            setattr(self, name, value)
+
+
+class FakePool(object):
+    """
+    _FakePool_
+
+    Hands out a database interface returning a fixed snapshot
+
+    """
+    def __init__(self, counts, executing):
+        self.results = [ counts, executing ]
+        self.borrowed = 0
+
+    def connection(self):
+        pool = self
+
+        class Borrowed(object):
+            def __enter__(self):
+                pool.borrowed += 1
+                return pool
+            def __exit__(self, *args):
+                return False
+
+        return Borrowed()
+
+    def processData(self, sql, binds = {}, conn = None, transaction = False):
+        result = self.results.pop(0)
+        self.results.append(result)
+        return [ FakeResult(result) ]
+
+
+class FakeResult(object):
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchall(self):
+        return self.rows
+
+
+class SLSMonitorTest(unittest.TestCase):
+    """
+    _SLSMonitorTest_
+
+    Test for the SLS monitoring checks
+
+    """
+    def setUp(self):
+        self.xmlDir = tempfile.mkdtemp()
+        self.config = Section(Settings = Section(xmlDir = self.xmlDir),
+                              cmst0_backlog_wma = Section(Express = 10, Repack = 10, PromptReco = 10),
+                              cmst0_paused_jobs = Section(RunBlacklist = [ "000002" ]),
+                              cmst0_long_jobs = Section(RunBlacklist = [],
+                                                        Thresholds = Section(Running = Section(Repack = 1))))
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.xmlDir)
+        return
+
+    def testBacklog(self):
+        """
+        _testBacklog_
+
+        Created jobs are summed per workflow type
+
+        """
+        snapshot = { 'created' : { "Repack_Run000001_StreamA" : 6,
+                                   "Repack_Run000002_StreamA" : 6,
+                                   "Express_Run000001_StreamExpress" : 1 } }
+
+        result = checkBacklog(self.config.cmst0_backlog_wma, snapshot)
+        self.assertEqual(result['availability'], 0)
+        self.assertEqual(result['details']['Repack'], 12)
+
+        del snapshot['created']["Repack_Run000002_StreamA"]
+        result = checkBacklog(self.config.cmst0_backlog_wma, snapshot)
+        self.assertEqual(result['availability'], 100)
+
+        return
+
+    def testPausedJobs(self):
+        """
+        _testPausedJobs_
+
+        Paused jobs of blacklisted runs are ignored, every job
+        counts once
+
+        """
+        snapshot = { 'paused' : { "Repack_Run000001_StreamA" : 5,
+                                  "PromptReco_Run000001_Tau" : 10,
+                                  "Repack_Run000002_StreamA" : 100 } }
+
+        result = checkPausedJobs(self.config.cmst0_paused_jobs, snapshot)
+        self.assertEqual(result['details'], 15)
+        self.assertEqual(result['availability'], 55)
+
+        return
+
+    def testLongJobs(self):
+        """
+        _testLongJobs_
+
+        Running jobs above the threshold are reported
+
+        """
+        now = time.time()
+        snapshot = { 'time' : now,
+                     'executing' : [ { 'job_id' : 1, 'job_type' : "Repack", 'timestamp' : now - 7200,
+                                       'status' : "R", 'plugin' : "Fake", 'workflow' : "Repack_Run000001_StreamA" },
+                                     { 'job_id' : 2, 'job_type' : "Repack", 'timestamp' : now - 60,
+                                       'status' : "R", 'plugin' : "Fake", 'workflow' : "Repack_Run000001_StreamA" },
+                                     { 'job_id' : 3, 'job_type' : "Repack", 'timestamp' : now - 7200,
+                                       'status' : "C", 'plugin' : "Fake", 'workflow' : "Repack_Run000001_StreamA" } ] }
+
+        result = checkLongJobs(self.config.cmst0_long_jobs, snapshot,
+                               { "Fake" : { "R" : "Running", "C" : "Complete" } })
+        self.assertEqual(result['availability'], 0)
+        self.assertEqual([ job['jobId'] for job in result['details']["Repack_Run000001_StreamA"]["Repack"] ], [ 1 ])
+
+        return
+
+    def testMonitorCycle(self):
+        """
+        _testMonitorCycle_
+
+        One snapshot feeds all job checks, XML files and timings
+        are produced for every check
+
+        """
+        counts = [ { 'state' : "created", 'workflow' : "Repack_Run000001_StreamA", 'jobs' : 3 },
+                   { 'state' : "jobpaused", 'workflow' : "Repack_Run000001_StreamA", 'jobs' : 1 },
+                   { 'state' : "createpaused", 'workflow' : "Repack_Run000001_StreamA", 'jobs' : 1 } ]
+        pool = FakePool(counts, [])
+
+        monitor = SLSMonitor(self.config, pool = pool)
+        monitor.runOnce()
+
+        self.assertEqual(pool.borrowed, 1)
+        self.assertEqual(monitor.results["cmst0_paused_jobs"]['details'], 2)
+        self.assertEqual(sorted(monitor.timings().keys()),
+                         [ "cmst0_backlog_wma", "cmst0_long_jobs", "cmst0_paused_jobs" ])
+        for name in monitor.timings():
+            with open(os.path.join(self.xmlDir, "%s.xml" % name)) as xmlFile:
+                self.assertTrue("check_time" in xmlFile.read())
+
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
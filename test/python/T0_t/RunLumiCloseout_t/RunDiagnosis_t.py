@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+_RunDiagnosis_t_
+
+Active run diagnosis test
+
+"""
+
+import unittest
+
+from T0.RunLumiCloseout.RunDiagnosis import diagnoseRuns, buildLumiRanges
+from T0_t.FakeDAOFactory import FakeDAOFactory
+
+
+class FakeRequestDBReader(object):
+
+    def __init__(self, workflows):
+        self.workflows = workflows
+        self.calls = 0
+
+    def getRequestByStatus(self, statusList, detail = False):
+        self.calls += 1
+        return dict([ (workflow, { 'RequestStatus' : status })
+                      for workflow, status in self.workflows.items() ])
+
+
+class RunDiagnosisTest(unittest.TestCase):
+    """
+    _RunDiagnosisTest_
+
+    Test for the multi run diagnosis
+
+    """
+    def testLumiRanges(self):
+        """
+        _testLumiRanges_
+
+        Consecutive lumis are merged into ranges
+
+        """
+        self.assertEqual(buildLumiRanges([ 1, 2, 3, 5, 7, 8 ]), [ (1, 3), (5, 5), (7, 8) ])
+        return
+
+    def testDiagnoseRuns(self):
+        """
+        _testDiagnoseRuns_
+
+        Every check runs once for all runs
+
+        """
+        eor = lambda withEoR, withoutEoR: { "totalInstances" : len(withEoR) + len(withoutEoR),
+                                            "instancesWithEoR" : withEoR,
+                                            "instancesWithoutEoR" : withoutEoR }
+
+        daoFactorySM = FakeDAOFactory({ "RunLumiCloseout.CheckEndOfRunRecords" : { 1 : eor([ 1 ], [ 2 ]),
+                                                                                   2 : eor([], [ 1, 2 ]),
+                                                                                   4 : eor([ 1, 2 ], []),
+                                                                                   5 : eor([ 1, 2 ], []),
+                                                                                   6 : eor([ 1, 2 ], []),
+                                                                                   7 : eor([ 1, 2 ], []),
+                                                                                   8 : eor([ 1, 2 ], []) } })
+
+        daoFactoryT0AST = FakeDAOFactory({ "RunLumiCloseout.FindActiveRuns" : [ 1, 2 ],
+                                           "RunLumiCloseout.CheckClosedLumis" : [ { 'run_id' : 6, 'stream_id' : 1,
+                                                                                    'closed_lumi_count' : 3, 'max_lumi' : 5,
+                                                                                    'expected_lumi_count' : 5 },
+                                                                                  { 'run_id' : 7, 'stream_id' : 1,
+                                                                                    'closed_lumi_count' : 5, 'max_lumi' : 5,
+                                                                                    'expected_lumi_count' : 5 } ],
+                                           "RunLumiCloseout.GetClosedLumisForStream" : { (6, 1) : { 'name' : "A",
+                                                                                                    'closedLumis' : [ 1, 4, 5 ] } },
+                                           "RunLumiCloseout.GetFileCountOnOpenLumis" : { 7 : { (1, "A") : { 3 : (2, 1) } } } })
+
+        requestDBReader = FakeRequestDBReader({ "Repack_Run000005_StreamA" : "Closed",
+                                                "Repack_Run000006_StreamA" : "new",
+                                                "Repack_Run000007_StreamA" : "new",
+                                                "Repack_Run000008_StreamA" : "new",
+                                                "Express_Run000008_StreamExpress" : "Closed" })
+
+        report = diagnoseRuns([ 1, 2, 3, 4, 5, 6, 7, 8 ], daoFactoryT0AST, daoFactorySM, requestDBReader)
+
+        self.assertEqual(dict([ (run, entry['status']) for run, entry in report.items() ]),
+                         { 1 : "active_without_eor",
+                           2 : "not_ended",
+                           3 : "unknown",
+                           4 : "not_in_requestdb",
+                           5 : "workflows_closed",
+                           6 : "missing_eols",
+                           7 : "incomplete_lumis",
+                           8 : "no_problem_found" })
+        self.assertEqual(report[6]['streams']["A"]['missingEoLS'], [ (2, 3) ])
+        self.assertEqual(report[7]['streams']["A"]['inconsistentLumis'], { 3 : { 'expected' : 2, 'found' : 1 } })
+        self.assertEqual(report[8]['activeWorkflows'], [ "Repack_Run000008_StreamA" ])
+
+        self.assertEqual(requestDBReader.calls, 1)
+        for classname, calls in list(daoFactoryT0AST.calls.items()) + list(daoFactorySM.calls.items()):
+            self.assertEqual(len(calls), 1, classname)
+        self.assertEqual(daoFactoryT0AST.calls["RunLumiCloseout.CheckClosedLumis"][0], ([ 6, 7, 8 ],))
+        self.assertEqual(daoFactoryT0AST.calls["RunLumiCloseout.GetFileCountOnOpenLumis"][0], ([ 7, 8 ],))
+
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
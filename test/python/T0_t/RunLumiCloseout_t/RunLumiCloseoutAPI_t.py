@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+"""
+_RunLumiCloseoutAPI_t_
+
+Run purge and StorageManager notification test
+
+"""
+
+import unittest
+import threading
+import logging
+import subprocess
+
+from T0.RunLumiCloseout import RunLumiCloseoutAPI
+from T0.WMBS.DAOCache import cachedDAOFactory
+from T0_t.FakeDAOFactory import FakeDAOFactory
+
+
+class FakeDBInterface(object):
+    pass
+
+
+class FakePopen(object):
+    """
+    _FakePopen_
+
+    Records the shell scripts instead of running them
+
+    """
+    scripts = []
+
+    def __init__(self, args, stdin = None, stdout = None, stderr = None):
+        self.args = args
+
+    def communicate(self, input = None):
+        FakePopen.scripts.append( (self.args, input) )
+        return ("", "")
+
+
+class NotificationDAOFactory(FakeDAOFactory):
+    """
+    _NotificationDAOFactory_
+
+    Keeps the finished streamers of the run/streams,
+    streamers in failMark aren't marked finished
+
+    """
+    def __init__(self, streamers):
+        FakeDAOFactory.__init__(self)
+        self.streamers = streamers
+        self.finished = set()
+        self.failMark = set()
+
+    def GetFinishedRunStreams(self):
+        return sorted(self.streamers.keys())
+
+    def GetFinishedStreamers(self, run, stream, lastId, maxStreamers):
+        streamers = []
+        for id in sorted(self.streamers[(run, stream)]):
+            if id > lastId and id not in self.finished:
+                streamers.append( (id, "/store/t0streamer/%d.dat" % id) )
+        return streamers[:maxStreamers]
+
+    def MarkStreamersFinished(self, streamers):
+        self.finished.update(set(streamers) - self.failMark)
+
+
+class RunLumiCloseoutAPITest(unittest.TestCase):
+    """
+    _RunLumiCloseoutAPITest_
+
+    Test for purgeRuns, notifyStorageManager and clearFinishedStreamers
+
+    """
+    def setUp(self):
+        """
+        _setUp_
+
+        Use the fake DAO factory through the DAO cache of
+        a fake database interface
+
+        """
+        myThread = threading.currentThread()
+        self.dbi = getattr(myThread, "dbi", None)
+        myThread.dbi = FakeDBInterface()
+
+        self.popen = subprocess.Popen
+        FakePopen.scripts = []
+        subprocess.Popen = FakePopen
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        threading.currentThread().dbi = self.dbi
+        subprocess.Popen = self.popen
+
+        return
+
+    def setDAOFactory(self, daoFactory):
+        """
+        _setDAOFactory_
+
+        helper function that makes the API use the fake DAO factory
+        """
+        cachedDAOFactory(package = "T0.WMBS",
+                         logger = logging,
+                         dbinterface = threading.currentThread().dbi).daoFactory = daoFactory
+
+        return
+
+    def notifications(self):
+        """
+        _notifications_
+
+        helper function that returns the transfer system
+        calls of the shell scripts run so far
+        """
+        notifications = []
+        for (args, script) in FakePopen.scripts:
+            self.assertEqual(args, "/bin/bash")
+            self.assertTrue("export T0_BASE_DIR=/base\n" in script)
+            for line in script.splitlines():
+                if "sendRepackedStatus.pl" in line:
+                    notifications.append(line.strip())
+        return notifications
+
+    def testPurgeRuns(self):
+        """
+        _testPurgeRuns_
+
+        The streamer notification flag is passed to FindPurgeableRuns,
+        every run it returns is purged
+
+        """
+        daoFactory = FakeDAOFactory( { "RunLumiCloseout.FindPurgeableRuns" : lambda streamerNotification: [ 1 ] if streamerNotification else [ 2, 1 ],
+                                       "RunLumiCloseout.PurgeRun" : None } )
+        self.setDAOFactory(daoFactory)
+
+        RunLumiCloseoutAPI.purgeRuns(True)
+        self.assertEqual(daoFactory.calls["RunLumiCloseout.FindPurgeableRuns"], [ (True,) ])
+        self.assertEqual(daoFactory.calls["RunLumiCloseout.PurgeRun"], [ (1,) ])
+
+        RunLumiCloseoutAPI.purgeRuns(False)
+        self.assertEqual(daoFactory.calls["RunLumiCloseout.FindPurgeableRuns"][1], (False,))
+        self.assertEqual(daoFactory.calls["RunLumiCloseout.PurgeRun"][1:], [ (1,), (2,) ])
+
+        return
+
+    def testClearFinishedStreamers(self):
+        """
+        _testClearFinishedStreamers_
+
+        Without notification the queue is cleared by its own DAO
+
+        """
+        daoFactory = FakeDAOFactory( { "SMNotification.ClearFinishedStreamers" : None } )
+        self.setDAOFactory(daoFactory)
+
+        RunLumiCloseoutAPI.clearFinishedStreamers()
+        self.assertEqual(daoFactory.calls["SMNotification.ClearFinishedStreamers"], [ () ])
+        self.assertEqual(FakePopen.scripts, [])
+
+        return
+
+    def testNotificationPaging(self):
+        """
+        _testNotificationPaging_
+
+        Streamers are paged from the last id of the previous batch,
+        the budget limits the streamers per call and the next call
+        continues with the streamers not marked finished yet
+
+        """
+        daoFactory = NotificationDAOFactory( { (1, 1) : [ 1, 2, 3, 4, 5 ],
+                                               (2, 1) : [ 6 ] } )
+        self.setDAOFactory(daoFactory)
+
+        self.assertEqual(RunLumiCloseoutAPI.notifyStorageManager("/base", 3, 2), 3)
+        self.assertEqual(daoFactory.calls["SMNotification.GetFinishedStreamers"],
+                         [ (1, 1, 0, 2), (1, 1, 2, 1) ])
+        self.assertEqual(daoFactory.finished, set([ 1, 2, 3 ]))
+        self.assertEqual(self.notifications(),
+                         [ "${T0ROOT}/operations/sendRepackedStatus.pl --config $CONFIG -FILENAME 1.dat -FILENAME 2.dat",
+                           "${T0ROOT}/operations/sendRepackedStatus.pl --config $CONFIG -FILENAME 3.dat" ])
+
+        self.assertEqual(RunLumiCloseoutAPI.notifyStorageManager("/base", 10, 2), 3)
+        self.assertEqual(daoFactory.calls["SMNotification.GetFinishedStreamers"][2:],
+                         [ (1, 1, 0, 2), (1, 1, 5, 2), (2, 1, 0, 2), (2, 1, 6, 2) ])
+        self.assertEqual(daoFactory.finished, set([ 1, 2, 3, 4, 5, 6 ]))
+
+        return
+
+    def testNotificationNotMarked(self):
+        """
+        _testNotificationNotMarked_
+
+        Streamers that aren't marked finished are not paged
+        again in the same call
+
+        """
+        daoFactory = NotificationDAOFactory( { (1, 1) : [ 1, 2, 3 ] } )
+        daoFactory.failMark.add(1)
+        self.setDAOFactory(daoFactory)
+
+        self.assertEqual(RunLumiCloseoutAPI.notifyStorageManager("/base", 10, 1), 3)
+        self.assertEqual(daoFactory.calls["SMNotification.GetFinishedStreamers"],
+                         [ (1, 1, 0, 1), (1, 1, 1, 1), (1, 1, 2, 1), (1, 1, 3, 1) ])
+        self.assertEqual(daoFactory.finished, set([ 2, 3 ]))
+
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
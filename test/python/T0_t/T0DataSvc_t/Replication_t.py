@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+"""
+_Replication_t_
+
+Tier0 Data Service replication test
+
+"""
+
+import unittest
+import threading
+
+from contextlib import contextmanager
+
+from sqlalchemy.exc import DatabaseError
+
+from T0.T0DataSvc.Replication import ReplicatedEntity, ReplicationEngine
+from T0.ExternalDatabase.ConnectionRegistry import ExternalDatabaseUnavailable
+
+
+class FakeSource(object):
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, conn = None, transaction = False):
+        return list(self.rows)
+
+
+class FakeUpsert(object):
+    """
+    _FakeUpsert_
+
+    Target table, rejects batches containing bad rows and
+    loses the connection on batches containing lost rows
+
+    """
+    def __init__(self, engine):
+        self.engine = engine
+
+    def execute(self, binds, conn = None, transaction = False):
+        self.engine.upserts.append(len(binds))
+        for bind in binds:
+            if bind['RUN'] in self.engine.badRuns:
+                raise DatabaseError("ORA-12899: value too large for column")
+            if bind['RUN'] in self.engine.lostRuns:
+                raise DatabaseError("ORA-03113: end-of-file on communication channel")
+        self.engine.target.extend(binds)
+
+
+class FakeConfirm(object):
+
+    def __init__(self, confirmed):
+        self.confirmed = confirmed
+
+    def execute(self, binds, conn = None, transaction = False):
+        self.confirmed.extend(binds)
+
+
+class FakeDatabases(object):
+
+    def __init__(self):
+        self.available = True
+        self.borrowed = 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def connection(self, name, timeout = None):
+        if not self.available:
+            raise ExternalDatabaseUnavailable("%s database unavailable" % name)
+        with self.lock:
+            self.borrowed += 1
+        yield object()
+
+
+class FakeReplicationEngine(ReplicationEngine):
+
+    def __init__(self, *args, **kwargs):
+        ReplicationEngine.__init__(self, *args, **kwargs)
+        self.target = []
+        self.upserts = []
+        self.badRuns = set()
+        self.lostRuns = set()
+
+    def targetDAOFactory(self, dbInterface):
+        def factory(classname):
+            return FakeUpsert(self)
+        return factory
+
+
+class ReplicationTest(unittest.TestCase):
+    """
+    _ReplicationTest_
+
+    Test for the declarative Tier0 Data Service replication
+    """
+    def setUp(self):
+        self.sources = {}
+        self.confirmed = []
+
+        def daoFactory(classname):
+            if classname.startswith("Get"):
+                return FakeSource(self.sources[classname])
+            return FakeConfirm(self.confirmed)
+        self.daoFactory = daoFactory
+
+        self.entities = [ ReplicatedEntity("Config",
+                                           source = "GetConfig",
+                                           upsert = "InsertConfig",
+                                           confirm = "UpdateConfig",
+                                           key = [ 'run' ],
+                                           upsertBinds = { 'RUN' : 'run',
+                                                           'GLOBAL_TAG' : lambda row: row['global_tag'][:5] }),
+                          ReplicatedEntity("Release",
+                                           source = "GetRelease",
+                                           upsert = "InsertRelease",
+                                           confirm = "UpdateRelease",
+                                           key = [ 'run' ],
+                                           upsertBinds = { 'RUN' : 'run' },
+                                           confirmBinds = { 'RUN' : 'run', 'IN_DATASVC' : lambda row: 2 }) ]
+
+        self.sources['GetConfig'] = [ { 'run' : run, 'global_tag' : "GR_P_V%d" % run } for run in range(1, 11) ]
+        self.sources['GetRelease'] = [ { 'run' : run } for run in range(100, 103) ]
+
+        self.databases = FakeDatabases()
+        self.engine = FakeReplicationEngine(self.entities, self.daoFactory, self.databases, "T0DataSvc",
+                                            batchSize = 4, maxWorkers = 2)
+        return
+
+    def testReplicate(self):
+        """
+        _testReplicate_
+
+        All rows are upserted in bounded batches and confirmed
+
+        """
+        metrics = self.engine.replicate()
+
+        self.assertEqual(metrics['Config']['rows'], 10)
+        self.assertEqual(metrics['Release']['rows'], 3)
+        self.assertEqual(metrics['Config']['failed'], 0)
+        self.assertEqual(len(self.engine.target), 13)
+        self.assertEqual(len(self.confirmed), 13)
+        self.assertTrue( { 'RUN' : 1, 'GLOBAL_TAG' : "GR_P_" } in self.engine.target )
+        self.assertTrue( { 'RUN' : 100, 'IN_DATASVC' : 2 } in self.confirmed )
+        self.assertEqual(self.databases.borrowed, 2)
+
+        return
+
+    def testPartialFailure(self):
+        """
+        _testPartialFailure_
+
+        Only rows accepted by the target are confirmed
+
+        """
+        self.engine.badRuns.add(6)
+
+        metrics = self.engine.replicate()
+
+        self.assertEqual(metrics['Config']['rows'], 9)
+        self.assertEqual(metrics['Config']['failed'], 1)
+
+        # the failing batch of 4 is split down to the bad row
+        self.assertEqual(len([ x for x in self.engine.upserts if x < 4 ]), 6)
+        confirmedRuns = sorted( [ x['RUN'] for x in self.confirmed if x['RUN'] < 100 ] )
+        self.assertEqual(confirmedRuns, [ 1, 2, 3, 4, 5, 7, 8, 9, 10 ])
+
+        # lag only grows for the entity that isn't caught up
+        self.engine.caughtUp['Config'] -= 100
+        self.engine.caughtUp['Release'] -= 100
+        metrics = self.engine.replicate()
+        self.assertTrue(metrics['Config']['lag'] >= 100)
+        self.assertTrue(metrics['Release']['lag'] < 100)
+
+        return
+
+    def testConnectionLost(self):
+        """
+        _testConnectionLost_
+
+        A lost connection stops the entity for this cycle
+        without splitting up the batch
+
+        """
+        self.engine.lostRuns.add(6)
+        self.engine.caughtUp['Config'] -= 100
+
+        metrics = self.engine.replicate()
+
+        # Config batches of 4, the second one fails once
+        self.assertEqual(sorted(self.engine.upserts), [ 3, 4, 4 ])
+        confirmedRuns = sorted( [ x['RUN'] for x in self.confirmed if x['RUN'] < 100 ] )
+        self.assertEqual(confirmedRuns, [ 1, 2, 3, 4 ])
+        self.assertEqual(metrics['Release']['rows'], 3)
+        self.assertTrue(metrics['Config']['lag'] >= 100)
+
+        # the next cycle picks up where this one stopped
+        self.engine.lostRuns.clear()
+        self.sources['GetConfig'] = self.sources['GetConfig'][4:]
+        metrics = self.engine.replicate()
+        self.assertEqual(metrics['Config']['rows'], 6)
+        self.assertEqual(metrics['Config']['failed'], 0)
+
+        return
+
+    def testUnavailable(self):
+        """
+        _testUnavailable_
+
+        Nothing is confirmed if the target can't be reached
+
+        """
+        self.databases.available = False
+
+        metrics = self.engine.replicate()
+
+        self.assertEqual(metrics['Config']['rows'], 0)
+        self.assertEqual(self.confirmed, [])
+
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+"""
+_ConditionUpload_t_
+
+Condition upload DAO test
+
+"""
+
+import unittest
+import threading
+import logging
+import time
+
+from WMCore.WMBS.File import File
+from WMCore.WMBS.Fileset import Fileset
+from WMCore.WMBS.Subscription import Subscription
+from WMCore.WMBS.Workflow import Workflow
+
+from WMCore.DAOFactory import DAOFactory
+from WMQuality.TestInit import TestInit
+
+
+class ConditionUploadTest(unittest.TestCase):
+    """
+    _ConditionUploadTest_
+
+    Test for the pending queue and run information DAOs
+    of the condition upload, against the configured database
+    """
+
+    connectUrl = None
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+        self.testInit.setDatabaseConnection(connectUrl = self.connectUrl)
+
+        self.testInit.setSchema(customModules = ["T0.WMBS"])
+
+        myThread = threading.currentThread()
+        self.daoFactory = DAOFactory(package = "T0.WMBS",
+                                     logger = logging,
+                                     dbinterface = myThread.dbi)
+
+        self.currentTime = int(time.time())
+
+        insertRunDAO = self.daoFactory(classname = "RunConfig.InsertRun")
+        insertStreamDAO = self.daoFactory(classname = "RunConfig.InsertStream")
+        insertPromptCalibrationDAO = self.daoFactory(classname = "RunConfig.InsertPromptCalibration")
+
+        insertStreamDAO.execute(binds = { 'STREAM' : "Express" },
+                                transaction = False)
+
+        for run in [ 1, 2 ]:
+            insertRunDAO.execute(binds = { 'RUN' : run,
+                                           'TIME' : self.currentTime,
+                                           'HLTKEY' : "someHLTKey" },
+                                 transaction = False)
+            insertPromptCalibrationDAO.execute( { 'RUN' : run,
+                                                  'STREAM' : "Express",
+                                                  'NUM_PRODUCER' : 1 },
+                                                transaction = False)
+
+        myThread.dbi.processData("""UPDATE run
+                                    SET cond_timeout = 10,
+                                        valid_mode = 1
+                                    """, transaction = False)
+
+        self.fileset1 = Fileset(name = "TestFileset1")
+        self.fileset1.create()
+
+        workflow1 = Workflow(spec = "spec.xml", owner = "hufnagel", name = "TestWorkflow1", task="Test")
+        workflow1.create()
+
+        self.subscription1  = Subscription(fileset = self.fileset1,
+                                           workflow = workflow1,
+                                           split_algo = "Condition",
+                                           type = "Condition")
+        self.subscription1.create()
+
+        # two payload files per run
+        self.files = {}
+        for run in [ 1, 2 ]:
+            self.files[run] = []
+            for i in range(2):
+                payloadFile = File("/store/pcl/Run%d_%d.db" % (run, i), size = 0, events = 0)
+                payloadFile.create()
+                self.files[run].append(payloadFile)
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        self.testInit.clearDatabase()
+
+        return
+
+    def insertPayloadFiles(self, run):
+        """
+        _insertPayloadFiles_
+
+        helper function that inserts the payload files of a run
+        like the Condition splitter does
+        """
+        insertPromptCalibrationFileDAO = self.daoFactory(classname = "JobSplitting.InsertPromptCalibrationFile")
+
+        binds = []
+        for payloadFile in self.files[run]:
+            binds.append( { 'SUBSCRIPTION' : self.subscription1['id'],
+                            'FILEID' : payloadFile['id'],
+                            'RUN_ID' : run,
+                            'STREAM' : "Express" } )
+        insertPromptCalibrationFileDAO.execute(binds, transaction = False)
+
+        return
+
+    def getPendingRuns(self):
+        """
+        _getPendingRuns_
+
+        helper function that returns the runs in the pending queue
+        """
+        getPendingConditionsDAO = self.daoFactory(classname = "ConditionUpload.GetPendingConditions")
+
+        return sorted([ run for (run, streamid) in getPendingConditionsDAO.execute(transaction = False).keys() ])
+
+    def testPendingQueue(self):
+        """
+        _testPendingQueue_
+
+        Test that inserted payload files queue their run/stream
+        and that it's only dequeued without acquired files left
+
+        """
+        getPendingConditionsDAO = self.daoFactory(classname = "ConditionUpload.GetPendingConditions")
+        clearPendingConditionsDAO = self.daoFactory(classname = "ConditionUpload.ClearPendingConditions")
+
+        self.assertEqual(getPendingConditionsDAO.execute(transaction = False), {},
+                         "ERROR: nothing should be pending")
+
+        self.insertPayloadFiles(1)
+
+        pendingConditions = getPendingConditionsDAO.execute(transaction = False)
+        self.assertEqual(len(pendingConditions), 1,
+                         "ERROR: run/stream should be pending")
+
+        (run, streamid), pending = list(pendingConditions.items())[0]
+        self.assertEqual(run, 1)
+        self.assertFalse(pending['finished'])
+        self.assertEqual(sorted([ condFile['lfn'] for condFile in pending['files'] ]),
+                         [ "/store/pcl/Run1_0.db", "/store/pcl/Run1_1.db" ],
+                         "ERROR: pending files are wrong")
+
+        # still acquired files, stays queued
+        clearPendingConditionsDAO.execute( [ { 'RUN' : 1, 'STREAMID' : streamid } ],
+                                           transaction = False)
+        self.assertEqual(self.getPendingRuns(), [ 1 ],
+                         "ERROR: run/stream with acquired files should stay pending")
+
+        self.subscription1.completeFiles(self.files[1])
+
+        clearPendingConditionsDAO.execute( [ { 'RUN' : 1, 'STREAMID' : streamid } ],
+                                           transaction = False)
+        self.assertEqual(self.getPendingRuns(), [],
+                         "ERROR: run/stream without acquired files should be dequeued")
+
+        return
+
+    def testQueueAcquiredConditions(self):
+        """
+        _testQueueAcquiredConditions_
+
+        Test that payload files inserted without a pending queue
+        entry are queued, once per run/stream
+
+        """
+        queueAcquiredConditionsDAO = self.daoFactory(classname = "ConditionUpload.QueueAcquiredConditions")
+
+        self.insertPayloadFiles(1)
+        self.insertPayloadFiles(2)
+        self.subscription1.completeFiles(self.files[2])
+
+        # payload files from before the pending queue
+        myThread = threading.currentThread()
+        myThread.dbi.processData("""DELETE FROM prompt_calib_pending""",
+                                 transaction = False)
+
+        queueAcquiredConditionsDAO.execute(transaction = False)
+        self.assertEqual(self.getPendingRuns(), [ 1 ],
+                         "ERROR: only the run with acquired files should be queued")
+
+        queueAcquiredConditionsDAO.execute(transaction = False)
+        self.assertEqual(self.getPendingRuns(), [ 1 ],
+                         "ERROR: run/stream should only be queued once")
+
+        return
+
+    def testRunConditionInfoCache(self):
+        """
+        _testRunConditionInfoCache_
+
+        Test that stopped runs are cached, runs not stopped yet are
+        queried every time and runs not passed in anymore are evicted
+
+        """
+        getRunConditionInfoDAO = self.daoFactory(classname = "ConditionUpload.GetRunConditionInfo")
+
+        stopRunsDAO = self.daoFactory(classname = "RunLumiCloseout.StopRuns")
+        stopRunsDAO.execute(binds = { 'RUN' : 1,
+                                      'START_TIME' : self.currentTime,
+                                      'STOP_TIME' : self.currentTime },
+                            transaction = False)
+
+        runInfo = getRunConditionInfoDAO.execute([ 1, 2 ], transaction = False)
+        self.assertEqual(runInfo[1], { 'condUploadTimeout' : 10,
+                                       'validationMode' : True,
+                                       'stopTime' : self.currentTime })
+        self.assertEqual(runInfo[2]['condUploadTimeout'], 10)
+
+        myThread = threading.currentThread()
+        myThread.dbi.processData("""UPDATE run
+                                    SET cond_timeout = 20
+                                    """, transaction = False)
+
+        # stopped run from cache, the other one queried
+        runInfo = getRunConditionInfoDAO.execute([ 1, 2 ], transaction = False)
+        self.assertEqual(runInfo[1]['condUploadTimeout'], 10,
+                         "ERROR: stopped run should come from the cache")
+        self.assertEqual(runInfo[2]['condUploadTimeout'], 20,
+                         "ERROR: run not stopped yet should be queried")
+
+        # run 1 isn't passed in anymore, queried if it comes back
+        getRunConditionInfoDAO.execute([ 2 ], transaction = False)
+        self.assertEqual(getRunConditionInfoDAO.stoppedRunsCache, {},
+                         "ERROR: run not passed in should be evicted")
+
+        runInfo = getRunConditionInfoDAO.execute([ 1 ], transaction = False)
+        self.assertEqual(runInfo[1]['condUploadTimeout'], 20,
+                         "ERROR: evicted run should be queried")
+
+        return
+
+
+class SQLiteConditionUploadTest(ConditionUploadTest):
+    """
+    _SQLiteConditionUploadTest_
+
+    Test for the SQLite condition upload DAOs
+    """
+
+    connectUrl = "sqlite://"
+
+
+if __name__ == '__main__':
+    unittest.main()
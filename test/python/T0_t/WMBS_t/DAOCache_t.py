@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""
+_DAOCache_t_
+
+DAO cache and IN-list bind test
+
+"""
+
+import unittest
+import logging
+
+from T0.WMBS import DAOCache
+from T0.WMBS.DAOCache import cachedDAOFactory, inListBinds
+from T0.WMBS.QueryLog import QueryLog, ProfiledDBInterface
+
+
+class FakeDialect(object):
+    name = "sqlite"
+
+
+class FakeEngine(object):
+    dialect = FakeDialect()
+
+
+class FakeDBInterface(object):
+    engine = FakeEngine()
+
+
+class FakeDAO(object):
+
+    def __init__(self, dbinterface):
+        self.dbi = dbinterface
+
+
+class DAOCacheTest(unittest.TestCase):
+    """
+    _DAOCacheTest_
+
+    Test for the process wide DAO cache
+
+    """
+    def testCachedDAOFactory(self):
+        """
+        _testCachedDAOFactory_
+
+        Factories are shared per database interface and package,
+        DAOs are created once
+
+        """
+        dbInterface = FakeDBInterface()
+
+        daoFactory = cachedDAOFactory(package = "T0.WMBS",
+                                      logger = logging,
+                                      dbinterface = dbInterface)
+        self.assertTrue(daoFactory is cachedDAOFactory(package = "T0.WMBS",
+                                                       logger = logging,
+                                                       dbinterface = dbInterface))
+        self.assertFalse(daoFactory is cachedDAOFactory(package = "WMCore.WMBS",
+                                                        logger = logging,
+                                                        dbinterface = dbInterface))
+        self.assertFalse(daoFactory is cachedDAOFactory(package = "T0.WMBS",
+                                                        logger = logging,
+                                                        dbinterface = FakeDBInterface()))
+
+        created = []
+        def createDAO(classname):
+            created.append(classname)
+            return object()
+        daoFactory.daoFactory = createDAO
+
+        before = DAOCache.metrics()
+
+        dao = daoFactory(classname = "RunLumiCloseout.FindOpenRuns")
+        self.assertTrue(dao is daoFactory(classname = "RunLumiCloseout.FindOpenRuns"))
+        daoFactory(classname = "RunLumiCloseout.FindActiveRuns")
+        self.assertEqual(created, [ "RunLumiCloseout.FindOpenRuns",
+                                    "RunLumiCloseout.FindActiveRuns" ])
+
+        after = DAOCache.metrics()
+        self.assertEqual(after['created'] - before['created'], 2)
+        self.assertEqual(after['reused'] - before['reused'], 1)
+
+        self.assertFalse(DAOCache.enableStatementCache(dbInterface, 100))
+
+        return
+
+    def testQueryLog(self):
+        """
+        _testQueryLog_
+
+        With a query log set new T0.WMBS DAOs are profiled
+
+        """
+        dbInterface = FakeDBInterface()
+        daoFactory = cachedDAOFactory(package = "T0.WMBS",
+                                      logger = logging,
+                                      dbinterface = dbInterface)
+        daoFactory.daoFactory = lambda classname: FakeDAO(dbInterface)
+
+        DAOCache.setQueryLog(QueryLog())
+        try:
+            dao = daoFactory(classname = "RunLumiCloseout.FindClosedLumis")
+        finally:
+            DAOCache.setQueryLog(None)
+
+        self.assertTrue(isinstance(dao.dbi, ProfiledDBInterface))
+        self.assertEqual(dao.dbi.daoName, "RunLumiCloseout.FindClosedLumis")
+        self.assertFalse(isinstance(daoFactory(classname = "RunLumiCloseout.FindOpenRuns").dbi,
+                                    ProfiledDBInterface))
+
+        return
+
+    def testInListBinds(self):
+        """
+        _testInListBinds_
+
+        IN-lists are padded to a power of two with the last value
+
+        """
+        binds, bindNames = inListBinds("RUN", [ 1 ], 100)
+        self.assertEqual(binds, { 'RUN_0' : 1 })
+        self.assertEqual(bindNames, ":RUN_0")
+
+        binds, bindNames = inListBinds("RUN", [ 1, 2, 3 ], 100)
+        self.assertEqual(binds, { 'RUN_0' : 1, 'RUN_1' : 2, 'RUN_2' : 3, 'RUN_3' : 3 })
+        self.assertEqual(bindNames, ":RUN_0, :RUN_1, :RUN_2, :RUN_3")
+
+        # capped at the chunk size
+        binds, bindNames = inListBinds("RUN", range(70), 100)
+        self.assertEqual(len(binds), 100)
+        self.assertEqual(binds['RUN_99'], 69)
+
+        binds, bindNames = inListBinds("RUN", range(100), 100)
+        self.assertEqual(len(binds), 100)
+
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
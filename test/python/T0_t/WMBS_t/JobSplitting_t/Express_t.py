@@ -292,5 +292,66 @@ class ExpressTest(unittest.TestCase):
 
         return
 
+    def test03(self):
+        """
+        _test03_
+
+        Test input prescale for a lumi over the input event budget
+
+        """
+        insertClosedLumiBinds = []
+        for lumi in [1]:
+            filecount = 10
+            for i in range(filecount):
+                newFile = File(makeUUID(), size = 1000, events = 100)
+                newFile.addRun(Run(1, *[lumi]))
+                newFile.setLocation("SomeSE", immediateSave = False)
+                newFile.create()
+                self.fileset1.addFile(newFile)
+                insertClosedLumiBinds.append( { 'RUN' : 1,
+                                                'LUMI' : lumi,
+                                                'STREAM' : "Express",
+                                                'FILECOUNT' : filecount,
+                                                'INSERT_TIME' : self.currentTime,
+                                                'CLOSE_TIME' : self.currentTime } )
+        self.fileset1.commit()
+
+        jobFactory = self.splitterFactory(package = "WMCore.WMBS",
+                                          subscription = self.subscription1)
+
+        self.insertClosedLumiDAO.execute(binds = insertClosedLumiBinds,
+                                         transaction = False)
+
+        self.releaseExpressDAO.execute(binds = { 'RUN' : 1 }, transaction = False)
+
+        jobGroups = jobFactory(maxInputEvents = 1000, maxInputRate = 500,
+                               inputEventBudget = 300)
+
+        self.assertEqual(len(jobGroups), 1,
+                         "ERROR: JobFactory didn't return one JobGroup")
+
+        acceptedFiles = len(jobGroups[0].jobs[0].getFiles())
+        self.assertTrue(acceptedFiles >= 1 and acceptedFiles <= 3,
+                        "ERROR: Job processes more files than the budget allows")
+
+        failedFiles = len(self.subscription1.filesOfStatus("Failed"))
+        self.assertEqual(acceptedFiles + failedFiles, 10,
+                         "ERROR: Excess streamers were not failed")
+
+        myThread = threading.currentThread()
+        results = myThread.dbi.processData("""SELECT prescale, events_total, events_accepted
+                                              FROM lumi_section_prescale
+                                              WHERE lumi_id = 1
+                                              """, transaction = False)[0].fetchall()
+
+        self.assertEqual(results[0][0], 4,
+                         "ERROR: Wrong prescale recorded")
+        self.assertEqual(results[0][1], 1000,
+                         "ERROR: Wrong event count recorded")
+        self.assertEqual(results[0][2], 100 * acceptedFiles,
+                         "ERROR: Wrong accepted event count recorded")
+
+        return
+
 if __name__ == '__main__':
     unittest.main()
@@ -579,5 +579,77 @@ class RepackTest(unittest.TestCase):
 
         return
 
+    def test07(self):
+        """
+        _test07_
+
+        Test direct to merged job sizing
+        Multi lumi input
+
+        Stream triggers feed two datasets (fractions 0.75 and 0.25),
+        multi lumi jobs grow until the smaller output reaches minMergeSize
+        (without direct to merged sizing this would be three jobs)
+
+        """
+        myThread = threading.currentThread()
+        daoFactory = DAOFactory(package = "T0.WMBS",
+                                logger = logging,
+                                dbinterface = myThread.dbi)
+
+        insertPrimaryDatasetDAO = daoFactory(classname = "RunConfig.InsertPrimaryDataset")
+        insertStreamDatasetDAO = daoFactory(classname = "RunConfig.InsertStreamDataset")
+        insertTriggerDAO = daoFactory(classname = "RunConfig.InsertTrigger")
+        insertDatasetTriggerDAO = daoFactory(classname = "RunConfig.InsertDatasetTrigger")
+
+        for (primds, triggers) in [ ("A1", [ "HLT_1", "HLT_2", "HLT_3" ]),
+                                    ("A2", [ "HLT_4" ]) ]:
+            insertPrimaryDatasetDAO.execute(binds = { 'PRIMDS' : primds },
+                                            transaction = False)
+            insertStreamDatasetDAO.execute(binds = { 'RUN' : 1,
+                                                     'PRIMDS' : primds,
+                                                     'STREAM' : "A" },
+                                           transaction = False)
+            for trigger in triggers:
+                insertTriggerDAO.execute(binds = { 'TRIG' : trigger },
+                                         transaction = False)
+                insertDatasetTriggerDAO.execute(binds = { 'RUN' : 1,
+                                                          'TRIG' : trigger,
+                                                          'PRIMDS' : primds },
+                                                transaction = False)
+
+        mySplitArgs = self.splitArgs.copy()
+        mySplitArgs['maxSizeSingleLumi'] = 5000
+        mySplitArgs['maxSizeMultiLumi'] = 2000
+
+        for lumi in [1, 2, 3, 4]:
+            filecount = 2
+            for i in range(filecount):
+                newFile = File(makeUUID(), size = 1000, events = 100)
+                newFile.addRun(Run(1, *[lumi]))
+                newFile.setLocation("SomeSE", immediateSave = False)
+                newFile.create()
+                self.fileset1.addFile(newFile)
+
+        self.fileset1.commit()
+
+        jobFactory = self.splitterFactory(package = "WMCore.WMBS",
+                                          subscription = self.subscription1)
+
+        # direct to merged needs jobs of 4000 bytes for a 1000 bytes output
+        mySplitArgs['minMergeSize'] = 1000
+        mySplitArgs['maxMergeEvents'] = 100000
+        jobGroups = jobFactory(**mySplitArgs)
+
+        self.assertEqual(len(jobGroups), 1,
+                         "ERROR: JobFactory didn't return one JobGroup")
+
+        self.assertEqual(len(jobGroups[0].jobs), 1,
+                         "ERROR: JobFactory didn't create a single job")
+
+        self.assertEqual(len(jobGroups[0].jobs[0].getFiles()), 4,
+                         "ERROR: Job does not process 4 files")
+
+        return
+
 if __name__ == '__main__':
     unittest.main()
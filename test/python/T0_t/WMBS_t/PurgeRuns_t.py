@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+"""
+_PurgeRuns_t_
+
+Run purge DAO test
+
+"""
+
+import unittest
+import threading
+import logging
+import time
+
+from WMCore.DAOFactory import DAOFactory
+from WMQuality.TestInit import TestInit
+
+
+class PurgeRunsTest(unittest.TestCase):
+    """
+    _PurgeRunsTest_
+
+    Test for FindPurgeableRuns and PurgeRun, against
+    the configured database
+    """
+
+    connectUrl = None
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+        self.testInit.setDatabaseConnection(connectUrl = self.connectUrl)
+
+        self.testInit.setSchema(customModules = ["T0.WMBS"])
+
+        myThread = threading.currentThread()
+        self.daoFactory = DAOFactory(package = "T0.WMBS",
+                                     logger = logging,
+                                     dbinterface = myThread.dbi)
+
+        self.currentTime = int(time.time())
+
+        insertRunDAO = self.daoFactory(classname = "RunConfig.InsertRun")
+        insertLumiDAO = self.daoFactory(classname = "RunConfig.InsertLumiSection")
+        insertStreamDAO = self.daoFactory(classname = "RunConfig.InsertStream")
+        insertStreamerDAO = self.daoFactory(classname = "RunConfig.InsertStreamer")
+
+        insertStreamDAO.execute(binds = { 'STREAM' : "A" },
+                                transaction = False)
+
+        for run in [ 1, 2 ]:
+            insertRunDAO.execute(binds = { 'RUN' : run,
+                                           'TIME' : self.currentTime,
+                                           'HLTKEY' : "someHLTKey" },
+                                 transaction = False)
+            insertLumiDAO.execute(binds = { 'RUN' : run,
+                                            'LUMI' : 1 },
+                                  transaction = False)
+            insertStreamerDAO.execute(binds = { 'RUN' : run,
+                                                'LUMI' : 1,
+                                                'STREAM' : "A",
+                                                'LFN' : "/testLFN/A/%d" % run,
+                                                'FILESIZE' : 100,
+                                                'EVENTS' : 100,
+                                                'TIME' : self.currentTime },
+                                      transaction = False)
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        self.testInit.clearDatabase()
+
+        return
+
+    def closeRuns(self):
+        """
+        _closeRuns_
+
+        helper function that stops and closes all runs
+        """
+        stopRunsDAO = self.daoFactory(classname = "RunLumiCloseout.StopRuns")
+        closeRunsDAO = self.daoFactory(classname = "RunLumiCloseout.CloseRuns")
+
+        for run in [ 1, 2 ]:
+            stopRunsDAO.execute(binds = { 'RUN' : run,
+                                          'START_TIME' : self.currentTime,
+                                          'STOP_TIME' : self.currentTime },
+                                transaction = False)
+            closeRunsDAO.execute(binds = { 'RUN' : run,
+                                           'LUMICOUNT' : 1,
+                                           'CLOSE_TIME' : self.currentTime },
+                                 transaction = False)
+
+        return
+
+    def testPurgeGating(self):
+        """
+        _testPurgeGating_
+
+        Test that only closed runs are purgeable and that with
+        streamer notification runs are only purgeable once
+        all their streamers are marked finished
+
+        """
+        findPurgeableRunsDAO = self.daoFactory(classname = "RunLumiCloseout.FindPurgeableRuns")
+        markStreamersFinishedDAO = self.daoFactory(classname = "SMNotification.MarkStreamersFinished")
+        purgeRunDAO = self.daoFactory(classname = "RunLumiCloseout.PurgeRun")
+
+        self.assertEqual(findPurgeableRunsDAO.execute(True, transaction = False), [],
+                         "ERROR: open runs should not be purgeable")
+        self.assertEqual(findPurgeableRunsDAO.execute(False, transaction = False), [],
+                         "ERROR: open runs should not be purgeable")
+
+        self.closeRuns()
+
+        self.assertEqual(findPurgeableRunsDAO.execute(True, transaction = False), [],
+                         "ERROR: runs with streamers pending delete should not be purgeable")
+        self.assertEqual(sorted(findPurgeableRunsDAO.execute(False, transaction = False)), [ 1, 2 ],
+                         "ERROR: without streamer notification closed runs should be purgeable")
+
+        myThread = threading.currentThread()
+        results = myThread.dbi.processData("""SELECT id
+                                              FROM streamer
+                                              WHERE run_id = 1
+                                              """, transaction = False)[0].fetchall()
+        markStreamersFinishedDAO.execute([ results[0][0] ], transaction = False)
+
+        self.assertEqual(findPurgeableRunsDAO.execute(True, transaction = False), [ 1 ],
+                         "ERROR: run with all streamers finished should be purgeable")
+
+        purgeRunDAO.execute(1, transaction = False)
+
+        self.assertEqual(findPurgeableRunsDAO.execute(True, transaction = False), [],
+                         "ERROR: purged run should not be purgeable anymore")
+        self.assertEqual(findPurgeableRunsDAO.execute(False, transaction = False), [ 2 ],
+                         "ERROR: purged run should not be purgeable anymore")
+
+        results = myThread.dbi.processData("""SELECT DISTINCT run_id
+                                              FROM lumi_section
+                                              """, transaction = False)[0].fetchall()
+        self.assertEqual(results, [ (2,) ],
+                         "ERROR: lumi sections of the purged run should be removed")
+
+        return
+
+
+class SQLitePurgeRunsTest(PurgeRunsTest):
+    """
+    _SQLitePurgeRunsTest_
+
+    Test for the SQLite run purge DAOs
+    """
+
+    connectUrl = "sqlite://"
+
+
+if __name__ == '__main__':
+    unittest.main()
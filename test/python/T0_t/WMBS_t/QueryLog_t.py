@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+"""
+_QueryLog_t_
+
+Query log, slow query log and report test
+
+"""
+
+import unittest
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from T0.WMBS.QueryLog import QueryLog, ProfiledDBInterface
+from T0.Monitoring.QueryReport import readQueryLog, buildQueryReport, reportAsText
+
+
+class FakeResultSet(object):
+
+    def __init__(self, cursor):
+        self.data = cursor.fetchall()
+        self.rowcount = cursor.rowcount
+
+    def fetchall(self):
+        return self.data
+
+
+class FakeDialect(object):
+    name = "sqlite"
+
+
+class FakeEngine(object):
+    dialect = FakeDialect()
+
+
+class FakeDBInterface(object):
+    """
+    _FakeDBInterface_
+
+    processData on an in memory SQLite database
+
+    """
+    engine = FakeEngine()
+
+    def __init__(self):
+        self.db = sqlite3.connect(":memory:")
+        self.db.execute("CREATE TABLE run (run_id int primary key, status int)")
+        self.db.executemany("INSERT INTO run VALUES (?, 1)", [ (run,) for run in range(10) ])
+        self.statements = []
+
+    def processData(self, sqlstmt, binds = {}, conn = None,
+                    transaction = False, returnCursor = False):
+        self.statements.append(sqlstmt)
+        if isinstance(binds, list):
+            return [ FakeResultSet(self.db.execute(sqlstmt, b)) for b in binds ]
+        return [ FakeResultSet(self.db.execute(sqlstmt, binds)) ]
+
+
+class QueryLogTest(unittest.TestCase):
+    """
+    _QueryLogTest_
+
+    Test for the query statistics and slow query log
+
+    """
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.slowLogFile = os.path.join(self.tempDir, "slowQueries.log")
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
+        return
+
+    def testProfiledDBInterface(self):
+        """
+        _testProfiledDBInterface_
+
+        Calls are recorded per DAO with binds and rows
+
+        """
+        queryLog = QueryLog(threshold = 1000, slowLogFile = self.slowLogFile)
+        dbInterface = ProfiledDBInterface(queryLog, "RunConfig.FindRuns", FakeDBInterface())
+
+        results = dbInterface.processData("SELECT run_id FROM run WHERE run_id < :RUN", { 'RUN' : 5 })
+        self.assertEqual(len(results[0].fetchall()), 5)
+        dbInterface.processData("UPDATE run SET status = 2 WHERE run_id = :RUN",
+                                [ { 'RUN' : 1 }, { 'RUN' : 2 }, { 'RUN' : 20 } ])
+
+        hour, daos = queryLog.summary()
+        self.assertEqual(daos['RunConfig.FindRuns']['calls'], 2)
+        self.assertEqual(daos['RunConfig.FindRuns']['binds'], 4)
+        self.assertEqual(daos['RunConfig.FindRuns']['rows'], 7)
+        self.assertEqual(daos['RunConfig.FindRuns']['slow'], 0)
+        self.assertEqual(daos['RunConfig.FindRuns']['errors'], 0)
+
+        # passed through to the wrapped interface
+        self.assertEqual(dbInterface.engine.dialect.name, "sqlite")
+
+        self.assertFalse(os.path.exists(self.slowLogFile))
+
+        return
+
+    def testFailedQuery(self):
+        """
+        _testFailedQuery_
+
+        Failed calls are recorded with the error flag,
+        the exception is passed on
+
+        """
+        queryLog = QueryLog(threshold = 0, slowLogFile = self.slowLogFile)
+        fakeDBInterface = FakeDBInterface()
+        dbInterface = ProfiledDBInterface(queryLog, "RunConfig.FindRuns", fakeDBInterface)
+
+        self.assertRaises(sqlite3.OperationalError, dbInterface.processData,
+                          "SELECT run_id FROM no_such_table")
+
+        hour, daos = queryLog.summary()
+        self.assertEqual(daos['RunConfig.FindRuns']['calls'], 1)
+        self.assertEqual(daos['RunConfig.FindRuns']['errors'], 1)
+        self.assertEqual(daos['RunConfig.FindRuns']['rows'], 0)
+
+        # no execution plan for the failed statement
+        self.assertEqual(fakeDBInterface.statements, [ "SELECT run_id FROM no_such_table" ])
+
+        with open(self.slowLogFile) as logFile:
+            hours, slowQueries = readQueryLog(logFile)
+        self.assertTrue(slowQueries[0]['error'])
+        self.assertEqual(slowQueries[0]['rows'], None)
+
+        return
+
+    def testSlowQueryLog(self):
+        """
+        _testSlowQueryLog_
+
+        Slow statements are logged, the plan is captured on first
+        occurrence, hours are summarized and ranked
+
+        """
+        queryLog = QueryLog(threshold = 1.0, slowLogFile = self.slowLogFile)
+        dbInterface = FakeDBInterface()
+
+        sql = """SELECT run_id
+                 FROM run
+                 WHERE status = :STATUS"""
+
+        queryLog.record("RunLumiCloseout.FindClosedLumis", sql, { 'STATUS' : 1 }, 2.0, 1, 10, dbInterface, now = 7200)
+        queryLog.record("RunLumiCloseout.FindClosedLumis", sql, { 'STATUS' : 1 }, 3.0, 1, 10, dbInterface, now = 7300)
+        queryLog.record("RunConfig.InsertStreamer", "INSERT INTO run VALUES (:RUN, 1)", [ { 'RUN' : 11 } ],
+                        0.5, 1, 1, dbInterface, now = 7400)
+        queryLog.record("RunConfig.InsertStreamer", "INSERT INTO run VALUES (:RUN, 1)", [ { 'RUN' : 12 } ],
+                        0.5, 1, 1, dbInterface, now = 10900)
+
+        self.assertEqual(len([ statement for statement in dbInterface.statements
+                               if statement.startswith("EXPLAIN QUERY PLAN") ]), 1)
+
+        queryLog.flush()
+
+        with open(self.slowLogFile) as logFile:
+            hours, slowQueries = readQueryLog(logFile)
+
+        self.assertEqual(len(slowQueries), 2)
+        self.assertEqual(slowQueries[0]['sql'], "SELECT run_id FROM run WHERE status = :STATUS")
+        self.assertEqual(len(slowQueries[0]['plan']), 1)
+        self.assertFalse('plan' in slowQueries[1])
+
+        report = buildQueryReport(hours)
+        self.assertEqual([ hour for hour, ranking in report ], [ 7200, 10800 ])
+        self.assertEqual([ dao for dao, stats in report[0][1] ], [ "RunLumiCloseout.FindClosedLumis",
+                                                                   "RunConfig.InsertStreamer" ])
+        self.assertEqual(report[0][1][0][1]['total_time'], 5.0)
+        self.assertEqual(report[0][1][0][1]['slow'], 2)
+        self.assertEqual(len(buildQueryReport(hours, since = 10800)), 1)
+
+        self.assertTrue("RunLumiCloseout.FindClosedLumis" in reportAsText(report, slowQueries))
+
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
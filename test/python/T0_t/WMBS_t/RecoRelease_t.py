@@ -0,0 +1,319 @@
+#!/usr/bin/env python
+"""
+_RecoRelease_t_
+
+PromptReco release DAO test
+
+"""
+
+import unittest
+import threading
+import logging
+import time
+
+from WMCore.WMBS.Fileset import Fileset
+
+from WMCore.DAOFactory import DAOFactory
+from WMQuality.TestInit import TestInit
+
+from T0.RunConfig.RunConfigAPI import changedRecoReleaseDelays
+from T0.RunConfig.Tier0Config import createTier0Config
+
+
+class RecoReleaseTest(unittest.TestCase):
+    """
+    _RecoReleaseTest_
+
+    Test for the FindRecoReleaseDatasets, UpdateRecoReleaseDelays
+    and FindRecoRelease DAOs, against the configured database
+    """
+
+    connectUrl = None
+
+    def setUp(self):
+        """
+        _setUp_
+
+        MinimumBias has a PhEDEx configuration, Cosmics has none
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+        self.testInit.setDatabaseConnection(connectUrl = self.connectUrl)
+
+        self.testInit.setSchema(customModules = ["T0.WMBS"])
+
+        myThread = threading.currentThread()
+        self.daoFactory = DAOFactory(package = "T0.WMBS",
+                                     logger = logging,
+                                     dbinterface = myThread.dbi)
+
+        self.currentTime = int(time.time())
+
+        insertRunDAO = self.daoFactory(classname = "RunConfig.InsertRun")
+        insertRunDAO.execute(binds = { 'RUN' : 1,
+                                       'TIME' : self.currentTime,
+                                       'HLTKEY' : "someHLTKey" },
+                             transaction = False)
+
+        insertStreamDAO = self.daoFactory(classname = "RunConfig.InsertStream")
+        insertStreamDAO.execute(binds = { 'STREAM' : "A" },
+                                transaction = False)
+
+        insertCMSSWVersionDAO = self.daoFactory(classname = "RunConfig.InsertCMSSWVersion")
+        insertCMSSWVersionDAO.execute(binds = { 'VERSION' : "CMSSW_5_2_7" },
+                                      transaction = False)
+
+        insertRepackConfigDAO = self.daoFactory(classname = "RunConfig.InsertRepackConfig")
+        insertRepackConfigDAO.execute(binds = { 'RUN' : 1,
+                                                'STREAM' : "A",
+                                                'PROC_VER' : 1,
+                                                'MAX_SIZE_SINGLE_LUMI' : 1,
+                                                'MAX_SIZE_MULTI_LUMI' : 1,
+                                                'MIN_SIZE' : 1,
+                                                'MAX_SIZE' : 1,
+                                                'MAX_EDM_SIZE' : 1,
+                                                'MAX_OVER_SIZE' : 1,
+                                                'MAX_EVENTS' : 1,
+                                                'MAX_FILES' : 1,
+                                                'BLOCK_DELAY' : 1,
+                                                'CMSSW' : "CMSSW_5_2_7",
+                                                'SCRAM_ARCH' : "slc5_amd64_gcc462" },
+                                      transaction = False)
+
+        insertStorageNodeDAO = self.daoFactory(classname = "RunConfig.InsertStorageNode")
+        insertStorageNodeDAO.execute(binds = [ { 'NODE' : "T0_CH_CERN_MSS" },
+                                               { 'NODE' : "T1_US_FNAL_MSS" },
+                                               { 'NODE' : "T2_CH_CERN" } ],
+                                     transaction = False)
+
+        insertPrimaryDatasetDAO = self.daoFactory(classname = "RunConfig.InsertPrimaryDataset")
+        insertStreamDatasetDAO = self.daoFactory(classname = "RunConfig.InsertStreamDataset")
+        insertRecoReleaseConfigDAO = self.daoFactory(classname = "RunConfig.InsertRecoReleaseConfig")
+        for primds in [ "MinimumBias", "Cosmics" ]:
+
+            insertPrimaryDatasetDAO.execute(binds = { 'PRIMDS' : primds },
+                                            transaction = False)
+            insertStreamDatasetDAO.execute(binds = { 'RUN' : 1,
+                                                     'PRIMDS' : primds,
+                                                     'STREAM' : "A" },
+                                           transaction = False)
+
+            fileset = Fileset(name = "Run1_%s" % primds)
+            fileset.create()
+
+            insertRecoReleaseConfigDAO.execute(binds = { 'RUN' : 1,
+                                                         'PRIMDS' : primds,
+                                                         'FILESET' : fileset.id },
+                                               transaction = False)
+
+        insertPhEDExConfigDAO = self.daoFactory(classname = "RunConfig.InsertPhEDExConfig")
+        insertPhEDExConfigDAO.execute(binds = { 'RUN' : 1,
+                                                'PRIMDS' : "MinimumBias",
+                                                'ARCHIVAL_NODE' : "T0_CH_CERN_MSS",
+                                                'TAPE_NODE' : "T1_US_FNAL_MSS",
+                                                'DISK_NODE' : "T2_CH_CERN" },
+                                      transaction = False)
+
+        self.tier0Config = createTier0Config()
+        self.setRecoDelay("MinimumBias", 150, 60)
+        self.setRecoDelay("Cosmics", 150, 0)
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        self.testInit.clearDatabase()
+
+        return
+
+    def setRecoDelay(self, primds, delay, delayOffset):
+        """
+        _setRecoDelay_
+
+        helper function that sets the dataset delays in the Tier0 configuration
+        """
+        datasetConfig = getattr(self.tier0Config.Datasets, primds, None)
+        if datasetConfig == None:
+            datasetConfig = self.tier0Config.Datasets.section_(primds)
+
+        datasetConfig.RecoDelay = delay
+        datasetConfig.RecoDelayOffset = delayOffset
+
+        return
+
+    def stopRun(self, stopTime):
+        """
+        _stopRun_
+
+        helper function that sets the stop time of the run
+        """
+        stopRunsDAO = self.daoFactory(classname = "RunLumiCloseout.StopRuns")
+        stopRunsDAO.execute(binds = { 'RUN' : 1,
+                                      'START_TIME' : stopTime,
+                                      'STOP_TIME' : stopTime },
+                            transaction = False)
+
+        return
+
+    def updateRecoReleaseDelays(self):
+        """
+        _updateRecoReleaseDelays_
+
+        helper function that writes the changed delays like
+        releasePromptReco does, returns the written binds
+        """
+        findRecoReleaseDatasetsDAO = self.daoFactory(classname = "RunConfig.FindRecoReleaseDatasets")
+        updateRecoReleaseDelaysDAO = self.daoFactory(classname = "RunConfig.UpdateRecoReleaseDelays")
+
+        recoReleaseDatasets = findRecoReleaseDatasetsDAO.execute(transaction = False)
+
+        binds = changedRecoReleaseDelays(self.tier0Config, recoReleaseDatasets)
+        if len(binds) > 0:
+            updateRecoReleaseDelaysDAO.execute(binds, transaction = False)
+
+        return binds
+
+    def getReleased(self):
+        """
+        _getReleased_
+
+        helper function that returns released, delay and
+        delay_offset of reco_release_config per dataset
+        """
+        myThread = threading.currentThread()
+
+        results = myThread.dbi.processData("""SELECT primary_dataset.name,
+                                                     reco_release_config.released,
+                                                     reco_release_config.delay,
+                                                     reco_release_config.delay_offset
+                                              FROM reco_release_config
+                                              INNER JOIN primary_dataset ON
+                                                primary_dataset.id = reco_release_config.primds_id
+                                              """, transaction = False)[0].fetchall()
+
+        released = {}
+        for result in results:
+            released[result[0]] = (result[1], result[2], result[3])
+
+        return released
+
+    def testDelays(self):
+        """
+        _testDelays_
+
+        Test that the delays are inserted for datasets without any,
+        are not written again while they are unchanged and are
+        updated when the configuration changes
+
+        """
+        findRecoReleaseDatasetsDAO = self.daoFactory(classname = "RunConfig.FindRecoReleaseDatasets")
+
+        self.assertEqual(findRecoReleaseDatasetsDAO.execute(transaction = False), {},
+                         "ERROR: datasets of a running run should not wait for release")
+
+        self.stopRun(self.currentTime)
+
+        self.assertEqual(findRecoReleaseDatasetsDAO.execute(transaction = False),
+                         { 'MinimumBias' : None, 'Cosmics' : None },
+                         "ERROR: datasets should have no delays yet")
+
+        binds = self.updateRecoReleaseDelays()
+        self.assertEqual(len(binds), 2,
+                         "ERROR: first time delays should be inserted")
+
+        self.assertEqual(findRecoReleaseDatasetsDAO.execute(transaction = False),
+                         { 'MinimumBias' : (150, 60), 'Cosmics' : (150, 0) },
+                         "ERROR: delays are wrong")
+
+        binds = self.updateRecoReleaseDelays()
+        self.assertEqual(binds, [],
+                         "ERROR: unchanged delays should not be written")
+
+        self.setRecoDelay("Cosmics", 300, 0)
+
+        binds = self.updateRecoReleaseDelays()
+        self.assertEqual(binds, [ { 'PRIMDS' : "Cosmics",
+                                    'DELAY' : 300,
+                                    'DELAY_OFFSET' : 0 } ],
+                         "ERROR: only the changed delays should be written")
+
+        self.assertEqual(findRecoReleaseDatasetsDAO.execute(transaction = False),
+                         { 'MinimumBias' : (150, 60), 'Cosmics' : (300, 0) },
+                         "ERROR: delays are wrong")
+
+        return
+
+    def testRelease(self):
+        """
+        _testRelease_
+
+        Test that a dataset is pre-released once its delay minus
+        delay offset passed, keeps the delay it was pre-released
+        with and is released once that delay passed
+
+        Test that a dataset without PhEDEx configuration is
+        released with None for it
+
+        """
+        findRecoReleaseDAO = self.daoFactory(classname = "RunConfig.FindRecoRelease")
+
+        # pre-release window for MinimumBias only
+        self.stopRun(self.currentTime - 100)
+        self.updateRecoReleaseDelays()
+
+        self.assertEqual(findRecoReleaseDAO.execute(transaction = False), {},
+                         "ERROR: nothing should be released")
+
+        released = self.getReleased()
+        self.assertEqual(released['MinimumBias'], (1, 150, 60),
+                         "ERROR: MinimumBias should be pre-released")
+        self.assertEqual(released['Cosmics'][0], 0,
+                         "ERROR: Cosmics should not be pre-released")
+
+        # pre-released delay is locked in
+        self.setRecoDelay("MinimumBias", 10, 0)
+        self.updateRecoReleaseDelays()
+
+        self.assertEqual(findRecoReleaseDAO.execute(transaction = False), {},
+                         "ERROR: nothing should be released")
+
+        self.stopRun(self.currentTime - 200)
+
+        recoRelease = findRecoReleaseDAO.execute(transaction = False)
+
+        self.assertEqual(list(recoRelease.keys()), [ 1 ],
+                         "ERROR: run should be released")
+
+        datasets = {}
+        for dataset in recoRelease[1]['datasets']:
+            datasets[dataset[0]] = dataset
+
+        self.assertEqual(sorted(datasets.keys()), [ "Cosmics", "MinimumBias" ],
+                         "ERROR: both datasets should be released")
+        self.assertEqual(datasets['MinimumBias'][3],
+                         { 'archival_node' : "T0_CH_CERN_MSS",
+                           'tape_node' : "T1_US_FNAL_MSS",
+                           'disk_node' : "T2_CH_CERN" },
+                         "ERROR: PhEDEx configuration is wrong")
+        self.assertEqual(datasets['Cosmics'][3], None,
+                         "ERROR: dataset without PhEDEx configuration should have None")
+
+        return
+
+
+class SQLiteRecoReleaseTest(RecoReleaseTest):
+    """
+    _SQLiteRecoReleaseTest_
+
+    Test for the SQLite PromptReco release DAOs
+    """
+
+    connectUrl = "sqlite://"
+
+
+if __name__ == '__main__':
+    unittest.main()
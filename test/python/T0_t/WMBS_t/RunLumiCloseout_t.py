@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+_RunLumiCloseout_t_
+
+Run cache test for the StorageManager run DAOs
+
+"""
+
+import unittest
+import logging
+
+from T0.WMBS.Oracle.RunLumiCloseout.FindStoppedRuns import FindStoppedRuns
+from T0.WMBS.Oracle.RunLumiCloseout.FindClosedRuns import FindClosedRuns
+
+
+class FakeResult(object):
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeDBInterface(object):
+    """
+    _FakeDBInterface_
+
+    Returns the rows for the runs bound in the query,
+    records the queried runs
+
+    """
+    def __init__(self, rows):
+        self.rows = rows
+        self.queried = []
+
+    def processData(self, sql, binds, conn = None, transaction = False):
+        runs = sorted(set(binds.values()))
+        self.queried.append(runs)
+        return [ FakeResult([ self.rows[run] for run in runs if run in self.rows ]) ]
+
+
+class RunLumiCloseoutTest(unittest.TestCase):
+    """
+    _RunLumiCloseoutTest_
+
+    Test for the run caches of FindStoppedRuns and FindClosedRuns
+
+    """
+    def testStoppedRunsCache(self):
+        """
+        _testStoppedRunsCache_
+
+        Stopped runs are only queried until they are found stopped,
+        runs not passed in anymore are evicted
+
+        """
+        dbInterface = FakeDBInterface( { 1 : (1, 100, 200) } )
+        findStoppedRunsDAO = FindStoppedRuns(logging, dbInterface)
+
+        # miss
+        self.assertEqual(findStoppedRunsDAO.execute([ 1, 2 ]), { 1 : (100, 200) })
+        self.assertEqual(dbInterface.queried, [ [ 1, 2 ] ])
+
+        # hit for run 1, run 2 is still queried
+        dbInterface.rows[2] = (2, 300, 400)
+        self.assertEqual(findStoppedRunsDAO.execute([ 1, 2 ]), { 1 : (100, 200),
+                                                                 2 : (300, 400) })
+        self.assertEqual(dbInterface.queried[1], [ 2 ])
+
+        # run 1 isn't passed in anymore
+        self.assertEqual(findStoppedRunsDAO.execute([ 2 ]), { 2 : (300, 400) })
+        self.assertEqual(len(dbInterface.queried), 2)
+        self.assertEqual(findStoppedRunsDAO.stoppedRunsCache, { 2 : (300, 400) })
+
+        # caches aren't shared between instances
+        self.assertEqual(FindStoppedRuns(logging, dbInterface).stoppedRunsCache, {})
+
+        return
+
+    def testClosedRunsCache(self):
+        """
+        _testClosedRunsCache_
+
+        Closed runs are only queried until they are found closed,
+        runs not passed in anymore are evicted
+
+        """
+        dbInterface = FakeDBInterface( { 1 : (1, 10) } )
+        findClosedRunsDAO = FindClosedRuns(logging, dbInterface)
+
+        # miss
+        self.assertEqual(findClosedRunsDAO.execute([ 1, 2 ]), { 1 : 10 })
+        self.assertEqual(dbInterface.queried, [ [ 1, 2 ] ])
+
+        # hit for run 1, run 2 is still queried
+        dbInterface.rows[2] = (2, 20)
+        self.assertEqual(findClosedRunsDAO.execute([ 1, 2 ]), { 1 : 10, 2 : 20 })
+        self.assertEqual(dbInterface.queried[1], [ 2 ])
+
+        # run 1 isn't passed in anymore, it's queried again if it comes back
+        self.assertEqual(findClosedRunsDAO.execute([ 2 ]), { 2 : 20 })
+        self.assertEqual(findClosedRunsDAO.closedRunsCache, { 2 : 20 })
+        self.assertEqual(findClosedRunsDAO.execute([ 1 ]), { 1 : 10 })
+        self.assertEqual(dbInterface.queried[2], [ 1 ])
+
+        # caches aren't shared between instances
+        self.assertEqual(FindClosedRuns(logging, dbInterface).closedRunsCache, {})
+
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+"""
+_SMNotification_t_
+
+StorageManager notification DAO test
+
+"""
+
+import unittest
+import threading
+import logging
+import time
+
+from WMCore.DAOFactory import DAOFactory
+from WMQuality.TestInit import TestInit
+
+
+class SMNotificationTest(unittest.TestCase):
+    """
+    _SMNotificationTest_
+
+    Test for the finished streamer paging, against
+    the configured database
+    """
+
+    connectUrl = None
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+        self.testInit.setDatabaseConnection(connectUrl = self.connectUrl)
+
+        self.testInit.setSchema(customModules = ["T0.WMBS"])
+
+        myThread = threading.currentThread()
+        self.daoFactory = DAOFactory(package = "T0.WMBS",
+                                     logger = logging,
+                                     dbinterface = myThread.dbi)
+
+        self.currentTime = int(time.time())
+
+        insertRunDAO = self.daoFactory(classname = "RunConfig.InsertRun")
+        insertRunDAO.execute(binds = { 'RUN' : 1,
+                                       'TIME' : self.currentTime,
+                                       'HLTKEY' : "someHLTKey" },
+                             transaction = False)
+
+        insertLumiDAO = self.daoFactory(classname = "RunConfig.InsertLumiSection")
+        insertLumiDAO.execute(binds = { 'RUN' : 1,
+                                        'LUMI' : 1 },
+                              transaction = False)
+
+        insertStreamDAO = self.daoFactory(classname = "RunConfig.InsertStream")
+        insertStreamDAO.execute(binds = { 'STREAM' : "A" },
+                                transaction = False)
+
+        binds = []
+        for i in range(5):
+            binds.append( { 'RUN' : 1,
+                            'LUMI' : 1,
+                            'STREAM' : "A",
+                            'LFN' : "/testLFN/A/%d" % i,
+                            'FILESIZE' : 100,
+                            'EVENTS' : 100,
+                            'TIME' : self.currentTime } )
+
+        insertStreamerDAO = self.daoFactory(classname = "RunConfig.InsertStreamer")
+        insertStreamerDAO.execute(binds = binds, transaction = False)
+
+        results = myThread.dbi.processData("""SELECT id
+                                              FROM stream
+                                              WHERE name = 'A'
+                                              """, transaction = False)[0].fetchall()
+        self.streamId = results[0][0]
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        self.testInit.clearDatabase()
+
+        return
+
+    def testPaging(self):
+        """
+        _testPaging_
+
+        Test that the finished streamers are paged in id order
+        starting after LAST_ID and that marked streamers are
+        not returned again
+
+        """
+        getFinishedStreamersDAO = self.daoFactory(classname = "SMNotification.GetFinishedStreamers")
+        markStreamersFinishedDAO = self.daoFactory(classname = "SMNotification.MarkStreamersFinished")
+
+        page1 = getFinishedStreamersDAO.execute(1, self.streamId, 0, 2, transaction = False)
+        self.assertEqual([ lfn for (id, lfn) in page1 ], [ "/testLFN/A/0", "/testLFN/A/1" ],
+                         "ERROR: first page is wrong")
+
+        page2 = getFinishedStreamersDAO.execute(1, self.streamId, page1[-1][0], 2, transaction = False)
+        self.assertEqual([ lfn for (id, lfn) in page2 ], [ "/testLFN/A/2", "/testLFN/A/3" ],
+                         "ERROR: second page should start after the first one")
+
+        # only the first page is marked, a restart begins with
+        # the first streamer not marked yet
+        markStreamersFinishedDAO.execute([ id for (id, lfn) in page1 ], transaction = False)
+
+        page = getFinishedStreamersDAO.execute(1, self.streamId, 0, 10, transaction = False)
+        self.assertEqual([ lfn for (id, lfn) in page ], [ "/testLFN/A/2", "/testLFN/A/3", "/testLFN/A/4" ],
+                         "ERROR: marked streamers should not be returned")
+
+        page = getFinishedStreamersDAO.execute(1, self.streamId, page[-1][0], 10, transaction = False)
+        self.assertEqual(page, [],
+                         "ERROR: nothing should be left after the last streamer")
+
+        return
+
+    def testClearFinished(self):
+        """
+        _testClearFinished_
+
+        Test that without notification the streamers are removed
+        from the queue once their run/stream fileset is closed
+
+        """
+        insertStreamFilesetDAO = self.daoFactory(classname = "RunConfig.InsertStreamFileset")
+        clearFinishedStreamersDAO = self.daoFactory(classname = "SMNotification.ClearFinishedStreamers")
+
+        insertStreamFilesetDAO.execute(1, "A", "TestFileset1", transaction = False)
+
+        myThread = threading.currentThread()
+        pendingSql = """SELECT COUNT(*)
+                        FROM streamer_pending_delete
+                        """
+
+        clearFinishedStreamersDAO.execute(transaction = False)
+        results = myThread.dbi.processData(pendingSql, transaction = False)[0].fetchall()
+        self.assertEqual(results[0][0], 5,
+                         "ERROR: streamers of an open fileset should stay queued")
+
+        myThread.dbi.processData("""UPDATE wmbs_fileset
+                                    SET open = 0
+                                    WHERE name = 'TestFileset1'
+                                    """, transaction = False)
+
+        clearFinishedStreamersDAO.execute(transaction = False)
+        results = myThread.dbi.processData(pendingSql, transaction = False)[0].fetchall()
+        self.assertEqual(results[0][0], 0,
+                         "ERROR: streamers of a closed fileset should be removed")
+
+        return
+
+
+class SQLiteSMNotificationTest(SMNotificationTest):
+    """
+    _SQLiteSMNotificationTest_
+
+    Test for the SQLite StorageManager notification DAOs
+    """
+
+    connectUrl = "sqlite://"
+
+
+if __name__ == '__main__':
+    unittest.main()
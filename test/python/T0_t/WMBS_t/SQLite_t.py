@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+"""
+_SQLite_t_
+
+Test of the SQLite schema and DAOs, runs the Tier0Feeder
+flow from streamer insert to fileset closeout
+
+"""
+
+import unittest
+import threading
+import logging
+import time
+import sys
+import os
+
+from WMCore.WMBS.Fileset import Fileset
+from WMCore.WMBS.Subscription import Subscription
+from WMCore.WMBS.Workflow import Workflow
+
+from WMCore.DAOFactory import DAOFactory
+from WMQuality.TestInit import TestInit
+
+
+class SQLiteTest(unittest.TestCase):
+    """
+    _SQLiteTest_
+
+    Test of the SQLite schema and DAOs
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        """
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+        self.testInit.setDatabaseConnection(connectUrl = "sqlite://")
+
+        self.testInit.setSchema(customModules = ["T0.WMBS"])
+
+        myThread = threading.currentThread()
+        self.daoFactory = DAOFactory(package = "T0.WMBS",
+                                     logger = logging,
+                                     dbinterface = myThread.dbi)
+
+        self.currentTime = int(time.time())
+
+        insertRunDAO = self.daoFactory(classname = "RunConfig.InsertRun")
+        insertRunDAO.execute(binds = { 'RUN' : 1,
+                                       'TIME' : self.currentTime,
+                                       'HLTKEY' : "someHLTKey" },
+                             transaction = False)
+
+        insertLumiDAO = self.daoFactory(classname = "RunConfig.InsertLumiSection")
+        for lumi in [1, 2]:
+            insertLumiDAO.execute(binds = { 'RUN' : 1,
+                                            'LUMI' : lumi },
+                                  transaction = False)
+
+        insertStreamDAO = self.daoFactory(classname = "RunConfig.InsertStream")
+        insertStreamDAO.execute(binds = { 'STREAM' : "A" },
+                                transaction = False)
+
+        insertStreamFilesetDAO = self.daoFactory(classname = "RunConfig.InsertStreamFileset")
+        insertStreamFilesetDAO.execute(1, "A", "TestFileset1")
+
+        self.fileset1 = Fileset(name = "TestFileset1")
+        self.fileset1.load()
+
+        workflow1 = Workflow(spec = "spec.xml", owner = "hufnagel", name = "TestWorkflow1", task="Test")
+        workflow1.create()
+
+        self.subscription1  = Subscription(fileset = self.fileset1,
+                                           workflow = workflow1,
+                                           split_algo = "Repack",
+                                           type = "Repack")
+        self.subscription1.create()
+
+        return
+
+    def tearDown(self):
+        """
+        _tearDown_
+
+        """
+        self.testInit.clearDatabase()
+
+        return
+
+    def countRows(self, table):
+        """
+        _countRows_
+
+        helper function that counts the rows of a table
+        """
+        myThread = threading.currentThread()
+
+        results = myThread.dbi.processData("""SELECT COUNT(*)
+                                              FROM %s
+                                              """ % table, transaction = False)[0].fetchall()
+
+        return results[0][0]
+
+    def testOracleFallback(self):
+        """
+        _testOracleFallback_
+
+        Test that a DAO without SQLite module of its own is
+        loaded from the Oracle package
+
+        """
+        getRunInfoDAO = self.daoFactory(classname = "RunConfig.GetRunInfo")
+        module = sys.modules[getRunInfoDAO.__class__.__module__]
+
+        self.assertEqual(module.__name__, "T0.WMBS.SQLite.RunConfig.GetRunInfo")
+        self.assertEqual(os.path.basename(os.path.dirname(os.path.dirname(module.__file__))), "Oracle",
+                         "ERROR: DAO should be loaded from the Oracle package")
+
+        return
+
+    def testFeederFlow(self):
+        """
+        _testFeederFlow_
+
+        Test the feeder flow, streamers are only fed after their
+        lumi is closed and the fileset is only closed once the
+        run is closed and all its streamers are fed
+
+        """
+        insertStreamerDAO = self.daoFactory(classname = "RunConfig.InsertStreamer")
+        insertClosedLumiDAO = self.daoFactory(classname = "RunLumiCloseout.InsertClosedLumi")
+        finalCloseLumiDAO = self.daoFactory(classname = "RunLumiCloseout.FinalCloseLumi")
+        feedStreamersDAO = self.daoFactory(classname = "Tier0Feeder.FeedStreamers")
+        closeRunStreamFilesetsDAO = self.daoFactory(classname = "RunLumiCloseout.CloseRunStreamFilesets")
+        stopRunsDAO = self.daoFactory(classname = "RunLumiCloseout.StopRuns")
+        closeRunsDAO = self.daoFactory(classname = "RunLumiCloseout.CloseRuns")
+
+        binds = []
+        for lumi in [1, 2]:
+            for i in [1, 2]:
+                binds.append( { 'RUN' : 1,
+                                'LUMI' : lumi,
+                                'STREAM' : "A",
+                                'LFN' : "/testLFN/A/%d/%d" % (lumi, i),
+                                'FILESIZE' : 100,
+                                'EVENTS' : 100,
+                                'TIME' : self.currentTime } )
+        insertStreamerDAO.execute(binds = binds, transaction = False)
+
+        self.assertEqual(self.countRows("streamer_pending_feed"), 4,
+                         "ERROR: streamers should be pending feed")
+
+        feedStreamersDAO.execute(transaction = False)
+
+        self.assertEqual(self.countRows("wmbs_sub_files_available"), 0,
+                         "ERROR: streamers of open lumis should not be fed")
+
+        binds = []
+        for lumi in [1, 2]:
+            binds.append( { 'RUN' : 1,
+                            'LUMI' : lumi,
+                            'STREAM' : "A",
+                            'FILECOUNT' : 2,
+                            'INSERT_TIME' : self.currentTime,
+                            'CLOSE_TIME' : 0 } )
+        insertClosedLumiDAO.execute(binds = binds, transaction = False)
+        finalCloseLumiDAO.execute(self.currentTime, transaction = False)
+
+        feedStreamersDAO.execute(transaction = False)
+
+        self.assertEqual(self.countRows("wmbs_sub_files_available"), 4,
+                         "ERROR: streamers of closed lumis should be fed")
+        self.assertEqual(self.countRows("streamer_pending_feed"), 0,
+                         "ERROR: fed streamers should be removed from the feed queue")
+
+        self.assertEqual(closeRunStreamFilesetsDAO.execute(transaction = False), 0,
+                         "ERROR: filesets of an open run should not be closed")
+
+        stopRunsDAO.execute(binds = { 'RUN' : 1,
+                                      'START_TIME' : self.currentTime,
+                                      'STOP_TIME' : self.currentTime },
+                            transaction = False)
+        closeRunsDAO.execute(binds = { 'RUN' : 1,
+                                       'LUMICOUNT' : 2,
+                                       'CLOSE_TIME' : self.currentTime },
+                             transaction = False)
+
+        self.assertEqual(closeRunStreamFilesetsDAO.execute(transaction = False), 1,
+                         "ERROR: fileset of the closed run should be closed")
+
+        self.fileset1.load()
+        self.assertFalse(self.fileset1.open,
+                         "ERROR: fileset should be closed")
+
+        myThread = threading.currentThread()
+        results = myThread.dbi.processData("""SELECT milestone
+                                              FROM latency_ledger
+                                              WHERE run_id = 1
+                                              """, transaction = False)[0].fetchall()
+
+        self.assertEqual(sorted([ result[0] for result in results ]),
+                         [ "eols", "feed", "fileset_closed", "lumi_closed", "streamer" ],
+                         "ERROR: latency ledger milestones are wrong")
+
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+"""
+_SpecStore_t_
+
+Workflow spec store test
+
+"""
+
+import unittest
+import os
+import pickle
+import shutil
+import tempfile
+import zlib
+
+from T0.WMSpec.SpecStore import SpecStore, specStore
+
+
+class FakeSection(object):
+    """
+    _FakeSection_
+
+    Behaves like a WMCore ConfigSection for pickling, child
+    sections keep a reference to their parent
+
+    """
+    def __init__(self, name):
+        self.__dict__['_internal_name'] = name
+        self.__dict__['_internal_settings'] = set()
+        self.__dict__['_internal_children'] = set()
+        self.__dict__['_internal_parent_ref'] = None
+
+    def __setattr__(self, name, value):
+        if isinstance(value, FakeSection):
+            self._internal_children.add(name)
+            value.__dict__['_internal_parent_ref'] = self
+        self._internal_settings.add(name)
+        self.__dict__[name] = value
+
+    def section_(self, name):
+        if name not in self.__dict__:
+            setattr(self, name, FakeSection(name))
+        return self.__dict__[name]
+
+
+def makeWorkload(run, stream):
+    """
+    _makeWorkload_
+
+    Repack like workload, only the top level task depends on the run
+
+    """
+    workload = FakeSection("Repack_Run%d_Stream%s" % (run, stream))
+    workload.owner = "T0"
+    tasks = workload.section_("tasks")
+    tasks.tasklist = [ "Repack" ]
+    repack = tasks.section_("Repack")
+    repack.runWhitelist = [ run ]
+    repack.pathName = "/%s/Repack" % workload._internal_name
+    for step in [ "cmsRun1", "stageOut1", "logArch1" ]:
+        stepSection = repack.section_("steps").section_(step)
+        stepSection.config = "x" * 5000 + step
+        stepSection.outputModules = set([ "write_RAW", "write_ALCARECO", "write_DQM" ])
+    return workload
+
+
+class SpecStoreTest(unittest.TestCase):
+    """
+    _SpecStoreTest_
+
+    Test for storing, deduplicating and loading specs
+
+    """
+    def setUp(self):
+        self.testDir = tempfile.mkdtemp()
+        self.storeDir = os.path.join(self.testDir, "store")
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.testDir)
+        return
+
+    def testDeduplication(self):
+        """
+        _testDeduplication_
+
+        Identical sections are stored once, workloads
+        come back complete with parent references
+
+        """
+        store = SpecStore(self.storeDir)
+
+        key1 = store.put(makeWorkload(1, "A"))
+        written = store.metrics()['blobs_written']
+        key2 = store.put(makeWorkload(2, "A"))
+
+        self.assertNotEqual(key1, key2)
+        self.assertEqual(key1, store.put(makeWorkload(1, "A")))
+
+        # only the run dependent sections are new
+        metrics = store.metrics()
+        self.assertTrue(metrics['blobs_written'] < 2 * written)
+        self.assertTrue(metrics['blobs_reused'] >= 3)
+
+        workload = store.get(key2)
+        self.assertEqual(workload._internal_name, "Repack_Run2_StreamA")
+        repack = workload.tasks.Repack
+        self.assertEqual(repack.runWhitelist, [ 2 ])
+        self.assertTrue(repack._internal_parent_ref is workload.tasks)
+        self.assertTrue(repack.steps._internal_parent_ref is repack)
+        self.assertTrue(repack.steps.cmsRun1._internal_parent_ref is repack.steps)
+        self.assertEqual(repack.steps.cmsRun1.outputModules, set([ "write_RAW", "write_ALCARECO", "write_DQM" ]))
+
+        # every get is a new copy
+        self.assertFalse(store.get(key2) is workload)
+        self.assertTrue(store.metrics()['cache_hits'] > 0)
+
+        return
+
+    def testSpecFiles(self):
+        """
+        _testSpecFiles_
+
+        Stored spec files load with plain pickle, plain spec
+        files still load from the store
+
+        """
+        specPath = os.path.join(self.testDir, "WMWorkload.pkl")
+        with open(specPath, 'wb') as specFile:
+            pickle.dump(makeWorkload(1, "A"), specFile)
+
+        store = specStore(self.storeDir)
+        self.assertEqual(store.load(specPath)._internal_name, "Repack_Run1_StreamA")
+
+        store.storeSpecFile(specPath)
+        self.assertTrue(os.path.getsize(specPath) < 1000)
+
+        with open(specPath, 'rb') as specFile:
+            workload = pickle.load(specFile)
+        self.assertEqual(workload.tasks.Repack.runWhitelist, [ 1 ])
+        self.assertEqual(store.load(specPath).tasks.Repack.steps.logArch1.config, "x" * 5000 + "logArch1")
+
+        return
+
+    def testRelocation(self):
+        """
+        _testRelocation_
+
+        Spec files reference the store relative to themselves,
+        spec and store directory can be moved together
+
+        """
+        specDir = os.path.join(self.testDir, "specs", "Repack_Run1_StreamA")
+        os.makedirs(specDir)
+        specPath = os.path.join(specDir, "WMWorkload.pkl")
+
+        store = SpecStore(os.path.join(self.testDir, "specs", "store"))
+        store.storeSpecFile(specPath, makeWorkload(1, "A"))
+
+        os.rename(os.path.join(self.testDir, "specs"), os.path.join(self.testDir, "moved"))
+        specPath = os.path.join(self.testDir, "moved", "Repack_Run1_StreamA", "WMWorkload.pkl")
+
+        workload = SpecStore(self.storeDir).load(specPath)
+        self.assertEqual(workload.tasks.Repack.runWhitelist, [ 1 ])
+
+        return
+
+    def testCorruptedBlob(self):
+        """
+        _testCorruptedBlob_
+
+        Blobs not matching their key aren't loaded
+
+        """
+        store = SpecStore(self.storeDir)
+        key = store.put(makeWorkload(1, "A"))
+
+        with open(store.blobPath(key), 'wb') as blobFile:
+            blobFile.write(zlib.compress(pickle.dumps("corrupted")))
+
+        self.assertRaises(RuntimeError, SpecStore(self.storeDir).get, key)
+
+        return
+
+    def testCacheBytes(self):
+        """
+        _testCacheBytes_
+
+        The read cache is bounded by the uncompressed size
+        of the blobs, blobs larger than it aren't cached
+
+        """
+        store = SpecStore(self.storeDir)
+        key = store.put(makeWorkload(1, "A"))
+
+        store.get(key)
+        metrics = store.metrics()
+        self.assertTrue(metrics['cache_blobs'] > 1)
+
+        store = SpecStore(self.storeDir, cacheBytes = 6000)
+        store.get(key)
+        metrics = store.metrics()
+        self.assertTrue(metrics['cache_bytes'] <= 6000)
+        self.assertEqual(metrics['cache_blobs'], 1)
+
+        store = SpecStore(self.storeDir, cacheBytes = 100)
+        store.get(key)
+        self.assertEqual(store.metrics()['cache_blobs'], 0)
+
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()